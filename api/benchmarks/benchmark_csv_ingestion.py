@@ -0,0 +1,70 @@
+"""
+Benchmark for the streaming CSV -> Parquet ingestion engine.
+
+Generates telecom-style CSV files of increasing size, ingests each one with
+ingest_csv_to_parquet and prints the time per MB. With the single-pass
+writer the seconds-per-MB column stays roughly constant, i.e. ingest time
+grows linearly with file size.
+
+Usage:
+    python -m api.benchmarks.benchmark_csv_ingestion [size_mb ...]
+"""
+
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from api.datapuur_engine import ingest_csv_to_parquet
+
+HEADERS = ['customerID', 'gender', 'SeniorCitizen', 'tenure', 'Contract',
+           'PaymentMethod', 'MonthlyCharges', 'TotalCharges', 'Churn']
+CONTRACTS = ['Month-to-month', 'One year', 'Two year']
+PAYMENT_METHODS = ['Electronic check', 'Mailed check', 'Bank transfer (automatic)', 'Credit card (automatic)']
+
+
+def generate_csv(path, target_size_mb):
+    """Write a CSV file of approximately target_size_mb megabytes"""
+    target_bytes = target_size_mb * 1024 * 1024
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADERS)
+        row_id = 0
+        while f.tell() < target_bytes:
+            for _ in range(10000):
+                row_id += 1
+                tenure = random.randint(0, 72)
+                monthly = round(random.uniform(18.0, 120.0), 2)
+                writer.writerow([
+                    f"{row_id:08d}-CUST", random.choice(['Male', 'Female']), random.randint(0, 1), tenure,
+                    random.choice(CONTRACTS), random.choice(PAYMENT_METHODS), monthly,
+                    round(monthly * tenure, 2), random.choice(['Yes', 'No'])
+                ])
+    return row_id
+
+
+def run(sizes_mb):
+    print(f"{'size (MB)':>10} {'rows':>12} {'seconds':>10} {'s/MB':>8} {'row groups':>11}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size_mb in sizes_mb:
+            csv_path = Path(tmp_dir) / f"bench_{size_mb}.csv"
+            parquet_path = Path(tmp_dir) / f"bench_{size_mb}.parquet"
+            generate_csv(csv_path, size_mb)
+            actual_mb = os.path.getsize(csv_path) / (1024 * 1024)
+
+            start = time.perf_counter()
+            result = ingest_csv_to_parquet(csv_path, parquet_path, chunk_size=1000)
+            elapsed = time.perf_counter() - start
+
+            print(f"{actual_mb:>10.1f} {result['rows']:>12,} {elapsed:>10.2f} "
+                  f"{elapsed / actual_mb:>8.3f} {result['row_groups']:>11}")
+            csv_path.unlink()
+            parquet_path.unlink()
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10, 20, 40, 80]
+    run(sizes)
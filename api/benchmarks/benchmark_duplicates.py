@@ -0,0 +1,53 @@
+"""
+Benchmark for exact duplicate detection.
+
+Writes a Parquet file in which a share of the rows repeat earlier rows, then
+counts the duplicates with find_exact_duplicates, once in memory and once
+with a memory budget small enough to spill, and checks the count against
+DataFrame.duplicated. Prints the throughput in rows per second.
+
+Usage:
+    python -m api.benchmarks.benchmark_duplicates [rows [duplicate_share]]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from api.benchmarks.benchmark_profiler import generate_parquet
+from api.profiler.services.duplicates import find_exact_duplicates
+
+
+def run(rows, duplicate_share):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+        df = generate_parquet(tmp_dir / "unique.parquet", rows)
+        rng = np.random.default_rng(rows)
+        repeated = rng.integers(0, rows, int(rows * duplicate_share))
+        replaced = rng.choice(rows, len(repeated), replace=False)
+        df.iloc[replaced] = df.iloc[repeated].to_numpy()
+        parquet_path = tmp_dir / "duplicates.parquet"
+        df.to_parquet(parquet_path, index=False, row_group_size=100000)
+
+        start = time.perf_counter()
+        expected = int(df.duplicated().sum())
+        pandas_seconds = time.perf_counter() - start
+        print(f"{rows:,} rows, {expected:,} duplicates (DataFrame.duplicated: {pandas_seconds:.2f}s)")
+
+        for label, memory_rows in (("in memory", rows + 1), ("spilled", max(rows // 8, 1))):
+            start = time.perf_counter()
+            result = find_exact_duplicates(parquet_path, memory_rows=memory_rows)
+            elapsed = time.perf_counter() - start
+            status = "ok" if result["count"] == expected else f"MISMATCH ({result['count']:,})"
+            print(f"{label:>10}: {elapsed:.2f}s, {rows / elapsed / 1e6:.2f}M rows/s, "
+                  f"largest group {result['groups'][0]['count'] if result['groups'] else 0}, {status}")
+
+
+if __name__ == "__main__":
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+    share = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    run(row_count, share)
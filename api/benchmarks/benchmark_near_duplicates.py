@@ -0,0 +1,84 @@
+"""
+Benchmark for near-duplicate detection.
+
+Writes a Parquet file and plants near duplicates in it: copies of earlier
+rows with a typo in the email and a small change to MonthlyCharges. Then
+times the MinHash/LSH engine over the whole file and the sampling
+DataProfiler.detect_fuzzy_duplicates, and prints the recall of each on the
+planted pairs. The engine's recall is the share of planted pairs that end
+up in one group; the sampler only reports a count, so its recall is taken
+as that count over the planted pairs, which is an upper bound.
+
+Usage:
+    python -m api.benchmarks.benchmark_near_duplicates [rows [planted_share [threshold]]]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from api.benchmarks.benchmark_profiler import generate_parquet
+from api.profiler.services.engine import DataProfiler
+from api.profiler.services.near_duplicates import NEAR_DUPLICATE_THRESHOLD, near_duplicate_groups
+
+
+def plant_near_duplicates(df, share, rng):
+    """Overwrite share of the rows with edited copies of other rows, returning the (original, copy) pairs"""
+    rows = len(df)
+    copies = rng.choice(rows, int(rows * share), replace=False)
+    originals = rng.integers(0, rows, len(copies))
+    keep = ~np.isin(originals, copies)
+    copies, originals = copies[keep], originals[keep]
+    df.iloc[copies] = df.iloc[originals].to_numpy()
+    emails = df['email'].to_numpy(dtype=object)
+    for row in copies:
+        email = emails[row]
+        position = int(rng.integers(0, email.index('@')))
+        emails[row] = email[:position] + 'x' + email[position + 1:]
+    df['email'] = emails
+    df.loc[df.index[copies], 'MonthlyCharges'] += 0.05
+    return np.stack([np.minimum(originals, copies), np.maximum(originals, copies)], axis=1)
+
+
+def engine_recall(members, labels, planted):
+    group = np.full(planted.max() + 1 if len(planted) else 0, -1, dtype=np.int64)
+    group[members[members < len(group)]] = labels[members < len(group)]
+    first, second = group[planted[:, 0]], group[planted[:, 1]]
+    return float(np.mean((first >= 0) & (first == second))) if len(planted) else float('nan')
+
+
+def run(rows, share, threshold):
+    rng = np.random.default_rng(rows)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+        df = generate_parquet(tmp_dir / "unique.parquet", rows)
+        planted = plant_near_duplicates(df, share, rng)
+        parquet_path = tmp_dir / "near_duplicates.parquet"
+        df.to_parquet(parquet_path, index=False, row_group_size=100000)
+        print(f"{rows:,} rows, {len(planted):,} planted near duplicates, threshold {threshold}")
+
+        start = time.perf_counter()
+        batches = pq.ParquetFile(parquet_path).iter_batches()
+        _, members, labels, _ = near_duplicate_groups(batches, threshold=threshold)
+        elapsed = time.perf_counter() - start
+        found = len(members) - (labels.max() + 1 if len(labels) else 0)
+        print(f"{'minhash/lsh':>12}: {elapsed:7.2f}s, {found:,} found, "
+              f"recall {engine_recall(members, labels, planted):.3f}")
+
+        start = time.perf_counter()
+        sampled = DataProfiler(pd.read_parquet(parquet_path)).detect_fuzzy_duplicates(threshold=0.9)
+        elapsed = time.perf_counter() - start
+        recall = min(sampled['count'] / max(len(planted), 1), 1.0)
+        print(f"{'sampler':>12}: {elapsed:7.2f}s, {sampled['count']:,} found, recall <= {recall:.3f}")
+
+
+if __name__ == "__main__":
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    planted_share = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+    similarity = float(sys.argv[3]) if len(sys.argv) > 3 else NEAR_DUPLICATE_THRESHOLD
+    run(row_count, planted_share, similarity)
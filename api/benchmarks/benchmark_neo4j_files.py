@@ -0,0 +1,116 @@
+"""
+Benchmark for Neo4j import file generation.
+
+Writes a telecom-style Parquet file and the same rows as CSV, then times
+create_neo4j_import_files and write_sharded_import_files on each with a
+schema of customers, contracts and payment methods. Prints the time, the
+throughput and the number of rows in the generated node and relationship
+files.
+
+Before timing, it checks that Parquet columns are read with the values that
+the row-wise generator took from pd.read_parquet(...).iterrows(). The check
+covers the telecom file and a file with nullable pandas dtypes (Int64,
+boolean, Float64, string) holding nulls. The values are compared as the
+strings written to the import files.
+
+Usage:
+    python -m api.benchmarks.benchmark_neo4j_files [rows]
+"""
+
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from api.benchmarks.benchmark_profiler import generate_parquet
+from api.kgdata_loader.generate_neo4j_files import ParquetSource, create_neo4j_import_files
+from api.kgdata_loader.sharded_import_files import import_file_groups, write_sharded_import_files
+
+SCHEMA = {
+    'nodes': [
+        {'label': 'Customer', 'id': {'property': 'customerID'}, 'properties': {
+            'customerID': 'string', 'gender': 'string', 'SeniorCitizen': 'integer', 'tenure': 'integer',
+            'MonthlyCharges': 'float', 'TotalCharges': 'float', 'email': 'string', 'Churn': 'boolean'}},
+        {'label': 'Contract', 'id_rule': {'type': 'property', 'property': 'Contract'},
+         'properties': {'Contract': 'string'}},
+        {'label': 'PaymentMethod', 'id_rule': {'type': 'property', 'property': 'PaymentMethod'},
+         'properties': {'PaymentMethod': 'string'}},
+    ],
+    'relationships': [
+        {'type': 'HAS_CONTRACT', 'startNode': 'Customer', 'endNode': 'Contract',
+         'properties': {'tenure': {'type': 'integer', 'source_column': 'tenure'}}},
+        {'type': 'PAYS_WITH', 'startNode': 'Customer', 'endNode': 'PaymentMethod'},
+    ],
+}
+
+
+def count_rows(files):
+    """Data rows of a group of import files, whose first line is the header."""
+    lines = 0
+    for path in files:
+        with open(path) as f:
+            lines += sum(1 for _ in f)
+    return lines - 1
+
+
+def write_nullable_parquet(path, rows):
+    """Write a Parquet file whose pandas metadata restores nullable dtypes, with nulls in every column"""
+    df = pd.DataFrame({
+        'customerID': [f"{i:08d}-CUST" for i in range(rows)],
+        'age': pd.array([None if i % 7 == 0 else 18 + i % 60 for i in range(rows)], dtype='Int64'),
+        'active': pd.array([None if i % 5 == 0 else i % 2 == 0 for i in range(rows)], dtype='boolean'),
+        'score': pd.array([None if i % 4 == 0 else i / 8 for i in range(rows)], dtype='Float64'),
+        'segment': pd.array([None if i % 6 == 0 else f"s{i % 9}" for i in range(rows)], dtype='string'),
+        'visits': [None if i % 9 == 0 else i % 30 for i in range(rows)],
+    })
+    df.to_parquet(path, index=False)
+
+
+def check_parquet_values(path):
+    """Whether ParquetSource gives every column the values iterrows() gives it, as written to the import files"""
+    expected = {column: [] for column in pd.read_parquet(path).columns}
+    for _, row in pd.read_parquet(path).iterrows():
+        for column in expected:
+            expected[column].append(str(row[column]))
+    source = ParquetSource(str(path))
+    actual = {column: [] for column in source.columns}
+    for batch in source.batches():
+        for column in actual:
+            actual[column].extend(str(value) for value in batch.values(column))
+    mismatched = [column for column in expected if actual.get(column) != expected[column]]
+    print(f"{Path(path).name:>16} values: {'match iterrows()' if not mismatched else f'differ in {mismatched}'}")
+    return not mismatched
+
+
+def run(rows):
+    logging.getLogger().setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+        schema_path = tmp_dir / "schema.json"
+        schema_path.write_text(json.dumps(SCHEMA))
+        df = generate_parquet(tmp_dir / "telecom.parquet", rows)
+        df.to_csv(tmp_dir / "telecom.csv", index=False)
+        write_nullable_parquet(tmp_dir / "nullable.parquet", min(rows, 10000))
+        if not all([check_parquet_values(tmp_dir / "telecom.parquet"),
+                    check_parquet_values(tmp_dir / "nullable.parquet")]):
+            sys.exit(1)
+
+        for name in ("telecom.parquet", "telecom.csv"):
+            for writer in (create_neo4j_import_files, write_sharded_import_files):
+                output_dir = tmp_dir / f"{writer.__name__}_{name.replace('.', '_')}"
+                start = time.perf_counter()
+                writer(str(schema_path), str(tmp_dir / name), str(output_dir))
+                elapsed = time.perf_counter() - start
+                node_groups, relationship_groups = import_file_groups(output_dir)
+                nodes = sum(count_rows(files) for _, files in node_groups)
+                relationships = sum(count_rows(files) for files in relationship_groups)
+                print(f"{name:>16} {writer.__name__:>26}: {elapsed:7.2f}s, {rows / elapsed / 1e3:,.0f}k rows/s, "
+                      f"{nodes:,} nodes, {relationships:,} relationships")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,53 @@
+"""
+Benchmark for process-parallel profiling.
+
+Generates one Parquet file and profiles it in a single process and then with
+process pools of increasing size, printing the time and speedup for each.
+With shards sketched in separate processes the speedup follows the worker
+count up to the number of cores.
+
+Usage:
+    python -m api.benchmarks.benchmark_parallel_profiler [rows [workers ...]]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from api.benchmarks.benchmark_profiler import generate_parquet
+from api.profiler.services import parallel
+from api.profiler.services.streaming import profile_parquet, read_column_types
+
+
+def run(rows, worker_counts):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        parquet_path = Path(tmp_dir) / f"bench_{rows}.parquet"
+        generate_parquet(parquet_path, rows)
+        column_types = read_column_types(parquet_path)
+
+        start = time.perf_counter()
+        profile_parquet(parquet_path, column_types)
+        baseline = time.perf_counter() - start
+
+        print(f"{rows:,} rows, {os.cpu_count()} cores")
+        print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+        print(f"{'1':>8} {baseline:>10.2f} {1.0:>7.1f}x")
+        for workers in worker_counts:
+            parallel.shutdown_executor(wait=True)
+            parallel.PROFILE_MAX_WORKERS = workers
+            # Warm the pool up so process start-up is not timed
+            parallel.profile_parquet_parallel(parquet_path, column_types, workers=workers, min_rows=0)
+
+            start = time.perf_counter()
+            parallel.profile_parquet_parallel(parquet_path, column_types, workers=workers, min_rows=0)
+            elapsed = time.perf_counter() - start
+            print(f"{workers:>8} {elapsed:>10.2f} {baseline / elapsed:>7.1f}x")
+        parallel.shutdown_executor(wait=True)
+
+
+if __name__ == "__main__":
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+    counts = [int(arg) for arg in sys.argv[2:]] or [2, 4, 8, 16, 32]
+    run(row_count, counts)
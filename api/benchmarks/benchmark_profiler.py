@@ -0,0 +1,95 @@
+"""
+Benchmark for the single-pass column profiler.
+
+Generates Parquet files of increasing row counts and profiles each one twice:
+with DataProfiler's chunked per-column scans (the path used for large
+DataFrames) and with profile_parquet, which reads the file once and updates
+mergeable sketches for every column. Prints both times and the worst relative
+error of the distinct counts and medians against exact pandas values.
+
+Usage:
+    python -m api.benchmarks.benchmark_profiler [rows ...]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from api.profiler.services.engine import DataProfiler
+from api.profiler.services.streaming import profile_parquet
+
+CONTRACTS = ['Month-to-month', 'One year', 'Two year']
+PAYMENT_METHODS = ['Electronic check', 'Mailed check', 'Bank transfer (automatic)', 'Credit card (automatic)']
+
+
+def generate_parquet(path, rows):
+    """Write a telecom-style Parquet file with rows rows"""
+    rng = np.random.default_rng(rows)
+    tenure = rng.integers(0, 73, rows)
+    monthly = np.round(rng.uniform(18.0, 120.0, rows), 2)
+    df = pd.DataFrame({
+        'customerID': [f"{i:08d}-CUST" for i in range(rows)],
+        'gender': rng.choice(['Male', 'Female', '', 'n/a'], rows, p=[0.49, 0.49, 0.01, 0.01]),
+        'SeniorCitizen': rng.integers(0, 2, rows),
+        'tenure': tenure,
+        'Contract': rng.choice(CONTRACTS, rows),
+        'PaymentMethod': rng.choice(PAYMENT_METHODS, rows),
+        'MonthlyCharges': monthly,
+        'TotalCharges': np.where(rng.random(rows) < 0.01, np.nan, np.round(monthly * tenure, 2)),
+        'email': [f"user{i % (rows // 2 + 1)}@example.com" for i in range(rows)],
+        'Churn': rng.choice(['Yes', 'No'], rows),
+    })
+    df.to_parquet(path, index=False, row_group_size=100000)
+    return df
+
+
+def relative_error(estimate, exact):
+    if estimate is None or exact is None:
+        return float('nan')
+    return abs(float(estimate) - float(exact)) / max(abs(float(exact)), 1e-9)
+
+
+def accuracy(df, column_profiles):
+    """Worst relative error of unique_count and median_value over all columns"""
+    distinct_error, median_error = 0.0, 0.0
+    for column in df.columns:
+        profile = column_profiles[column]
+        # unique_count leaves out the empty string
+        exact_distinct = df[column][df[column] != ''].nunique()
+        distinct_error = max(distinct_error, relative_error(profile.get('unique_count'), exact_distinct))
+        if pd.api.types.is_numeric_dtype(df[column]):
+            median_error = max(median_error, relative_error(profile.get('median_value'), df[column].median()))
+    return distinct_error, median_error
+
+
+def run(row_counts):
+    print(f"{'rows':>12} {'per-column (s)':>15} {'single pass (s)':>16} {'speedup':>8} "
+          f"{'distinct err (old/new)':>23} {'median err (old/new)':>21}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in row_counts:
+            parquet_path = Path(tmp_dir) / f"bench_{rows}.parquet"
+            df = generate_parquet(parquet_path, rows)
+
+            start = time.perf_counter()
+            profiler = DataProfiler(pd.read_parquet(parquet_path), max_memory_mb=1)
+            old_profiles = profiler._profile_columns_chunked()
+            old_elapsed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            _, new_profiles = profile_parquet(parquet_path)
+            new_elapsed = time.perf_counter() - start
+
+            old_distinct, old_median = accuracy(df, old_profiles)
+            new_distinct, new_median = accuracy(df, new_profiles)
+            print(f"{rows:>12,} {old_elapsed:>15.2f} {new_elapsed:>16.2f} {old_elapsed / new_elapsed:>7.1f}x "
+                  f"{old_distinct:>11.2%} / {new_distinct:<9.2%} {old_median:>10.2%} / {new_median:<8.2%}")
+            parquet_path.unlink()
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [100000, 500000, 1000000]
+    run(counts)
@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File, Form, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File, Form, BackgroundTasks, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional, Union
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 import random
 import uuid
 from datetime import datetime, timedelta, timezone, date
@@ -22,12 +22,27 @@ import traceback
 import logging
 import pandas as pd
 import numpy as np
+import ijson
 from pydantic import BaseModel, Field
 
 from .models import User, get_db, ActivityLog, Role, UploadedFile, IngestionJob, DatabaseConnection
 from .auth import get_current_active_user, has_role, has_permission, log_activity, has_any_permission
 from .data_models import DataSource, DataMetrics, Activity, DashboardData
 from .models import get_db, SessionLocal
+from .datapuur_engine import (
+    ingest_csv_to_parquet, ingest_json_to_parquet, extract_table_to_parquet, extract_table_parallel,
+    get_ingestion_scheduler
+)
+from .datapuur_engine.progress import JobProgressReporter, signal_job_cancelled
+from .datapuur_engine.chunked_upload import ChunkedUpload, ChunkedUploadError, ChunkChecksumError
+from .datapuur_engine.parquet_metadata import read_parquet_statistics
+from .datapuur_engine.preview import read_parquet_preview, ORIENT_ROWS, ORIENT_RECORDS
+from .datapuur_engine.export_stream import (
+    stream_parquet_export, parse_byte_range, iter_file_range, RangeNotSatisfiableError, EXPORT_MEDIA_TYPES
+)
+from .datapuur_engine.json_ingest import (
+    flatten_json_iterative, detect_json_layout, sample_json_records, JSON_LAYOUT_LINES, JSON_LINES_EXTENSIONS
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -106,73 +121,6 @@ def convert_numpy_types(obj):
     else:
         return obj
 
-# Helper function to check if a job has been cancelled
-def check_job_cancelled(job_id, db_session, job):
-    """
-    Check if a job has been cancelled by checking database status and marker files.
-    
-    Args:
-        job_id: The job ID to check
-        db_session: Database session
-        job: The job object
-        
-    Returns:
-        bool: True if job is cancelled, False otherwise
-    """
-    # Refresh job from database to get latest status
-    db_session.refresh(job)
-    
-    # Check if job has been marked as cancelled in the database
-    if job.status == "cancelled":
-        logger.info(f"Job {job_id} has been cancelled in the database, stopping processing")
-        return True
-        
-    # Check for cancellation marker file
-    cancel_marker_path = DATA_DIR / f"cancel_{job_id}"
-    if cancel_marker_path.exists():
-        logger.info(f"Cancellation marker found for job {job_id}, stopping processing")
-        # Update job status to cancelled since we found a marker
-        job.status = "cancelled"
-        job.end_time = datetime.now()
-        job.details = f"{job.details} (Cancelled by user)"
-        db_session.commit()
-        return True
-        
-    return False
-
-# Helper function to flatten JSON objects
-def flatten_json_iterative(nested_json, prefix=''):
-    """
-    Flatten nested JSON objects iteratively to avoid recursion limits.
-    
-    Args:
-        nested_json: The nested JSON object to flatten
-        prefix: Prefix for flattened keys
-        
-    Returns:
-        dict: Flattened dictionary
-    """
-    if not isinstance(nested_json, dict):
-        return {prefix.rstrip('_'): nested_json}
-    
-    flattened = {}
-    for key, value in nested_json.items():
-        new_key = f"{prefix}{key}"
-        if isinstance(value, dict):
-            flattened.update(flatten_json_iterative(value, f"{new_key}_"))
-        elif isinstance(value, list):
-            if all(not isinstance(item, dict) for item in value):
-                flattened[new_key] = str(value)
-            else:
-                for i, item in enumerate(value):
-                    if isinstance(item, dict):
-                        flattened.update(flatten_json_iterative(item, f"{new_key}_{i}_"))
-                    else:
-                        flattened[f"{new_key}_{i}"] = item
-        else:
-            flattened[new_key] = value
-    return flattened
-
 # Create a structured error response
 def create_error_response(error_code, message, details=None, suggestion=None):
     """
@@ -232,21 +180,19 @@ def validate_file_before_processing(file_path, file_type):
     
     elif file_type == "json":
         try:
-            # Check if the file is a valid JSON
-            with open(file_path, 'r', encoding='utf-8') as f:
-                try:
-                    data = json.load(f)
-                    
-                    # Validate JSON structure for data ingestion
-                    if not isinstance(data, list):
-                        errors.append("JSON file must contain an array of objects")
-                    elif len(data) == 0:
-                        errors.append("JSON file contains an empty array")
-                    elif any(not isinstance(item, dict) for item in data[:10]):
-                        errors.append("JSON file must contain an array of objects (dictionaries)")
-                    
-                except json.JSONDecodeError as e:
-                    errors.append(f"Invalid JSON structure: {str(e)}")
+            # Stream the first records instead of loading the whole file, so large
+            # arrays and JSON Lines files can be validated in constant memory
+            try:
+                sample = sample_json_records(file_path, limit=10)
+                
+                # Validate JSON structure for data ingestion
+                if len(sample) == 0:
+                    errors.append("JSON file contains an empty array")
+                elif any(not isinstance(item, dict) for item in sample):
+                    errors.append("JSON file must contain an array of objects (dictionaries)")
+                
+            except (ijson.JSONError, UnicodeDecodeError) as e:
+                errors.append(f"Invalid JSON structure: {str(e)}")
         except Exception as e:
             errors.append(f"File validation error: {str(e)}")
     
@@ -352,7 +298,9 @@ def save_ingestion_job(db, job_id, job_data):
             end_time=datetime.fromisoformat(job_data['end_time']).replace(tzinfo=timezone.utc) if job_data.get('end_time') and datetime.fromisoformat(job_data['end_time']).tzinfo is None else (datetime.fromisoformat(job_data['end_time']) if job_data.get('end_time') else None),
             details=job_data.get('details'),
             error=job_data.get('error'),
-            config=config_json
+            config=config_json,
+            file_id=job_data.get('file_id'),
+            uploaded_by=job_data.get('uploaded_by')
         )
         db.add(new_job)
     
@@ -439,11 +387,14 @@ class DatabaseConfig(BaseModel):
     config: Dict[str, Any]
     chunk_size: int = 1000
     connection_name: str
+    parallelism: int = 1  # Number of concurrent partition workers for extraction
+    partition_strategy: Optional[str] = None  # 'range', 'hash' or None to pick automatically
 
 class FileIngestionRequest(BaseModel):
     file_id: str
     file_name: str
     chunk_size: int = 1000
+    memory_limit_mb: Optional[int] = None  # Soft memory ceiling for streaming ingestion
 
 class JobStatus(BaseModel):
     id: str
@@ -456,6 +407,7 @@ class JobStatus(BaseModel):
     details: str
     error: Optional[str] = None
     config: Optional[Dict[str, Any]] = None
+    queue_position: Optional[int] = None  # Position in the ingestion queue while waiting for a worker
 
 # New models for ingestion history
 class IngestionHistoryItem(BaseModel):
@@ -641,12 +593,16 @@ def detect_csv_schema(file_path, chunk_size=1000):
     return schema
 
 def detect_json_schema(file_path, chunk_size=1000):
-    """Detect schema from a JSON file"""
-    with open(file_path, 'r', encoding='utf-8') as jsonfile:
-        try:
-            data = json.load(jsonfile)
-        except json.JSONDecodeError:
-            raise ValueError("Invalid JSON file")
+    """Detect schema from a JSON or JSON Lines file"""
+    # Only the first chunk_size records are needed, so stream them instead of loading the file
+    try:
+        layout = detect_json_layout(file_path)
+        data = sample_json_records(file_path, limit=chunk_size)
+        # A file holding a single top-level object is described by its keys
+        if layout == JSON_LAYOUT_LINES and len(data) == 1 and isinstance(data[0], dict):
+            data = data[0]
+    except ijson.JSONError:
+        raise ValueError("Invalid JSON file")
     
     schema = {"name": Path(file_path).stem, "fields": []}
     
@@ -655,9 +611,6 @@ def detect_json_schema(file_path, chunk_size=1000):
         if not data:
             return schema
         
-        # Limit to chunk_size
-        data = data[:chunk_size]
-        
         # Use the first object to initialize field tracking
         first_obj = data[0]
         if not isinstance(first_obj, dict):
@@ -934,12 +887,17 @@ async def delete_database_connection(
 # Process file ingestion with database
 def process_file_ingestion_with_db(job_id, file_id, chunk_size, db):
     """Process file ingestion in a background thread with database access"""
+    reporter = None
     try:
         # Get a new database session
         db_session = SessionLocal()
         
         # Update job status
         job = get_ingestion_job(db_session, job_id)
+        if job.status == "cancelled":
+            # Cancelled between being dispatched by the scheduler and starting
+            logger.info(f"Job {job_id} was cancelled before it started, skipping")
+            return None
         job.status = "running"
         job.progress = 0
         db_session.commit()
@@ -983,178 +941,45 @@ def process_file_ingestion_with_db(job_id, file_id, chunk_size, db):
         # Create output file path using file_id for better traceability
         output_file = DATA_DIR / f"{file_id}.parquet"
         
-        # Use the centralized job cancellation check
-        def check_job_cancelled_local():
-            return check_job_cancelled(job_id, db_session, job)
+        # Progress writes are throttled and cancellation is answered from memory,
+        # the cancel marker file and, less often, the job row
+        reporter = JobProgressReporter(db_session, job, cancel_marker_dir=DATA_DIR)
+        
+        def check_job_cancelled_local(force=False):
+            return reporter.is_cancelled(force=force)
         
         # Process file based on type
         if file_type == "csv":
             try:
-                # Optimize for large files by using a more efficient approach
-                # First, determine the file size to estimate progress better
                 file_size = os.path.getsize(file_path)
+                job.details = f"Processing CSV file ({file_size / (1024 * 1024):.2f} MB) with streaming engine"
+                db_session.commit()
                 
-                # For very large files (>100MB), use a more optimized approach
-                if file_size > 100 * 1024 * 1024:  # 100MB
-                    # Update job status
-                    job.details = f"Processing large file ({file_size / (1024 * 1024):.2f} MB) with optimized engine"
-                    db_session.commit()
-                    
-                    # Check for cancellation before starting large file processing
-                    if check_job_cancelled_local():
-                        logger.info(f"Job {job_id} was cancelled before starting large file processing, stopping")
-                        return
-                        
-                    # Use pyarrow for better performance with large files
-                    import pyarrow as pa
-                    import pyarrow.csv as csv
-                    import pyarrow.parquet as pq
-                    
-                    # Read the CSV file in a memory-efficient way
-                    read_options = csv.ReadOptions(block_size=10 * 1024 * 1024)  # 10MB chunks
-                    convert_options = csv.ConvertOptions(
-                        strings_can_be_null=True,
-                        timestamp_parsers=["%Y-%m-%d", "%Y/%m/%d", "%m-%d-%Y", "%m/%d/%Y"]  # Common date formats
-                    )
-                    
-                    # Create a CSV reader that processes the file in chunks
-                    with csv.open_csv(file_path, read_options=read_options, convert_options=convert_options) as reader:
-                        # Read and process the file in batches
-                        batch_number = 0
-                        table_batches = []
-                        
-                        for batch in reader:
-                            batch_number += 1
-                            # Convert RecordBatch to Table before appending
-                            if isinstance(batch, pa.RecordBatch):
-                                batch = pa.Table.from_batches([batch])
-                            table_batches.append(batch)
-                            
-                            # Update progress every few batches
-                            if batch_number % 5 == 0:
-                                # Check for cancellation during batch processing
-                                if check_job_cancelled_local():
-                                    logger.info(f"Job {job_id} was cancelled during batch processing, stopping")
-                                    return
-                                    
-                                # Estimate progress based on batches processed
-                                progress = int((batch_number * 10 * 1024 * 1024 / file_size) * 100)
-                                job.progress = progress
-                                job.details = f"Processing batch {batch_number} ({progress}% complete)"
-                                db_session.commit()
-                        
-                        # Combine all batches into a single table
-                        if table_batches:
-                            table = pa.concat_tables(table_batches)
-                            # Write to parquet with compression
-                            pq.write_table(table, output_file, compression='snappy')
-                        else:
-                            raise ValueError("No data was read from the CSV file")
-                        
-                        # Final update
-                        job.progress = 100
-                        job.details = f"Finalizing file processing..."
-                        db_session.commit()
-                        
-                        # Check for cancellation after finalizing
-                        if check_job_cancelled():
-                            logger.info(f"Job {job_id} was cancelled after finalizing, stopping")
-                            return
-                else:
-                    # For smaller files, use pandas with optimized settings
-                    # Read CSV in chunks with all columns as string type initially
-                    chunk_iterator = pd.read_csv(
-                        file_path, 
-                        chunksize=chunk_size,
-                        dtype=str,  # Read all columns as strings initially to prevent type conversion errors
-                        keep_default_na=False,  # Don't convert empty strings to NaN
-                        low_memory=True,  # Use less memory
-                        engine='c'  # Use the faster C engine
-                    )
-                    
-                    # Count lines more efficiently for large files
-                    total_rows = 0
-                    with open(file_path, 'r') as f:
-                        # Count lines in chunks to avoid loading the entire file
-                        chunk_size = 1024 * 1024  # 1MB chunks
-                        while True:
-                            chunk = f.read(chunk_size)
-                            if not chunk:
-                                break
-                            total_rows += chunk.count('\n')
-                    
-                    # Subtract 1 for header if file has content
-                    if total_rows > 0:
-                        total_rows -= 1
-                    
-                    processed_rows = 0
-                    
-                    # Process first chunk
-                    first_chunk = next(chunk_iterator)
-                    
-                    # Try to convert numeric columns safely
-                    for col in first_chunk.columns:
-                        # Only attempt numeric conversion on specific columns we know should be numeric
-                        # This prevents errors when trying to convert IDs or other string values to numbers
-                        if col in ['MonthlyCharges', 'TotalCharges']:
-                            first_chunk[col] = pd.to_numeric(first_chunk[col], errors='coerce')
-                    
-                    # Write directly to parquet with compression
-                    first_chunk.to_parquet(output_file, index=False, compression='snappy')
-                    processed_rows += len(first_chunk)
-                    
-                    # Update progress
-                    job.progress = int((processed_rows / total_rows) * 100)
-                    db_session.commit()
-                    
-                    # Process remaining chunks more efficiently
-                    for chunk in chunk_iterator:
-                        # Check for cancellation before processing each chunk
-                        if check_job_cancelled_local():
-                            logger.info(f"Job {job_id} was cancelled during processing, stopping")
-                            return
-                                
-                        # Try to convert numeric columns safely
-                        for col in chunk.columns:
-                            if col in ['MonthlyCharges', 'TotalCharges']:
-                                chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
-                        
-                        # Append to parquet file using pyarrow instead of unsupported append parameter
-                        import pyarrow as pa
-                        import pyarrow.parquet as pq
-                        
-                        # Check if this is the first append after initial write
-                        if processed_rows == len(first_chunk):
-                            # Read the existing parquet file
-                            existing_table = pq.read_table(output_file)
-                            # Convert chunk to pyarrow table
-                            chunk_table = pa.Table.from_pandas(chunk)
-                            # Concatenate tables
-                            combined_table = pa.concat_tables([existing_table, chunk_table])
-                            # Write back to the file
-                            pq.write_table(combined_table, output_file, compression='snappy')
-                        else:
-                            # For subsequent appends, read the entire file again
-                            try:
-                                existing_table = pq.read_table(output_file)
-                                chunk_table = pa.Table.from_pandas(chunk)
-                                combined_table = pa.concat_tables([existing_table, chunk_table])
-                                pq.write_table(combined_table, output_file, compression='snappy')
-                            except Exception as e:
-                                logger.error(f"Error appending to parquet file: {str(e)}")
-                                raise
-                        
-                        processed_rows += len(chunk)
-                        
-                        # Update progress
-                        job.progress = int((processed_rows / total_rows) * 100)
-                        job.details = f"Processed {processed_rows} of {total_rows} rows ({job.progress}%)"
-                        db_session.commit()
-                        
-                        # Check for cancellation after updating progress
-                        if check_job_cancelled():
-                            logger.info(f"Job {job_id} was cancelled after updating progress, stopping")
-                            return
+                # Check for cancellation before starting CSV processing
+                if check_job_cancelled_local():
+                    logger.info(f"Job {job_id} was cancelled before starting CSV processing, stopping")
+                    return
+                
+                def update_csv_progress(progress, details):
+                    reporter.update(progress, details)
+                
+                # Per-job memory ceiling for the streaming engine, if one was requested
+                job_config = json.loads(job.config) if job.config else {}
+                
+                # Stream the CSV into a single Parquet writer, one row group at a time
+                result = ingest_csv_to_parquet(
+                    file_path,
+                    output_file,
+                    chunk_size=chunk_size,
+                    memory_limit_mb=job_config.get("memory_limit_mb"),
+                    progress_callback=update_csv_progress,
+                    cancel_check=check_job_cancelled_local
+                )
+                if result["cancelled"]:
+                    logger.info(f"Job {job_id} was cancelled during CSV processing, stopping")
+                    return
+                
+                reporter.update(100, f"Finalizing file processing ({result['rows']} rows)...", force=True)
             except Exception as e:
                 logger.error(f"Error processing CSV file: {str(e)}")
                 raise ValueError(f"Error processing CSV file: {str(e)}")
@@ -1162,162 +987,43 @@ def process_file_ingestion_with_db(job_id, file_id, chunk_size, db):
         elif file_type == "json":
             try:
                 # Check if job has been cancelled before starting
-                if check_job_cancelled():
+                if check_job_cancelled_local():
                     logger.info(f"Job {job_id} has been cancelled before starting JSON processing, stopping")
                     return
                     
                 # Get file size to determine processing approach
                 file_size = os.path.getsize(file_path)
                 
-                # For very large files (>50MB), use a streaming approach
-                if file_size > 50 * 1024 * 1024:  # 50MB
+                # Large files and JSON Lines are streamed into a single Parquet writer
+                json_layout = detect_json_layout(file_path)
+                if file_size > 50 * 1024 * 1024 or json_layout == JSON_LAYOUT_LINES:  # 50MB
                     # Update job status
-                    job.details = f"Processing large JSON file ({file_size / (1024 * 1024):.2f} MB) with optimized engine"
+                    job.details = f"Processing JSON file ({file_size / (1024 * 1024):.2f} MB) with streaming engine"
                     db_session.commit()
                     
-                    # Use ijson for streaming JSON parsing
-                    import ijson
+                    def update_json_progress(progress, details):
+                        reporter.update(progress, details)
                     
-                    # Initialize an empty DataFrame
-                    df = None
-                    processed_items = 0
-                    total_items_estimate = max(1, file_size // 1000)  # Rough estimate based on file size
-                    
-                    # Use the centralized JSON flattening function
-                    
-                    # Process the file in a streaming manner
-                    with open(file_path, 'rb') as f:
-                        # Check if the JSON is an array at the root
-                        parser = ijson.parse(f)
-                        prefix, event, value = next(parser)
-                        f.seek(0)  # Reset file position
-                        
-                        if prefix == '' and event == 'start_array':
-                            # It's an array of objects, process each item
-                            batch_size = 1000
-                            batch = []
-                            
-                            for item in ijson.items(f, 'item'):
-                                if isinstance(item, dict):
-                                    batch.append(flatten_json_iterative(item))
-                                else:
-                                    batch.append({"value": item})
-                                
-                                processed_items += 1
-                                
-                                # Check for cancellation periodically
-                                if processed_items % 1000 == 0 and check_job_cancelled():
-                                    logger.info(f"Job {job_id} was cancelled during JSON processing, stopping")
-                                    return
-                                
-                                # Process in batches for better performance
-                                if len(batch) >= batch_size:
-                                    # Check for cancellation before processing batch
-                                    if check_job_cancelled():
-                                        logger.info(f"Job {job_id} was cancelled before processing JSON batch, stopping")
-                                        return
-                                    
-                                    batch_df = pd.DataFrame(batch)
-                                    
-                                    # Convert numeric columns
-                                    for col in batch_df.columns:
-                                        if batch_df[col].dtype == object:
-                                            try:
-                                                numeric_values = pd.to_numeric(batch_df[col], errors='coerce')
-                                                if numeric_values.notna().sum() / len(numeric_values) > 0.8:
-                                                    batch_df[col] = numeric_values
-                                            except:
-                                                pass
-                                    
-                                    # Save or append to parquet
-                                    if df is None:
-                                        batch_df.to_parquet(output_file, index=False, compression='snappy')
-                                        df = batch_df  # Just to mark that we've started writing
-                                    else:
-                                        # Use pyarrow for efficient appending
-                                        import pyarrow as pa
-                                        import pyarrow.parquet as pq
-                                        
-                                        existing_table = pq.read_table(output_file)
-                                        batch_table = pa.Table.from_pandas(batch_df)
-                                        combined_table = pa.concat_tables([existing_table, batch_table])
-                                        pq.write_table(combined_table, output_file, compression='snappy')
-                                    
-                                    # Update progress
-                                    progress = int((processed_items / total_items_estimate) * 100)
-                                    job.progress = progress
-                                    job.details = f"Processed {processed_items} items ({progress}% estimated)"
-                                    db_session.commit()
-                                    
-                                    # Clear batch
-                                    batch = []
-                            
-                            # Process any remaining items
-                            if batch:
-                                # Check for cancellation before processing remaining batch
-                                if check_job_cancelled():
-                                    logger.info(f"Job {job_id} was cancelled before processing remaining JSON batch, stopping")
-                                    return
-                                        
-                                batch_df = pd.DataFrame(batch)
-                                
-                                # Convert numeric columns
-                                for col in batch_df.columns:
-                                    if batch_df[col].dtype == object:  # Only attempt conversion on object (string) columns
-                                        # Check if column contains numeric data by trying conversion
-                                        try:
-                                            # If more than 80% of non-null values can be converted to numeric, treat as numeric
-                                            non_null_values = batch_df[col].dropna()
-                                            if len(non_null_values) > 0:
-                                                numeric_count = sum(pd.to_numeric(non_null_values, errors='coerce').notna())
-                                                if numeric_count / len(non_null_values) > 0.8:
-                                                    batch_df.loc[:, col] = pd.to_numeric(batch_df[col], errors='coerce')
-                                        except:
-                                            pass
-                                
-                                # Save or append to parquet
-                                if df is None:
-                                    batch_df.to_parquet(output_file, index=False, compression='snappy')
-                                else:
-                                    import pyarrow as pa
-                                    import pyarrow.parquet as pq
-                                    
-                                    existing_table = pq.read_table(output_file)
-                                    batch_table = pa.Table.from_pandas(batch_df)
-                                    combined_table = pa.concat_tables([existing_table, batch_table])
-                                    pq.write_table(combined_table, output_file, compression='snappy')
-                        else:
-                            # It's a single object, process it directly
-                            # Check for cancellation before processing single object
-                            if check_job_cancelled():
-                                logger.info(f"Job {job_id} was cancelled before processing single JSON object, stopping")
-                                return
-                                
-                            f.seek(0)  # Reset file position
-                            data = json.load(f)
-                            
-                            if isinstance(data, dict):
-                                flattened_data = flatten_json_iterative(data)
-                                df = pd.DataFrame([flattened_data])
-                            else:
-                                df = pd.DataFrame([{"value": data}])
-                            
-                            # Save to parquet
-                            df.to_parquet(output_file, index=False, compression='snappy')
+                    result = ingest_json_to_parquet(
+                        file_path,
+                        output_file,
+                        progress_callback=update_json_progress,
+                        cancel_check=check_job_cancelled_local
+                    )
+                    if result["cancelled"]:
+                        logger.info(f"Job {job_id} was cancelled during JSON processing, stopping")
+                        return
                     
-                    # Update progress
                     # Check for cancellation before finalizing
-                    if check_job_cancelled():
+                    if check_job_cancelled_local():
                         logger.info(f"Job {job_id} was cancelled before finalizing JSON processing, stopping")
                         return
                         
-                    job.progress = 100
-                    job.details = f"Finalizing JSON processing..."
-                    db_session.commit()
+                    reporter.update(100, f"Finalizing JSON processing ({result['rows']} items, {result['columns']} columns)...", force=True)
                 else:
                     # For smaller files, use the standard approach but with optimizations
                     # Check for cancellation before processing small file
-                    if check_job_cancelled():
+                    if check_job_cancelled_local():
                         logger.info(f"Job {job_id} was cancelled before processing small JSON file, stopping")
                         return
                         
@@ -1410,7 +1116,7 @@ def process_file_ingestion_with_db(job_id, file_id, chunk_size, db):
         
         # Mark job as completed
         # Final check for cancellation before marking as completed
-        if check_job_cancelled():
+        if check_job_cancelled_local(force=True):
             logger.info(f"Job {job_id} was cancelled before marking as completed, stopping")
             return
             
@@ -1524,26 +1230,36 @@ def process_file_ingestion_with_db(job_id, file_id, chunk_size, db):
 
     
     finally:
+        if reporter is not None:
+            reporter.close()
         # Close the database session
         db_session.close()
 
 # Process database ingestion with database
 def process_db_ingestion_with_db(job_id, db_type, db_config, chunk_size, db):
     """Process database ingestion in a background thread with database access"""
+    reporter = None
     try:
         # Get a new database session
         db_session = SessionLocal()
         
         # Update job status
         job = get_ingestion_job(db_session, job_id)
+        if job.status == "cancelled":
+            # Cancelled between being dispatched by the scheduler and starting
+            logger.info(f"Job {job_id} was cancelled before it started, skipping")
+            return None
         job.status = "running"
         job.progress = 0
         job.details = "Initializing SQL database connection"
         db_session.commit()
         
-        # Use the centralized job cancellation check
-        def check_job_cancelled_local():
-            return check_job_cancelled(job_id, db_session, job)
+        # Progress writes are throttled and cancellation is answered from memory,
+        # the cancel marker file and, less often, the job row
+        reporter = JobProgressReporter(db_session, job, cancel_marker_dir=DATA_DIR)
+        
+        def check_job_cancelled_local(force=False):
+            return reporter.is_cancelled(force=force)
         
         # Create connection string
         connection_string = create_connection_string(db_type, db_config)
@@ -1571,10 +1287,6 @@ def process_db_ingestion_with_db(job_id, db_type, db_config, chunk_size, db):
             # Create output file path using file_id for better traceability
             output_file = DATA_DIR / f"{file_id}.parquet"
             
-            # Create temporary directory for parquet chunks
-            temp_dir = DATA_DIR / f"temp_{job_id}"
-            temp_dir.mkdir(exist_ok=True)
-            
             # Format the connection details for the filename field (host:port:database)
             host = db_config.get('host', 'localhost')
             port = db_config.get('port', '')
@@ -1595,6 +1307,7 @@ def process_db_ingestion_with_db(job_id, db_type, db_config, chunk_size, db):
             db_session.commit()
             
             # Update job config to include the file_id reference
+            job.file_id = file_id
             if job.config:
                 try:
                     config_data = json.loads(job.config)
@@ -1609,8 +1322,22 @@ def process_db_ingestion_with_db(job_id, db_type, db_config, chunk_size, db):
         
         start_time = time.time()
         
-        # Connect to database
-        engine = create_engine(connection_string)
+        # Parallel extraction settings from the job config
+        parallelism = 1
+        partition_strategy = None
+        if job.config:
+            try:
+                config_data = json.loads(job.config)
+                parallelism = max(1, int(config_data.get("parallelism") or 1))
+                partition_strategy = config_data.get("partition_strategy")
+            except (json.JSONDecodeError, TypeError, ValueError):
+                pass
+        
+        # Connect to database, with one pooled connection per partition worker
+        if parallelism > 1:
+            engine = create_engine(connection_string, pool_size=parallelism, max_overflow=1, pool_pre_ping=True)
+        else:
+            engine = create_engine(connection_string)
         
         try:
             # Get total row count (with error handling for different SQL dialects)
@@ -1643,133 +1370,42 @@ def process_db_ingestion_with_db(job_id, db_type, db_config, chunk_size, db):
                 logger.info(f"Job {job_id} was cancelled during preparation, stopping")
                 return
             
-            # Read data in chunks and save directly to parquet files
-            offset = 0
-            processed_rows = 0
-            chunk_files = []
-            chunk_number = 0
-            
             job.details = "Starting data extraction from SQL database"
             db_session.commit()
             
-            # Keep track of schema information from first chunk for consistency
-            schema = None
+            def update_db_progress(progress, details):
+                reporter.update(progress, details)
             
-            while True:
-                # Check for cancellation
-                if check_job_cancelled_local():
-                    logger.info(f"Job {job_id} was cancelled during processing, stopping")
-                    
-                    # Clean up temporary files
-                    for chunk_file in chunk_files:
-                        if os.path.exists(chunk_file):
-                            os.unlink(chunk_file)
-                    
-                    if temp_dir.exists():
-                        shutil.rmtree(temp_dir)
-                    
-                    return
-                
-                # Update progress
-                if total_rows > 0:
-                    progress = int((processed_rows / total_rows) * 100)
-                    job.progress = min(progress, 99)  # Cap at 99% until complete
-                else:
-                    # If total_rows unknown, use a sliding scale
-                    job.progress = min(10 + (chunk_number * 5), 99)  # Cap at 99%
-                
-                job.details = f"Extracting data (offset: {offset}, processed: {processed_rows} rows)"
-                db_session.commit()
-                
-                # Construct query with proper handling for different SQL dialects
-                query = ""
-                try:
-                    if db_type == "mysql" or db_type == "postgresql":
-                        query = f"SELECT * FROM {table_name} LIMIT {chunk_size} OFFSET {offset}"
-                    elif db_type == "mssql":
-                        # MSSQL uses different OFFSET/FETCH syntax
-                        query = f"SELECT * FROM {table_name} ORDER BY (SELECT NULL) OFFSET {offset} ROWS FETCH NEXT {chunk_size} ROWS ONLY"
-                    
-                    # Read chunk safely using parameterized query
-                    chunk = pd.read_sql(sqlalchemy.text(query), engine)
-                except Exception as e:
-                    # Try a different approach if the standard approach fails
-                    logger.warning(f"Error with standard query: {str(e)}. Trying alternative approach.")
-                    try:
-                        # Simpler query without OFFSET for compatibility
-                        if chunk_number == 0:
-                            query = f"SELECT TOP {chunk_size} * FROM {table_name}"
-                        else:
-                            # This might not work for all databases, but it's a fallback
-                            query = f"SELECT * FROM {table_name} LIMIT {chunk_size}"
-                        
-                        chunk = pd.read_sql(sqlalchemy.text(query), engine)
-                    except Exception as inner_e:
-                        # If all approaches fail, report and exit
-                        error_msg = f"Failed to extract data: {str(inner_e)}"
-                        logger.error(error_msg)
-                        raise ValueError(error_msg)
-                
-                # If no rows returned, we've reached the end
-                if len(chunk) == 0:
-                    break
-                
-                # Save first chunk schema for consistency (but don't depend on it)
-                if chunk_number == 0:
-                    try:
-                        # This might fail depending on pandas version - use simpler approach
-                        schema = str(chunk.dtypes[0])
-                    except Exception as schema_error:
-                        logger.warning(f"Non-critical schema detection error: {str(schema_error)}")
-                        schema = None
-                
-                # Convert datetime columns to string to avoid serialization issues
-                try:
-                    for col in chunk.select_dtypes(include=['datetime64']).columns:
-                        logger.info(f"Converting datetime column '{col}' to string")
-                        chunk[col] = chunk[col].astype(str)
-                except Exception as dt_error:
-                    logger.warning(f"Error handling datetime columns: {str(dt_error)}")
-                
-                # Save chunk to a temporary parquet file
-                chunk_file = temp_dir / f"chunk_{chunk_number}.parquet"
-                chunk.to_parquet(chunk_file, index=False)
-                chunk_files.append(chunk_file)
-                
-                # Update counters
-                processed_rows += len(chunk)
-                offset += chunk_size
-                chunk_number += 1
-                
-                # Add a small delay to prevent database overload
-                time.sleep(0.1)
-            
-            # Check if any data was extracted
-            if not chunk_files:
-                raise ValueError("No data was extracted from the database. The table might be empty.")
-            
-            # Now combine all chunk files into a single parquet file
-            job.details = "Combining extracted data chunks into final parquet file"
-            job.progress = 99
-            db_session.commit()
-            
-            # If only one chunk, just rename it
-            if len(chunk_files) == 1:
-                shutil.move(str(chunk_files[0]), str(output_file))
+            if parallelism > 1:
+                # Extract key-range or hash partitions concurrently; progress and
+                # cancellation are handled by this thread on behalf of the workers
+                result = extract_table_parallel(
+                    engine,
+                    table_name,
+                    output_file,
+                    parallelism=parallelism,
+                    chunk_size=chunk_size,
+                    total_rows=total_rows,
+                    strategy=partition_strategy,
+                    progress_callback=update_db_progress,
+                    cancel_check=check_job_cancelled_local
+                )
             else:
-                # Read and combine all chunks
-                dfs = [pd.read_parquet(chunk_file) for chunk_file in chunk_files]
-                combined_df = pd.concat(dfs, ignore_index=True)
-                combined_df.to_parquet(output_file, index=False)
-                
-                # Clean up temporary files
-                for chunk_file in chunk_files:
-                    if os.path.exists(chunk_file):
-                        os.unlink(chunk_file)
-            
-            # Clean up temporary directory
-            if temp_dir.exists():
-                shutil.rmtree(temp_dir)
+                # Keyset pagination on a unique key when available, otherwise a single
+                # streaming server-side cursor; batches go straight into one Parquet writer
+                result = extract_table_to_parquet(
+                    engine,
+                    table_name,
+                    output_file,
+                    chunk_size=chunk_size,
+                    total_rows=total_rows,
+                    progress_callback=update_db_progress,
+                    cancel_check=check_job_cancelled_local
+                )
+            if result["cancelled"]:
+                logger.info(f"Job {job_id} was cancelled during processing, stopping")
+                return
+            processed_rows = result["rows"]
             
             # Calculate processing time
             processing_time = time.time() - start_time
@@ -1790,14 +1426,6 @@ def process_db_ingestion_with_db(job_id, db_type, db_config, chunk_size, db):
     except Exception as e:
         logger.error(f"Error processing database ingestion: {str(e)}")
         
-        # Clean up temporary directory if it exists
-        temp_dir = DATA_DIR / f"temp_{job_id}"
-        if temp_dir.exists():
-            try:
-                shutil.rmtree(temp_dir)
-            except Exception as cleanup_error:
-                logger.error(f"Error cleaning up temporary directory: {str(cleanup_error)}")
-        
         # Update job status to failed
         try:
             job = get_ingestion_job(db_session, job_id)
@@ -1809,6 +1437,8 @@ def process_db_ingestion_with_db(job_id, db_type, db_config, chunk_size, db):
             logger.error(f"Error updating job status: {str(update_error)}")
     
     finally:
+        if reporter is not None:
+            reporter.close()
         # Close the database session
         db_session.close()
 
@@ -1871,11 +1501,13 @@ async def upload_file(
     """Upload a file for data ingestion"""
     # Validate file type
     file_ext = file.filename.split('.')[-1].lower()
-    if file_ext not in ['csv', 'json']:
+    if file_ext not in ['csv', 'json', 'jsonl', 'ndjson']:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Only CSV and JSON files are supported"
+            detail="Only CSV, JSON and JSON Lines files are supported"
         )
+    # JSON Lines files are ingested by the JSON pipeline
+    file_type = "json" if f".{file_ext}" in JSON_LINES_EXTENSIONS else file_ext
     
     # Generate a unique file ID
     file_id = str(uuid.uuid4())
@@ -1914,7 +1546,7 @@ async def upload_file(
     file_data = {
         "filename": file.filename,
         "path": str(file_path),
-        "type": file_ext,
+        "type": file_type,
         "uploaded_by": current_user.username,
         "uploaded_at": datetime.now(timezone.utc),
         "chunk_size": chunkSize,
@@ -2064,10 +1696,92 @@ async def get_database_schema(
             detail=f"Error fetching schema: {str(e)}"
         )
 
+# Mark a job as failed when its ingestion worker dies
+def mark_ingestion_job_crashed(job_id, exception):
+    """
+    Record a failure for jobs whose worker process crashed before the job could update itself.
+    
+    Args:
+        job_id: The job ID that was running in the worker
+        exception: The exception raised by the worker pool
+    """
+    db_session = SessionLocal()
+    try:
+        job = get_ingestion_job(db_session, job_id)
+        if not job or job.status not in ["running", "queued"]:
+            return
+        error_data = create_error_response(
+            error_code="INGESTION_WORKER_ERROR",
+            message="Ingestion worker stopped unexpectedly",
+            details=str(exception),
+            suggestion="Please try the ingestion again; contact an administrator if the problem persists"
+        )
+        job.status = "failed"
+        job.error = json.dumps(error_data)
+        job.end_time = datetime.now(timezone.utc)
+        db_session.commit()
+    finally:
+        db_session.close()
+
+# Re-queue ingestion jobs left behind by a restart
+def resume_queued_ingestion_jobs():
+    """
+    Re-submit ingestion jobs that were queued or running when the server stopped.
+    
+    File jobs are restarted from the uploaded file. Database jobs cannot be
+    resumed because connection credentials are never persisted, so they are
+    marked as failed.
+    
+    Returns:
+        int: Number of jobs that were re-queued
+    """
+    db_session = SessionLocal()
+    resumed = 0
+    try:
+        jobs = db_session.query(IngestionJob).filter(
+            IngestionJob.status.in_(["queued", "running"])
+        ).order_by(IngestionJob.start_time).all()
+        
+        for job in jobs:
+            config = {}
+            try:
+                config = json.loads(job.config) if job.config else {}
+            except json.JSONDecodeError:
+                logger.warning(f"Could not parse config JSON for job {job.id}")
+            
+            if job.type == "file" and config.get("file_id"):
+                job.status = "queued"
+                job.progress = 0
+                db_session.commit()
+                get_ingestion_scheduler().submit(
+                    job.id, job.uploaded_by or config.get("username", "Unknown"), process_file_ingestion_with_db,
+                    job.id, config["file_id"], config.get("chunk_size", 1000), None,
+                    on_error=mark_ingestion_job_crashed
+                )
+                resumed += 1
+            else:
+                error_data = create_error_response(
+                    error_code="INGESTION_INTERRUPTED",
+                    message="Ingestion interrupted by a server restart",
+                    details="The server restarted before this job finished and the job cannot be resumed automatically",
+                    suggestion="Please start the ingestion again"
+                )
+                job.status = "failed"
+                job.error = json.dumps(error_data)
+                job.end_time = datetime.now(timezone.utc)
+                db_session.commit()
+        
+        if jobs:
+            logger.info(f"Re-queued {resumed} of {len(jobs)} interrupted ingestion jobs")
+    except Exception as e:
+        logger.error(f"Error resuming ingestion jobs: {str(e)}")
+    finally:
+        db_session.close()
+    return resumed
+
 @router.post("/ingest-file", status_code=status.HTTP_200_OK)
 async def ingest_file(
     request: FileIngestionRequest,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(has_permission("datapuur:write")),  # Updated permission
     db: Session = Depends(get_db)
 ):
@@ -2076,6 +1790,7 @@ async def ingest_file(
         file_id = request.file_id
         file_name = request.file_name
         chunk_size = request.chunk_size
+        memory_limit_mb = request.memory_limit_mb
         
         # Check if file exists
         file_info = get_uploaded_file(db, file_id)
@@ -2135,15 +1850,22 @@ async def ingest_file(
             "end_time": None,
             "details": f"File: {file_name}",
             "error": None,
+            "file_id": file_id,
+            "uploaded_by": current_user.username,
             "config": {
                 "file_id": file_id,
-                "chunk_size": chunk_size
+                "chunk_size": chunk_size,
+                "memory_limit_mb": memory_limit_mb,
+                "username": current_user.username
             }
         }
         save_ingestion_job(db, job_id, job_data)
         
-        # Start background task with database session
-        background_tasks.add_task(process_file_ingestion_with_db, job_id, file_id, chunk_size, db)
+        # Queue the job; it runs in the ingestion worker pool with its own database session
+        queue_position = get_ingestion_scheduler().submit(
+            job_id, current_user.username, process_file_ingestion_with_db, job_id, file_id, chunk_size, None,
+            on_error=mark_ingestion_job_crashed
+        )
         
         # Log activity
         log_activity(
@@ -2153,7 +1875,7 @@ async def ingest_file(
             details=f"Started ingestion for file: {file_name}"
         )
         
-        return {"job_id": job_id, "message": "File ingestion started"}
+        return {"job_id": job_id, "message": "File ingestion started", "queue_position": queue_position}
     except Exception as e:
         # Create a structured error response with more context
         error_resp = create_error_response(
@@ -2171,7 +1893,6 @@ async def ingest_file(
 @router.post("/ingest-db", status_code=status.HTTP_200_OK)
 async def ingest_database(
     request: DatabaseConfig,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(has_permission("datapuur:write")),  # Updated permission
     db: Session = Depends(get_db)
 ):
@@ -2205,17 +1926,23 @@ async def ingest_database(
             "end_time": None,
             "details": f"DB: {db_config['database']}.{db_config['table']}",
             "error": None,
+            "uploaded_by": current_user.username,
             "config": {
                 "type": db_type,
                 "database": db_config["database"],
                 "table": db_config["table"],
-                "username": current_user.username  # Store the user who initiated the ingestion
+                "username": current_user.username,  # Store the user who initiated the ingestion
+                "parallelism": request.parallelism,
+                "partition_strategy": request.partition_strategy
             }
         }
         save_ingestion_job(db, job_id, job_data)
         
-        # Start background task with database session
-        background_tasks.add_task(process_db_ingestion_with_db, job_id, db_type, db_config, chunk_size, db)
+        # Queue the job; it runs in the ingestion worker pool with its own database session
+        queue_position = get_ingestion_scheduler().submit(
+            job_id, current_user.username, process_db_ingestion_with_db, job_id, db_type, db_config, chunk_size, None,
+            on_error=mark_ingestion_job_crashed
+        )
         
         # Log activity
         log_activity(
@@ -2225,7 +1952,7 @@ async def ingest_database(
             details=f"Started ingestion for table: {db_config['database']}.{db_config['table']}"
         )
         
-        return {"job_id": job_id, "message": "Database ingestion started"}
+        return {"job_id": job_id, "message": "Database ingestion started", "queue_position": queue_position}
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -2259,7 +1986,8 @@ async def get_job_status(
         end_time=job.end_time.isoformat() if job.end_time else None,
         details=job.details,
         error=job.error,
-        config=config
+        config=config,
+        queue_position=get_ingestion_scheduler().get_queue_position(job_id) if job.status == "queued" else None
     )
 
 @router.post("/cancel-job/{job_id}", status_code=status.HTTP_200_OK)
@@ -2283,6 +2011,12 @@ async def cancel_job(
             detail=f"Cannot cancel job with status: {job.status}"
         )
     
+    # Drop the job from the ingestion queue if it has not started yet, and
+    # signal it directly if it is running in this process
+    if get_ingestion_scheduler().cancel(job_id):
+        logger.info(f"Removed queued job {job_id} from the ingestion queue")
+    signal_job_cancelled(job_id)
+    
     # Create a cancellation marker file to signal to any ongoing processes that they should stop
     try:
         cancel_marker_path = DATA_DIR / f"cancel_{job_id}"
@@ -2561,44 +2295,19 @@ async def get_file_preview(
         # Log file info for debugging
         logging.info(f"Found file: {file_info.id}, {file_info.filename}")
             
-        # Look for jobs with this file_id in their config
-        jobs = db.query(IngestionJob)\
+        # Find the most recent completed job for this file through the indexed file_id column
+        completed_file_jobs = db.query(IngestionJob)\
             .filter(IngestionJob.type == "file")\
             .filter(IngestionJob.status == "completed")\
-            .order_by(desc(IngestionJob.start_time))\
-            .all()
-            
-        logging.info(f"Found {len(jobs)} completed ingestion jobs to check")
-            
-        # Find the job with this file_id in config
-        target_job = None
-        for j in jobs:
-            if not j.config:
-                continue
-            
-            try:
-                config = json.loads(j.config) if isinstance(j.config, str) else j.config
-                # Try multiple possible keys where file_id might be stored
-                file_id_in_config = config.get("file_id") or config.get("fileId") or \
-                                  config.get("file", {}).get("id") if isinstance(config.get("file"), dict) else None
-                
-                # Log for debugging
-                if file_id_in_config:
-                    logging.info(f"Job {j.id} has file_id: {file_id_in_config}")
-                
-                if file_id_in_config == file_id:
-                    target_job = j
-                    break
-            except (json.JSONDecodeError, AttributeError) as e:
-                logging.error(f"Error parsing job config for job {j.id}: {str(e)}")
-                continue
+            .order_by(desc(IngestionJob.start_time))
+        target_job = completed_file_jobs.filter(IngestionJob.file_id == file_id).first()
         
         if not target_job:
             # Fall back to most recent job if specific job for this file not found
             # This is a temporary workaround until we have better job-file mapping
-            if jobs:
+            target_job = completed_file_jobs.first()
+            if target_job:
                 logging.warning(f"No job found with matching file_id {file_id}, falling back to most recent job")
-                target_job = jobs[0]
             else:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -2666,153 +2375,53 @@ async def get_ingestion_preview(
                 detail="Ingestion data file not found"
             )
         
-        # Read the parquet file
-        df = pd.read_parquet(parquet_path)
-        
-        # Limit to first 100 rows for preview
-        preview_df = df.head(100).copy()  # Create an explicit copy to avoid SettingWithCopyWarning
-        
-        # Convert to appropriate format based on job type
+        # Convert to appropriate format based on job type; only the first row group(s)
+        # of the file are read and the rendered preview is cached per file version
         if job.type == "file":
-            config = json.loads(job.config) if job.config else {}
-            file_id = config.get("file_id")
             file_info = get_uploaded_file(db, file_id) if file_id else None
             file_type = file_info.type if file_info else "unknown"
+            filename = file_info.filename if file_info else f"file_{file_id}"
             
-            if file_type == "csv":
-                # For CSV, return as list of lists with headers
-                headers = preview_df.columns.tolist()
-                # Convert NumPy types to Python native types using helper function
-                rows = []
-                for row in preview_df.values:
-                    python_row = []
-                    for item in row:
-                        if pd.isna(item):
-                            python_row.append(None)
-                        else:
-                            python_row.append(convert_numpy_types(item))
-                    rows.append(python_row)
-                
-                return {
-                    "data": rows,
-                    "headers": headers,
-                    "filename": file_info.filename if file_info else f"file_{file_id}",
-                    "type": "csv"
-                }
-            elif file_type == "json":
+            if file_type == "json":
                 # For JSON, always return a list of dictionaries
-                
-                # Handle empty DataFrame case
-                if preview_df.empty:
-                    return {
-                        "data": [],  # Empty array
-                        "headers": [],
-                        "filename": file_info.filename if file_info else f"file_{file_id}",
-                        "type": "json"
-                    }
-                
-                # Convert to records and ensure all values have proper Python types
-                try:
-                    # First attempt - standard conversion using helper function
-                    records = []
-                    for record in preview_df.to_dict(orient='records'):
-                        clean_record = {}
-                        for key, value in record.items():
-                            if pd.isna(value):
-                                clean_record[key] = None
-                            else:
-                                clean_record[key] = convert_numpy_types(value)
-                        records.append(clean_record)
-                except Exception as e:
-                    # Fallback - if any error occurs, create a simpler structure
-                    print(f"Error in preview conversion: {str(e)}")
-                    records = []
-                    for i, row in preview_df.iterrows():
-                        record = {}
-                        for col in preview_df.columns:
-                            val = row[col]
-                            if pd.isna(val):
-                                record[col] = None
-                            elif isinstance(val, (np.integer, np.floating)):
-                                record[col] = float(val)
-                            elif isinstance(val, np.bool_):
-                                record[col] = bool(val)
-                            else:
-                                record[col] = str(val)
-                        records.append(record)
-                
-                # CRITICAL: Force records to be a list if it's not already
-                if not isinstance(records, list):
-                    records = [records] if records else []
-                
-                # Verify each record is a dict
-                for i, record in enumerate(records):
-                    if not isinstance(record, dict):
-                        records[i] = {"value": record}
-                
-                # Ensure the data is JSON serializable by converting to and from JSON
-                try:
-                    # This will catch any non-serializable objects
-                    json_string = json.dumps(records)
-                    # Parse it back to ensure we have valid JSON objects
-                    records = json.loads(json_string)
-                except Exception as e:
-                    print(f"JSON serialization error: {str(e)}")
-                    # Fallback to a simpler structure if serialization fails
-                    records = [{"error": "Data could not be serialized", "index": i} for i in range(len(records))]
-                
-                # Log the structure for debugging
-                print(f"Preview response structure: data is a {type(records).__name__} with {len(records)} items")
-                
+                preview = read_parquet_preview(parquet_path, rows=100, orient=ORIENT_RECORDS)
                 return {
-                    "data": records,
-                    "headers": preview_df.columns.tolist(),
-                    "filename": file_info.filename if file_info else f"file_{file_id}",
+                    "data": preview["data"],
+                    "headers": preview["headers"],
+                    "filename": filename,
                     "type": "json"
                 }
+            
+            # For CSV, return as list of lists with headers
+            preview = read_parquet_preview(parquet_path, rows=100, orient=ORIENT_ROWS)
+            return {
+                "data": preview["data"],
+                "headers": preview["headers"],
+                "filename": filename,
+                "type": "csv"
+            }
         elif job.type == "database":
             # For database, return as list of dictionaries
             config = json.loads(job.config) if job.config else {}
             connection_name = config.get("connection_name", "Database Connection")
-            
-            # Convert DataFrame to records using helper function
-            records = []
-            for record in preview_df.to_dict(orient='records'):
-                clean_record = {}
-                for key, value in record.items():
-                    if pd.isna(value):
-                        clean_record[key] = None
-                    else:
-                        clean_record[key] = convert_numpy_types(value)
-                records.append(clean_record)
-            
+            preview = read_parquet_preview(parquet_path, rows=100, orient=ORIENT_RECORDS)
             return {
-                "data": records,
-                "headers": preview_df.columns.tolist(),
+                "data": preview["data"],
+                "headers": preview["headers"],
                 "filename": connection_name,
                 "type": "database"
             }
         else:
             # Generic table format as fallback
-            headers = preview_df.columns.tolist()
-            rows = []
-            for row in preview_df.values:
-                python_row = []
-                for item in row:
-                    if pd.isna(item):
-                        python_row.append(None)
-                    elif isinstance(item, (np.integer, np.floating)):
-                        python_row.append(item.item())
-                    else:
-                        python_row.append(item)
-                rows.append(python_row)
-            
+            preview = read_parquet_preview(parquet_path, rows=100, orient=ORIENT_ROWS)
             return {
-                "data": rows,
-                "headers": headers,
+                "data": preview["data"],
+                "headers": preview["headers"],
                 "filename": f"ingestion_{ingestion_id}",
                 "type": "table"
             }
+    except HTTPException:
+        raise
     except Exception as e:
         # Log the specific parquet reading error
         print(f"Error reading parquet file: {str(e)}")
@@ -3057,27 +2666,14 @@ async def get_ingestion_statistics(
                 detail="Ingestion data file not found"
             )
         
-        # Read the parquet file
-        df = pd.read_parquet(parquet_path)
-        
-        # Calculate statistics
-        row_count = len(df)
-        column_count = len(df.columns)
+        # Row, column and null counts come from the Parquet footer; no data pages are read
+        parquet_stats = read_parquet_statistics(parquet_path)
+        row_count = parquet_stats["row_count"]
+        column_count = parquet_stats["column_count"]
+        null_percentage = parquet_stats["null_percentage"]
         
-        # Calculate null percentage
-        total_cells = row_count * column_count
-        null_count = df.isna().sum().sum()
-        null_percentage = (null_count / total_cells) * 100 if total_cells > 0 else 0
-        
-        # Convert null_percentage from NumPy type to Python native type if needed
-        if isinstance(null_percentage, (np.integer, np.floating)):
-            null_percentage = null_percentage.item()
-        
-        # Calculate memory usage
-        memory_usage_bytes = df.memory_usage(deep=True).sum()
-        if isinstance(memory_usage_bytes, (np.integer, np.floating)):
-            memory_usage_bytes = memory_usage_bytes.item()
-            
+        # Uncompressed column chunk sizes approximate the in-memory size of the data
+        memory_usage_bytes = parquet_stats["uncompressed_bytes"]
         if memory_usage_bytes < 1024:
             memory_usage = f"{memory_usage_bytes} B"
         elif memory_usage_bytes < 1024 * 1024:
@@ -3090,12 +2686,7 @@ async def get_ingestion_statistics(
         
         # Calculate data density (rows per KB)
         data_density = (row_count / (memory_usage_bytes / 1024)) if memory_usage_bytes > 0 else 0
-        if isinstance(data_density, (np.integer, np.floating)):
-            data_density = data_density.item()
-            
         completion_rate = 100 - null_percentage
-        if isinstance(completion_rate, (np.integer, np.floating)):
-            completion_rate = completion_rate.item()
         
         return {
             "row_count": row_count,
@@ -3107,20 +2698,73 @@ async def get_ingestion_statistics(
             "completion_rate": completion_rate,
             "error_rate": 0  # Placeholder, could be calculated from data quality checks
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error generating statistics: {str(e)}"
         )
 
+def file_range_response(request: Request, path: Path, filename: str, media_type: str) -> Response:
+    """
+    Send a file unchanged, honouring a single-range Range header.
+    
+    The file is streamed from disk in chunks without being decoded, and
+    clients can resume or fetch parts of it (e.g. a Parquet footer) with
+    byte ranges. If-Range is honoured against the file's ETag.
+    """
+    stat_result = os.stat(path)
+    size = stat_result.st_size
+    etag = f'"{stat_result.st_mtime_ns:x}-{size:x}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Content-Disposition": f'attachment; filename="{filename}"'
+    }
+    
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range and if_range != etag:
+        # The client's copy is stale, so send the whole file
+        range_header = None
+    
+    try:
+        byte_range = parse_byte_range(range_header, size)
+    except RangeNotSatisfiableError:
+        return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                        headers={"Content-Range": f"bytes */{size}", **headers})
+    
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, status.HTTP_200_OK
+    else:
+        start, end = byte_range
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(max(end - start + 1, 0))
+    
+    return StreamingResponse(
+        iter_file_range(path, start, end),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers
+    )
+
 @router.get("/ingestion-download/{ingestion_id}")
 async def download_ingestion(
     ingestion_id: str,
-    format: str = Query("csv", regex="^(csv|json|parquet)$"),
+    request: Request,
+    format: str = Query("csv", regex="^(csv|json|ndjson|parquet)$"),
     current_user: User = Depends(has_permission("datapuur:read")),  # Updated permission
     db: Session = Depends(get_db)
 ):
-    """Download ingestion data in specified format"""
+    """
+    Download ingestion data in specified format.
+    
+    CSV, JSON (an array of records) and NDJSON are encoded from Parquet record
+    batches while the response is sent; Parquet is served as stored, with
+    byte-range support.
+    """
     job = get_ingestion_job(db, ingestion_id)
     if not job:
         raise HTTPException(
@@ -3151,40 +2795,27 @@ async def download_ingestion(
                 detail="Ingestion data file not found"
             )
         
-        # Read the parquet file
-        df = pd.read_parquet(parquet_path)
-        
-        # Create a temporary file for the download
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{format}") as temp_file:
-            temp_path = temp_file.name
-            
-            # Convert to requested format
-            if format == "csv":
-                df.to_csv(temp_path, index=False)
-                media_type = "text/csv"
-            elif format == "json":
-                df.to_json(temp_path, orient="records", lines=False)
-                media_type = "application/json"
-            else:  # parquet
-                df.to_parquet(temp_path, index=False)
-                media_type = "application/octet-stream"
+        # Log activity once per download, not for every byte range a client fetches
+        if "range" not in request.headers:
+            log_activity(
+                db=db,
+                username=current_user.username,
+                action="Ingestion download",
+                details=f"Downloaded ingestion data: {job.name} ({format})"
+            )
         
-        # Log activity
-        log_activity(
-            db=db,
-            username=current_user.username,
-            action="Ingestion download",
-            details=f"Downloaded ingestion data: {job.name} ({format})"
-        )
+        filename = f"{job.name}.{format}"
+        if format == "parquet":
+            return file_range_response(request, parquet_path, filename, EXPORT_MEDIA_TYPES[format])
         
-        # Return the file
-        return FileResponse(
-            path=temp_path,
-            filename=f"{job.name}.{format}",
-            media_type=media_type,
-            background=BackgroundTasks().add_task(lambda: os.unlink(temp_path))
+        return StreamingResponse(
+            stream_parquet_export(parquet_path, format),
+            media_type=EXPORT_MEDIA_TYPES[format],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -3194,84 +2825,47 @@ async def download_ingestion(
 # Original routes from the template - updated to use database
 @router.get("/sources", response_model=List[DataSource])
 async def get_data_sources(
+    response: Response,
+    page: int = Query(1, ge=1),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
     current_user: User = Depends(has_any_permission(["datapuur:read", "kginsights:read"])),
     db: Session = Depends(get_db)
 ):
-    # Get real data sources from ingestion jobs
-    sources = []
+    """
+    List completed ingestions as data sources, newest first.
     
-    # Query completed jobs
-    completed_jobs = db.query(IngestionJob).filter(IngestionJob.status == "completed").all()
+    Jobs and their file records are fetched with a single joined query. Pass
+    ``limit`` (and ``page``) to page through the results; the total number of
+    sources is returned in the X-Total-Count header.
+    """
+    query = db.query(IngestionJob, UploadedFile).outerjoin(
+        UploadedFile, UploadedFile.id == IngestionJob.file_id
+    ).filter(
+        IngestionJob.status == "completed",
+        IngestionJob.type != "profile"
+    )
+    response.headers["X-Total-Count"] = str(query.count())
     
-    # Add sources
-    for job in completed_jobs:
-        if job.type == "profile":
-            continue
-            
-        # Get uploaded_by information based on job type
-        uploaded_by = "Unknown"
-        
-        if job.type == "file":
-            # For file-based ingestion: Try to find the file record that matches this job
-            file_info = None
-            if job.config:
-                try:
-                    config_data = json.loads(job.config)
-                    if "file_id" in config_data:
-                        file_info = db.query(UploadedFile).filter(UploadedFile.id == config_data["file_id"]).first()
-                except json.JSONDecodeError:
-                    pass
-                    
-            if file_info and file_info.uploaded_by:
-                uploaded_by = file_info.uploaded_by
-        else:
-            # For database-based ingestion: Check activity log for who initiated this job
-            activity = db.query(ActivityLog).filter(
-                ActivityLog.action.like("Database ingestion started%"),
-                ActivityLog.details.like(f"%{job.id}%")
-            ).first()
-            
-            if activity and activity.username:
-                uploaded_by = activity.username
-            elif job.config:
-                # Alternative: Check if username is stored in job config
-                try:
-                    config_data = json.loads(job.config)
-                    if "username" in config_data:
-                        uploaded_by = config_data["username"]
-                except json.JSONDecodeError:
-                    pass
-                
-        # Determine the last_updated timestamp based on job type
-        # Ensure all timestamps are in the same format with timezone information
-        file_info = None
+    query = query.order_by(IngestionJob.start_time.desc(), IngestionJob.id)
+    if limit is not None:
+        query = query.offset((page - 1) * limit).limit(limit)
+    
+    sources = []
+    for job, file_info in query.all():
+        # Prefer the user recorded on the job, then the owner of the file record
+        uploaded_by = job.uploaded_by or (file_info.uploaded_by if file_info else None) or "Unknown"
         
-        # Try to get file_info regardless of job type
-        if job.config:
-            try:
-                config_data = json.loads(job.config)
-                if "file_id" in config_data:
-                    file_info = db.query(UploadedFile).filter(UploadedFile.id == config_data["file_id"]).first()
-            except json.JSONDecodeError:
-                pass
-            
         # Determine the last_updated timestamp
+        # Ensure all timestamps are in the same format with timezone information
         if file_info and file_info.uploaded_at:
             last_updated = file_info.uploaded_at.isoformat()
-            dataset_value = file_info.dataset if hasattr(file_info, 'dataset') else None
+            dataset_value = file_info.dataset
         else:
             # Fall back to job timestamps if no file record is available
-            if isinstance(job.end_time, datetime):
-                dt = job.end_time
-            elif job.end_time:
-                # Try to parse the string as datetime if it's a string
-                try:
-                    dt = datetime.fromisoformat(job.end_time)
-                except (ValueError, TypeError):
-                    dt = job.start_time if isinstance(job.start_time, datetime) else datetime.now()
-            else:
-                dt = job.start_time if isinstance(job.start_time, datetime) else datetime.now()
-                
+            dt = job.end_time if isinstance(job.end_time, datetime) else job.start_time
+            if not isinstance(dt, datetime):
+                dt = datetime.now()
+            
             # Add timezone if missing
             if dt.tzinfo is None:
                 dt = dt.replace(tzinfo=timezone.utc)
@@ -3282,7 +2876,7 @@ async def get_data_sources(
         # Create a name_for_display field that gets the dataset name from job name if dataset is None
         name_for_display = job.name
         
-        # Extract dataset name from job configuration if available
+        # Database sources are named after their table
         if job.type == "database" and job.config:
             try:
                 config_data = json.loads(job.config)
@@ -3296,33 +2890,23 @@ async def get_data_sources(
             # For file types without dataset, extract filename without extension
             dataset_value = os.path.splitext(job.name)[0]
             
-        # Get file size and row count information
-        file_size = 0
-        row_count = None
-        created_at = None
-        
         # For file-based ingestion, get file size from the file_info
-        if file_info and hasattr(file_info, 'path') and file_info.path and os.path.exists(file_info.path):
+        file_size = 0
+        if file_info and file_info.path:
             try:
                 file_size = os.path.getsize(file_info.path)
             except OSError:
                 logger.warning(f"Could not get file size for {file_info.path}")
                 
-        # For both file and database ingestion, try to get row count from parquet file
-        data_path = None
-        if file_info:
-            data_path = DATA_DIR / f"{file_info.id}.parquet"
-        else:
-            data_path = DATA_DIR / f"{job.id}.parquet"
-            
-        if data_path and data_path.exists():
-            try:
-                # Use pandas to get row count from parquet file
-                import pandas as pd
-                df = pd.read_parquet(data_path)
-                row_count = len(df)
-            except Exception as e:
-                logger.warning(f"Could not get row count from parquet file: {str(e)}")
+        # Row count comes from the Parquet footer (cached per file version)
+        row_count = None
+        data_path = DATA_DIR / f"{file_info.id if file_info else job.id}.parquet"
+        try:
+            row_count = read_parquet_statistics(data_path)["row_count"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not get row count from parquet file: {str(e)}")
                 
         # Set created_at from file_info or job start_time
         if file_info and file_info.uploaded_at:
@@ -3335,7 +2919,7 @@ async def get_data_sources(
             
         sources.append(
             DataSource(
-                id=file_info.id,
+                id=file_info.id if file_info else job.id,
                 name=name_for_display,
                 type="File" if job.type == "file" else "Database",
                 last_updated=last_updated,
@@ -3348,10 +2932,6 @@ async def get_data_sources(
             )
         )
     
-    # If no sources, return empty list
-    if not sources:
-        return []
-    
     return sources
 
 @router.get("/sources/{source_id}", response_model=dict)
@@ -3740,17 +3320,14 @@ async def preview_file(
         # For JSON files
         elif file_info.type == "json":
             try:
-                # For large JSON files, we need to be careful about memory usage
-                # Read the file in chunks and only process the beginning
-                with open(file_path, 'r', encoding='utf-8', errors='replace') as jsonfile:
-                    # Try to parse the JSON data
-                    try:
-                        data = json.load(jsonfile)
-                    except json.JSONDecodeError as e:
-                        raise HTTPException(
-                            status_code=status.HTTP_400_BAD_REQUEST,
-                            detail=f"Invalid JSON file: {str(e)}"
-                        )
+                # Stream only the records shown, which also reads JSON Lines files
+                try:
+                    data = sample_json_records(file_path, limit=100)
+                except (ijson.JSONError, UnicodeDecodeError) as e:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Invalid JSON file: {str(e)}"
+                    )
                 
                 # Function to flatten nested JSON
                 def flatten_json(nested_json, prefix=''):
@@ -3872,7 +3449,71 @@ async def download_file(
             detail=f"Error downloading file: {str(e)}"
         )
 
-# Add new endpoint for chunked uploads
+# Chunked uploads are written in place at their final byte offset
+CHUNKED_UPLOAD_DIR = UPLOAD_DIR / "chunks"
+
+def get_chunked_upload(upload_id):
+    """Open a chunked upload session, mapping invalid IDs to a 400 response"""
+    try:
+        return ChunkedUpload(CHUNKED_UPLOAD_DIR, upload_id)
+    except ChunkedUploadError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.post("/init-chunked-upload", status_code=status.HTTP_200_OK)
+async def init_chunked_upload(
+    request: Request,
+    current_user: User = Depends(has_permission("datapuur:write")),
+    db: Session = Depends(get_db)
+):
+    """
+    Start (or resume) a chunked upload.
+    
+    Preallocates the destination file so chunks can be uploaded in parallel and
+    in any order. Calling it again with the same layout returns the chunks that
+    are still missing.
+    """
+    data = await request.json()
+    upload_id = data.get("uploadId")
+    file_name = data.get("fileName")
+    total_size = data.get("totalSize")
+    chunk_bytes = data.get("chunkBytes")
+    total_chunks = data.get("totalChunks")
+    
+    if not upload_id or not file_name or total_size is None or not chunk_bytes or not total_chunks:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Missing required parameters"
+        )
+    
+    upload = get_chunked_upload(upload_id)
+    try:
+        CHUNKED_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(upload.create, file_name, total_size, chunk_bytes, total_chunks)
+        return upload.status()
+    except ChunkedUploadError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error initialising chunked upload {upload_id}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error initialising upload: {str(e)}"
+        )
+
+@router.get("/chunked-upload/{upload_id}/missing-chunks", status_code=status.HTTP_200_OK)
+async def get_missing_chunks(
+    upload_id: str,
+    current_user: User = Depends(has_permission("datapuur:write")),
+    db: Session = Depends(get_db)
+):
+    """List the chunks of an upload that still have to be sent, for resuming"""
+    upload = get_chunked_upload(upload_id)
+    if not upload.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found. It may have been completed, cancelled or never started."
+        )
+    return upload.status()
+
 @router.post("/upload-chunk", status_code=status.HTTP_200_OK)
 async def upload_chunk(
     file: UploadFile = File(...),
@@ -3880,52 +3521,40 @@ async def upload_chunk(
     chunkIndex: int = Form(...),
     totalChunks: int = Form(...),
     uploadId: str = Form(...),
+    chunkBytes: Optional[int] = Form(None),
+    totalSize: Optional[int] = Form(None),
+    checksum: Optional[str] = Form(None),
     current_user: User = Depends(has_permission("datapuur:write")),  # Updated permission
     db: Session = Depends(get_db)
 ):
-    """Upload a chunk of a large file"""
-    logger.info(f"Received chunk {chunkIndex + 1} of {totalChunks} for upload ID: {uploadId}")
+    """
+    Upload a chunk of a large file.
     
-    # Create a directory for this upload if it doesn't exist
-    chunks_dir = UPLOAD_DIR / "chunks" / uploadId
+    The chunk is written at its final offset in the preallocated upload file, so
+    chunks may be sent concurrently and in any order. When ``checksum`` (SHA-256
+    hex digest) is given the chunk is only accepted if it matches.
+    """
+    logger.info(f"Received chunk {chunkIndex + 1} of {totalChunks} for upload ID: {uploadId}")
+    upload = get_chunked_upload(uploadId)
     
     try:
-        # Ensure the upload directory exists
-        if not UPLOAD_DIR.exists():
-            logger.info(f"Creating upload directory: {UPLOAD_DIR}")
-            UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
-         # Ensure the chunks parent directory exists
-        chunks_parent = UPLOAD_DIR / "chunks"
-        if not chunks_parent.exists():
-            logger.info(f"Creating chunks parent directory: {chunks_parent}")
-            chunks_parent.mkdir(parents=True, exist_ok=True)
-        
-        # Create the specific chunks directory for this upload
-        if not chunks_dir.exists():
-            logger.info(f"Creating chunks directory for upload ID {uploadId}: {chunks_dir}")
-            chunks_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Log the directory structure
-        logger.info(f"Directory structure: UPLOAD_DIR={UPLOAD_DIR}, chunks_parent={chunks_parent}, chunks_dir={chunks_dir}")
-        
-        # Save the chunk
-        chunk_path = chunks_dir / f"chunk_{chunkIndex}"
-        logger.info(f"Saving chunk {chunkIndex + 1} to {chunk_path}")
-        
-        with open(chunk_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Verify the chunk was saved correctly
-        if not chunk_path.exists():
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to save chunk {chunkIndex + 1}: File not found after save"
-            )
-        
-        chunk_size = os.path.getsize(chunk_path)
-        logger.info(f"Chunk {chunkIndex + 1} saved successfully, size: {chunk_size} bytes")
-        
+        if not upload.exists():
+            # Clients that skip /init-chunked-upload describe the layout with every chunk
+            if chunkBytes is None or totalSize is None:
+                raise ChunkedUploadError(
+                    f"Upload {uploadId} has not been initialised; call /init-chunked-upload "
+                    "or send chunkBytes and totalSize with each chunk"
+                )
+            CHUNKED_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+            await asyncio.to_thread(upload.create, file.filename, totalSize, chunkBytes, totalChunks)
+        
+        result = await asyncio.to_thread(upload.write_chunk, chunkIndex, file.file, checksum)
+        logger.info(f"Chunk {chunkIndex + 1} written at its final offset, size: {result['bytes']} bytes")
+    except ChunkChecksumError as e:
+        logger.warning(f"Rejected chunk {chunkIndex + 1} of upload {uploadId}: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except ChunkedUploadError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Error saving chunk {chunkIndex + 1}: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -3935,7 +3564,10 @@ async def upload_chunk(
     finally:
         file.file.close()
     
-    return {"message": f"Chunk {chunkIndex + 1} of {totalChunks} uploaded successfully"}
+    return {
+        "message": f"Chunk {chunkIndex + 1} of {totalChunks} uploaded successfully",
+        "sha256": result["sha256"]
+    }
 
 @router.get("/file-schema/{file_id}", response_model=SchemaResponse)
 async def get_file_schema(
@@ -4016,43 +3648,43 @@ async def get_file_schema(
         
         # For JSON files
         elif file_info.type.lower() == "json":
-            with open(file_path, 'r', encoding='utf-8', errors='replace') as jsonfile:
-                try:
-                    data = json.load(jsonfile)
-                    
-                    # If the data is a list of objects, infer schema from the first item
-                    if isinstance(data, list) and data and isinstance(data[0], dict):
-                        first_item = data[0]
-                        for key, value in first_item.items():
-                            field_type = "string"
-                            if isinstance(value, int):
-                                field_type = "integer"
-                            elif isinstance(value, float):
-                                field_type = "float"
-                            elif isinstance(value, bool):
-                                field_type = "boolean"
-                                
-                            fields.append({
-                                "name": key,
-                                "type": field_type,
-                                "nullable": True  # Assume nullable for JSON
-                            })
+            try:
+                # Only the first record is needed, so stream it instead of loading the file
+                data = sample_json_records(file_path, limit=1)
+                
+                # If the data is a list of objects, infer schema from the first item
+                if isinstance(data, list) and data and isinstance(data[0], dict):
+                    first_item = data[0]
+                    for key, value in first_item.items():
+                        field_type = "string"
+                        if isinstance(value, int):
+                            field_type = "integer"
+                        elif isinstance(value, float):
+                            field_type = "float"
+                        elif isinstance(value, bool):
+                            field_type = "boolean"
                             
-                            sample_values.append(value)
-                    else:
-                        # For simple JSON or complex nested structures, provide basic info
                         fields.append({
-                            "name": "json_content",
-                            "type": "object",
-                            "nullable": False
+                            "name": key,
+                            "type": field_type,
+                            "nullable": True  # Assume nullable for JSON
                         })
-                        sample_values.append(None)
                         
-                except json.JSONDecodeError as e:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Invalid JSON file: {str(e)}"
-                    )
+                        sample_values.append(value)
+                else:
+                    # For simple JSON or complex nested structures, provide basic info
+                    fields.append({
+                        "name": "json_content",
+                        "type": "object",
+                        "nullable": False
+                    })
+                    sample_values.append(None)
+                    
+            except (ijson.JSONError, UnicodeDecodeError) as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid JSON file: {str(e)}"
+                )
         
         # Log the schema data being returned
         logger.info(f"Schema data for file {file_id}: {len(fields)} fields")
@@ -4153,7 +3785,7 @@ async def complete_chunked_upload(
     current_user: User = Depends(has_permission("datapuur:write")),  # Updated permission
     db: Session = Depends(get_db)
 ):
-    """Complete a chunked upload by combining all chunks into a single file"""
+    """Complete a chunked upload by moving the assembled file into place"""
     # Parse request body
     try:
         data = await request.json()
@@ -4172,15 +3804,11 @@ async def complete_chunked_upload(
             )
         
         # Check if this upload was cancelled
+        upload = get_chunked_upload(upload_id)
         cancel_marker = UPLOAD_DIR / f"cancel_{upload_id}"
         if cancel_marker.exists():
             # The upload was cancelled, clean up any chunks and return appropriate response
-            chunks_dir = UPLOAD_DIR / "chunks" / upload_id
-            if chunks_dir.exists():
-                try:
-                    shutil.rmtree(chunks_dir)
-                except Exception as e:
-                    logger.error(f"Error cleaning up chunks after cancellation: {str(e)}")
+            upload.abort()
             
             # Remove the cancellation marker
             try:
@@ -4193,111 +3821,37 @@ async def complete_chunked_upload(
         
         # Get file extension
         file_ext = file_name.split('.')[-1].lower()
-        if file_ext not in ['csv', 'json']:
+        if file_ext not in ['csv', 'json', 'jsonl', 'ndjson']:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only CSV, JSON and JSON Lines files are supported"
+            )
+        # JSON Lines files are ingested by the JSON pipeline
+        file_type = "json" if f".{file_ext}" in JSON_LINES_EXTENSIONS else file_ext
+        
+        if not upload.exists():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Only CSV and JSON files are supported"
+                detail="Upload not found. Upload may have been cancelled or failed."
+            )
+        if upload.manifest["total_chunks"] != total_chunks:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Upload was initialised with {upload.manifest['total_chunks']} chunks, not {total_chunks}"
             )
         
         # Generate a unique file ID
         file_id = str(uuid.uuid4())
         file_path = UPLOAD_DIR / f"{file_id}.{file_ext}"
         
-        # Combine chunks into a single file
-        chunks_dir = UPLOAD_DIR / "chunks" / upload_id
-        
-        # Check if chunks directory exists
-        if not chunks_dir.exists():
-            # Check all possible paths that might have been used
-            alternative_paths = [
-                UPLOAD_DIR / f"chunks_{upload_id}",  # Old format
-                UPLOAD_DIR / upload_id,              # Another possible format
-                UPLOAD_DIR / "chunks" / upload_id    # Current format
-            ]
-            
-            found_dir = None
-            for path in alternative_paths:
-                if path.exists():
-                    logger.info(f"Found chunks directory at alternative path: {path}")
-                    found_dir = path
-                    chunks_dir = path
-                    break
-            
-            if found_dir is None:
-                # Check if this was a cancelled upload
-                if cancel_marker.exists():
-                    try:
-                        os.remove(cancel_marker)
-                    except Exception as e:
-                        logger.error(f"Error removing cancellation marker: {str(e)}")
-                    return {"cancelled": True, "message": "Upload was cancelled by the user"}
-                else:
-                    # List all directories in UPLOAD_DIR to help debug
-                    try:
-                        upload_contents = list(UPLOAD_DIR.iterdir())
-                        chunks_parent = UPLOAD_DIR / "chunks"
-                        chunks_contents = list(chunks_parent.iterdir()) if chunks_parent.exists() else []
-                        
-                        logger.error(f"Chunks directory not found at {chunks_dir}")
-                        logger.error(f"UPLOAD_DIR contents: {upload_contents}")
-                        logger.error(f"Chunks parent directory exists: {chunks_parent.exists()}")
-                        if chunks_parent.exists():
-                            logger.error(f"Chunks parent directory contents: {chunks_contents}")
-                    except Exception as e:
-                        logger.error(f"Error listing directory contents: {str(e)}")
-                    
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Chunks directory not found. Upload may have been cancelled or failed."
-                    )
-        
-        logger.info(f"Found chunks directory for {upload_id}, combining {total_chunks} chunks")
-        
-        # Check if all chunks exist before starting to combine them
-        for i in range(total_chunks):
-            chunk_path = chunks_dir / f"chunk_{i}"
-            if not chunk_path.exists():
-                # Check if this was a cancelled upload
-                if cancel_marker.exists():
-                    try:
-                        os.remove(cancel_marker)
-                    except Exception as e:
-                        logger.error(f"Error removing cancellation marker: {str(e)}")
-                    return {"cancelled": True, "message": "Upload was cancelled by the user"}
-                else:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Chunk {i + 1} is missing"
-                    )
-        
-        # Now that we've verified all chunks exist, combine them
+        # Chunks were written in place, so completing is a rename of the assembled file
         try:
-            # Use buffered I/O for better performance with large files
-            with open(file_path, "wb", buffering=8192) as outfile:
-                for i in range(total_chunks):
-                    chunk_path = chunks_dir / f"chunk_{i}"
-                    logger.info(f"Processing chunk {i+1}/{total_chunks} from {chunk_path}")
-                    
-                    # Use buffered reading for better performance
-                    with open(chunk_path, "rb", buffering=8192) as infile:
-                        # Copy in smaller chunks to avoid memory issues
-                        bytes_copied = 0
-                        while True:
-                            buffer = infile.read(1024 * 1024)  # Read 1MB at a time
-                            if not buffer:
-                                break
-                            outfile.write(buffer)
-                            bytes_copied += len(buffer)
-                        logger.info(f"Copied {bytes_copied} bytes from chunk {i+1}")
-            
-            logger.info(f"All chunks combined successfully into {file_path}")
-            
-            # Clean up chunks
             try:
-                shutil.rmtree(chunks_dir)
-                logger.info(f"Cleaned up chunks directory {chunks_dir}")
-            except Exception as e:
-                logger.warning(f"Failed to clean up chunks directory: {str(e)}")
+                await asyncio.to_thread(upload.finalize, file_path)
+            except ChunkedUploadError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            
+            logger.info(f"Chunked upload {upload_id} assembled into {file_path}")
             
             # Get actual file size
             actual_file_size = os.path.getsize(file_path)
@@ -4307,7 +3861,7 @@ async def complete_chunked_upload(
             file_data = {
                 "filename": file_name,
                 "path": str(file_path),
-                "type": file_ext,
+                "type": file_type,
                 "uploaded_by": current_user.username,
                 "uploaded_at": datetime.now(timezone.utc),
                 "chunk_size": original_chunk_size
@@ -4335,11 +3889,15 @@ async def complete_chunked_upload(
             
             return {"file_id": file_id, "message": "File uploaded successfully"}
             
+        except HTTPException:
+            raise
         except Exception as combine_error:
-            logger.error(f"Error while combining chunks: {str(combine_error)}")
+            logger.error(f"Error while completing chunked upload: {str(combine_error)}")
             # Re-raise to be caught by the outer exception handler
             raise
-            
+    
+    except HTTPException:
+        raise
     except Exception as e:
         error_msg = str(e) if str(e) else repr(e)
         logger.error(f"Error completing chunked upload: {error_msg}", exc_info=True)
@@ -4374,14 +3932,14 @@ async def cancel_chunked_upload(
             detail="Upload ID is required"
         )
     
-    # Create the chunks directory path based on the upload ID
-    chunks_dir = UPLOAD_DIR / "chunks" / upload_id
+    # Session directory holding the partially uploaded file
+    upload = get_chunked_upload(upload_id)
     
-    # Check if the chunks directory exists
-    if chunks_dir.exists():
+    # Check if the upload session exists
+    if upload.session_dir.exists():
         try:
-            # Remove all chunks
-            shutil.rmtree(chunks_dir)
+            # Remove everything uploaded so far
+            upload.abort()
             
             # Create a cancellation marker file to signal to any ongoing processes that they should stop
             # This will be checked by the complete_chunked_upload endpoint
@@ -4865,6 +4423,10 @@ async def stop_job_admin(
                 detail=f"Job with status '{job.status}' cannot be stopped"
             )
         
+        # Drop the job from the ingestion queue if it has not started yet
+        get_ingestion_scheduler().cancel(job_id)
+        signal_job_cancelled(job_id)
+        
         # Update job status to cancelled
         job.status = "cancelled"
         job.end_time = datetime.now()
@@ -15,6 +15,7 @@ from datetime import datetime
 
 from api.models import User, get_db
 from api.auth import has_any_permission, log_activity
+from api.datapuur_engine.preview import read_parquet_preview, ORIENT_RECORDS
 from .models import TransformedDataset
 from .schemas import (
     TransformedDatasetResponse, DatasetMetadataUpdate
@@ -230,14 +231,9 @@ async def preview_transformed_dataset(
             if not file_path.exists():
                 raise HTTPException(status_code=404, detail="Transformed dataset file not found")
         
-        # Read the Parquet file with pandas
-        df = pd.read_parquet(file_path)
-        
-        # Get a preview of the data (first N rows)
-        preview_df = df.head(rows)
-        
-        # Convert to records format (list of dictionaries)
-        records = preview_df.to_dict(orient='records')
+        # Read only the leading row group(s); the total comes from the Parquet footer
+        preview = read_parquet_preview(file_path, rows=rows, orient=ORIENT_RECORDS)
+        records = preview["data"]
         
         # Log the preview request
         log_activity(
@@ -250,9 +246,11 @@ async def preview_transformed_dataset(
         # Return preview data
         return {
             "data": records,
-            "total_rows": len(df),
+            "total_rows": preview["total_rows"],
             "preview_rows": len(records)
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error previewing transformed dataset {dataset_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,33 @@
+"""
+DataPuur Engine - streaming ingestion primitives shared by the DataPuur APIs
+"""
+
+from .parquet_writer import StreamingParquetWriter, SchemaEvolvingParquetWriter
+from .csv_ingest import ingest_csv_to_parquet
+from .json_ingest import ingest_json_to_parquet
+from .db_extract import extract_table_to_parquet
+from .db_parallel import extract_table_parallel
+from .job_scheduler import IngestionScheduler, get_ingestion_scheduler
+from .progress import JobProgressReporter
+from .chunked_upload import ChunkedUpload
+from .parquet_metadata import read_parquet_statistics
+from .preview import read_parquet_preview
+from .dataset_query import query_parquet_page
+from .export_stream import stream_parquet_export
+
+__all__ = [
+    "StreamingParquetWriter",
+    "SchemaEvolvingParquetWriter",
+    "ingest_csv_to_parquet",
+    "ingest_json_to_parquet",
+    "extract_table_to_parquet",
+    "extract_table_parallel",
+    "IngestionScheduler",
+    "get_ingestion_scheduler",
+    "JobProgressReporter",
+    "ChunkedUpload",
+    "read_parquet_statistics",
+    "read_parquet_preview",
+    "query_parquet_page",
+    "stream_parquet_export",
+]
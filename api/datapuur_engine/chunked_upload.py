@@ -0,0 +1,254 @@
+"""
+Resumable chunked uploads assembled in place.
+
+Every upload gets a session directory holding a manifest, the destination
+data file preallocated to the full upload size, and one receipt per chunk
+that has been written and verified. Chunks are written straight to their
+final byte offset (``index * chunk_bytes``) with positional writes, so they
+can arrive in any order and in parallel, and completing the upload is a
+rename of the data file rather than a concatenation pass.
+
+State lives entirely on disk, which keeps it shared between API workers and
+lets a client resume after a restart by asking which chunks are missing.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Bytes copied from the request body per positional write
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Upload IDs become directory names, so only allow a safe character set
+UPLOAD_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+
+MANIFEST_NAME = "manifest.json"
+DATA_NAME = "data"
+RECEIPTS_DIR = "received"
+
+
+class ChunkedUploadError(ValueError):
+    """Raised for invalid chunked upload requests"""
+
+
+class ChunkChecksumError(ChunkedUploadError):
+    """Raised when a chunk does not match the checksum sent by the client"""
+
+
+def _preallocate(fd: int, size: int):
+    """Reserve disk space for the whole upload, falling back to a sparse file"""
+    if size <= 0:
+        return
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError as e:
+            logger.debug(f"posix_fallocate unavailable ({str(e)}), using a sparse file")
+    if os.fstat(fd).st_size < size:
+        os.ftruncate(fd, size)
+
+
+class ChunkedUpload:
+    """A resumable upload session stored under ``root/<upload_id>``"""
+
+    def __init__(self, root: Union[str, Path], upload_id: str):
+        if not upload_id or not UPLOAD_ID_PATTERN.match(upload_id):
+            raise ChunkedUploadError(f"Invalid upload ID: {upload_id}")
+        self.upload_id = upload_id
+        self.session_dir = Path(root) / upload_id
+        self.manifest_path = self.session_dir / MANIFEST_NAME
+        self.data_path = self.session_dir / DATA_NAME
+        self.receipts_dir = self.session_dir / RECEIPTS_DIR
+        self._manifest: Optional[Dict[str, Any]] = None
+
+    def exists(self) -> bool:
+        return self.manifest_path.exists()
+
+    @property
+    def manifest(self) -> Dict[str, Any]:
+        if self._manifest is None:
+            if not self.exists():
+                raise ChunkedUploadError(f"Upload {self.upload_id} has not been initialised")
+            with open(self.manifest_path, "r") as f:
+                self._manifest = json.load(f)
+        return self._manifest
+
+    def create(self, file_name: str, total_size: int, chunk_bytes: int, total_chunks: int) -> Dict[str, Any]:
+        """
+        Create the session, or return the existing one when it was created with the same layout.
+
+        Safe to call concurrently: the manifest is published with an atomic link,
+        and preallocating the data file is idempotent.
+
+        Returns:
+            dict: The session manifest
+        """
+        total_size, chunk_bytes, total_chunks = int(total_size), int(chunk_bytes), int(total_chunks)
+        if total_size < 0 or chunk_bytes <= 0 or total_chunks <= 0:
+            raise ChunkedUploadError("totalSize, chunkBytes and totalChunks must be positive")
+        expected_chunks = max(1, -(-total_size // chunk_bytes))
+        if total_chunks != expected_chunks:
+            raise ChunkedUploadError(
+                f"{total_chunks} chunks of {chunk_bytes} bytes do not match a {total_size} byte upload"
+            )
+
+        manifest = {
+            "upload_id": self.upload_id,
+            "file_name": file_name,
+            "total_size": total_size,
+            "chunk_bytes": chunk_bytes,
+            "total_chunks": total_chunks
+        }
+
+        if not self.exists():
+            self.receipts_dir.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.data_path, os.O_WRONLY | os.O_CREAT, 0o644)
+            try:
+                _preallocate(fd, total_size)
+            finally:
+                os.close(fd)
+
+            temp_manifest = self.session_dir / f".{MANIFEST_NAME}.{uuid.uuid4().hex}"
+            with open(temp_manifest, "w") as f:
+                json.dump(manifest, f)
+            try:
+                os.link(temp_manifest, self.manifest_path)
+                logger.info(f"Created chunked upload {self.upload_id}: {total_chunks} chunks, {total_size} bytes")
+            except FileExistsError:
+                pass
+            finally:
+                os.unlink(temp_manifest)
+
+        self._manifest = None
+        existing = self.manifest
+        for key in ("total_size", "chunk_bytes", "total_chunks"):
+            if existing[key] != manifest[key]:
+                raise ChunkedUploadError(
+                    f"Upload {self.upload_id} already exists with {key}={existing[key]}, got {manifest[key]}"
+                )
+        return existing
+
+    def chunk_range(self, index: int):
+        """Return (offset, length) of a chunk in the final file"""
+        manifest = self.manifest
+        if index < 0 or index >= manifest["total_chunks"]:
+            raise ChunkedUploadError(f"Chunk index {index} is out of range (0-{manifest['total_chunks'] - 1})")
+        offset = index * manifest["chunk_bytes"]
+        return offset, min(manifest["chunk_bytes"], manifest["total_size"] - offset)
+
+    def write_chunk(self, index: int, source: BinaryIO, checksum: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Write one chunk at its final offset and record a receipt once it is verified.
+
+        Args:
+            index: Zero-based chunk index
+            source: Readable binary stream with the chunk content
+            checksum: Optional SHA-256 hex digest of the chunk, optionally prefixed with ``sha256:``
+
+        Returns:
+            dict: index, bytes written and the SHA-256 digest of the chunk
+        """
+        offset, expected_length = self.chunk_range(index)
+        digest = hashlib.sha256()
+        written = 0
+
+        fd = os.open(self.data_path, os.O_WRONLY)
+        try:
+            while True:
+                block = source.read(COPY_BUFFER_SIZE)
+                if not block:
+                    break
+                if written + len(block) > expected_length:
+                    raise ChunkedUploadError(f"Chunk {index} is larger than the expected {expected_length} bytes")
+                view = memoryview(block)
+                while view:
+                    count = os.pwrite(fd, view, offset + written)
+                    view = view[count:]
+                    written += count
+                digest.update(block)
+        finally:
+            os.close(fd)
+
+        if written != expected_length:
+            raise ChunkedUploadError(f"Chunk {index} has {written} bytes, expected {expected_length}")
+
+        sha256 = digest.hexdigest()
+        if checksum:
+            expected_checksum = checksum.lower()
+            if expected_checksum.startswith("sha256:"):
+                expected_checksum = expected_checksum[len("sha256:"):]
+            if expected_checksum != sha256:
+                raise ChunkChecksumError(f"Checksum mismatch for chunk {index}")
+
+        # Publish the receipt atomically so missing_chunks never sees a partial one
+        receipt_path = self.receipts_dir / str(index)
+        temp_receipt = self.receipts_dir / f".{index}.{uuid.uuid4().hex}"
+        with open(temp_receipt, "w") as f:
+            f.write(sha256)
+        os.replace(temp_receipt, receipt_path)
+
+        return {"index": index, "bytes": written, "sha256": sha256}
+
+    def received_chunks(self) -> List[int]:
+        if not self.receipts_dir.exists():
+            return []
+        return sorted(int(name) for name in os.listdir(self.receipts_dir) if name.isdigit())
+
+    def missing_chunks(self) -> List[int]:
+        received = set(self.received_chunks())
+        return [i for i in range(self.manifest["total_chunks"]) if i not in received]
+
+    def status(self) -> Dict[str, Any]:
+        """Summary used by clients to resume an upload"""
+        manifest = self.manifest
+        missing = self.missing_chunks()
+        return {
+            "upload_id": self.upload_id,
+            "file_name": manifest["file_name"],
+            "total_size": manifest["total_size"],
+            "chunk_bytes": manifest["chunk_bytes"],
+            "total_chunks": manifest["total_chunks"],
+            "received_chunks": manifest["total_chunks"] - len(missing),
+            "missing_chunks": missing,
+            "complete": not missing
+        }
+
+    def finalize(self, destination: Union[str, Path]) -> int:
+        """
+        Move the assembled file to its destination and remove the session.
+
+        Returns:
+            int: Size of the final file in bytes
+        """
+        missing = self.missing_chunks()
+        if missing:
+            preview = ", ".join(str(i + 1) for i in missing[:10])
+            raise ChunkedUploadError(f"{len(missing)} chunks are missing (chunks {preview}"
+                                     f"{', ...' if len(missing) > 10 else ''})")
+
+        fd = os.open(self.data_path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        size = os.path.getsize(self.data_path)
+        if size != self.manifest["total_size"]:
+            raise ChunkedUploadError(f"Assembled file has {size} bytes, expected {self.manifest['total_size']}")
+
+        os.replace(self.data_path, destination)
+        self.abort()
+        return size
+
+    def abort(self):
+        """Remove the session and everything uploaded so far"""
+        shutil.rmtree(self.session_dir, ignore_errors=True)
@@ -0,0 +1,14 @@
+"""
+Tunable settings for the DataPuur ingestion engines.
+
+Every value can be overridden through an environment variable so that
+deployments with different worker sizes can adjust them without code changes.
+"""
+
+import os
+
+# Soft ceiling on the memory a single ingestion job may hold for decoded data
+INGEST_MEMORY_LIMIT_MB = int(os.getenv("DATAPUUR_INGEST_MEMORY_LIMIT_MB", "256"))
+
+# Target number of rows per Parquet row group
+PARQUET_ROW_GROUP_SIZE = int(os.getenv("DATAPUUR_PARQUET_ROW_GROUP_SIZE", str(128 * 1024)))
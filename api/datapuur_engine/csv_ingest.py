@@ -0,0 +1,186 @@
+"""
+Single-pass CSV to Parquet ingestion engine.
+
+Both the pandas reader (small files) and the Arrow reader (large files) feed
+the same loop, which appends chunks to one open Parquet writer. Ingest time is
+therefore linear in file size.
+
+Large files use the streaming mode: every Arrow record batch is written as its
+own row group as soon as it is decoded, and the Arrow block size is derived
+from the job's memory ceiling so peak memory stays bounded regardless of file
+size. Progress is reported from the number of source bytes consumed.
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+from .config import INGEST_MEMORY_LIMIT_MB, PARQUET_ROW_GROUP_SIZE
+from .parquet_writer import StreamingParquetWriter
+
+logger = logging.getLogger(__name__)
+
+# Files above this size are decoded with the streaming Arrow CSV reader
+LARGE_CSV_THRESHOLD = 100 * 1024 * 1024  # 100MB
+
+# Bounds for the Arrow CSV reader block size
+MIN_ARROW_BLOCK_SIZE = 1 * 1024 * 1024  # 1MB
+MAX_ARROW_BLOCK_SIZE = 16 * 1024 * 1024  # 16MB
+
+# Maximum number of raw blocks the Arrow CSV reader reads ahead of the decoder
+ARROW_READAHEAD_BLOCKS = 32
+
+# Columns that are coerced to numbers when reading through pandas
+NUMERIC_COLUMNS = ['MonthlyCharges', 'TotalCharges']
+
+
+def arrow_block_size_for_limit(memory_limit_bytes: int) -> int:
+    """
+    Pick an Arrow CSV block size that keeps a streaming job under its memory ceiling.
+
+    The Arrow reader prefetches up to ARROW_READAHEAD_BLOCKS raw blocks on a
+    background I/O thread, and each decoded batch plus the row group being
+    encoded by the Parquet writer come on top of that, so the budget is split
+    into ARROW_READAHEAD_BLOCKS * 2 parts.
+    """
+    block_size = memory_limit_bytes // (ARROW_READAHEAD_BLOCKS * 2)
+    return max(MIN_ARROW_BLOCK_SIZE, min(MAX_ARROW_BLOCK_SIZE, block_size))
+
+
+def _iter_pandas_chunks(source, chunk_size: int) -> Iterator[pa.Table]:
+    """Read a CSV with pandas, keeping every column as string except known numeric ones"""
+    chunk_iterator = pd.read_csv(
+        source,
+        chunksize=chunk_size,
+        dtype=str,  # Read all columns as strings to prevent type conversion errors
+        keep_default_na=False,  # Don't convert empty strings to NaN
+        low_memory=True,
+        engine='c'
+    )
+    for chunk in chunk_iterator:
+        for col in chunk.columns:
+            if col in NUMERIC_COLUMNS:
+                chunk[col] = pd.to_numeric(chunk[col], errors='coerce').astype('float64')
+        yield pa.Table.from_pandas(chunk, preserve_index=False)
+
+
+def _iter_arrow_chunks(source, block_size: int) -> Iterator[pa.Table]:
+    """Read a CSV with the streaming Arrow reader, inferring column types"""
+    read_options = pa_csv.ReadOptions(block_size=block_size)
+    convert_options = pa_csv.ConvertOptions(
+        strings_can_be_null=True,
+        timestamp_parsers=["%Y-%m-%d", "%Y/%m/%d", "%m-%d-%Y", "%m/%d/%Y"]  # Common date formats
+    )
+    with pa_csv.open_csv(source, read_options=read_options, convert_options=convert_options) as reader:
+        for batch in reader:
+            yield pa.Table.from_batches([batch])
+
+
+def ingest_csv_to_parquet(file_path: Union[str, Path],
+                          output_file: Union[str, Path],
+                          chunk_size: int = 1000,
+                          row_group_size: int = PARQUET_ROW_GROUP_SIZE,
+                          memory_limit_mb: Optional[int] = None,
+                          streaming: Optional[bool] = None,
+                          progress_callback: Optional[Callable[[int, str], None]] = None,
+                          cancel_check: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+    """
+    Convert a CSV file to Parquet in a single streaming pass.
+
+    Args:
+        file_path: Source CSV file
+        output_file: Destination Parquet file
+        chunk_size: Number of rows read per pandas chunk (buffered mode only)
+        row_group_size: Maximum rows buffered before a row group is written (buffered mode only)
+        memory_limit_mb: Soft memory ceiling for the job, defaults to INGEST_MEMORY_LIMIT_MB
+        streaming: Force the Arrow streaming mode on or off. By default it is
+            used for files larger than LARGE_CSV_THRESHOLD.
+        progress_callback: Called with (progress_percent, details) after each row group
+        cancel_check: Returns True when the job has been cancelled
+
+    Returns:
+        dict: rows, row_groups and bytes_read, and whether the job was cancelled
+    """
+    file_size = os.path.getsize(file_path)
+    memory_limit_bytes = (memory_limit_mb or INGEST_MEMORY_LIMIT_MB) * 1024 * 1024
+    if streaming is None:
+        streaming = file_size > LARGE_CSV_THRESHOLD
+
+    writer = StreamingParquetWriter(output_file)
+    buffered = []
+    buffered_rows = 0
+    buffered_bytes = 0
+
+    def result(cancelled: bool, bytes_read: int) -> Dict[str, Any]:
+        return {
+            "rows": writer.rows_written,
+            "row_groups": writer.row_groups_written,
+            "bytes_read": bytes_read,
+            "cancelled": cancelled
+        }
+
+    def flush():
+        nonlocal buffered, buffered_rows, buffered_bytes
+        if buffered:
+            writer.write_table(pa.concat_tables(buffered) if len(buffered) > 1 else buffered[0])
+            buffered = []
+            buffered_rows = 0
+            buffered_bytes = 0
+
+    def report(bytes_read: int):
+        if progress_callback is None or file_size == 0:
+            return
+        progress = min(int((bytes_read / file_size) * 100), 99)
+        progress_callback(
+            progress,
+            f"Processed {writer.rows_written} rows, {bytes_read / (1024 * 1024):.1f} of "
+            f"{file_size / (1024 * 1024):.1f} MB ({progress}%)"
+        )
+
+    # Read through our own handle so that progress can be taken from the
+    # position of the reader in the source file. The Arrow reader runs at most
+    # ARROW_READAHEAD_BLOCKS ahead of the decoder, which is a small fraction of
+    # the files that use the streaming mode.
+    with open(file_path, 'rb') as source:
+        if streaming:
+            block_size = arrow_block_size_for_limit(memory_limit_bytes)
+            logger.info(f"Streaming CSV {file_path} with {block_size / (1024 * 1024):.0f} MB blocks "
+                        f"(memory limit {memory_limit_bytes / (1024 * 1024):.0f} MB)")
+            chunks = _iter_arrow_chunks(source, block_size)
+        else:
+            chunks = _iter_pandas_chunks(source, chunk_size)
+
+        try:
+            for table in chunks:
+                if cancel_check is not None and cancel_check():
+                    logger.info(f"CSV ingestion of {file_path} cancelled after {writer.rows_written} rows")
+                    writer.abort()
+                    return result(True, source.tell())
+
+                if streaming:
+                    # Each decoded batch goes straight to its own row group
+                    writer.write_table(table)
+                    report(source.tell())
+                    continue
+
+                buffered.append(table)
+                buffered_rows += table.num_rows
+                buffered_bytes += table.nbytes
+                if buffered_rows >= row_group_size or buffered_bytes >= memory_limit_bytes // 4:
+                    flush()
+                    report(source.tell())
+
+            flush()
+            if writer.rows_written == 0 and writer.schema is None:
+                raise ValueError("No data was read from the CSV file")
+            writer.close()
+        except Exception:
+            writer.abort()
+            raise
+
+    return result(False, file_size)
@@ -0,0 +1,339 @@
+"""
+Filtered, paginated reads of Parquet datasets.
+
+A filter is evaluated against the Parquet file rather than a DataFrame of the
+whole dataset. Row groups whose min/max statistics rule the predicate out are
+skipped through a pyarrow dataset scan, and the remaining row groups only
+read the filtered column to count their matches. The per-row-group match
+counts form a row-offset index which is cached per (file version, filter), so
+any page - including deep ones - is served by reading just the row group(s)
+that hold it and stopping as soon as the page is full.
+"""
+
+import bisect
+import logging
+import operator as operators
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .parquet_metadata import parquet_fingerprint
+from .preview import ORIENT_RECORDS, pandas_index_columns, table_to_json_rows
+
+logger = logging.getLogger(__name__)
+
+# Rows per record batch when scanning a whole dataset
+SCAN_BATCH_SIZE = 50000
+
+# Number of (file version, filter) row-offset indexes kept in memory
+FILTER_INDEX_CACHE_SIZE = 64
+
+# Operators that always compare numerically
+NUMERIC_OPERATORS = {
+    "gt": (operators.gt, pc.greater),
+    "lt": (operators.lt, pc.less),
+    "gte": (operators.ge, pc.greater_equal),
+    "lte": (operators.le, pc.less_equal),
+}
+
+FILTER_OPERATORS = ("eq", "neq", "contains") + tuple(NUMERIC_OPERATORS)
+
+_index_cache: "OrderedDict[Tuple, _FilterIndex]" = OrderedDict()
+_index_cache_lock = threading.Lock()
+
+
+class DatasetQueryError(ValueError):
+    """Raised when a filter cannot be applied to a dataset"""
+
+
+class _Predicate:
+    """
+    A filter on one column.
+
+    ``expression`` is used to prune row groups from their statistics (None
+    when the filter cannot be expressed on the stored type), ``mask`` computes
+    the exact matches of a column chunk.
+    """
+
+    def __init__(self, mask: Callable[[pa.ChunkedArray], pa.Array], expression: Optional[ds.Expression] = None):
+        self.mask = mask
+        self.expression = expression
+
+
+class _FilterIndex:
+    """Row groups that contain matches and the filtered offset of their first match"""
+
+    def __init__(self, row_groups: List[int], starts: List[int], total_rows: int):
+        self.row_groups = row_groups
+        self.starts = starts
+        self.total_rows = total_rows
+
+
+def _as_number(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_numeric(data_type: pa.DataType) -> bool:
+    return pa.types.is_integer(data_type) or pa.types.is_floating(data_type) or pa.types.is_decimal(data_type)
+
+
+def _to_mask(values) -> pa.Array:
+    return pa.array(values, type=pa.bool_())
+
+
+def _string_predicate(operator: str, value: str) -> _Predicate:
+    """
+    Compare the string form of each value, with nulls as empty strings.
+
+    This is how the DataFrame implementation compared columns that are not
+    numeric, so non-string types keep their pandas string representation.
+    ``contains`` is a regular expression search, as with ``Series.str.contains``.
+    """
+
+    def mask(column: pa.ChunkedArray) -> pa.Array:
+        strings = column.to_pandas().fillna('').astype(str)
+        if operator == "eq":
+            result = strings == value
+        elif operator == "neq":
+            result = strings != value
+        else:
+            result = strings.str.contains(value, na=False)
+        return _to_mask(result.to_numpy(dtype=bool))
+
+    return _Predicate(mask)
+
+
+def _utf8_predicate(field: str, operator: str, value: str) -> _Predicate:
+    """Comparisons on string columns, evaluated with Arrow kernels"""
+    null_matches = {"eq": value == "", "neq": value != ""}
+
+    if operator == "contains":
+        if re.escape(value) != value:
+            # A real pattern: keep Python regular expression semantics
+            return _string_predicate(operator, value)
+
+        def contains(column: pa.ChunkedArray) -> pa.Array:
+            return pc.fill_null(pc.match_substring(column, value), value == "").combine_chunks()
+
+        return _Predicate(contains)
+
+    compare = pc.equal if operator == "eq" else pc.not_equal
+
+    def mask(column: pa.ChunkedArray) -> pa.Array:
+        return pc.fill_null(compare(column, value), null_matches[operator]).combine_chunks()
+
+    expression = None
+    if operator == "eq":
+        expression = ds.field(field) == value
+        if value == "":
+            expression = expression | ds.field(field).is_null()
+    return _Predicate(mask, expression)
+
+
+def _build_predicate(field: str, data_type: pa.DataType, operator: str, value: str) -> _Predicate:
+    if operator not in FILTER_OPERATORS:
+        raise DatasetQueryError(f"Unsupported operator: {operator}")
+
+    if operator in NUMERIC_OPERATORS:
+        number = _as_number(value)
+        if number is None:
+            raise DatasetQueryError(
+                f"Cannot perform {operator} comparison on column '{field}' with value '{value}'. "
+                f"This operator requires numeric values."
+            )
+        expression_op, kernel = NUMERIC_OPERATORS[operator]
+
+        if _is_numeric(data_type):
+            def numeric_mask(column: pa.ChunkedArray) -> pa.Array:
+                return pc.fill_null(kernel(column, number), False).combine_chunks()
+
+            return _Predicate(numeric_mask, expression_op(ds.field(field), number))
+
+        # Strings holding numbers and other types are coerced the way pd.to_numeric does
+        def coerced_mask(column: pa.ChunkedArray) -> pa.Array:
+            numbers = pd.to_numeric(column.to_pandas(), errors='coerce')
+            return _to_mask(expression_op(numbers, number).fillna(False).to_numpy(dtype=bool))
+
+        return _Predicate(coerced_mask)
+
+    number = _as_number(value)
+    if _is_numeric(data_type) and number is not None and operator != "contains":
+        if operator == "eq":
+            def equal_mask(column: pa.ChunkedArray) -> pa.Array:
+                return pc.fill_null(pc.equal(column, number), False).combine_chunks()
+
+            return _Predicate(equal_mask, ds.field(field) == number)
+
+        def not_equal_mask(column: pa.ChunkedArray) -> pa.Array:
+            return pc.fill_null(pc.not_equal(column, number), True).combine_chunks()
+
+        return _Predicate(not_equal_mask)
+
+    if pa.types.is_string(data_type) or pa.types.is_large_string(data_type):
+        return _utf8_predicate(field, operator, value)
+
+    return _string_predicate(operator, value)
+
+
+def _visible_columns(schema: pa.Schema) -> List[str]:
+    hidden = set(pandas_index_columns(schema))
+    return [name for name in schema.names if name not in hidden]
+
+
+def _candidate_row_groups(path: Union[str, Path], parquet_file: pq.ParquetFile,
+                          predicate: Optional[_Predicate]) -> List[int]:
+    """Row groups whose statistics do not rule the predicate out"""
+    if predicate is None or predicate.expression is None:
+        return list(range(parquet_file.metadata.num_row_groups))
+    fragment = next(iter(ds.dataset(str(path), format="parquet").get_fragments()))
+    return [rg.row_groups[0].id for rg in fragment.split_by_row_group(filter=predicate.expression)]
+
+
+def _open_filter(path: Union[str, Path], column: str, operator: str,
+                 value: str) -> Tuple[pq.ParquetFile, List[str], _Predicate]:
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    schema = parquet_file.schema_arrow
+    columns = _visible_columns(schema)
+    if column not in columns:
+        raise DatasetQueryError(f"Column '{column}' not found in dataset")
+    return parquet_file, columns, _build_predicate(column, schema.field(column).type, operator, value)
+
+
+def _build_index(path: Union[str, Path], parquet_file: pq.ParquetFile, column: str,
+                 predicate: _Predicate) -> _FilterIndex:
+    """Count the matches of every row group that can contain any, reading only the filtered column"""
+    candidates = _candidate_row_groups(path, parquet_file, predicate)
+
+    row_groups, starts = [], []
+    total_rows = 0
+    for rg in candidates:
+        table = parquet_file.read_row_group(rg, columns=[column])
+        matches = pc.sum(predicate.mask(table.column(0))).as_py() or 0
+        if matches:
+            row_groups.append(rg)
+            starts.append(total_rows)
+            total_rows += matches
+
+    logger.debug(f"Filter index for {path}: {len(row_groups)}/{parquet_file.metadata.num_row_groups} "
+                 f"row groups match ({len(candidates)} scanned), {total_rows} rows")
+    return _FilterIndex(row_groups, starts, total_rows)
+
+
+def query_parquet_page(path: Union[str, Path],
+                       column: str,
+                       operator: str,
+                       value: str,
+                       page: int = 1,
+                       page_size: int = 15,
+                       orient: str = ORIENT_RECORDS) -> Dict[str, Any]:
+    """
+    Return one page of the rows of a Parquet file that match a filter.
+
+    Args:
+        path: Parquet file
+        column: Column to filter on
+        operator: One of eq, neq, gt, lt, gte, lte, contains
+        value: Value to compare with, as sent by the client
+        page: One-based page number
+        page_size: Rows per page
+        orient: Row format, see read_parquet_preview
+
+    Returns:
+        dict: columns, data and total_rows (number of matching rows)
+
+    Raises:
+        DatasetQueryError: If the column does not exist or the value does not suit the operator
+    """
+    parquet_file, columns, predicate = _open_filter(path, column, operator, value)
+
+    key = (parquet_fingerprint(path), column, operator, value)
+    with _index_cache_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+    if index is None:
+        index = _build_index(path, parquet_file, column, predicate)
+        with _index_cache_lock:
+            _index_cache[key] = index
+            while len(_index_cache) > FILTER_INDEX_CACHE_SIZE:
+                _index_cache.popitem(last=False)
+
+    offset = (page - 1) * page_size
+    pieces = []
+    needed = min(page_size, max(index.total_rows - offset, 0))
+    position = bisect.bisect_right(index.starts, offset) - 1 if needed else len(index.row_groups)
+    while needed > 0 and position < len(index.row_groups):
+        table = parquet_file.read_row_group(index.row_groups[position], columns=columns)
+        matches = table.filter(predicate.mask(table.column(column)))
+        skip = max(offset - index.starts[position], 0)
+        piece = matches.slice(skip, needed)
+        pieces.append(piece)
+        needed -= piece.num_rows
+        position += 1
+
+    if pieces:
+        page_table = pa.concat_tables(pieces)
+    else:
+        page_table = parquet_file.schema_arrow.empty_table().select(columns)
+
+    return {
+        "columns": columns,
+        "data": table_to_json_rows(page_table, orient),
+        "total_rows": index.total_rows
+    }
+
+
+def scan_parquet(path: Union[str, Path],
+                 column: Optional[str] = None,
+                 operator: str = "eq",
+                 value: Optional[str] = None,
+                 batch_size: int = SCAN_BATCH_SIZE) -> Tuple[List[str], Iterator[pa.Table]]:
+    """
+    Stream the rows of a Parquet file, optionally filtered, as bounded-size tables.
+
+    The column and value are validated before this returns, so errors can be
+    reported before a response starts streaming. Row groups ruled out by their
+    statistics are never read.
+
+    Args:
+        path: Parquet file
+        column: Optional column to filter on; without it every row is returned
+        operator: Filter operator, see query_parquet_page
+        value: Filter value
+        batch_size: Maximum rows per yielded table
+
+    Returns:
+        tuple: (visible column names, iterator of tables with at least one row)
+
+    Raises:
+        DatasetQueryError: If the filter cannot be applied
+    """
+    if column is not None:
+        parquet_file, columns, predicate = _open_filter(path, column, operator, value)
+    else:
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        columns, predicate = _visible_columns(parquet_file.schema_arrow), None
+    row_groups = _candidate_row_groups(path, parquet_file, predicate)
+
+    def tables() -> Iterator[pa.Table]:
+        if not row_groups:
+            return
+        for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=row_groups, columns=columns):
+            table = pa.Table.from_batches([batch])
+            if predicate is not None:
+                table = table.filter(predicate.mask(table.column(column)))
+            if table.num_rows:
+                yield table
+
+    return columns, tables()
@@ -0,0 +1,222 @@
+"""
+Database table extraction engine.
+
+Tables are read either with keyset pagination on a unique key (primary key or
+a unique index on non-nullable columns), which turns every page into an index
+seek, or - when no usable key exists - with a single streaming server-side
+cursor. In both cases batches are appended straight to one Parquet writer, so
+there are no OFFSET scans, no per-chunk temporary files and no final merge.
+"""
+
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+import sqlalchemy
+from sqlalchemy import MetaData, Table, and_, inspect, or_, select
+
+from .config import PARQUET_ROW_GROUP_SIZE
+from .parquet_writer import SchemaEvolvingParquetWriter
+
+logger = logging.getLogger(__name__)
+
+# Extraction strategies reported in the result
+STRATEGY_KEYSET = "keyset"
+STRATEGY_STREAM = "stream"
+
+
+def split_table_name(table_name: str) -> Tuple[Optional[str], str]:
+    """Split an optionally schema-qualified table name into (schema, table)"""
+    if '.' in table_name:
+        schema, table = table_name.rsplit('.', 1)
+        return schema, table
+    return None, table_name
+
+
+def reflect_table(engine, table_name: str) -> Table:
+    """Reflect a source table so queries can be built with SQLAlchemy Core"""
+    schema, table = split_table_name(table_name)
+    return Table(table, MetaData(), schema=schema, autoload_with=engine)
+
+
+def detect_keyset_columns(engine, table_name: str) -> List[str]:
+    """
+    Find columns that uniquely identify rows and can drive keyset pagination.
+
+    The primary key is preferred (single or composite); otherwise the first
+    unique index on non-nullable columns is used.
+
+    Returns:
+        list: Key column names, empty if the table has no usable key
+    """
+    schema, table = split_table_name(table_name)
+    inspector = inspect(engine)
+
+    try:
+        pk_columns = inspector.get_pk_constraint(table, schema=schema).get("constrained_columns") or []
+        if pk_columns:
+            return list(pk_columns)
+    except Exception as e:
+        logger.warning(f"Could not read primary key for {table_name}: {str(e)}")
+
+    try:
+        nullable = {col["name"]: col.get("nullable", True) for col in inspector.get_columns(table, schema=schema)}
+        for index in inspector.get_indexes(table, schema=schema):
+            columns = [col for col in index.get("column_names") or [] if col]
+            if index.get("unique") and columns and not any(nullable.get(col, True) for col in columns):
+                return columns
+    except Exception as e:
+        logger.warning(f"Could not read indexes for {table_name}: {str(e)}")
+
+    return []
+
+
+def _keyset_predicate(key_columns, last_key):
+    """Build ``(k1, k2, ...) > (v1, v2, ...)`` in an OR/AND form every dialect supports"""
+    clauses = []
+    for i, column in enumerate(key_columns):
+        equal_prefix = [key_columns[j] == last_key[j] for j in range(i)]
+        clauses.append(and_(*equal_prefix, column > last_key[i]))
+    return or_(*clauses)
+
+
+def normalize_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Apply the same column normalisation the legacy extraction used"""
+    for col in chunk.select_dtypes(include=['datetime64', 'datetimetz']).columns:
+        chunk[col] = chunk[col].astype(str)
+    return chunk
+
+
+def iter_keyset_chunks(engine, table: Table, key_columns: List[str], chunk_size: int, partition_clause=None):
+    """
+    Yield DataFrames page by page using ``WHERE key > last_key ORDER BY key LIMIT n``.
+
+    An optional partition_clause restricts the pages to one partition of the table.
+    """
+    key_cols = [table.c[name] for name in key_columns]
+    last_key = None
+    while True:
+        query = select(table).order_by(*key_cols).limit(chunk_size)
+        if partition_clause is not None:
+            query = query.where(partition_clause)
+        if last_key is not None:
+            query = query.where(_keyset_predicate(key_cols, last_key))
+
+        with engine.connect() as conn:
+            result = conn.execute(query)
+            rows = result.fetchall()
+            columns = list(result.keys())
+
+        if not rows:
+            return
+        chunk = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+        last_key = tuple(rows[-1]._mapping[name] for name in key_columns)
+        yield chunk
+        if len(rows) < chunk_size:
+            return
+
+
+def iter_streaming_chunks(engine, query, chunk_size: int):
+    """Yield DataFrames from a single server-side cursor"""
+    with engine.connect().execution_options(stream_results=True, yield_per=chunk_size) as conn:
+        result = conn.execute(query)
+        columns = list(result.keys())
+        for partition in result.partitions(chunk_size):
+            yield pd.DataFrame.from_records(partition, columns=columns, coerce_float=True)
+
+
+def extract_table_to_parquet(engine,
+                             table_name: str,
+                             output_file,
+                             chunk_size: int = 10000,
+                             total_rows: int = 0,
+                             row_group_size: int = PARQUET_ROW_GROUP_SIZE,
+                             progress_callback: Optional[Callable[[int, str], None]] = None,
+                             cancel_check: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+    """
+    Extract a database table into a single Parquet file.
+
+    Args:
+        engine: SQLAlchemy engine for the source database
+        table_name: Table to extract, optionally schema-qualified
+        output_file: Destination Parquet file
+        chunk_size: Rows fetched per query (keyset) or per cursor partition (stream)
+        total_rows: Row count used for progress reporting, 0 if unknown
+        row_group_size: Rows buffered before a Parquet row group is written
+        progress_callback: Called with (progress_percent, details) after each fetched chunk
+        cancel_check: Returns True when the job has been cancelled
+
+    Returns:
+        dict: rows written, the strategy and key columns used, and whether the job was cancelled
+    """
+    try:
+        table = reflect_table(engine, table_name)
+        key_columns = detect_keyset_columns(engine, table_name)
+    except Exception as e:
+        logger.warning(f"Could not reflect table {table_name}, falling back to a raw streaming query: {str(e)}")
+        table = None
+        key_columns = []
+
+    if key_columns:
+        strategy = STRATEGY_KEYSET
+        chunks = iter_keyset_chunks(engine, table, key_columns, chunk_size)
+        logger.info(f"Extracting {table_name} with keyset pagination on {key_columns}")
+    else:
+        strategy = STRATEGY_STREAM
+        query = select(table) if table is not None else sqlalchemy.text(f"SELECT * FROM {table_name}")
+        chunks = iter_streaming_chunks(engine, query, chunk_size)
+        logger.info(f"Extracting {table_name} with a streaming server-side cursor (no unique key found)")
+
+    writer = SchemaEvolvingParquetWriter(output_file)
+    buffered = []
+    buffered_rows = 0
+    processed_rows = 0
+    chunk_number = 0
+
+    def result(cancelled: bool) -> Dict[str, Any]:
+        return {
+            "rows": processed_rows,
+            "strategy": strategy,
+            "key_columns": key_columns,
+            "cancelled": cancelled
+        }
+
+    def flush():
+        nonlocal buffered, buffered_rows
+        if buffered:
+            writer.write_dataframe(pd.concat(buffered, ignore_index=True) if len(buffered) > 1 else buffered[0])
+            buffered = []
+            buffered_rows = 0
+
+    try:
+        for chunk in chunks:
+            if cancel_check is not None and cancel_check():
+                logger.info(f"Extraction of {table_name} cancelled after {processed_rows} rows")
+                chunks.close()
+                writer.abort()
+                return result(True)
+
+            buffered.append(normalize_chunk(chunk))
+            buffered_rows += len(chunk)
+            processed_rows += len(chunk)
+            if buffered_rows >= row_group_size:
+                flush()
+
+            chunk_number += 1
+            if progress_callback is not None:
+                if total_rows > 0:
+                    progress = min(int((processed_rows / total_rows) * 100), 99)
+                else:
+                    # If total_rows is unknown, use a sliding scale
+                    progress = min(10 + (chunk_number * 5), 99)
+                progress_callback(progress, f"Extracting data ({strategy}, processed: {processed_rows} rows)")
+
+        flush()
+        if writer.schema is None:
+            raise ValueError("No data was extracted from the database. The table might be empty.")
+        writer.close()
+    except Exception:
+        writer.abort()
+        raise
+
+    return result(False)
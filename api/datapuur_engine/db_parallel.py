@@ -0,0 +1,238 @@
+"""
+Parallel partitioned extraction for database sources.
+
+A table is split into N partitions - contiguous key ranges when it has a
+single numeric key, or hash buckets of the key otherwise - and each partition
+is extracted by its own worker thread over a pooled SQLAlchemy engine. Every
+worker writes its own Parquet part file; the parts form a partitioned dataset
+that is then streamed into the single Parquet file the rest of DataPuur reads.
+
+Workers never touch the application database session. The coordinating
+thread polls the job's cancellation state and aggregates progress, and
+workers stop at their next chunk once the shared cancel event is set.
+"""
+
+import logging
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+from sqlalchemy import Integer, Numeric, Text, and_, cast, func, select
+
+from .config import PARQUET_ROW_GROUP_SIZE
+from .db_extract import (
+    detect_keyset_columns, extract_table_to_parquet, iter_keyset_chunks, iter_streaming_chunks,
+    normalize_chunk, reflect_table
+)
+from .parquet_writer import SchemaEvolvingParquetWriter, combine_parquet_files
+
+logger = logging.getLogger(__name__)
+
+PARTITION_RANGE = "range"
+PARTITION_HASH = "hash"
+
+# Upper bound on concurrent extraction workers per job
+MAX_PARALLELISM = 16
+
+# Seconds between progress/cancellation polls by the coordinating thread
+POLL_INTERVAL = 1.0
+
+
+class ExtractionCancelled(Exception):
+    """Raised inside a worker when the job has been cancelled"""
+
+
+def _is_numeric_column(column) -> bool:
+    try:
+        return column.type.python_type in (int, float) or isinstance(column.type, (Integer, Numeric))
+    except NotImplementedError:
+        return isinstance(column.type, (Integer, Numeric))
+
+
+def _hash_bucket_expression(engine, column, partitions: int):
+    """Dialect-specific expression mapping a column to a bucket in [0, partitions)"""
+    dialect = engine.dialect.name
+    if isinstance(column.type, Integer):
+        return func.abs(column % partitions)
+    if dialect == "postgresql":
+        return func.abs(func.mod(func.hashtext(cast(column, Text)), partitions))
+    if dialect == "mysql":
+        return func.mod(func.crc32(column), partitions)
+    if dialect == "mssql":
+        return func.abs(func.checksum(column) % partitions)
+    raise ValueError(f"Hash partitioning is not supported for {dialect} on non-integer columns")
+
+
+def plan_partitions(engine, table, key_columns: List[str], parallelism: int,
+                    strategy: Optional[str] = None) -> Tuple[str, List[Any]]:
+    """
+    Split a table into partitions that can be extracted independently.
+
+    Args:
+        engine: SQLAlchemy engine for the source database
+        table: Reflected source table
+        key_columns: Unique key columns from detect_keyset_columns
+        parallelism: Number of partitions to create
+        strategy: PARTITION_RANGE, PARTITION_HASH or None to pick automatically
+
+    Returns:
+        tuple: (strategy used, list of SQLAlchemy WHERE clauses, one per partition)
+    """
+    key_column = table.c[key_columns[0]]
+
+    if strategy in (None, PARTITION_RANGE) and _is_numeric_column(key_column):
+        with engine.connect() as conn:
+            low, high = conn.execute(select(func.min(key_column), func.max(key_column))).one()
+        if low is None:
+            return PARTITION_RANGE, []
+        if low == high:
+            return PARTITION_RANGE, [key_column >= low]
+
+        step = (high - low) / parallelism
+        boundaries = [low + step * i for i in range(1, parallelism)]
+        if isinstance(key_column.type, Integer):
+            boundaries = sorted(set(int(b) for b in boundaries if low < int(b) <= high))
+
+        clauses = []
+        lower = None
+        for boundary in boundaries:
+            clauses.append(key_column < boundary if lower is None else and_(key_column >= lower, key_column < boundary))
+            lower = boundary
+        clauses.append(key_column >= lower if lower is not None else key_column >= low)
+        return PARTITION_RANGE, clauses
+
+    if strategy == PARTITION_RANGE:
+        logger.warning(f"Range partitioning needs a numeric key, using hash partitions on {key_column.name}")
+
+    bucket = _hash_bucket_expression(engine, key_column, parallelism)
+    return PARTITION_HASH, [bucket == i for i in range(parallelism)]
+
+
+def extract_table_parallel(engine,
+                           table_name: str,
+                           output_file: Union[str, Path],
+                           parallelism: int = 4,
+                           chunk_size: int = 10000,
+                           total_rows: int = 0,
+                           strategy: Optional[str] = None,
+                           row_group_size: int = PARQUET_ROW_GROUP_SIZE,
+                           progress_callback: Optional[Callable[[int, str], None]] = None,
+                           cancel_check: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+    """
+    Extract a database table with several concurrent workers.
+
+    Tables without a unique key cannot be partitioned safely and are extracted
+    with the single-connection engine instead.
+
+    Args:
+        engine: Pooled SQLAlchemy engine (pool_size should be >= parallelism)
+        table_name: Table to extract, optionally schema-qualified
+        output_file: Destination Parquet file
+        parallelism: Number of partitions and worker threads
+        chunk_size: Rows fetched per query within a partition
+        total_rows: Row count used for progress reporting, 0 if unknown
+        strategy: PARTITION_RANGE, PARTITION_HASH or None to pick automatically
+        row_group_size: Rows buffered per worker before a row group is written
+        progress_callback: Called from the calling thread with (progress_percent, details)
+        cancel_check: Called from the calling thread; returns True when the job is cancelled
+
+    Returns:
+        dict: rows written, partitioning strategy, partition count and whether the job was cancelled
+    """
+    parallelism = max(1, min(int(parallelism), MAX_PARALLELISM))
+    output_file = Path(output_file)
+
+    table = reflect_table(engine, table_name)
+    key_columns = detect_keyset_columns(engine, table_name)
+    if not key_columns or parallelism == 1:
+        logger.info(f"Extracting {table_name} serially (parallelism={parallelism}, key={key_columns})")
+        return extract_table_to_parquet(engine, table_name, output_file, chunk_size=chunk_size,
+                                        total_rows=total_rows, row_group_size=row_group_size,
+                                        progress_callback=progress_callback, cancel_check=cancel_check)
+
+    strategy, partitions = plan_partitions(engine, table, key_columns, parallelism, strategy)
+    if not partitions:
+        raise ValueError("No data was extracted from the database. The table might be empty.")
+    logger.info(f"Extracting {table_name} in {len(partitions)} {strategy} partitions on {key_columns}")
+
+    parts_dir = output_file.with_name(f".{output_file.name}.parts")
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    part_paths = [parts_dir / f"part-{i:05d}.parquet" for i in range(len(partitions))]
+
+    cancel_event = threading.Event()
+    lock = threading.Lock()
+    rows_per_partition = [0] * len(partitions)
+
+    def extract_partition(index: int) -> int:
+        chunks = iter_keyset_chunks(engine, table, key_columns, chunk_size, partition_clause=partitions[index])
+        writer = SchemaEvolvingParquetWriter(part_paths[index])
+        buffered = []
+        buffered_rows = 0
+        try:
+            for chunk in chunks:
+                if cancel_event.is_set():
+                    chunks.close()
+                    raise ExtractionCancelled()
+                buffered.append(normalize_chunk(chunk))
+                buffered_rows += len(chunk)
+                with lock:
+                    rows_per_partition[index] += len(chunk)
+                if buffered_rows >= row_group_size:
+                    writer.write_dataframe(pd.concat(buffered, ignore_index=True))
+                    buffered, buffered_rows = [], 0
+            if buffered:
+                writer.write_dataframe(pd.concat(buffered, ignore_index=True))
+            if writer.schema is None:
+                # Empty partition: leave no part file behind
+                return 0
+            writer.close()
+            return writer.rows_written
+        except BaseException:
+            writer.abort()
+            raise
+
+    cancelled = False
+    try:
+        with ThreadPoolExecutor(max_workers=len(partitions), thread_name_prefix="db-extract") as executor:
+            futures = [executor.submit(extract_partition, i) for i in range(len(partitions))]
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_EXCEPTION)
+                for future in done:
+                    if future.exception() is not None and not isinstance(future.exception(), ExtractionCancelled):
+                        cancel_event.set()
+                        raise future.exception()
+
+                if not cancelled and cancel_check is not None and cancel_check():
+                    logger.info(f"Parallel extraction of {table_name} cancelled, stopping workers")
+                    cancelled = True
+                    cancel_event.set()
+
+                if progress_callback is not None and not cancelled:
+                    with lock:
+                        processed_rows = sum(rows_per_partition)
+                    finished = len(futures) - len(pending)
+                    if total_rows > 0:
+                        progress = min(int((processed_rows / total_rows) * 100), 99)
+                    else:
+                        progress = min(int((finished / len(futures)) * 100), 99)
+                    progress_callback(progress, f"Extracting data ({len(partitions)} {strategy} partitions, "
+                                                f"{finished} finished, processed: {processed_rows} rows)")
+
+        if cancelled:
+            return {"rows": sum(rows_per_partition), "strategy": strategy,
+                    "partitions": len(partitions), "key_columns": key_columns, "cancelled": True}
+
+        written_parts = [path for path in part_paths if path.exists()]
+        if not written_parts:
+            raise ValueError("No data was extracted from the database. The table might be empty.")
+        rows = combine_parquet_files(written_parts, output_file)
+    finally:
+        cancel_event.set()
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+    return {"rows": rows, "strategy": strategy, "partitions": len(partitions),
+            "key_columns": key_columns, "cancelled": False}
@@ -0,0 +1,206 @@
+"""
+Bounded scheduler for DataPuur ingestion jobs.
+
+Ingestion work used to be handed to FastAPI BackgroundTasks, which runs it on
+the API process's threadpool with no concurrency limit. The scheduler instead
+keeps a priority queue of submitted jobs and dispatches them to a bounded
+process pool, enforcing a global limit (the pool size) and a per-user limit.
+Jobs waiting in the queue can report their position and be withdrawn before
+they start.
+
+The scheduler only holds in-memory state; IngestionJob rows remain the source
+of truth, and jobs left in the ``queued`` state by a crash are re-submitted on
+startup by the caller.
+"""
+
+import heapq
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Global number of ingestion jobs that may run at the same time
+MAX_CONCURRENT_JOBS = int(os.getenv("DATAPUUR_INGEST_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Number of jobs a single user may have running at the same time
+MAX_JOBS_PER_USER = int(os.getenv("DATAPUUR_INGEST_MAX_JOBS_PER_USER", "2"))
+
+# "process" runs jobs in a spawned process pool, "thread" in a thread pool
+EXECUTOR_KIND = os.getenv("DATAPUUR_INGEST_EXECUTOR", "process").lower()
+
+# Job priorities; lower values are dispatched first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+
+
+@dataclass(order=True)
+class QueuedJob:
+    """A job waiting for a free worker slot"""
+    priority: int
+    sequence: int
+    job_id: str = field(compare=False)
+    username: str = field(compare=False)
+    func: Callable = field(compare=False)
+    args: Tuple[Any, ...] = field(compare=False)
+    on_error: Optional[Callable[[str, BaseException], None]] = field(compare=False, default=None)
+
+
+class IngestionScheduler:
+    """Priority queue plus bounded worker pool with global and per-user limits"""
+
+    def __init__(self,
+                 max_workers: int = MAX_CONCURRENT_JOBS,
+                 max_jobs_per_user: int = MAX_JOBS_PER_USER,
+                 executor_kind: str = EXECUTOR_KIND):
+        self.max_workers = max(1, max_workers)
+        self.max_jobs_per_user = max(1, max_jobs_per_user)
+        self.executor_kind = executor_kind
+        self._executor: Optional[Executor] = None
+        self._queue: List[QueuedJob] = []
+        self._running: Dict[str, str] = {}  # job_id -> username
+        self._sequence = itertools.count()
+        self._lock = threading.RLock()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "thread":
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="ingestion-worker")
+            else:
+                # Spawn rather than fork: the API process runs threads and holds
+                # open database connections that must not be shared with children
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            logger.info(f"Started ingestion {self.executor_kind} pool with {self.max_workers} workers "
+                        f"(max {self.max_jobs_per_user} per user)")
+        return self._executor
+
+    def submit(self,
+               job_id: str,
+               username: str,
+               func: Callable,
+               *args,
+               priority: int = PRIORITY_NORMAL,
+               on_error: Optional[Callable[[str, BaseException], None]] = None) -> Optional[int]:
+        """
+        Queue a job for execution.
+
+        Args:
+            job_id: IngestionJob ID
+            username: User who owns the job, used for the per-user limit
+            func: Picklable top-level function to run in a worker
+            *args: Arguments for func
+            priority: Lower values run first; jobs of equal priority run in submission order
+            on_error: Called with (job_id, exception) if the worker crashes
+
+        Returns:
+            int or None: 1-based queue position, or None if the job started immediately
+        """
+        with self._lock:
+            heapq.heappush(self._queue, QueuedJob(priority, next(self._sequence), job_id,
+                                                  username or "Unknown", func, args, on_error))
+            self._dispatch()
+            return self.get_queue_position(job_id)
+
+    def _user_running_count(self, username: str) -> int:
+        return sum(1 for running_user in self._running.values() if running_user == username)
+
+    def _dispatch(self):
+        """Start queued jobs while there are free slots, skipping users at their limit"""
+        with self._lock:
+            deferred = []
+            while self._queue and len(self._running) < self.max_workers:
+                entry = heapq.heappop(self._queue)
+                if self._user_running_count(entry.username) >= self.max_jobs_per_user:
+                    deferred.append(entry)
+                    continue
+                self._start(entry)
+            for entry in deferred:
+                heapq.heappush(self._queue, entry)
+
+    def _start(self, entry: QueuedJob):
+        self._running[entry.job_id] = entry.username
+        try:
+            future = self._get_executor().submit(entry.func, *entry.args)
+        except BrokenProcessPool as e:
+            logger.error(f"Ingestion pool is broken, recreating it: {str(e)}")
+            self._executor = None
+            future = self._get_executor().submit(entry.func, *entry.args)
+        logger.info(f"Started ingestion job {entry.job_id} for {entry.username} "
+                    f"({len(self._running)}/{self.max_workers} slots in use)")
+        future.add_done_callback(lambda f, e=entry: self._on_done(e, f))
+
+    def _on_done(self, entry: QueuedJob, future):
+        with self._lock:
+            self._running.pop(entry.job_id, None)
+            if isinstance(future.exception(), BrokenProcessPool):
+                self._executor = None
+        exception = future.exception()
+        if exception is not None:
+            logger.error(f"Ingestion job {entry.job_id} crashed in its worker: {str(exception)}")
+            if entry.on_error is not None:
+                try:
+                    entry.on_error(entry.job_id, exception)
+                except Exception as e:
+                    logger.error(f"Error handling failure of job {entry.job_id}: {str(e)}")
+        self._dispatch()
+
+    def cancel(self, job_id: str) -> bool:
+        """Remove a job that has not started yet. Returns True if it was still queued."""
+        with self._lock:
+            for i, entry in enumerate(self._queue):
+                if entry.job_id == job_id:
+                    self._queue.pop(i)
+                    heapq.heapify(self._queue)
+                    return True
+        return False
+
+    def get_queue_position(self, job_id: str) -> Optional[int]:
+        """1-based position of a queued job in dispatch order, or None if it is not queued"""
+        with self._lock:
+            for position, entry in enumerate(sorted(self._queue), start=1):
+                if entry.job_id == job_id:
+                    return position
+        return None
+
+    def is_running(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._running
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the scheduler state for monitoring"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_jobs_per_user": self.max_jobs_per_user,
+                "running": len(self._running),
+                "queued": len(self._queue)
+            }
+
+    def shutdown(self, wait: bool = False):
+        with self._lock:
+            self._queue.clear()
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+
+_scheduler: Optional[IngestionScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_ingestion_scheduler() -> IngestionScheduler:
+    """Return the process-wide ingestion scheduler"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = IngestionScheduler()
+        return _scheduler
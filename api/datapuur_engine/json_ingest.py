@@ -0,0 +1,226 @@
+"""
+Streaming JSON to Parquet ingestion engine.
+
+Supports a top-level JSON array of records as well as NDJSON / JSON Lines
+(one value per line, or any sequence of concatenated JSON values). Records are
+parsed incrementally with ijson, flattened, converted to Arrow in fixed-size
+batches and appended to a single schema-evolving Parquet writer, so memory
+stays constant no matter how large the input is.
+"""
+
+import json
+import logging
+import os
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+import ijson
+import pandas as pd
+import pyarrow as pa
+
+from .parquet_writer import SchemaEvolvingParquetWriter
+
+logger = logging.getLogger(__name__)
+
+# Number of records converted to Arrow and written per row group
+DEFAULT_JSON_BATCH_SIZE = 10000
+
+# File extensions that are always treated as JSON Lines
+JSON_LINES_EXTENSIONS = ('.jsonl', '.ndjson')
+
+# Layouts returned by detect_json_layout
+JSON_LAYOUT_ARRAY = "array"
+JSON_LAYOUT_LINES = "lines"
+
+UTF8_BOM = b'\xef\xbb\xbf'
+
+
+def flatten_json_iterative(nested_json, prefix=''):
+    """
+    Flatten nested JSON objects iteratively to avoid recursion limits.
+
+    Args:
+        nested_json: The nested JSON object to flatten
+        prefix: Prefix for flattened keys
+
+    Returns:
+        dict: Flattened dictionary
+    """
+    if not isinstance(nested_json, dict):
+        return {prefix.rstrip('_'): nested_json}
+
+    flattened = {}
+    for key, value in nested_json.items():
+        new_key = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flattened.update(flatten_json_iterative(value, f"{new_key}_"))
+        elif isinstance(value, list):
+            if all(not isinstance(item, dict) for item in value):
+                flattened[new_key] = str(value)
+            else:
+                for i, item in enumerate(value):
+                    if isinstance(item, dict):
+                        flattened.update(flatten_json_iterative(item, f"{new_key}_{i}_"))
+                    else:
+                        flattened[f"{new_key}_{i}"] = item
+        else:
+            flattened[new_key] = value
+    return flattened
+
+
+def detect_json_layout(file_path: Union[str, Path]) -> str:
+    """
+    Detect whether a JSON file holds a top-level array or a stream of values.
+
+    Only the first non-whitespace byte is inspected, so this is O(1) for any file size.
+
+    Returns:
+        str: JSON_LAYOUT_ARRAY or JSON_LAYOUT_LINES
+    """
+    if str(file_path).lower().endswith(JSON_LINES_EXTENSIONS):
+        return JSON_LAYOUT_LINES
+
+    with open(file_path, 'rb') as f:
+        head = f.read(4096)
+        while head and not head.lstrip():
+            head = f.read(4096)
+    if head.startswith(UTF8_BOM):
+        head = head[len(UTF8_BOM):]
+    return JSON_LAYOUT_ARRAY if head.lstrip()[:1] == b'[' else JSON_LAYOUT_LINES
+
+
+def _open_json(file_path: Union[str, Path]):
+    f = open(file_path, 'rb')
+    if f.read(len(UTF8_BOM)) != UTF8_BOM:
+        f.seek(0)
+    return f
+
+
+def _iter_values(f, layout: str) -> Iterator[Any]:
+    if layout == JSON_LAYOUT_ARRAY:
+        return ijson.items(f, 'item', use_float=True)
+    # A single top-level object is just a stream of one value
+    return ijson.items(f, '', multiple_values=True, use_float=True)
+
+
+def iter_json_records(file_path: Union[str, Path], layout: Optional[str] = None) -> Iterator[Any]:
+    """
+    Iterate over the records of a JSON array or JSON Lines file without loading it.
+
+    Args:
+        file_path: Source JSON file
+        layout: Optional layout from detect_json_layout
+
+    Yields:
+        The raw (unflattened) JSON values
+    """
+    layout = layout or detect_json_layout(file_path)
+    with _open_json(file_path) as f:
+        yield from _iter_values(f, layout)
+
+
+def sample_json_records(file_path: Union[str, Path], limit: int = 1000) -> List[Any]:
+    """Return up to ``limit`` records from the start of a JSON or JSON Lines file"""
+    return list(islice(iter_json_records(file_path), limit))
+
+
+def records_to_table(records: List[Dict[str, Any]]) -> pa.Table:
+    """
+    Convert a batch of flattened records to an Arrow table.
+
+    Object columns where more than 80% of the non-null values are numeric are
+    converted to numbers; remaining mixed-type columns are stored as strings so
+    that every batch can be represented in Parquet.
+    """
+    batch_df = pd.DataFrame(records)
+
+    for col in batch_df.columns:
+        if batch_df[col].dtype != object:
+            continue
+        non_null_values = batch_df[col].dropna()
+        if len(non_null_values) == 0:
+            continue
+        value_types = set(non_null_values.map(type))
+        if value_types == {bool}:
+            continue
+        try:
+            numeric_values = pd.to_numeric(non_null_values, errors='coerce')
+            if numeric_values.notna().sum() / len(non_null_values) > 0.8:
+                batch_df[col] = pd.to_numeric(batch_df[col], errors='coerce')
+                continue
+        except (TypeError, ValueError):
+            pass
+        if value_types != {str}:
+            batch_df[col] = batch_df[col].map(lambda value: value if value is None or pd.isna(value) else str(value))
+
+    return pa.Table.from_pandas(batch_df, preserve_index=False)
+
+
+def ingest_json_to_parquet(file_path: Union[str, Path],
+                           output_file: Union[str, Path],
+                           batch_size: int = DEFAULT_JSON_BATCH_SIZE,
+                           progress_callback: Optional[Callable[[int, str], None]] = None,
+                           cancel_check: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+    """
+    Convert a JSON array or JSON Lines file to Parquet in a single streaming pass.
+
+    Args:
+        file_path: Source JSON file
+        output_file: Destination Parquet file
+        batch_size: Number of records written per row group
+        progress_callback: Called with (progress_percent, details) after each row group
+        cancel_check: Returns True when the job has been cancelled
+
+    Returns:
+        dict: rows, row_groups and columns written, the detected layout, and
+        whether the job was cancelled
+    """
+    file_size = os.path.getsize(file_path)
+    layout = detect_json_layout(file_path)
+    writer = SchemaEvolvingParquetWriter(output_file)
+
+    def result(cancelled: bool) -> Dict[str, Any]:
+        return {
+            "rows": writer.rows_written,
+            "row_groups": writer.row_groups_written,
+            "columns": len(writer.schema) if writer.schema is not None else 0,
+            "layout": layout,
+            "cancelled": cancelled
+        }
+
+    def write_batch(batch: List[Dict[str, Any]], bytes_read: int):
+        writer.write_table(records_to_table(batch))
+        if progress_callback is not None and file_size:
+            progress = min(int((bytes_read / file_size) * 100), 99)
+            progress_callback(progress, f"Processed {writer.rows_written} items ({progress}%)")
+
+    logger.info(f"Streaming JSON {file_path} ({layout} layout, {file_size / (1024 * 1024):.2f} MB)")
+    try:
+        with _open_json(file_path) as f:
+            batch = []
+            for item in _iter_values(f, layout):
+                batch.append(flatten_json_iterative(item) if isinstance(item, dict) else {"value": item})
+                if len(batch) >= batch_size:
+                    if cancel_check is not None and cancel_check():
+                        logger.info(f"JSON ingestion of {file_path} cancelled after {writer.rows_written} items")
+                        writer.abort()
+                        return result(True)
+                    write_batch(batch, f.tell())
+                    batch = []
+
+            if batch:
+                write_batch(batch, file_size)
+
+        if writer.schema is None:
+            # Empty array: keep the previous behaviour of a single placeholder column
+            writer.write_table(pa.table({"data": pa.array([], type=pa.string())}))
+        writer.close()
+    except ijson.JSONError as e:
+        writer.abort()
+        raise json.JSONDecodeError(f"Invalid JSON: {str(e)}", "", 0)
+    except Exception:
+        writer.abort()
+        raise
+
+    return result(False)
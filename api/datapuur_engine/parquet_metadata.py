@@ -0,0 +1,106 @@
+"""
+Dataset statistics read from Parquet footer metadata.
+
+Row counts, column counts, null counts and sizes are all recorded in the
+Parquet footer (per row group and per column chunk), so they can be reported
+without reading any data pages. Results are cached per file version - path,
+modification time and size - so repeated dashboard requests cost one stat()
+call.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Tuple, Union
+
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# Number of file versions whose statistics are kept in memory
+METADATA_CACHE_SIZE = 256
+
+_cache: "OrderedDict[Tuple[str, int, int], Dict[str, Any]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def parquet_fingerprint(path: Union[str, Path]) -> Tuple[str, int, int]:
+    """Identify a file version by (absolute path, mtime in ns, size in bytes)"""
+    stat = os.stat(path)
+    return str(Path(path).resolve()), stat.st_mtime_ns, stat.st_size
+
+
+def _column_null_count(parquet_file: pq.ParquetFile, column_index: int) -> int:
+    """
+    Null count for one leaf column from the footer statistics.
+
+    Writers that did not record statistics force a read of that single column.
+    """
+    metadata = parquet_file.metadata
+    null_count = 0
+    for rg in range(metadata.num_row_groups):
+        stats = metadata.row_group(rg).column(column_index).statistics
+        if stats is None or not stats.has_null_count:
+            column_name = metadata.schema.column(column_index).path
+            logger.debug(f"No null_count statistics for {column_name}, reading the column")
+            table = parquet_file.read(columns=[column_name.split('.')[0]])
+            return int(table.column(0).null_count)
+        null_count += stats.null_count
+    return null_count
+
+
+def read_parquet_statistics(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Compute row, column, null and size figures for a Parquet file from its footer.
+
+    Args:
+        path: Parquet file
+
+    Returns:
+        dict: row_count, column_count, null_count, null_percentage, row_groups,
+        uncompressed_bytes (sum of column chunk sizes, an estimate of the
+        in-memory size) and compressed_bytes
+    """
+    key = parquet_fingerprint(path)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return dict(cached)
+
+    parquet_file = pq.ParquetFile(path)
+    metadata = parquet_file.metadata
+
+    uncompressed_bytes = 0
+    compressed_bytes = 0
+    for rg in range(metadata.num_row_groups):
+        row_group = metadata.row_group(rg)
+        for col in range(row_group.num_columns):
+            column = row_group.column(col)
+            uncompressed_bytes += column.total_uncompressed_size
+            compressed_bytes += column.total_compressed_size
+
+    row_count = metadata.num_rows
+    # Leaf columns of nested fields are counted under their top-level field
+    column_count = len(parquet_file.schema_arrow)
+    null_count = sum(_column_null_count(parquet_file, i) for i in range(metadata.num_columns))
+    leaf_cells = row_count * metadata.num_columns
+
+    statistics = {
+        "row_count": row_count,
+        "column_count": column_count,
+        "null_count": null_count,
+        "null_percentage": (null_count / leaf_cells) * 100 if leaf_cells > 0 else 0,
+        "row_groups": metadata.num_row_groups,
+        "uncompressed_bytes": uncompressed_bytes,
+        "compressed_bytes": compressed_bytes
+    }
+
+    with _cache_lock:
+        _cache[key] = statistics
+        _cache.move_to_end(key)
+        while len(_cache) > METADATA_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return dict(statistics)
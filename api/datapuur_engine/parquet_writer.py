@@ -0,0 +1,251 @@
+"""
+Streaming Parquet writers used by the DataPuur ingestion engines.
+
+Chunks are appended to a single open ``pyarrow.parquet.ParquetWriter`` as
+row groups, so the output file is never re-read or rewritten while an
+ingestion job is running.
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+
+def widen_type(current: pa.DataType, incoming: pa.DataType) -> pa.DataType:
+    """Return a type that can hold values of both input types"""
+    if current.equals(incoming):
+        return current
+    if pa.types.is_null(current):
+        return incoming
+    if pa.types.is_null(incoming):
+        return current
+    if (pa.types.is_integer(current) or pa.types.is_floating(current)) and \
+            (pa.types.is_integer(incoming) or pa.types.is_floating(incoming)):
+        return pa.float64()
+    return pa.string()
+
+
+def merge_schemas(current: pa.Schema, incoming: pa.Schema) -> pa.Schema:
+    """Merge two schemas, widening shared columns and appending new ones"""
+    fields = []
+    for field in current:
+        if field.name in incoming.names:
+            field = pa.field(field.name, widen_type(field.type, incoming.field(field.name).type))
+        fields.append(field)
+    for field in incoming:
+        if field.name not in current.names:
+            fields.append(pa.field(field.name, field.type))
+    return pa.schema(fields)
+
+
+def conform_table(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Align a table with a target schema (column order, missing columns and types)"""
+    if table.schema.equals(schema, check_metadata=False):
+        return table
+
+    for name in schema.names:
+        if name not in table.column_names:
+            table = table.append_column(name, pa.nulls(table.num_rows, type=schema.field(name).type))
+
+    extra = [name for name in table.column_names if name not in schema.names]
+    if extra:
+        logger.warning(f"Dropping columns not present in the Parquet schema: {extra}")
+
+    return table.select(schema.names).cast(schema)
+
+
+def combine_parquet_files(input_paths, output_path: Union[str, Path],
+                          schema: Optional[pa.Schema] = None,
+                          compression: str = "snappy") -> int:
+    """
+    Stream several Parquet files into one, row group by row group.
+
+    Args:
+        input_paths: Parquet files to combine, in output order
+        output_path: Destination Parquet file
+        schema: Schema of the combined file. When omitted, the schemas of the
+            inputs are merged with merge_schemas.
+        compression: Parquet compression codec
+
+    Returns:
+        int: Number of rows written
+    """
+    output_path = Path(output_path)
+    if schema is None:
+        for input_path in input_paths:
+            file_schema = pq.read_schema(str(input_path)).remove_metadata()
+            schema = file_schema if schema is None else merge_schemas(schema, file_schema)
+    if schema is None:
+        raise ValueError("No Parquet files to combine")
+
+    temp_path = output_path.with_name(f".{output_path.name}.partial")
+    rows_written = 0
+    writer = pq.ParquetWriter(str(temp_path), schema, compression=compression)
+    try:
+        for input_path in input_paths:
+            parquet_file = pq.ParquetFile(str(input_path))
+            for i in range(parquet_file.num_row_groups):
+                row_group = conform_table(parquet_file.read_row_group(i).replace_schema_metadata(None), schema)
+                writer.write_table(row_group)
+                rows_written += row_group.num_rows
+    except Exception:
+        writer.close()
+        temp_path.unlink()
+        raise
+    writer.close()
+    os.replace(temp_path, output_path)
+    return rows_written
+
+
+class StreamingParquetWriter:
+    """Append-only Parquet writer that emits one row group per written chunk"""
+
+    def __init__(self,
+                 output_path: Union[str, Path],
+                 compression: str = "snappy",
+                 schema: Optional[pa.Schema] = None):
+        """
+        Args:
+            output_path: Destination Parquet file
+            compression: Parquet compression codec
+            schema: Optional schema to lock the file to. When omitted the
+                schema of the first written chunk is used.
+        """
+        self.output_path = Path(output_path)
+        self.compression = compression
+        self.schema = schema
+        self.rows_written = 0
+        self.row_groups_written = 0
+        self._writer = None
+        # Write to a temporary path so that a failed or cancelled job never
+        # leaves a truncated Parquet file behind under the final name
+        self._temp_path = self.output_path.with_name(f".{self.output_path.name}.partial")
+
+    def _open(self, schema: pa.Schema):
+        self.schema = schema
+        self._writer = pq.ParquetWriter(str(self._temp_path), schema, compression=self.compression)
+
+    def write_table(self, table: pa.Table):
+        """Append an Arrow table to the output file as a new row group"""
+        if table.num_rows == 0 and self._writer is not None:
+            return
+        # Pandas index/metadata is per-chunk and would differ between row groups
+        table = table.replace_schema_metadata(None)
+        if self._writer is None:
+            self._open(self.schema or table.schema)
+        table = conform_table(table, self.schema)
+        self._writer.write_table(table)
+        self.rows_written += table.num_rows
+        self.row_groups_written += 1
+
+    def write_batch(self, batch: pa.RecordBatch):
+        """Append an Arrow record batch to the output file"""
+        self.write_table(pa.Table.from_batches([batch]))
+
+    def write_dataframe(self, df: pd.DataFrame):
+        """Append a pandas DataFrame to the output file"""
+        self.write_table(pa.Table.from_pandas(df, preserve_index=False))
+
+    def close(self):
+        """Finish the file and move it to its final location"""
+        if self._writer is None:
+            if self.schema is None:
+                raise ValueError("No data was written to the Parquet file")
+            self._open(self.schema)
+        self._writer.close()
+        self._writer = None
+        os.replace(self._temp_path, self.output_path)
+
+    def abort(self):
+        """Close the writer and discard the partially written file"""
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except Exception as e:
+                logger.warning(f"Error closing aborted Parquet writer: {str(e)}")
+            self._writer = None
+        if self._temp_path.exists():
+            self._temp_path.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class SchemaEvolvingParquetWriter(StreamingParquetWriter):
+    """
+    Streaming Parquet writer whose schema grows as new columns appear.
+
+    A Parquet file has a single schema, so when a chunk introduces new columns
+    (or needs a wider type for an existing one) the current segment is closed
+    and a new one is started with the merged schema. Schemas only ever grow,
+    so on close the segments are streamed row group by row group into the
+    final file using the last schema. Nothing is re-read while chunks are
+    arriving, and files whose schema never changes are simply renamed.
+    """
+
+    def __init__(self, output_path: Union[str, Path], compression: str = "snappy"):
+        super().__init__(output_path, compression=compression)
+        self.segment_paths = []
+
+    def _open(self, schema: pa.Schema):
+        self.schema = schema
+        segment_path = self.output_path.with_name(f".{self.output_path.name}.part{len(self.segment_paths)}")
+        self.segment_paths.append(segment_path)
+        self._writer = pq.ParquetWriter(str(segment_path), schema, compression=self.compression)
+
+    def write_table(self, table: pa.Table):
+        """Append a table, starting a new segment if its schema extends the current one"""
+        if table.num_rows == 0 and self._writer is not None:
+            return
+        table = table.replace_schema_metadata(None)
+        if self._writer is not None:
+            merged = merge_schemas(self.schema, table.schema)
+            if not merged.equals(self.schema):
+                logger.info(f"Parquet schema for {self.output_path.name} grew to {len(merged)} columns, "
+                            f"starting segment {len(self.segment_paths)}")
+                self._writer.close()
+                self._open(merged)
+        super().write_table(table)
+
+    def close(self):
+        """Finish the current segment and combine all segments into the output file"""
+        if self._writer is None:
+            if self.schema is None:
+                raise ValueError("No data was written to the Parquet file")
+            self._open(self.schema)
+        self._writer.close()
+        self._writer = None
+
+        if len(self.segment_paths) == 1:
+            os.replace(self.segment_paths[0], self.output_path)
+            self.segment_paths = []
+            return
+
+        combine_parquet_files(self.segment_paths, self.output_path, schema=self.schema,
+                              compression=self.compression)
+        self._remove_segments()
+
+    def abort(self):
+        """Close the writer and discard all segments"""
+        super().abort()
+        self._remove_segments()
+
+    def _remove_segments(self):
+        for segment_path in self.segment_paths:
+            if segment_path.exists():
+                segment_path.unlink()
+        self.segment_paths = []
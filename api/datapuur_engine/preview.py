@@ -0,0 +1,152 @@
+"""
+Row-group-aware previews of Parquet datasets.
+
+A preview only needs the first rows of a file, so instead of loading the
+whole dataset the file is memory-mapped and batches are read from the first
+row group(s) until enough rows are available, optionally projecting a subset
+of columns. Cells are made JSON-safe with vectorized Arrow kernels (NaN to
+null, temporal and decimal values to strings/floats) and converted to Python
+column by column. Rendered previews are cached per file version.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from .parquet_metadata import parquet_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Default number of rows in a preview
+DEFAULT_PREVIEW_ROWS = 100
+
+# Number of rendered previews kept in memory
+PREVIEW_CACHE_SIZE = 128
+
+# Preview orientations
+ORIENT_ROWS = "rows"        # {"headers": [...], "data": [[...], ...]}
+ORIENT_RECORDS = "records"  # {"headers": [...], "data": [{...}, ...]}
+
+_cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def pandas_index_columns(schema: pa.Schema) -> List[str]:
+    """Columns pandas wrote for a DataFrame index; pd.read_parquet hides them, so previews do too"""
+    metadata = schema.pandas_metadata or {}
+    return [name for name in metadata.get("index_columns", []) if isinstance(name, str)]
+
+
+def _json_safe_column(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Convert an Arrow column to types whose Python values serialize to JSON"""
+    column_type = column.type
+    if pa.types.is_dictionary(column_type):
+        column = column.cast(column_type.value_type)
+        column_type = column.type
+    if pa.types.is_floating(column_type):
+        # NaN is not valid JSON; pandas previews reported it as null
+        return pc.if_else(pc.is_nan(column), pa.scalar(None, type=column_type), column)
+    if pa.types.is_decimal(column_type):
+        return column.cast(pa.float64())
+    if pa.types.is_temporal(column_type):
+        return column.cast(pa.string())
+    if pa.types.is_binary(column_type) or pa.types.is_large_binary(column_type):
+        try:
+            return column.cast(pa.string())
+        except pa.ArrowInvalid:
+            # Not UTF-8: fall back to a readable representation per value
+            return pa.chunked_array([pa.array([repr(v) if v is not None else None for v in column.to_pylist()],
+                                               type=pa.string())])
+    return column
+
+
+def table_to_json_rows(table: pa.Table, orient: str = ORIENT_ROWS) -> List[Any]:
+    """
+    Convert an Arrow table to JSON-ready rows.
+
+    Args:
+        table: Table to convert
+        orient: ORIENT_ROWS for a list of lists, ORIENT_RECORDS for a list of dicts
+
+    Returns:
+        list: One entry per row
+    """
+    headers = table.column_names
+    values = [_json_safe_column(table.column(i)).to_pylist() for i in range(table.num_columns)]
+    if not values:
+        return []
+    if orient == ORIENT_RECORDS:
+        return [dict(zip(headers, row)) for row in zip(*values)]
+    return [list(row) for row in zip(*values)]
+
+
+def _read_head(path: Union[str, Path], rows: int, columns: Optional[Sequence[str]]) -> Tuple[pa.Table, int]:
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    schema = parquet_file.schema_arrow
+    hidden = set(pandas_index_columns(schema))
+    selected = [name for name in (columns or schema.names) if name in schema.names and name not in hidden]
+
+    batches = []
+    collected = 0
+    if rows > 0 and parquet_file.metadata.num_rows > 0:
+        # Batches are decoded row group by row group, so only the leading row groups are read
+        for batch in parquet_file.iter_batches(batch_size=rows, columns=selected):
+            batches.append(batch)
+            collected += batch.num_rows
+            if collected >= rows:
+                break
+
+    if batches:
+        table = pa.Table.from_batches(batches).slice(0, rows)
+    else:
+        table = schema.empty_table().select(selected)
+    return table, parquet_file.metadata.num_rows
+
+
+def read_parquet_preview(path: Union[str, Path],
+                         rows: int = DEFAULT_PREVIEW_ROWS,
+                         columns: Optional[Sequence[str]] = None,
+                         orient: str = ORIENT_ROWS) -> Dict[str, Any]:
+    """
+    Render the first rows of a Parquet file as JSON-ready Python structures.
+
+    The returned dict is shared with the cache and must not be modified.
+
+    Args:
+        path: Parquet file
+        rows: Maximum number of rows to return
+        columns: Optional subset of columns to read
+        orient: ORIENT_ROWS for a list of lists, ORIENT_RECORDS for a list of dicts
+
+    Returns:
+        dict: headers, data, preview_rows and total_rows (from the file footer)
+    """
+    key = (parquet_fingerprint(path), rows, tuple(columns) if columns else None, orient)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+
+    table, total_rows = _read_head(path, rows, columns)
+    data = table_to_json_rows(table, orient)
+
+    preview = {
+        "headers": table.column_names,
+        "data": data,
+        "preview_rows": len(data),
+        "total_rows": total_rows
+    }
+
+    with _cache_lock:
+        _cache[key] = preview
+        _cache.move_to_end(key)
+        while len(_cache) > PREVIEW_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return preview
@@ -0,0 +1,182 @@
+"""
+Throttled progress persistence and cancellation signalling for ingestion jobs.
+
+Ingestion engines report progress after every chunk, which used to mean one
+commit on the IngestionJob row per chunk plus a refresh of the row for every
+cancellation check. On SQLite every one of those commits takes the database
+write lock. JobProgressReporter keeps the latest progress in memory and only
+writes it when it has moved by a few percent or a heartbeat interval has
+passed, and it answers cancellation checks from an in-memory event, the
+cancel marker file and - at a much lower rate - the job row.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Minimum progress change (percent) that is written immediately
+PROGRESS_MIN_DELTA = 5
+
+# Never write progress more often than this (seconds)
+PROGRESS_MIN_INTERVAL = 1.0
+
+# Write progress at least this often while it is changing (seconds)
+PROGRESS_HEARTBEAT_INTERVAL = 15.0
+
+# Seconds between checks of the cancel marker file
+CANCEL_MARKER_POLL_INTERVAL = 0.5
+
+# Seconds between re-reads of the job row for cancellation
+CANCEL_DB_POLL_INTERVAL = 5.0
+
+# Reporters of jobs running in this process, so cancellation can be signalled in memory
+_active_reporters: Dict[str, "JobProgressReporter"] = {}
+_active_reporters_lock = threading.Lock()
+
+
+def signal_job_cancelled(job_id: str) -> bool:
+    """
+    Set the in-memory cancel signal of a job running in this process.
+
+    Jobs running in another worker process pick the cancellation up from the
+    marker file or the job row instead.
+
+    Returns:
+        bool: True if the job was running in this process
+    """
+    with _active_reporters_lock:
+        reporter = _active_reporters.get(job_id)
+    if reporter is None:
+        return False
+    reporter.cancel_event.set()
+    return True
+
+
+class JobProgressReporter:
+    """Coalesces progress writes for one IngestionJob and caches its cancellation state"""
+
+    def __init__(self, db_session, job, cancel_marker_dir: Optional[Path] = None,
+                 min_delta: int = PROGRESS_MIN_DELTA,
+                 min_interval: float = PROGRESS_MIN_INTERVAL,
+                 heartbeat_interval: float = PROGRESS_HEARTBEAT_INTERVAL):
+        self.db_session = db_session
+        self.job = job
+        self.job_id = job.id
+        self.cancel_marker_path = Path(cancel_marker_dir) / f"cancel_{job.id}" if cancel_marker_dir else None
+        self.min_delta = min_delta
+        self.min_interval = min_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.cancel_event = threading.Event()
+        self.writes = 0
+
+        self._lock = threading.Lock()
+        self._progress = job.progress or 0
+        self._details = None
+        self._written_progress = self._progress
+        self._last_write = time.monotonic()
+        self._last_marker_check = 0.0
+        self._last_db_check = time.monotonic()
+        self._dirty = False
+
+        with _active_reporters_lock:
+            _active_reporters[self.job_id] = self
+
+    def update(self, progress: int, details: Optional[str] = None, force: bool = False):
+        """
+        Record progress and write it to the job row if the cadence allows.
+
+        Args:
+            progress: Progress percentage
+            details: Optional status text
+            force: Write immediately regardless of cadence
+        """
+        with self._lock:
+            self._progress = progress
+            if details is not None:
+                self._details = details
+            self._dirty = True
+
+            now = time.monotonic()
+            elapsed = now - self._last_write
+            due = (abs(progress - self._written_progress) >= self.min_delta and elapsed >= self.min_interval) \
+                or elapsed >= self.heartbeat_interval
+            if force or due:
+                self._write(now)
+
+    def flush(self):
+        """Write any pending progress"""
+        with self._lock:
+            if self._dirty:
+                self._write(time.monotonic())
+
+    def _write(self, now: float):
+        self.job.progress = self._progress
+        if self._details is not None:
+            self.job.details = self._details
+        self.db_session.commit()
+        self._written_progress = self._progress
+        self._last_write = now
+        self._dirty = False
+        self.writes += 1
+
+    def is_cancelled(self, force: bool = False) -> bool:
+        """
+        Return True once the job has been cancelled.
+
+        The in-memory event is checked on every call, the marker file every
+        CANCEL_MARKER_POLL_INTERVAL seconds and the job row every
+        CANCEL_DB_POLL_INTERVAL seconds. On first detection the job is
+        marked cancelled in the database.
+
+        Args:
+            force: Check the marker file and the job row now, e.g. before completing the job
+        """
+        if self.cancel_event.is_set():
+            return True
+
+        now = time.monotonic()
+        cancelled_by = None
+        if self.cancel_marker_path is not None and \
+                (force or now - self._last_marker_check >= CANCEL_MARKER_POLL_INTERVAL):
+            self._last_marker_check = now
+            if self.cancel_marker_path.exists():
+                cancelled_by = "marker"
+        if cancelled_by is None and (force or now - self._last_db_check >= CANCEL_DB_POLL_INTERVAL):
+            self._last_db_check = now
+            with self._lock:
+                # Only the status column is re-read; pending progress stays in memory
+                self.db_session.refresh(self.job, ["status"])
+            if self.job.status == "cancelled":
+                cancelled_by = "database"
+
+        if cancelled_by is None:
+            return False
+
+        logger.info(f"Job {self.job_id} has been cancelled ({cancelled_by}), stopping processing")
+        self.cancel_event.set()
+        with self._lock:
+            if self.job.status != "cancelled":
+                self.job.status = "cancelled"
+                self.job.end_time = datetime.now()
+                self.job.details = f"{self._details or self.job.details} (Cancelled by user)"
+                self._details = None
+                self.db_session.commit()
+                self.writes += 1
+            self._dirty = False
+        return True
+
+    def close(self):
+        """
+        Stop receiving in-memory cancel signals.
+
+        Unwritten progress is dropped: by the time a job finishes, its final
+        state has been written with update(..., force=True) or as a failure.
+        """
+        with _active_reporters_lock:
+            if _active_reporters.get(self.job_id) is self:
+                del _active_reporters[self.job_id]
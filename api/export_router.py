@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
 import pandas as pd
+import asyncio
 import io
 import json
 import logging
@@ -11,6 +12,8 @@ from sqlalchemy.orm import Session
 from api.db_config import get_db
 from api.models import UploadedFile, User
 from api.auth import get_current_user, has_permission, has_any_permission
+from api.datapuur_engine.dataset_query import query_parquet_page, DatasetQueryError
+from api.datapuur_engine.export_stream import stream_parquet_export, EXPORT_MEDIA_TYPES
 
 router = APIRouter(prefix="/api/export", tags=["Export"])
 logger = logging.getLogger(__name__)
@@ -80,10 +83,44 @@ def load_dataset_as_dataframe(file_path: str, file_type: str) -> pd.DataFrame:
         logger.error(f"Error loading dataset file: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to load dataset: {str(e)}")
 
+# Helper function to stream a parquet dataset in an export format
+def stream_parquet_download(data_path: str, file_format: str, filename: str,
+                            column: Optional[str] = None, operator: str = "eq",
+                            value: Optional[str] = None, max_rows: Optional[int] = None) -> StreamingResponse:
+    """
+    Build a streaming download of a parquet dataset.
+    
+    Rows are read in record batches (filtered in the scan when a filter is
+    given) and encoded as they are sent, so the dataset is never held in memory.
+    
+    Args:
+        data_path: Path to the parquet file
+        file_format: csv, json or ndjson
+        filename: File name for the Content-Disposition header
+        column: Optional column to filter on
+        operator: Filter operator
+        value: Filter value
+        max_rows: Optional maximum number of rows
+        
+    Returns:
+        StreamingResponse: The download response
+        
+    Raises:
+        HTTPException: If the filter cannot be applied
+    """
+    try:
+        chunks = stream_parquet_export(data_path, file_format, column, operator, value, max_rows)
+    except DatasetQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    response = StreamingResponse(chunks, media_type=EXPORT_MEDIA_TYPES[file_format])
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return response
+
 @router.get("/download")
 async def download_dataset(
     dataset_id: str,
-    file_format: str = Query("csv", regex="^(csv|json)$"),
+    file_format: str = Query("csv", regex="^(csv|json|ndjson)$"),
     column: Optional[str] = None,
     operator: Optional[str] = None,
     value: Optional[str] = None,
@@ -108,6 +145,14 @@ async def download_dataset(
         if not os.path.exists(data_path):
             raise HTTPException(status_code=404, detail="Dataset file not found")
         
+        # Parquet datasets are streamed batch by batch instead of being built in memory
+        if data_path.lower().endswith('.parquet'):
+            file_format = file_format.lower()
+            filename = f"{dataset.dataset or dataset.filename.split('.')[0]}_export.{file_format}"
+            filter_column = column if column and operator and value is not None else None
+            return stream_parquet_download(data_path, file_format, filename, filter_column,
+                                           operator or "eq", value, max_rows)
+        
         # Load the data using our helper function
         df = load_dataset_as_dataframe(data_path, dataset.type)
         
@@ -228,6 +273,10 @@ async def download_dataset(
             content = json_str
             media_type = "application/json"
             filename = f"{dataset.dataset or dataset.filename.split('.')[0]}_export.json"
+        elif file_format.lower() == 'ndjson':
+            content = df.to_json(orient='records', date_format='iso', lines=True)
+            media_type = "application/x-ndjson"
+            filename = f"{dataset.dataset or dataset.filename.split('.')[0]}_export.ndjson"
         else:
             raise HTTPException(status_code=400, detail=f"Unsupported export format: {file_format}")
         
@@ -410,6 +459,31 @@ async def filter_dataset(
         # Check if file exists
         if not os.path.exists(data_path):
             raise HTTPException(status_code=404, detail="Dataset file not found")
+        
+        # Parquet datasets are filtered in place: row groups are pruned from their
+        # statistics and only the row groups holding the requested page are read
+        if data_path.lower().endswith('.parquet'):
+            try:
+                result = await asyncio.to_thread(
+                    query_parquet_page, data_path, column, operator, value, page, page_size
+                )
+            except DatasetQueryError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            
+            total_rows = result["total_rows"]
+            return {
+                "columns": result["columns"],
+                "data": result["data"],
+                "page": page,
+                "page_size": page_size,
+                "total_rows": total_rows,
+                "total_pages": (total_rows + page_size - 1) // page_size,
+                "filter": {
+                    "column": column,
+                    "operator": operator,
+                    "value": value
+                }
+            }
             
         # Load the data using our helper function
         df = load_dataset_as_dataframe(data_path, dataset.type)
@@ -561,7 +635,7 @@ async def filter_dataset(
 @router.get("/datasets/{dataset_id}/download")
 async def download_dataset(
     dataset_id: str,
-    format: str = Query("csv", regex="^(csv|json)$"),
+    format: str = Query("csv", regex="^(csv|json|ndjson)$"),
     column: Optional[str] = None,
     operator: str = Query("eq", regex="^(eq|neq|gt|lt|gte|lte|contains)$"),
     value: Optional[str] = None,
@@ -570,7 +644,7 @@ async def download_dataset(
     current_user: User = Depends(has_permission("datapuur:read"))
 ):
     """
-    Download a dataset as CSV or JSON. Optionally apply filters and row limits.
+    Download a dataset as CSV, JSON or NDJSON. Optionally apply filters and row limits.
     """
     try:
         dataset = db.query(UploadedFile).filter(UploadedFile.id == dataset_id).first()
@@ -583,6 +657,15 @@ async def download_dataset(
         # Check if file exists
         if not os.path.exists(data_path):
             raise HTTPException(status_code=404, detail="Dataset file not found")
+        
+        # Use the dataset name (with fallback to filename without extension) for the export file
+        filename_base = dataset.dataset if dataset.dataset else os.path.splitext(dataset.filename)[0]
+        
+        # Parquet datasets are streamed batch by batch instead of being built in memory
+        if data_path.lower().endswith('.parquet'):
+            file_format = format.lower()
+            return stream_parquet_download(data_path, file_format, f"{filename_base}_export.{file_format}",
+                                           column if column and value else None, operator, value, max_rows)
             
         # Load the data using our helper function
         df = load_dataset_as_dataframe(data_path, dataset.type)
@@ -668,9 +751,6 @@ async def download_dataset(
         if max_rows is not None and max_rows > 0:
             df = df.head(max_rows)
         
-        # Use the dataset name (with fallback to filename without extension) for the export file
-        filename_base = dataset.dataset if dataset.dataset else os.path.splitext(dataset.filename)[0]
-        
         # Convert to the requested format
         if format.lower() == 'csv':
             output = io.StringIO()
@@ -696,6 +776,12 @@ async def download_dataset(
             
             # Set the content disposition header for download
             response.headers["Content-Disposition"] = f"attachment; filename={filename_base}_export.json"
+        elif format.lower() == 'ndjson':
+            response = StreamingResponse(
+                iter([df.to_json(orient='records', date_format='iso', lines=True)]),
+                media_type="application/x-ndjson"
+            )
+            response.headers["Content-Disposition"] = f"attachment; filename={filename_base}_export.ndjson"
         else:
             raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
         
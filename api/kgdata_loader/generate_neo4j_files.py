@@ -1,5 +1,6 @@
 import json
 import csv
+import hashlib
 import pandas as pd
 import os
 import argparse
@@ -8,6 +9,11 @@ from pathlib import Path
 import string
 import re
 import ast
+from functools import partial
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 # Import optimized JSON processing functions
 try:
@@ -32,6 +38,7 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 
 # Performance optimization settings
 BATCH_SIZE = 5000  # Process data in batches of this size
+READ_BATCH_SIZE = 100000  # Rows read from the source data per batch when extracting nodes and relationships
 
 # Cache settings
 MAX_CACHE_SIZE = 10000  # Maximum number of items to keep in caches
@@ -286,6 +293,11 @@ def parse_json_data(value):
     # Directly use the optimized version
     return parse_json_data_optimized(value)
 
+def row_hash(values):
+    """Hash of the non-null values of a row, the same in every process (unlike hash())."""
+    key = "\x1f".join(str(v) for v in values if not pd.isna(v))
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'big')
+
 def generate_node_id(node_schema, row):
     """Generates a unique ID for a node based on schema rules or primary property."""
     # Check if the node schema defines a specific ID generation rule
@@ -346,8 +358,7 @@ def generate_node_id(node_schema, row):
             return f"{node_schema.get('label')}-{row[col]}"
     
     # If we still don't have an ID, use a hash of the row values
-    row_hash = hash(tuple(str(v) for v in row.values if not pd.isna(v)))
-    return f"{node_schema.get('label')}-{abs(row_hash)}"
+    return f"{node_schema.get('label')}-{row_hash(row.values)}"
 
 
 # Set the reference to this function in the optimized module
@@ -363,48 +374,593 @@ try:
 except Exception as e:
     logging.warning(f"Could not set function references in optimized module: {e}")
 
-# --- Main Processing Function ---
+# --- Batched Extraction ---
+# Nodes and relationships are extracted column-wise from batches of rows. Each
+# step reproduces what the row-wise loops over original_df.iterrows() produced,
+# so the generated files do not change.
 
-def create_neo4j_import_files(schema_path, data_path, output_dir):
-    """
-    Generates nodes.csv and relationships.csv files for Neo4j import.
+class RowBatch:
+    """Consecutive rows of the source data, converted to pandas column by column on demand."""
 
-    Args:
-        schema_path (str): Path to the JSON schema file.
-        data_path (str): Path to the input CSV data file.
-        output_dir (str): Directory to save the output CSV files.
+    def __init__(self, offset, length, row_dtype, load_column):
+        self.offset = offset
+        self.length = length
+        self._row_dtype = row_dtype
+        self._load_column = load_column
+        self._values = {}
+
+    def values(self, column):
+        """Values of a column as iterrows() presents them in each row.
+
+        iterrows() casts every column to the dtype shared by the whole row, so
+        integers read as floats when all columns are numeric.
+        """
+        if column not in self._values:
+            series = self._load_column(column)
+            if self._row_dtype != object:
+                series = series.astype(self._row_dtype)
+            self._values[column] = series.to_numpy(dtype=object)
+        return self._values[column]
+
+
+class FrameSource:
+    """Source data already loaded into a DataFrame (CSV and JSON files)."""
+
+    def __init__(self, df):
+        self.df = df.reset_index(drop=True)
+        self.columns = list(self.df.columns)
+        self.num_rows = len(self.df)
+        self.row_dtype = self.df.iloc[:0].to_numpy().dtype
+
+    def batches(self):
+        for offset in range(0, self.num_rows, READ_BATCH_SIZE):
+            frame = self.df.iloc[offset:offset + READ_BATCH_SIZE]
+            yield RowBatch(offset, len(frame), self.row_dtype, frame.__getitem__)
+
+    def column_frame(self, column):
+        """DataFrame holding the whole column, for detect_type_mismatch."""
+        return self.df
+
+    def first_values(self, column, count):
+        """First count non-null values of a column."""
+        return self.df[column].dropna().head(count).tolist()
+
+    def frame(self):
+        return self.df
+
+
+class ParquetSource:
+    """Parquet source data, streamed in record batches instead of being loaded whole."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet_file = pq.ParquetFile(path, memory_map=True)
+        schema = self.parquet_file.schema_arrow
+        # Columns pd.read_parquet would turn into the index
+        index_columns = [c for c in (schema.pandas_metadata or {}).get('index_columns', []) if isinstance(c, str)]
+        self.columns = [name for name in schema.names if name not in index_columns]
+        self.num_rows = self.parquet_file.metadata.num_rows
+
+        # Column dtypes as pd.read_parquet gives them, which restores nullable
+        # types such as Int64 from the pandas metadata. Converting a single column
+        # ignores the metadata, so batches are cast to those dtypes. Plain numpy
+        # integer and boolean columns with nulls read as float and object, and
+        # every batch has to do the same, whether or not its own rows hold a null.
+        empty = schema.empty_table().to_pandas()
+        self._dtypes = {}
+        for name in self.columns:
+            dtype = empty[name].dtype
+            if isinstance(dtype, np.dtype):
+                if dtype.kind in 'iu' and self._has_nulls(name):
+                    self._dtypes[name] = 'float64'
+                elif dtype.kind == 'b' and self._has_nulls(name):
+                    self._dtypes[name] = object
+            elif isinstance(dtype, pd.StringDtype) or pd.api.types.is_bool_dtype(dtype) or (
+                    pd.api.types.is_numeric_dtype(dtype) and not isinstance(dtype, pd.CategoricalDtype)):
+                self._dtypes[name] = dtype
+        self.row_dtype = empty[self.columns].astype(self._dtypes).to_numpy().dtype
+
+    def _has_nulls(self, column):
+        metadata = self.parquet_file.metadata
+        leaves = [i for i in range(metadata.num_columns) if metadata.schema.column(i).path == column]
+        if len(leaves) == 1:
+            null_count = 0
+            for row_group in range(metadata.num_row_groups):
+                statistics = metadata.row_group(row_group).column(leaves[0]).statistics
+                if statistics is None or not statistics.has_null_count:
+                    break
+                null_count += statistics.null_count
+            else:
+                return null_count > 0
+        return self.parquet_file.read(columns=[column]).column(column).null_count > 0
+
+    def _load(self, record_batch, column):
+        series = record_batch.column(record_batch.schema.get_field_index(column)).to_pandas()
+        return series.astype(self._dtypes[column]) if column in self._dtypes else series
+
+    def batches(self):
+        offset = 0
+        for record_batch in self.parquet_file.iter_batches(batch_size=READ_BATCH_SIZE, columns=self.columns):
+            yield RowBatch(offset, record_batch.num_rows, self.row_dtype, partial(self._load, record_batch))
+            offset += record_batch.num_rows
+
+    def column_frame(self, column):
+        """DataFrame holding the whole column, for detect_type_mismatch."""
+        return self.parquet_file.read(columns=[column]).to_pandas()
+
+    def first_values(self, column, count):
+        """First count non-null values of a column, reading only as many batches as needed."""
+        values = []
+        for record_batch in self.parquet_file.iter_batches(batch_size=READ_BATCH_SIZE, columns=[column]):
+            values.extend(self._load(record_batch, column).dropna().head(count - len(values)).tolist())
+            if len(values) >= count:
+                break
+        return values
+
+    def frame(self):
+        return pd.read_parquet(self.path).reset_index(drop=True)
+
+
+def object_array(items):
+    """Object array of items, without numpy unpacking list or dict items."""
+    array = np.empty(len(items), dtype=object)
+    for i, item in enumerate(items):
+        array[i] = item
+    return array
+
+
+def as_strings(values):
+    """str() of every value of an object array."""
+    return pd.Series(values, dtype=object).astype(str).to_numpy(dtype=object)
+
+
+def prefixed_ids(label, values):
+    """f"{label}-{value}" for every value of an object array."""
+    return (f"{label}-" + pd.Series(as_strings(values), dtype=object)).to_numpy(dtype=object)
+
+
+def node_exists(node_ids, nodes):
+    """Whether each ID is a key of nodes (None never is)."""
+    return np.fromiter((node_id in nodes for node_id in node_ids), dtype=bool, count=len(node_ids))
+
+
+def map_distinct(values, func, func_distinct=None):
+    """func(value) for every value of an object array, calling func once per distinct value.
+
+    func_distinct, if given, converts all distinct values at once, or returns
+    None to fall back to func.
     """
-    logging.info(f"Loading schema from: {schema_path}")
     try:
-        with open(schema_path, 'r') as f:
-            schema = json.load(f)
-    except FileNotFoundError:
-        logging.error(f"Schema file not found: {schema_path}")
-        return
-    except json.JSONDecodeError as e:
-        logging.error(f"Error parsing schema JSON: {e}")
-        return
-    
+        codes, uniques = pd.factorize(values)
+    except TypeError:
+        # Unhashable values such as lists
+        return object_array([func(value) for value in values])
+    # Values of different types can compare equal (1 == 1.0 == True) but convert differently
+    if len({type(value) for value in uniques}) > 1:
+        return object_array([func(value) for value in values])
+    results = np.empty(len(uniques) + 1, dtype=object)
+    converted = func_distinct(uniques) if func_distinct is not None and len(uniques) else None
+    if converted is not None:
+        results[:-1] = converted
+    else:
+        for i, value in enumerate(uniques):
+            results[i] = func(value)
+    # Nulls get code -1
+    results[-1] = func(None)
+    return results[codes]
+
+
+# Naive ISO 8601 dates and times, which pd.to_datetime parses the same way one by one or as an array
+ISO_DATETIME_PATTERN = r'\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,9})?)?)?'
+
+
+def format_datetimes(values, target_type):
+    """cast_value to 'date' or 'datetime' for an array of ISO 8601 strings; None for any other values."""
+    if not isinstance(values[0], str):
+        return None
+    strings = pd.Series(values, dtype=object)
+    if not strings.str.fullmatch(ISO_DATETIME_PATTERN).all():
+        return None
+    try:
+        dt = pd.to_datetime(strings, format='ISO8601')
+    except (ValueError, TypeError):
+        return None
+    if target_type == 'date':
+        return dt.dt.strftime('%Y-%m-%d').to_numpy(dtype=object)
+    # Format for Neo4j datetime: yyyy-MM-ddTHH:mm:ss.sssZ
+    return (dt.dt.strftime('%Y-%m-%dT%H:%M:%S.%f').str[:-3] + 'Z').to_numpy(dtype=object)
+
+
+def cast_distinct(values, target_type):
+    """cast_value over an array of distinct values of one type, for the common cases; None for the others."""
+    if target_type in ('date', 'datetime'):
+        return format_datetimes(values, target_type)
+    value_type = type(values[0])
+    is_number = value_type in (int, float)
+    if target_type == 'string':
+        if value_type is str:
+            # Empty strings are missing values
+            return np.where(values == '', None, values)
+        return as_strings(values) if is_number else None
+    if not is_number:
+        return None
+    numbers = values.astype(float)
+    if target_type == 'float':
+        return numbers.astype(object)
+    # int(float(value)) beyond the int64 range needs Python integers
+    if target_type == 'integer' and (np.abs(numbers) < 2 ** 63).all():
+        return numbers.astype(np.int64).astype(object)
+    return None
+
+
+def cast_column(values, target_type):
+    """Vectorized cast_value (or JSON parsing for 'json' properties) over a column of values."""
+    if target_type == 'json':
+        return map_distinct(values, lambda value: parse_json_data(clean_non_json_chars(value)))
+    return map_distinct(values, lambda value: cast_value(value, target_type),
+                        partial(cast_distinct, target_type=target_type))
+
+
+def generate_node_ids(node_schema, batch, columns):
+    """Vectorized generate_node_id: the node ID of every row of a batch, None where no ID can be formed."""
+    label = node_schema.get('label')
+    ids = np.full(batch.length, None, dtype=object)
+    pending = np.ones(batch.length, dtype=bool)
+
+    def take(column, skip_empty):
+        # Rows still without an ID take it from this column where it has a value
+        if not pending.any():
+            return
+        values = batch.values(column)
+        found = pending & pd.notna(values)
+        if skip_empty:
+            # Only compared where there is a value, as pd.NA != '' is not a bool
+            found[found] = values[found] != ''
+        ids[found] = prefixed_ids(label, values[found])
+        pending[found] = False
+
+    id_rule = node_schema.get('id_rule')
+    if id_rule:
+        if id_rule.get('type') == 'property':
+            prop_name = id_rule.get('property')
+            if prop_name and prop_name in columns:
+                take(prop_name, False)
+        elif id_rule.get('type') == 'composite':
+            properties = id_rule.get('properties', [])
+            if properties:
+                complete = pending.copy()
+                for prop in properties:
+                    if prop in columns:
+                        complete &= pd.notna(batch.values(prop))
+                    else:
+                        complete[:] = False
+                if complete.any():
+                    joined = pd.Series(as_strings(batch.values(properties[0])[complete]), dtype=object)
+                    for prop in properties[1:]:
+                        joined = joined + '_' + as_strings(batch.values(prop)[complete])
+                    ids[complete] = (f"{label}-" + joined).to_numpy(dtype=object)
+                # If any part is missing, the row gets no ID at all
+                return ids
+
+    id_config = node_schema.get('id', {})
+    if id_config and 'property' in id_config and id_config['property'] in columns:
+        take(id_config['property'], True)
+
+    primary_prop = node_schema.get('primary_property')
+    if primary_prop and primary_prop in columns:
+        take(primary_prop, False)
+
+    for prop_name in node_schema.get('properties', {}).keys():
+        if prop_name in columns:
+            take(prop_name, True)
+
+    for id_name in ['id', 'ID', 'Id', 'name', 'Name', 'identifier', 'Identifier', 'key', 'Key']:
+        if id_name in columns:
+            take(id_name, True)
+
+    for col in columns:
+        if not pending.any():
+            break
+        if 'id' in col.lower():
+            take(col, False)
+
+    # If we still don't have an ID, use a hash of the row values
+    for row in np.flatnonzero(pending):
+        ids[row] = f"{label}-{row_hash(batch.values(col)[row] for col in columns)}"
+    return ids
+
+
+# process_json_column_optimized extracts JSON columns with the same batched helpers
+for module_name in ('api.kgdata_loader.json_processing_optimizations', 'json_processing_optimizations'):
+    if module_name in sys.modules:
+        sys.modules[module_name].FrameSource = FrameSource
+        sys.modules[module_name].generate_node_ids = generate_node_ids
+
+
+def resolve_property_types(properties, source, owner, node_properties=True):
+    """Source column and target type of each property, as (name, source_col, target_type, use_id) tuples.
+
+    Where detect_type_mismatch finds that the data disagrees with the schema,
+    the schema entry is updated to the inferred type, as the row-wise loops
+    did when they reached their first row.
+    """
+    specs = []
+    for prop_name, prop_details in properties.items():
+        source_col = None
+        target_type = None
+        use_generated_id = False
+        if isinstance(prop_details, dict):
+            if node_properties:
+                source_col = prop_details.get('source_column', prop_name)
+                target_type = prop_details.get('type', 'string')
+                use_generated_id = prop_details.get('use_id', False)
+            else:
+                source_col = prop_details.get('source_column')
+                target_type = prop_details.get('type')
+        elif isinstance(prop_details, str):
+            source_col = prop_name
+            target_type = prop_details
+
+        if source_col and source_col in source.columns and not use_generated_id:
+            has_mismatch, inferred_type = detect_type_mismatch(source.column_frame(source_col), source_col, target_type)
+            if has_mismatch:
+                logging.warning(f"Type mismatch for {owner}{prop_name}: schema says '{target_type}' but data indicates '{inferred_type}'")
+                # Update the schema type to match the data
+                if isinstance(prop_details, dict):
+                    properties[prop_name]['type'] = inferred_type
+                else:
+                    properties[prop_name] = inferred_type
+                logging.info(f"Updated type for {owner}{prop_name} from '{target_type}' to '{inferred_type}'")
+                target_type = inferred_type
+        elif source_col and not use_generated_id:
+            logging.warning(f"Source column '{source_col}' not found in data. Setting property '{prop_name}' to null.")
+        specs.append((prop_name, source_col, target_type, use_generated_id))
+    return specs
+
+
+def property_columns(specs, batch, rows, columns, node_ids=None):
+    """Values of each property for the given rows of a batch, one list per property."""
+    values = []
+    for prop_name, source_col, target_type, use_generated_id in specs:
+        if use_generated_id:
+            values.append(node_ids.tolist())
+        elif source_col and source_col in columns:
+            values.append(cast_column(batch.values(source_col)[rows], target_type).tolist())
+        else:
+            values.append([None] * len(rows))
+    return values
+
+
+def row_relationship_targets(schema, label, columns):
+    """Relationships created alongside each new node of label, as (type, target label, column) tuples.
+
+    The column is the first one named after the target label or one of its
+    properties; its value identifies the target node.
+    """
+    targets = []
+    processed_types = set()
+    for rel_schema in schema.get('relationships', []):
+        if rel_schema.get('startNode', rel_schema.get('source')) != label:
+            continue
+        target_label = rel_schema.get('endNode', rel_schema.get('target'))
+        relationship_type = rel_schema.get('type')
+        # Only the first relationship of each type is created per node
+        if relationship_type in processed_types:
+            continue
+        processed_types.add(relationship_type)
+
+        target_node_schema = next((n for n in schema.get('nodes', []) if n.get('label') == target_label), None)
+        if not target_node_schema:
+            continue
+        target_props = [p.lower() for p in target_node_schema.get('properties', {}).keys()]
+        rel_col = next((col for col in columns
+                        if target_label in col or any(p in col.lower() for p in target_props)), None)
+        if rel_col:
+            targets.append((relationship_type, target_label, rel_col))
+    return targets
+
+
+def extract_nodes(source, node_schema, schema, nodes_data, node_headers, relationships_output,
+                  processed_relationship_types):
+    """Add the nodes of one node schema to nodes_data, with the relationships created alongside them."""
+    label = node_schema['label']
+    nodes = nodes_data[label]
+    properties_schema = node_schema.get('properties', {})
+    targets = row_relationship_targets(schema, label, source.columns)
+    # Row at which each node of this pass was created, for relationships between nodes of this label
+    created_at = {} if any(target_label == label for _, target_label, _ in targets) else None
+    specs = None
+
+    for batch in source.batches():
+        ids = generate_node_ids(node_schema, batch, source.columns)
+        # Deduplicate by ID: the first row of each new ID creates the node
+        candidates = pd.notna(ids) & ~pd.Series(ids).duplicated().to_numpy()
+        rows = np.flatnonzero(candidates)
+        rows = rows[~node_exists(ids[rows], nodes)]
+        if not len(rows):
+            continue
+        if specs is None:
+            specs = resolve_property_types(properties_schema, source, f"{label}.")
+            node_headers[label].update(spec[0] for spec in specs)
+
+        new_ids = ids[rows]
+        keys = [':ID', ':LABEL'] + [spec[0] for spec in specs]
+        values = [new_ids.tolist(), [label] * len(rows)] + property_columns(specs, batch, rows, source.columns, new_ids)
+        nodes.update(zip(values[0], (dict(zip(keys, node_values)) for node_values in zip(*values))))
+        if created_at is not None:
+            created_at.update(zip(values[0], (rows + batch.offset).tolist()))
+
+        # Relationships from the new nodes, ordered by row and then by schema order
+        found_rows, found_order, found_targets = [], [], []
+        for order, (relationship_type, target_label, rel_col) in enumerate(targets):
+            target_nodes = nodes_data.get(target_label)
+            if not target_nodes:
+                continue
+            target_values = batch.values(rel_col)[rows]
+            present = pd.notna(target_values)
+            # Match the ID format of the existing target nodes
+            if next(iter(target_nodes)).startswith(f"{target_label}-"):
+                target_ids = prefixed_ids(target_label, target_values[present])
+            else:
+                target_ids = as_strings(target_values[present])
+            source_rows = rows[present]
+            exists = node_exists(target_ids, target_nodes)
+            if target_label == label:
+                # Only nodes created at or before the source row existed at that point
+                exists &= np.fromiter((created_at.get(target_id, -1) <= row
+                                       for target_id, row in zip(target_ids, (source_rows + batch.offset).tolist())),
+                                      dtype=bool, count=len(target_ids))
+            found_rows.append(source_rows[exists])
+            found_order.append(np.full(int(exists.sum()), order))
+            found_targets.append(target_ids[exists])
+        if not found_rows:
+            continue
+        found_rows = np.concatenate(found_rows)
+        found_order = np.concatenate(found_order)
+        found_targets = np.concatenate(found_targets)
+        for i in np.lexsort((found_order, found_rows)):
+            relationship_type = targets[found_order[i]][0]
+            relationships_output.append({
+                ':START_ID': ids[found_rows[i]],
+                ':END_ID': found_targets[i],
+                ':TYPE': relationship_type
+            })
+            processed_relationship_types.add(relationship_type)
+
+
+def extract_relationships(source, rel_schema, startNode_schema, endNode_schema, nodes_data, relationships_output):
+    """Add a relationship for every row whose start and end nodes both exist; returns the number added."""
+    rel_type = rel_schema['type']
+    start_nodes = nodes_data[rel_schema.get('startNode', rel_schema.get('source'))]
+    end_nodes = nodes_data[rel_schema.get('endNode', rel_schema.get('target'))]
+    rel_props = rel_schema.get('properties', {})
+    specs = None
+    relationship_count = 0
+
+    for batch in source.batches():
+        # Generate node IDs using the exact same method as node creation
+        start_ids = generate_node_ids(startNode_schema, batch, source.columns)
+        end_ids = generate_node_ids(endNode_schema, batch, source.columns)
+        rows = np.flatnonzero(node_exists(start_ids, start_nodes) & node_exists(end_ids, end_nodes))
+        if not len(rows):
+            continue
+        if specs is None:
+            specs = resolve_property_types(rel_props, source, "relationship property ", node_properties=False)
+
+        keys = [':START_ID', ':END_ID', ':TYPE'] + [spec[0] for spec in specs]
+        values = ([start_ids[rows].tolist(), end_ids[rows].tolist(), [rel_type] * len(rows)]
+                  + property_columns(specs, batch, rows, source.columns))
+        relationships_output.extend(dict(zip(keys, rel_values)) for rel_values in zip(*values))
+        relationship_count += len(rows)
+    return relationship_count
+
+
+def extract_json_array_relationships(source, rel_schema, json_array_column, schema, nodes_data, node_headers,
+                                     relationships_output):
+    """Create target nodes and relationships from the JSON arrays in a column; returns the number of relationships."""
+    rel_type = rel_schema['type']
+    from_label = rel_schema.get('startNode', rel_schema.get('source'))
+    to_label = rel_schema.get('endNode', rel_schema.get('target'))
+    source_schema = next((n for n in schema['nodes'] if n['label'] == from_label), None)
+    relationship_count = 0
+
+    for batch in source.batches():
+        raw_values = batch.values(json_array_column)
+        rows = np.flatnonzero(pd.notna(raw_values))
+        if not len(rows):
+            continue
+        source_ids = generate_node_ids(source_schema, batch, source.columns)[rows]
+        # Parse each distinct JSON string once
+        parsed = map_distinct(raw_values[rows],
+                              lambda value: parse_json_data_optimized(clean_non_json_chars_optimized(value)))
+
+        for source_id, json_data in zip(source_ids, parsed):
+            if not source_id:
+                continue
+
+            # Ensure source node exists
+            if source_id not in nodes_data.get(from_label, {}):
+                logging.info(f"Creating {from_label} node {source_id} for {rel_type} relationship")
+                nodes_data.setdefault(from_label, {})[source_id] = {
+                    ':ID': source_id,
+                    ':LABEL': from_label
+                }
+
+            if json_data and isinstance(json_data, list):
+                for item in json_data:
+                    if isinstance(item, dict):
+                        # Determine a unique ID for the target node
+                        # Try to use a name-like field from the item first, if available
+                        name_field = None
+                        for key in item.keys():
+                            if 'name' in key.lower() or key.lower() == 'id':
+                                name_field = item[key]
+                                break
+
+                        if name_field:
+                            target_id = f"{to_label}-{name_field}"
+                        else:
+                            # Fallback to a position-based ID
+                            target_id = f"{to_label}-{source_id}-{hash(str(item))}"
+
+                        # Create target node if it doesn't exist
+                        if target_id not in nodes_data.get(to_label, {}):
+                            node_data = {
+                                ':ID': target_id,
+                                ':LABEL': to_label
+                            }
+                            # Add properties from the JSON item
+                            for key, value in item.items():
+                                node_data[key] = value
+                                node_headers.setdefault(to_label, set()).add(key)
+                            nodes_data.setdefault(to_label, {})[target_id] = node_data
+
+                        # Create relationship
+                        rel_data = {
+                            ':START_ID': source_id,
+                            ':END_ID': target_id,
+                            ':TYPE': rel_type
+                        }
+
+                        # Add relationship properties if defined in schema
+                        rel_props = rel_schema.get('properties', {})
+                        for prop_name, prop_details in rel_props.items():
+                            if isinstance(prop_details, dict):
+                                target_type = prop_details.get('type')
+                            else:
+                                target_type = prop_details
+
+                            # Get property value from JSON item
+                            if prop_name in item:
+                                rel_data[prop_name] = cast_value(item[prop_name], target_type)
+
+                        relationships_output.append(rel_data)
+                        relationship_count += 1
+    return relationship_count
+
+
+def load_source(data_path):
+    """Open the data file as a FrameSource, or a ParquetSource for Parquet files."""
     logging.info(f"Loading data from {data_path}")
     try:
         # Determine file type based on extension
         file_ext = os.path.splitext(data_path.lower())[1]
-        
+
         if file_ext == '.csv':
             # Use optimized CSV reading parameters
             logging.info(f"Loading CSV file: {data_path}")
-            df = pd.read_csv(
-                data_path, 
+            source = FrameSource(pd.read_csv(
+                data_path,
                 low_memory=False,
                 # Only parse dates when needed later, not during initial load
                 parse_dates=False,
                 # Use a more efficient engine
                 engine='c' if 'c' in pd.read_csv.__doc__ else 'python'
-            )
+            ))
         elif file_ext == '.parquet':
-            # Load parquet file
+            # Stream the parquet file in record batches
             logging.info(f"Loading parquet file: {data_path}")
-            df = pd.read_parquet(data_path)
+            source = ParquetSource(data_path)
         elif file_ext == '.json':
             # Load JSON file
             logging.info(f"Loading JSON file: {data_path}")
@@ -421,65 +977,53 @@ def create_neo4j_import_files(schema_path, data_path, output_dir):
                     # If both fail, raise the original error
                     logging.error(f"Failed to read JSON file: {std_json_err}")
                     raise json_err
+            source = FrameSource(df)
         else:
             raise ValueError(f"Unsupported file format: {file_ext}. Supported formats are .csv, .json, and .parquet")
-            
-        logging.info(f"Loaded {len(df)} rows of data")
+
+        logging.info(f"Loaded {source.num_rows} rows of data")
     except Exception as e:
         logging.error(f"Error loading data: {e}")
         raise
-    
-    # Add indexes to the DataFrame to help with lookups later
-    original_df = df.reset_index(drop=True)
-    
-    logging.info(f"Loaded CSV has {len(original_df)} rows and {len(original_df.columns)} columns")
-    logging.info(f"First few columns: {list(original_df.columns[:5])}")
-    logging.info(f"Output directory: {output_dir}")
-        
-    # Create output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Data storage structures
-    nodes_data = {}  # Dictionary by label of node data
-    node_headers = {}  # Track headers by label
-    relationships_output = []  # List of relationship data
-    rel_headers = set([':START_ID', ':END_ID', ':TYPE'])  # Standard rel headers
-    processed_relationship_types = set()  # Track which relationship types have been processed
+
+    return source
+
+
+def find_json_array_mappings(schema, source):
+    """Columns holding structured data for the target nodes of a relationship.
+
+    Returns the mappings by column and the labels whose nodes are created from
+    those columns instead of from the node schema.
+    """
     json_array_mappings = {}  # Track columns that contain JSON arrays
-    
-    # Process JSON array columns in schema first to identify which node types will be processed from JSON
     json_handled_node_types = set()
     for rel_schema in schema.get('relationships', []):
         # Get relationship details
         source_label = rel_schema.get('startNode')
         target_label = rel_schema.get('endNode')
         rel_type = rel_schema.get('type')
-        
+
         logging.info(f"Checking relationship: {rel_type} ({source_label} -> {target_label})")
-        
+
         # Find the target node schema to get its properties
         target_node_schema = next((n for n in schema.get('nodes', []) if n.get('label') == target_label), None)
         if not target_node_schema:
             continue
-            
-        # Find columns in the CSV that might contain related entity data for this relationship type
-        # First, look for direct matches where column name contains the target label or relationship type
-        potential_columns = []
-        
+
+        # Find columns in the data that might contain related entity data for this relationship type
         # Create naming patterns to look for based on relationship and target node type
         rel_parts = re.split(r'[^a-zA-Z0-9]', rel_type.lower())
         target_parts = re.split(r'[^a-zA-Z0-9]', target_label.lower())
-        
-        for col in original_df.columns:
+
+        for col in source.columns:
             col_lower = col.lower()
-            col_parts = re.split(r'[^a-zA-Z0-9]', col_lower)
-            
+
             # High priority match if column name directly contains target node label
             direct_match = any(part in col_lower for part in target_parts) or target_label.lower() in col_lower
-            
+
             # Medium priority match if column contains relationship type words
             rel_match = any(part in col_lower for part in rel_parts)
-            
+
             # Also check if column name looks like it might contain nested data for this relationship
             # For example: "team_members" for a "HAS_TEAM_MEMBER" relationship
             related_match = False
@@ -488,32 +1032,32 @@ def create_neo4j_import_files(schema_path, data_path, output_dir):
                     if rel_part in col_lower:
                         related_match = True
                         break
-            
+
             if direct_match or rel_match or related_match:
                 # Look at a sample to see if it might contain JSON-like data
-                sample_values = original_df[col].dropna().head(3)
-                if not sample_values.empty:
+                sample_values = source.first_values(col, 3)
+                if sample_values:
                     for sample_value in sample_values:
                         value_str = str(sample_value)
-                        
+
                         # Prioritize columns that look like they contain structured data
-                        has_json_syntax = ((value_str.startswith('[') and value_str.endswith(']')) or 
+                        has_json_syntax = ((value_str.startswith('[') and value_str.endswith(']')) or
                             (value_str.startswith('{') and value_str.endswith('}')) or
                             ("{'" in value_str and "':" in value_str) or
                             ('{"' in value_str and '":' in value_str))
-                            
+
                         # Check for patterns that suggest this contains related entity data
                         has_related_data = (
                             ("name" in value_str.lower() and ":" in value_str) or
                             (target_label.lower() in value_str.lower() and ":" in value_str) or
                             ("id" in value_str.lower() and ":" in value_str))
-                            
+
                         # If the column looks like it contains JSON or related entity data
                         if has_json_syntax or has_related_data:
                             # Try to parse a sample to verify it's valid JSON or can be converted
                             clean_sample = clean_non_json_chars(sample_value)
                             test_parse = parse_json_data(clean_sample)
-                            
+
                             if test_parse is not None:
                                 logging.info(f"Found structured data in '{col}' column - mapping to {target_label} nodes via {rel_type}")
                                 json_array_mappings[col] = {
@@ -524,208 +1068,106 @@ def create_neo4j_import_files(schema_path, data_path, output_dir):
                                 }
                                 json_handled_node_types.add(target_label)
                                 break
-                        
+
                     # Only process one sample per column
                     if col in json_array_mappings:
                         break
 
+    return json_array_mappings, json_handled_node_types
+
+
+def find_json_array_column(source, rel_type, to_label):
+    """Column whose JSON arrays hold the target nodes of a relationship, or None."""
+    json_array_column = None
+    for column in source.columns:
+        if column.endswith('_Members') or column.endswith('_Array') or column.endswith('_List'):
+            # Check if this column contains JSON arrays
+            first_values = source.first_values(column, 1)
+            sample_value = first_values[0] if first_values else None
+            if sample_value and isinstance(sample_value, str) and (sample_value.startswith('[') or sample_value.startswith('{')):
+                # Find if this column is related to the current relationship
+                if (column.replace('_Members', '').replace('_Array', '').replace('_List', '') == to_label or
+                    to_label.lower() in column.lower()):
+                    json_array_column = column
+                    logging.info(f"Found JSON array column {json_array_column} for relationship {rel_type}")
+                    break
+    return json_array_column
+
+
+# --- Main Processing Function ---
+
+def create_neo4j_import_files(schema_path, data_path, output_dir):
+    """
+    Generates nodes.csv and relationships.csv files for Neo4j import.
+
+    Nodes and relationships are extracted column-wise, READ_BATCH_SIZE rows at
+    a time; Parquet files are streamed batch by batch instead of being loaded
+    whole.
+
+    Args:
+        schema_path (str): Path to the JSON schema file.
+        data_path (str): Path to the input CSV data file.
+        output_dir (str): Directory to save the output CSV files.
+    """
+    logging.info(f"Loading schema from: {schema_path}")
+    try:
+        with open(schema_path, 'r') as f:
+            schema = json.load(f)
+    except FileNotFoundError:
+        logging.error(f"Schema file not found: {schema_path}")
+        return
+    except json.JSONDecodeError as e:
+        logging.error(f"Error parsing schema JSON: {e}")
+        return
+
+    source = load_source(data_path)
+
+    logging.info(f"Loaded data has {source.num_rows} rows and {len(source.columns)} columns")
+    logging.info(f"First few columns: {source.columns[:5]}")
+    logging.info(f"Output directory: {output_dir}")
+
+    # Create output directory if it doesn't exist
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Data storage structures
+    nodes_data = {}  # Dictionary by label of node data
+    node_headers = {}  # Track headers by label
+    relationships_output = []  # List of relationship data
+    processed_relationship_types = set()  # Track which relationship types have been processed
+
+    # Process JSON array columns in schema first to identify which node types will be processed from JSON
+    json_array_mappings, json_handled_node_types = find_json_array_mappings(schema, source)
+
     # --- Process Nodes ---
     logging.info("Processing nodes...")
-    
-    # Process standard nodes 
+
+    # Process standard nodes
     for node_schema in schema.get('nodes', []):
         label = node_schema.get('label')
-        
+
         # Skip nodes that will be processed from JSON arrays
         if label in json_handled_node_types:
             logging.info(f"Skipping {label} nodes in initial processing - will handle through JSON arrays")
             continue
-            
+
         logging.info(f"Processing label: {label}")
-        
+
         if not label:
             logging.warning("Node schema missing 'label' field. Skipping.")
             continue
-            
+
         # Initialize dictionary for this node type if it doesn't exist
         if label not in nodes_data:
             nodes_data[label] = {}
             node_headers[label] = set([':ID', ':LABEL'])
-            
-        # Get property schema for this node type
-        properties_schema = node_schema.get('properties', {})
-        
-        # Check data types against schema and update if necessary
-        for prop_name, prop_details in properties_schema.items():
-            source_col = None
-            schema_type = None
-            
-            if isinstance(prop_details, dict):
-                source_col = prop_details.get('source_column', prop_name)
-                schema_type = prop_details.get('type', 'string')
-            elif isinstance(prop_details, dict) and prop_details.get('type') == 'json':
-                source_col = prop_details.get('source_column', prop_name)
-                schema_type = 'json'
-                target_node_type = prop_details.get('target_node')
-                relationship_type = prop_details.get('relationship_type')
-                
-                if target_node_type and relationship_type and source_col in original_df.columns:
-                    logging.info(f"Found JSON array mapping: {source_col} -> {target_node_type} via {relationship_type}")
-                    json_array_mappings[source_col] = {
-                        'startNode': label,
-                        'endNode': target_node_type,
-                        'relationship_type': relationship_type,
-                        'property_schema': prop_details.get('properties', {})
-                    }
-            elif isinstance(prop_details, str):
-                source_col = prop_name
-                schema_type = prop_details
-            
-            # If it's a simple string type, it might indicate the column name directly
-            elif isinstance(prop_details, str) and prop_details == 'json':
-                # Look for potential JSON array columns
-                if prop_name in original_df.columns:
-                    # Assume this is a JSON array
-                    logging.info(f"Found potential JSON array in column: {prop_name}")
-                    # We'll detect the relationship type from the schema later
-                    for rel_schema in schema.get('relationships', []):
-                        if rel_schema.get('endNode', rel_schema.get('target')) == label:
-                            target_node_type = rel_schema.get('endNode', rel_schema.get('target'))
-                            relationship_type = rel_schema.get('type')
-                            if target_node_type and relationship_type:
-                                logging.info(f"Identified JSON array mapping: {prop_name} -> {target_node_type} via {relationship_type}")
-                                json_array_mappings[prop_name] = {
-                                    'startNode': rel_schema.get('startNode', rel_schema.get('source')),
-                                    'endNode': target_node_type,
-                                    'relationship_type': relationship_type,
-                                    'property_schema': {}  # Will be detected from the data
-                                }
-        
-        # Process each row in the CSV data
-        for index, row in original_df.iterrows():
-            # Generate unique ID for this node
-            node_id = generate_node_id(node_schema, row)
-            
-            if not node_id:
-                # Skip this row if no valid ID could be generated
-                continue
-                
-            # Skip if node already processed (avoid duplicates)
-            if node_id in nodes_data[label]:
-                continue
-                
-            # Create node data
-            node_data = {
-                ":ID": node_id,
-                ":LABEL": label
-            }
-            
-            # Process properties according to schema
-            for prop_name, prop_details in properties_schema.items():
-                # Determine source column name and target data type
-                source_col = None
-                target_type = None
-                use_generated_id = False
-                
-                if isinstance(prop_details, dict):
-                    source_col = prop_details.get('source_column', prop_name)
-                    target_type = prop_details.get('type', 'string')
-                    use_generated_id = prop_details.get('use_id', False)
-                elif isinstance(prop_details, str):
-                    source_col = prop_name
-                    target_type = prop_details
-                
-                # Check data types against schema and update if necessary
-                if source_col and source_col in original_df.columns and not use_generated_id:
-                    has_mismatch, inferred_type = detect_type_mismatch(original_df, source_col, target_type)
-                    if has_mismatch:
-                        logging.warning(f"Type mismatch for {label}.{prop_name}: schema says '{target_type}' but data indicates '{inferred_type}'")
-                        # Update the schema type to match the data
-                        if isinstance(prop_details, dict):
-                            properties_schema[prop_name]['type'] = inferred_type
-                            target_type = inferred_type
-                        else:
-                            properties_schema[prop_name] = inferred_type
-                            target_type = inferred_type
-                        logging.info(f"Updated type for {label}.{prop_name} from '{target_type}' to '{inferred_type}'")
-                
-                # Get property value
-                prop_value = None
-                if use_generated_id:
-                    prop_value = node_id
-                elif source_col and source_col in original_df.columns:
-                    if target_type == 'json':
-                        prop_value = parse_json_data(clean_non_json_chars(row[source_col]))
-                    else:
-                        prop_value = cast_value(row[source_col], target_type)
-                elif source_col:
-                    logging.warning(f"Source column '{source_col}' not found in CSV. Setting property '{prop_name}' to null.")
-                    
-                # Add property to node data
-                node_data[prop_name] = prop_value
-                node_headers[label].add(prop_name)  # Track header
-                
-            # Store node data for later writing to file
-            nodes_data[label][node_id] = node_data
-            
-            # Check if this node is a target of any relationship in the schema
-            processed_node_relationships = set()
-            for rel_schema in schema.get('relationships', []):
-                # Check if this relationship involves the current node as source or target
-                if rel_schema.get('startNode', rel_schema.get('source')) == label:
-                    # This node is the source of the relationship
-                    target_label = rel_schema.get('endNode', rel_schema.get('target'))
-                    relationship_type = rel_schema.get('type')
-                    
-                    # Skip if we have already processed this relationship type for this node
-                    relationship_key = f"{node_id}_{relationship_type}"
-                    if relationship_key in processed_node_relationships:
-                        continue
-                    processed_node_relationships.add(relationship_key)
-                    
-                    # Find the target node ID column
-                    target_node_schema = next((n for n in schema.get('nodes', []) if n.get('label') == target_label), None)
-                    if not target_node_schema:
-                        continue
-                    
-                    # Only create the relationship if target nodes exist in our data
-                    if target_label in nodes_data and len(nodes_data[target_label]) > 0:
-                        # Find the column that determines the relationship
-                        rel_col = None
-                        for col in row.index:
-                            if target_label in col or any(p.lower() in col.lower() for p in target_node_schema.get('properties', {}).keys()):
-                                rel_col = col
-                                break
-                        
-                        if rel_col and rel_col in row and not pd.isna(row[rel_col]):
-                            # Get target node ID
-                            target_id_value = row[rel_col]
-                            
-                            # Try to find the target node ID format
-                            if target_label in nodes_data:
-                                target_node_ids = list(nodes_data[target_label].keys())
-                                if target_node_ids:
-                                    # Match format from existing target nodes
-                                    sample_id = target_node_ids[0]
-                                    if sample_id.startswith(f"{target_label}-"):
-                                        target_id = f"{target_label}-{target_id_value}"
-                                    else:
-                                        target_id = str(target_id_value)
-                                    
-                                    # Only create relationship if target node exists
-                                    if target_id in nodes_data[target_label]:
-                                        rel_data = {
-                                            ':START_ID': node_id,
-                                            ':END_ID': target_id,
-                                            ':TYPE': relationship_type
-                                        }
-                                        relationships_output.append(rel_data)
-                                        rel_headers.update(rel_data.keys())
-                                        processed_relationship_types.add(relationship_type)
-    
-    # Process JSON arrays in CSV columns
-    logging.info("Processing JSON arrays in CSV columns...")
-    
+
+        # Create the nodes of this label, and the relationships from each new node to existing target nodes
+        extract_nodes(source, node_schema, schema, nodes_data, node_headers, relationships_output,
+                      processed_relationship_types)
+
+    # Process JSON arrays in data columns
+    logging.info("Processing JSON arrays in data columns...")
+
     # Directly use the optimized function for all JSON mappings
     for mapping in schema.get('json_mappings', []):
         json_col = mapping.get('source_column')
@@ -734,233 +1176,75 @@ def create_neo4j_import_files(schema_path, data_path, output_dir):
         relationship_type = mapping.get('relationship_type')
         # Use startNode with fallback to source_label for backward compatibility
         source_label = mapping.get('startNode', mapping.get('source_label'))
-        
+
         if not json_col or not target_label or not relationship_type or not source_label:
             continue
-            
-        if json_col not in original_df.columns:
+
+        if json_col not in source.columns:
             logging.warning(f"JSON column '{json_col}' not found in data")
             continue
-        
+
         # Use the optimized function to process the JSON column
         nodes_created, rels_created, new_rel_types = process_json_column_optimized(
-            original_df, json_col, source_label, target_label, relationship_type,
+            source.frame(), json_col, source_label, target_label, relationship_type,
             schema, nodes_data, node_headers, relationships_output, BATCH_SIZE
         )
-        
+
         # Update processed relationship types
         processed_relationship_types.update(new_rel_types)
-    
-        # Create a new DataFrame with the typed headers
-        typed_df = df.copy()
-        typed_df.columns = [neo4j_headers.get(col, col) for col in df.columns]
-        
-        # Write the file with type information in the headers
-        output_path = os.path.join(output_dir, f"{label}_nodes.csv")
-        typed_df.to_csv(output_path, index=False, lineterminator='\n')
-        logging.info(f"Successfully wrote node file: {output_path}")
-    else:
-        logging.warning(f"No data generated for node label: {label}")
 
     # --- Process Relationships ---
     logging.info("Processing relationships...")
-    
+
     # Process relationships defined in the schema
     for rel_schema in schema['relationships']:
         rel_type = rel_schema['type']
         # Use startNode and endNode consistently (fallback to source/target for backward compatibility)
         from_label = rel_schema.get('startNode', rel_schema.get('source'))
         to_label = rel_schema.get('endNode', rel_schema.get('target'))
-        
+
         logging.info(f"Processing relationship type: {rel_type} ({from_label} -> {to_label})")
-        
+
         # Generic handling for relationships with JSON array columns
         # Check if this relationship involves a JSON array column
-        json_array_column = None
-        for column in original_df.columns:
-            if column.endswith('_Members') or column.endswith('_Array') or column.endswith('_List'):
-                # Check if this column contains JSON arrays
-                sample_value = original_df[column].dropna().iloc[0] if not original_df[column].dropna().empty else None
-                if sample_value and isinstance(sample_value, str) and (sample_value.startswith('[') or sample_value.startswith('{')):
-                    # Find if this column is related to the current relationship
-                    if (column.replace('_Members', '').replace('_Array', '').replace('_List', '') == to_label or 
-                        to_label.lower() in column.lower()):
-                        json_array_column = column
-                        logging.info(f"Found JSON array column {json_array_column} for relationship {rel_type}")
-                        break
-        
+        json_array_column = find_json_array_column(source, rel_type, to_label)
+
         if json_array_column:
             # Process JSON array column to create target nodes and relationships
             logging.info(f"Special handling for {rel_type} relationship using {json_array_column}")
-            relationship_count = 0
-            
-            for index, row in original_df.iterrows():
-                if json_array_column in row and not pd.isna(row[json_array_column]):
-                    # Get the source node ID
-                    source_schema = next((n for n in schema['nodes'] if n['label'] == from_label), None)
-                    source_id = generate_node_id(source_schema, row)
-                    
-                    if not source_id:
-                        continue
-                        
-                    # Ensure source node exists
-                    if source_id not in nodes_data.get(from_label, {}):
-                        logging.info(f"Creating {from_label} node {source_id} for {rel_type} relationship")
-                        nodes_data.setdefault(from_label, {})[source_id] = {
-                            ':ID': source_id,
-                            ':LABEL': from_label
-                        }
-                    
-                    # Process JSON array data
-                    json_data = parse_json_data_optimized(clean_non_json_chars_optimized(row[json_array_column]))
-                    
-                    if json_data and isinstance(json_data, list):
-                        for item in json_data:
-                            if isinstance(item, dict):
-                                # Determine a unique ID for the target node
-                                # Try to use a name-like field from the item first, if available
-                                name_field = None
-                                for key in item.keys():
-                                    if 'name' in key.lower() or key.lower() == 'id':
-                                        name_field = item[key]
-                                        break
-                                        
-                                if name_field:
-                                    target_id = f"{to_label}-{name_field}"
-                                else:
-                                    # Fallback to a position-based ID
-                                    target_id = f"{to_label}-{source_id}-{hash(str(item))}"
-                                
-                                # Create target node if it doesn't exist
-                                if target_id not in nodes_data.get(to_label, {}):
-                                    node_data = {
-                                        ':ID': target_id,
-                                        ':LABEL': to_label
-                                    }
-                                    # Add properties from the JSON item
-                                    for key, value in item.items():
-                                        node_data[key] = value
-                                        node_headers.setdefault(to_label, set()).add(key)
-                                    
-                                    # Add to nodes_data
-                                    nodes_data.setdefault(to_label, {})[target_id] = node_data
-                                
-                                # Create relationship
-                                rel_data = {
-                                    ':START_ID': source_id,
-                                    ':END_ID': target_id,
-                                    ':TYPE': rel_type
-                                }
-                                
-                                # Add relationship properties if defined in schema
-                                rel_props = rel_schema.get('properties', {})
-                                for prop_name, prop_details in rel_props.items():
-                                    if isinstance(prop_details, dict):
-                                        target_type = prop_details.get('type')
-                                    else:
-                                        target_type = prop_details
-                                        
-                                    # Get property value from JSON item
-                                    if prop_name in item:
-                                        rel_data[prop_name] = cast_value(item[prop_name], target_type)
-                                
-                                relationships_output.append(rel_data)
-                                rel_headers.update(rel_data.keys())
-                                relationship_count += 1
-                                processed_relationship_types.add(rel_type)
-            
+            relationship_count = extract_json_array_relationships(
+                source, rel_schema, json_array_column, schema, nodes_data, node_headers, relationships_output
+            )
+
             if relationship_count > 0:
+                processed_relationship_types.add(rel_type)
                 logging.info(f"Generated {relationship_count} relationships of type {rel_type}")
             continue
-            
+
         # Skip if either node type doesn't exist in our data
         if from_label not in nodes_data or to_label not in nodes_data:
             logging.warning(f"Skipping relationship type {rel_type} due to missing node data for {from_label} or {to_label}")
             continue
-            
+
         logging.info(f"Processing relationship type: {rel_type} ({from_label} -> {to_label})")
-        
+
         # Get node schemas for ID generation using the startNode/endNode labels
         startNode_schema = next((n for n in schema['nodes'] if n['label'] == from_label), None)
         endNode_schema = next((n for n in schema['nodes'] if n['label'] == to_label), None)
-        
+
         if not startNode_schema or not endNode_schema:
             logging.warning(f"Could not find node schemas for {from_label} or {to_label}. Skipping relationship.")
             continue
-        
-        # For each row in the ORIGINAL CSV data, try to create a relationship
-        relationship_count = 0
-        for index, row in original_df.iterrows():
-            # Generate node IDs using the exact same method as node creation
-            startNode_id = generate_node_id(startNode_schema, row)
-            endNode_id = generate_node_id(endNode_schema, row)
-            
-            # Debug info to track down the issue
-            logging.debug(f"Row {index}: Generated startNode_id={startNode_id}, endNode_id={endNode_id}")
-            
-            # Check if both nodes exist in our nodes_data dictionaries
-            startNode_exists = startNode_id is not None and startNode_id in nodes_data[from_label]
-            endNode_exists = endNode_id is not None and endNode_id in nodes_data[to_label]
-            
-            if startNode_exists and endNode_exists:
-                # We found a valid relationship! Add it.
-                rel_props = rel_schema.get('properties', {})
-                rel_data = {
-                    ':START_ID': startNode_id,
-                    ':END_ID': endNode_id,
-                    ':TYPE': rel_type
-                }
-                
-                # Process relationship properties
-                for prop_name, prop_details in rel_props.items():
-                    if isinstance(prop_details, dict):
-                        source_col = prop_details.get('source_column')
-                        target_type = prop_details.get('type')
-                    else:
-                        source_col = prop_name
-                        target_type = prop_details
-                        
-                    # Check data types against schema and update if necessary
-                    if source_col and source_col in original_df.columns:
-                        has_mismatch, inferred_type = detect_type_mismatch(original_df, source_col, target_type)
-                        if has_mismatch:
-                            logging.warning(f"Type mismatch for relationship property {prop_name}: schema says '{target_type}' but data indicates '{inferred_type}'")
-                            # Update the schema type to match the data
-                            if isinstance(prop_details, dict):
-                                rel_props[prop_name]['type'] = inferred_type
-                                target_type = inferred_type
-                            else:
-                                rel_props[prop_name] = inferred_type
-                                target_type = inferred_type
-                            logging.info(f"Updated type for relationship property {prop_name} from '{target_type}' to '{inferred_type}'")
-                    
-                    prop_value = None
-                    if source_col and source_col in original_df.columns:  # Check against original CSV columns
-                        if target_type == 'json':
-                            prop_value = parse_json_data(clean_non_json_chars(row[source_col]))
-                        else:
-                            prop_value = cast_value(row[source_col], target_type)
-                    elif source_col:
-                        logging.warning(f"Source column '{source_col}' not found in CSV data. Setting property to null.")
-                        
-                    rel_data[prop_name] = prop_value
-                    
-                relationships_output.append(rel_data)
-                # Add to rel_headers set for consistent output
-                rel_headers.update(rel_data.keys())
-                relationship_count += 1
-                processed_relationship_types.add(rel_type)
-            else:
-                if startNode_id is None or endNode_id is None:
-                    logging.debug(f"Row {index}: Unable to generate node IDs for relationship ({from_label} -> {to_label})")
-                elif not startNode_exists:
-                    logging.debug(f"Row {index}: From node ID {startNode_id} does not exist in {from_label} nodes")
-                elif not endNode_exists:
-                    logging.debug(f"Row {index}: To node ID {endNode_id} does not exist in {to_label} nodes")
-        
+
+        # For each row of the source data, create the relationship if both of its nodes exist
+        relationship_count = extract_relationships(
+            source, rel_schema, startNode_schema, endNode_schema, nodes_data, relationships_output
+        )
+
         if relationship_count > 0:
+            processed_relationship_types.add(rel_type)
             logging.info(f"Generated {relationship_count} relationships of type {rel_type}")
-                    
+
     # --- Write Node Files ---
     logging.info("Writing node files...")
     for label, nodes in nodes_data.items():
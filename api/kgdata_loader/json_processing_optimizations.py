@@ -10,6 +10,17 @@ import pandas as pd
 import ast
 import re
 import logging
+from functools import lru_cache
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 # Cache settings
 MAX_CACHE_SIZE = 10000  # Maximum number of items to keep in caches
@@ -123,7 +134,24 @@ def parse_json_data_optimized(value):
 # This will be set by the main script when importing this module
 generate_node_id = None
 
+# References to the batched extraction helpers of the main script, set the same way
+FrameSource = None
+generate_node_ids = None
+
 def process_json_column_optimized(original_df, json_col, source_label, target_label, relationship_type, schema, nodes_data, node_headers, relationships_output, batch_size=5000):
+    """
+    Create target nodes and relationships from the JSON in one column.
+
+    The column is processed as a whole: every distinct value is cleaned and
+    parsed once, the parsed items are exploded to one entry per row and item
+    with Arrow list compute, and node IDs and relationships are formed and
+    deduplicated column-wise. Python dicts are only built for the new nodes
+    and relationships. The results, and their order, are those of processing
+    the rows one by one.
+
+    Returns:
+        (number of nodes created, number of relationships created, relationship types created)
+    """
     # Initialize counters for reporting
     json_nodes_created = 0
     json_relationships_created = 0
@@ -154,20 +182,10 @@ def process_json_column_optimized(original_df, json_col, source_label, target_la
         node_headers[target_label] = set()
     if source_label not in nodes_data:
         nodes_data[source_label] = {}
-        
-    # Track existing relationships to avoid duplicates
-    existing_relationships = set()
     
     # Check if this column contains JSON array data
     is_json_array_column = json_col.endswith('_Members') or json_col.endswith('_Array') or json_col.endswith('_List')
     
-    # Process the JSON column in batches
-    logging.info(f"Processing {json_col} column in batches of {batch_size}")
-    
-    # Store all JSON items for batch processing
-    all_json_items = {}
-    source_node_ids = {}
-    
     # Get the mapping from the schema
     mapping = next((m for m in schema.get('json_mappings', []) 
                    if m.get('source_column') == json_col 
@@ -182,72 +200,52 @@ def process_json_column_optimized(original_df, json_col, source_label, target_la
     
     logging.info(f"Processing column '{json_col}' to create {target_label} nodes")
     
-    # First, collect all valid rows with JSON data
-    valid_rows = []
-    source_node_ids = {}
-    
-    # Use a set to track existing relationships for faster lookups
-    existing_relationships = set()
-    
     # Pre-compute source node IDs and filter valid rows
-    logging.info(f"Pre-processing JSON data in column '{json_col}'")
-    
-    # Get the source node schema once outside the loop
-    source_node_schema = next((n for n in schema.get('nodes', []) if n.get('label') == source_label), None)
-    if not source_node_schema:
-        logging.warning(f"Source node schema not found for label: {source_label}")
-        return 0, 0, set()
-        
-    # Process in batches for better memory management
-    total_batches = (len(original_df) + batch_size - 1) // batch_size
+    source = FrameSource(original_df)
+    source_ids = []
+    json_values = []
+    for batch in source.batches():
+        values = batch.values(json_col)
+        rows = np.flatnonzero(pd.notna(values))
+        ids = generate_node_ids(source_node_schema, batch, source.columns)[rows]
+        valid = np.array([bool(node_id) for node_id in ids], dtype=bool)
+        # For JSON array columns the source node is created if it doesn't exist yet
+        if not is_json_array_column:
+            source_nodes = nodes_data.get(source_label, {})
+            valid &= np.fromiter((node_id in source_nodes for node_id in ids), dtype=bool, count=len(ids))
+        source_ids.append(ids[valid])
+        json_values.append(values[rows[valid]])
+    source_ids = np.concatenate(source_ids) if source_ids else np.empty(0, dtype=object)
+    json_values = np.concatenate(json_values) if json_values else np.empty(0, dtype=object)
     
-    for batch_num in range(total_batches):
-        start_idx = batch_num * batch_size
-        end_idx = min(start_idx + batch_size, len(original_df))
-        batch_df = original_df.iloc[start_idx:end_idx]
-        
-        for index, row in batch_df.iterrows():
-            if json_col not in row or pd.isna(row[json_col]):
-                continue
-                
-            # Generate source node ID
-            source_node_id = generate_node_id(source_node_schema, row)
-            if not source_node_id:
-                continue
-                
-            # For relationships involving JSON array columns, we should process them even if source nodes don't exist yet
-            # This allows for creating relationships between nodes that are defined in the JSON arrays
-            if is_json_array_column:
-                # Allow processing even if the source node doesn't exist yet
-                pass
-            elif source_node_id not in nodes_data.get(source_label, {}):
-                continue
-                
-            # Store the row and source node ID for later processing
-            valid_rows.append((index, row))
-            source_node_ids[index] = source_node_id
+    # Parse each distinct JSON value once
+    logging.info(f"Parsing JSON data from {len(json_values)} rows")
+    try:
+        codes, distinct_values = pd.factorize(json_values)
+    except TypeError:
+        # Unhashable values
+        codes, distinct_values = np.arange(len(json_values)), json_values
+    distinct_items = [json_items(value) for value in distinct_values]
     
-    # Initialize a dictionary to store all JSON items by row index
-    all_json_items = {}
+    # Explode the items of each distinct value to one entry per row and item
+    offsets = np.zeros(len(distinct_items) + 1, dtype=np.int64)
+    np.cumsum([len(items) for items in distinct_items], out=offsets[1:])
+    flat_items = [item for items in distinct_items for item in items]
+    item_lists = pa.ListArray.from_arrays(pa.array(offsets), pa.array(np.arange(len(flat_items), dtype=np.int64)))
+    row_item_lists = item_lists.take(pa.array(codes, type=pa.int64()))
+    item_index = pc.list_flatten(row_item_lists).to_numpy()
+    row_index = pc.list_parent_indices(row_item_lists).to_numpy()
+    # Position of each item among the items of its row
+    position = item_index - offsets[codes[row_index]]
     
-    # Parse all JSON data in one pass
-    logging.info(f"Parsing JSON data from {len(valid_rows)} rows")
-    for index, row in valid_rows:
-        json_str = clean_non_json_chars_optimized(row[json_col])
-        json_data = parse_json_data_optimized(json_str)
-        
-        if not json_data:
-            # If parsing failed, log a debug message with a sample
-            if index < 5:  # Only log the first few failures to avoid log spam
-                logging.debug(f"Failed to parse JSON data in row {index}, column '{json_col}': {str(row[json_col])[:100]}")
-            continue
-            
-        # If it's not a list, convert it to a list with one item
-        if not isinstance(json_data, list):
-            json_data = [json_data]
-            
-        # Store valid JSON items
-        all_json_items[index] = [item for item in json_data if isinstance(item, dict)]
+    # Node IDs: the name-like field of an item, or else the source node and the item position
+    item_names = np.array([item_name_id(target_label, item) for item in flat_items] + [None], dtype=object)[:-1]
+    row_source_ids = source_ids[row_index]
+    target_ids = item_names[item_index]
+    unnamed = pd.isna(target_ids)
+    if unnamed.any():
+        target_ids[unnamed] = (f"{target_label}-" + pd.Series(row_source_ids[unnamed], dtype=object) + "-"
+                               + pd.Series(position[unnamed]).astype(str)).to_numpy(dtype=object)
     
     # Pre-compute property type mapping for better performance
     property_type_mapping = {}
@@ -257,117 +255,142 @@ def process_json_column_optimized(original_df, json_col, source_label, target_la
         elif isinstance(prop_details, str):
             property_type_mapping[prop_name] = prop_details
     
-    # Process all JSON items and create nodes and relationships
     logging.info(f"Processing JSON items and creating nodes and relationships")
     
-    # Check if this column contains JSON array data
-    is_json_array_column = json_col.endswith('_Members') or json_col.endswith('_Array') or json_col.endswith('_List')
-    
-    # Batch process the JSON items
-    for index, json_items in all_json_items.items():
-        source_node_id = source_node_ids[index]
-        
-        for i, item in enumerate(json_items):
-            # Generate a unique ID for this node
-            # Try to use a name-like field from the item first, if available
-            name_field = None
-            for key in item.keys():
-                if 'name' in key.lower() or key.lower() == 'id':
-                    name_field = item[key]
-                    break
-                    
-            if name_field:
-                # Use the name field to ensure consistent IDs across rows
-                target_node_id = f"{target_label}-{name_field}"
-            else:
-                # Fallback to position-based ID
-                target_node_id = f"{target_label}-{source_node_id}-{i}"
-            
-            # Check for existing relationship using the set for faster lookup
-            rel_key = (source_node_id, target_node_id, relationship_type)
-            
-            # For JSON array columns, ensure the source node exists in the nodes_data dictionary
-            if is_json_array_column:
-                # Create or update the source node if needed
-                if source_node_id not in nodes_data.get(source_label, {}):
-                    logging.info(f"Creating {source_label} node {source_node_id} for {relationship_type} relationship")
-                    nodes_data.setdefault(source_label, {})[source_node_id] = {
-                        ':ID': source_node_id,
-                        ':LABEL': source_label
-                    }
-                # Ensure the target node is created
-                if target_node_id not in nodes_data.get(target_label, {}):
-                    logging.info(f"Creating {target_label} node {target_node_id} for {relationship_type} relationship")
-                    node_data = {
-                        ':ID': target_node_id,
-                        ':LABEL': target_label
-                    }
-                    # Add properties from the JSON item
-                    for key, value in item.items():
-                        prop_name = key
-                        if prop_name in property_type_mapping:
-                            node_data[prop_name] = value
-                            node_headers[target_label].add(prop_name)
-                    nodes_data[target_label][target_node_id] = node_data
-            
-            # Create the relationship if it doesn't exist
-            if rel_key not in existing_relationships:
-                rel_data = {
-                    ':START_ID': source_node_id,
-                    ':END_ID': target_node_id,
-                    ':TYPE': relationship_type
-                }
-                relationships_output.append(rel_data)
-                existing_relationships.add(rel_key)
-                processed_relationship_types.add(relationship_type)
-                json_relationships_created += 1
-            
-            # Skip node creation if this node was already processed
-            if target_node_id in nodes_data[target_label]:
-                continue
-            
-            # Create the node data
-            node_data = {
-                ":ID": target_node_id,
-                ":LABEL": target_label
-            }
-            
-            # Add all properties from the JSON item
-            for key, value in item.items():
-                # Map to a property that exists in the schema if possible
-                prop_name = next((p for p in mapping['property_schema'].keys() if p.lower() == key.lower()), key)
-                
-                # Get the target type from pre-computed mapping or infer from value
-                target_type = property_type_mapping.get(prop_name)
-                if not target_type:
-                    # Guess the type based on the value
-                    if isinstance(value, bool):
-                        target_type = 'boolean'
-                    elif isinstance(value, int):
-                        target_type = 'integer'
-                    elif isinstance(value, float):
-                        target_type = 'float'
-                    else:
-                        target_type = 'string'
-                
-                # Convert value to the right type
-                if target_type in ['string', 'integer', 'float', 'boolean', 'date', 'datetime']:
-                    node_data[prop_name] = cast_value(value, target_type)
+    if is_json_array_column:
+        # Each item creates its source node if missing, then its target node with the mapped properties
+        if source_label == target_label:
+            event_ids = np.empty(2 * len(target_ids), dtype=object)
+            event_ids[0::2] = row_source_ids
+            event_ids[1::2] = target_ids
+            for event in first_new(event_ids, nodes_data[target_label]):
+                node_id = event_ids[event]
+                if event % 2:
+                    nodes_data[target_label][node_id] = array_item_node(
+                        node_id, target_label, flat_items[item_index[event // 2]], property_type_mapping)
                 else:
-                    node_data[prop_name] = value
-                    
-                # Track headers
-                node_headers[target_label].add(prop_name)
-            
-            # Add node to the data
-            nodes_data[target_label][target_node_id] = node_data
+                    nodes_data[source_label][node_id] = {':ID': node_id, ':LABEL': source_label}
+        else:
+            source_nodes = nodes_data[source_label]
+            for i in first_new(row_source_ids, source_nodes):
+                source_nodes[row_source_ids[i]] = {':ID': row_source_ids[i], ':LABEL': source_label}
+            target_nodes = nodes_data[target_label]
+            for i in first_new(target_ids, target_nodes):
+                target_nodes[target_ids[i]] = array_item_node(
+                    target_ids[i], target_label, flat_items[item_index[i]], property_type_mapping)
+    else:
+        # Each new target node gets all properties of its item, cast to the schema types
+        target_nodes = nodes_data[target_label]
+        schema_properties = list(mapping['property_schema'].keys())
+        for i in first_new(target_ids, target_nodes):
+            node_data = item_node(target_ids[i], target_label, flat_items[item_index[i]], schema_properties,
+                                  property_type_mapping)
+            node_headers[target_label].update(key for key in node_data if key not in (':ID', ':LABEL'))
+            target_nodes[target_ids[i]] = node_data
             json_nodes_created += 1
+    
+    # Create each relationship once
+    new_relationships = np.flatnonzero(~pd.DataFrame({'start': row_source_ids, 'end': target_ids}).duplicated().to_numpy())
+    relationships_output.extend({
+        ':START_ID': start_id,
+        ':END_ID': end_id,
+        ':TYPE': relationship_type
+    } for start_id, end_id in zip(row_source_ids[new_relationships], target_ids[new_relationships]))
+    json_relationships_created = len(new_relationships)
+    if json_relationships_created:
+        processed_relationship_types.add(relationship_type)
             
     logging.info(f"Generated {json_nodes_created} {target_label} nodes from '{json_col}' column")
     logging.info(f"Generated {json_relationships_created} {relationship_type} relationships from '{json_col}' column")
     
     return json_nodes_created, json_relationships_created, processed_relationship_types
 
+def json_items(value):
+    """The dict items of the JSON in a cell, as a list."""
+    json_str = clean_non_json_chars_optimized(value)
+    json_data = parse_json_fast(json_str)
+    if not json_data:
+        return []
+    # If it's not a list, convert it to a list with one item
+    if not isinstance(json_data, list):
+        json_data = [json_data]
+    return [item for item in json_data if isinstance(item, dict)]
+
+def parse_json_fast(value):
+    """parse_json_data_optimized, parsing valid JSON with orjson when it is installed."""
+    if pd.isna(value) or value == '':
+        return None
+    cleaned_value = clean_non_json_chars_optimized(value)
+    if not cleaned_value:
+        return None
+    try:
+        return json_loads(cleaned_value)
+    except ValueError:
+        # Not strict JSON: the ast and regex fallbacks, cached by input string
+        return parse_json_fallback(value)
+
+@lru_cache(maxsize=MAX_CACHE_SIZE)
+def parse_json_fallback(value):
+    return parse_json_data_optimized(value)
+
+def item_name_id(target_label, item):
+    """Node ID from the first name-like field of an item, or None if it has none."""
+    name_field = None
+    for key in item.keys():
+        if 'name' in key.lower() or key.lower() == 'id':
+            name_field = item[key]
+            break
+    return f"{target_label}-{name_field}" if name_field else None
+
+def first_new(ids, nodes):
+    """Positions of the first occurrence of each ID that is not yet a key of nodes."""
+    first = np.flatnonzero(~pd.Series(ids, dtype=object).duplicated().to_numpy())
+    return [i for i in first.tolist() if ids[i] not in nodes]
+
+def array_item_node(node_id, label, item, property_type_mapping):
+    """Node for an item of a JSON array column, with the item fields the mapping defines."""
+    node_data = {
+        ':ID': node_id,
+        ':LABEL': label
+    }
+    # Add properties from the JSON item
+    for key, value in item.items():
+        if key in property_type_mapping:
+            node_data[key] = value
+    return node_data
+
+def item_node(node_id, label, item, schema_properties, property_type_mapping):
+    """Node for a JSON item, with all its fields cast to the schema types."""
+    node_data = {
+        ":ID": node_id,
+        ":LABEL": label
+    }
+    
+    # Add all properties from the JSON item
+    for key, value in item.items():
+        # Map to a property that exists in the schema if possible
+        prop_name = next((p for p in schema_properties if p.lower() == key.lower()), key)
+        
+        # Get the target type from pre-computed mapping or infer from value
+        target_type = property_type_mapping.get(prop_name)
+        if not target_type:
+            # Guess the type based on the value
+            if isinstance(value, bool):
+                target_type = 'boolean'
+            elif isinstance(value, int):
+                target_type = 'integer'
+            elif isinstance(value, float):
+                target_type = 'float'
+            else:
+                target_type = 'string'
+        
+        # Convert value to the right type
+        if target_type in ['string', 'integer', 'float', 'boolean', 'date', 'datetime']:
+            node_data[prop_name] = cast_value(value, target_type)
+        else:
+            node_data[prop_name] = value
+    return node_data
+
 # Reference to the cast_value function from the main script
 # This will be set by the main script when importing this module
 cast_value = None
@@ -0,0 +1,550 @@
+"""
+Sharded, parallel writer for the Neo4j import files.
+
+create_neo4j_import_files collects every node and relationship in Python
+dicts before it writes a single file, so its memory grows with the data.
+write_sharded_import_files streams them to disk instead: each label and
+each relationship type is written by its own worker process, batch by batch,
+into numbered shards of at most SHARD_ROWS rows plus a separate header file:
+
+    Customer_nodes_header.csv, Customer_nodes_part0000.csv, ...
+    HAS_CONTRACT_relationships_header.csv, HAS_CONTRACT_relationships_part0000.csv, ...
+
+neo4j-admin import reads such groups directly (--nodes=header,part0,part1).
+Only the IDs of each label are kept in memory, to deduplicate nodes and to
+check that both ends of a relationship exist.
+
+Nodes, relationships and header types are those of create_neo4j_import_files.
+Schemas whose nodes come from JSON columns are handed to it unchanged, since
+those nodes are built from the parsed JSON items.
+"""
+
+import argparse
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    # Try relative import first (when run as a module)
+    from api.kgdata_loader.generate_neo4j_files import (
+        ParquetSource,
+        convert_to_neo4j_type,
+        create_neo4j_import_files,
+        find_json_array_column,
+        find_json_array_mappings,
+        generate_node_ids,
+        infer_data_type,
+        load_source,
+        node_exists,
+        prefixed_ids,
+        property_columns,
+        resolve_property_types,
+        row_relationship_targets,
+    )
+except ImportError:
+    # Fall back to local import (when run directly)
+    from generate_neo4j_files import (
+        ParquetSource,
+        convert_to_neo4j_type,
+        create_neo4j_import_files,
+        find_json_array_column,
+        find_json_array_mappings,
+        generate_node_ids,
+        infer_data_type,
+        load_source,
+        node_exists,
+        prefixed_ids,
+        property_columns,
+        resolve_property_types,
+        row_relationship_targets,
+    )
+
+# Rows per shard file
+SHARD_ROWS = int(os.getenv("NEO4J_IMPORT_SHARD_ROWS", "1000000"))
+# Worker processes writing labels and relationship types in parallel
+IMPORT_WORKERS = int(os.getenv("NEO4J_IMPORT_WORKERS", str(os.cpu_count() or 1)))
+
+NODE_FILE_SUFFIX = "_nodes"
+RELATIONSHIP_FILE_SUFFIX = "_relationships"
+
+
+class ShardWriter:
+    """Writes rows to numbered CSV shards of at most shard_rows rows, and their header to a separate file."""
+
+    def __init__(self, output_dir, name, shard_rows=SHARD_ROWS):
+        self.output_dir = output_dir
+        self.name = name
+        self.shard_rows = shard_rows
+        self.files = []
+        self.rows = 0
+        self._file = None
+        self._writer = None
+        self._shard_left = 0
+
+    def _next_shard(self):
+        if self._file:
+            self._file.close()
+        path = os.path.join(self.output_dir, f"{self.name}_part{len(self.files):04d}.csv")
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file, lineterminator='\n')
+        self._shard_left = self.shard_rows
+        self.files.append(path)
+
+    def write(self, columns):
+        """Append rows given as one list of values per column; None and NaN are written as empty fields."""
+        rows = list(zip(*map(_without_nan, columns)))
+        start = 0
+        while start < len(rows):
+            if self._shard_left == 0:
+                self._next_shard()
+            end = start + self._shard_left
+            self._writer.writerows(rows[start:end])
+            self._shard_left -= len(rows[start:end])
+            start = end
+        self.rows += len(rows)
+
+    def close(self, header):
+        """Close the last shard and write the header file; returns the header and shard paths."""
+        if self._file:
+            self._file.close()
+            self._file = None
+        if not self.rows:
+            return []
+        header_path = os.path.join(self.output_dir, f"{self.name}_header.csv")
+        with open(header_path, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f, lineterminator='\n').writerow(header)
+        return [header_path] + self.files
+
+
+class ValueSamples:
+    """First non-null values of each column, for inferring header types."""
+
+    def __init__(self, names, size):
+        self.size = size
+        self.values = {name: [] for name in names}
+
+    def add(self, names, columns):
+        for name, column in zip(names, columns):
+            samples = self.values.get(name)
+            if samples is None:
+                continue
+            for value in column:
+                if len(samples) >= self.size:
+                    break
+                if not _is_null(value):
+                    samples.append(value)
+
+
+def _is_null(value):
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def _without_nan(column):
+    # NaN is the only value not equal to itself
+    if any(value != value for value in column):
+        return [None if value != value else value for value in column]
+    return column
+
+
+def node_property_type(samples):
+    """Type create_neo4j_import_files gives a node property the schema has no type for, from its first values."""
+    if not samples:
+        return None
+    sample_types = {type(value).__name__ for value in samples[:5]}
+    if sample_types == {'float'}:
+        return 'float'
+    if sample_types == {'int'}:
+        return 'integer'
+    if sample_types == {'bool'}:
+        return 'boolean'
+    return 'string'
+
+
+def relationship_property_type(samples, details):
+    """Type create_neo4j_import_files gives a relationship property, from its schema details and first values."""
+    samples = samples[:10]
+    # Numbers and strings with a decimal point keep the schema type; other values decide it
+    if not samples or any(isinstance(value, (int, float)) or (isinstance(value, str) and '.' in value)
+                          for value in samples):
+        inferred_type = details.get('type', 'string') if isinstance(details, dict) else 'string'
+    else:
+        sample_types = {infer_data_type(value) for value in samples}
+        # The most flexible type that can hold all values
+        inferred_type = next((t for t in ('string', 'float', 'integer', 'boolean', 'datetime', 'date')
+                              if t in sample_types), 'string')
+    if inferred_type != 'float' and _has_fractional_number(samples):
+        return 'float'
+    return inferred_type
+
+
+def _has_fractional_number(samples):
+    """Whether a float, or a number string like '2.5' or '1e-3', comes before any value that is not a number."""
+    for value in samples:
+        if isinstance(value, float):
+            return True
+        if isinstance(value, int):
+            continue
+        if not isinstance(value, str):
+            return False
+        try:
+            number = float(value)
+        except ValueError:
+            return False
+        if '.' in value or not number.is_integer():
+            return True
+    return False
+
+
+def typed_header(name, data_type):
+    neo4j_type = convert_to_neo4j_type(data_type) if data_type else None
+    return f"{name}:{neo4j_type}" if neo4j_type else name
+
+
+def schema_property_type(properties, name):
+    """Type of a property in a schema properties dict, or None."""
+    details = properties.get(name)
+    return details.get('type') if isinstance(details, dict) else details
+
+
+# --- Worker processes ---
+# Workers are spawned, so nothing of the parent process is shared with them.
+# They get the path of a Parquet file to stream the source data from (CSV and
+# JSON data is written to a temporary Parquet file once), and each
+# relationship task gets only the node IDs of the labels it connects.
+
+_source = None
+
+
+def _init_worker(source):
+    global _source
+    _source = ParquetSource(source) if isinstance(source, str) else source
+
+
+def worker_source_path(source, tmp_dir):
+    """Parquet file workers can stream the source data from, or None.
+
+    A FrameSource is written to tmp_dir. None is returned when its object
+    columns hold values other than strings (such as lists, dicts or mixed
+    types), which would not read back from Parquet unchanged.
+    """
+    if isinstance(source, ParquetSource):
+        return source.path
+    df = source.frame()
+    for column in df.columns:
+        if df[column].dtype == object and pd.api.types.infer_dtype(df[column], skipna=True) not in ('string', 'empty'):
+            return None
+    path = os.path.join(tmp_dir, "source.parquet")
+    try:
+        df.to_parquet(path, index=False)
+    except Exception as e:
+        logging.warning(f"Could not write the source data to Parquet for the workers: {e}")
+        return None
+    return path
+
+
+def _write_nodes(label, node_schemas, output_dir, shard_rows):
+    """Write the nodes of one label; returns the label, its node IDs and the files written."""
+    specs_by_schema = [resolve_property_types(node_schema.get('properties', {}), _source, f"{label}.")
+                       for node_schema in node_schemas]
+    names = []
+    for specs in specs_by_schema:
+        names.extend(spec[0] for spec in specs if spec[0] not in names)
+    schema_types = {}
+    for node_schema in node_schemas:
+        for name in node_schema.get('properties', {}):
+            schema_types.setdefault(name, schema_property_type(node_schema['properties'], name))
+    samples = ValueSamples([name for name in names if not schema_types.get(name)], 5)
+
+    writer = ShardWriter(output_dir, f"{label}{NODE_FILE_SUFFIX}", shard_rows)
+    node_ids = set()
+    for node_schema, specs in zip(node_schemas, specs_by_schema):
+        for batch in _source.batches():
+            ids = generate_node_ids(node_schema, batch, _source.columns)
+            # Deduplicate by ID: the first row of each new ID creates the node
+            candidates = pd.notna(ids) & ~pd.Series(ids).duplicated().to_numpy()
+            rows = np.flatnonzero(candidates)
+            rows = rows[~node_exists(ids[rows], node_ids)]
+            if not len(rows):
+                continue
+            new_ids = ids[rows]
+            node_ids.update(new_ids.tolist())
+            values = dict(zip((spec[0] for spec in specs),
+                              property_columns(specs, batch, rows, _source.columns, new_ids)))
+            columns = [values.get(name, [None] * len(rows)) for name in names]
+            samples.add(names, columns)
+            writer.write([new_ids, [label] * len(rows)] + columns)
+
+    header = [':ID', ':LABEL'] + [typed_header(name, schema_types.get(name) or node_property_type(samples.values[name]))
+                                  for name in names]
+    files = writer.close(header)
+    if files:
+        logging.info(f"Wrote {writer.rows} {label} nodes to {len(files) - 1} shards")
+    else:
+        logging.warning(f"No data generated for node label: {label}")
+    return label, node_ids, files
+
+
+def _node_rows(node_schemas, position, created):
+    """Replay the node extraction of the label of node_schemas up to the schema at position.
+
+    Yields each batch of that schema with the rows creating new nodes and their
+    IDs; created maps every node ID to the (position, row) that created it.
+    """
+    for node_position, node_schema in node_schemas:
+        if node_position > position:
+            break
+        for batch in _source.batches():
+            ids = generate_node_ids(node_schema, batch, _source.columns)
+            candidates = pd.notna(ids) & ~pd.Series(ids).duplicated().to_numpy()
+            rows = np.flatnonzero(candidates)
+            rows = rows[~node_exists(ids[rows], created)]
+            created.update(zip(ids[rows].tolist(), ((node_position, row) for row in (rows + batch.offset).tolist())))
+            if node_position == position and len(rows):
+                yield batch, rows, ids
+
+
+def _write_relationships(rel_type, row_targets, rel_schemas, node_schemas, node_ids, output_dir, shard_rows):
+    """Write the relationships of one type; returns the type, the number written and the files written.
+
+    row_targets are the relationships create_neo4j_import_files creates
+    alongside the nodes of a label, as (label, schema position, target label,
+    column) tuples; rel_schemas the relationship schemas of this type with the
+    node schemas of their ends; node_ids the node IDs of the labels they connect.
+    """
+    specs_by_schema = []
+    names = []
+    for rel_schema, _, _ in rel_schemas:
+        specs = resolve_property_types(rel_schema.get('properties', {}), _source, "relationship property ",
+                                       node_properties=False)
+        specs_by_schema.append(specs)
+        names.extend(spec[0] for spec in specs if spec[0] not in names)
+    samples = ValueSamples(names, 10)
+    writer = ShardWriter(output_dir, f"{rel_type}{RELATIONSHIP_FILE_SUFFIX}", shard_rows)
+
+    def write(start_ids, end_ids, values):
+        columns = [values.get(name, [None] * len(start_ids)) for name in names]
+        samples.add(names, columns)
+        writer.write([start_ids, end_ids, [rel_type] * len(start_ids)] + columns)
+
+    for label, position, target_label, rel_col in row_targets:
+        target_nodes = node_ids.get(target_label)
+        created = {}
+        for batch, rows, ids in _node_rows(node_schemas[label], position, created):
+            target_values = batch.values(rel_col)[rows]
+            present = pd.notna(target_values)
+            target_ids = prefixed_ids(target_label, target_values[present])
+            source_rows = rows[present]
+            if target_label == label:
+                # Only nodes created at or before the source row existed at that point
+                exists = np.fromiter((target_id in created and (created[target_id][0] < position
+                                                                 or created[target_id][1] <= row)
+                                      for target_id, row in zip(target_ids, (source_rows + batch.offset).tolist())),
+                                     dtype=bool, count=len(target_ids))
+            elif target_nodes:
+                exists = node_exists(target_ids, target_nodes)
+            else:
+                continue
+            write(ids[source_rows[exists]], target_ids[exists], {})
+
+    for (rel_schema, start_schema, end_schema), specs in zip(rel_schemas, specs_by_schema):
+        start_nodes = node_ids[rel_schema.get('startNode', rel_schema.get('source'))]
+        end_nodes = node_ids[rel_schema.get('endNode', rel_schema.get('target'))]
+        for batch in _source.batches():
+            start_ids = generate_node_ids(start_schema, batch, _source.columns)
+            end_ids = generate_node_ids(end_schema, batch, _source.columns)
+            rows = np.flatnonzero(node_exists(start_ids, start_nodes) & node_exists(end_ids, end_nodes))
+            if len(rows):
+                write(start_ids[rows], end_ids[rows],
+                      dict(zip((spec[0] for spec in specs), property_columns(specs, batch, rows, _source.columns))))
+
+    header = [':START_ID', ':END_ID', ':TYPE']
+    for name in names:
+        properties = next(rel_schema['properties'] for rel_schema, _, _ in rel_schemas
+                          if name in rel_schema.get('properties', {}))
+        inferred_type = relationship_property_type(samples.values[name], properties[name])
+        schema_type = schema_property_type(properties, name)
+        if inferred_type != schema_type:
+            logging.warning(f"Type mismatch for relationship property {name}: schema says '{schema_type}' "
+                            f"but data indicates '{inferred_type}'")
+        header.append(typed_header(name, inferred_type))
+    files = writer.close(header)
+    if files:
+        logging.info(f"Wrote {writer.rows} {rel_type} relationships to {len(files) - 1} shards")
+    return rel_type, writer.rows, files
+
+
+def _run_tasks(func, tasks, workers, source, source_path):
+    """Run func over the argument tuples in tasks, in worker processes when more than one is allowed.
+
+    Workers stream the source data from source_path; without a path the
+    tasks run in this process on source.
+    """
+    workers = min(workers, len(tasks))
+    if workers <= 1 or source_path is None:
+        _init_worker(source)
+        try:
+            return [func(*task) for task in tasks]
+        finally:
+            # Do not keep the source data alive in this process
+            _init_worker(None)
+    # Spawned rather than forked, as forking the threaded API process can deadlock the workers
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(source_path,)) as executor:
+        return list(executor.map(func, *zip(*tasks)))
+
+
+# --- Main Processing Function ---
+
+def write_sharded_import_files(schema_path, data_path, output_dir, shard_rows=SHARD_ROWS, workers=IMPORT_WORKERS):
+    """
+    Generates sharded node and relationship files for Neo4j import.
+
+    Nodes are written first, one worker process per label, then
+    relationships, one worker process per relationship type.
+
+    Args:
+        schema_path (str): Path to the JSON schema file.
+        data_path (str): Path to the input data file.
+        output_dir (str): Directory to save the output CSV files.
+        shard_rows (int): Maximum number of rows per shard file.
+        workers (int): Maximum number of worker processes.
+    """
+    logging.info(f"Loading schema from: {schema_path}")
+    try:
+        with open(schema_path, 'r') as f:
+            schema = json.load(f)
+    except FileNotFoundError:
+        logging.error(f"Schema file not found: {schema_path}")
+        return
+    except json.JSONDecodeError as e:
+        logging.error(f"Error parsing schema JSON: {e}")
+        return
+
+    source = load_source(data_path)
+    logging.info(f"Loaded data has {source.num_rows} rows and {len(source.columns)} columns")
+
+    _, json_handled_node_types = find_json_array_mappings(schema, source)
+    json_columns = [find_json_array_column(source, rel_schema['type'],
+                                           rel_schema.get('endNode', rel_schema.get('target')))
+                    for rel_schema in schema.get('relationships', [])]
+    if json_handled_node_types or schema.get('json_mappings') or any(json_columns):
+        logging.info("Schema creates nodes from JSON columns; writing unsharded import files")
+        create_neo4j_import_files(schema_path, data_path, output_dir)
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+    # Holds the Parquet copy of CSV and JSON data that the workers read
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmp_dir:
+        source_path = worker_source_path(source, tmp_dir) if workers > 1 else None
+        if workers > 1 and source_path is None:
+            logging.info("Source data cannot be passed to worker processes; writing import files in this process")
+        elif source_path is not None and not isinstance(source, ParquetSource):
+            # Do not keep the loaded data in memory next to the workers
+            source = ParquetSource(source_path)
+
+        # --- Write Node Files ---
+        node_schemas = {}  # label -> [(position in the schema, node schema)]
+        for position, node_schema in enumerate(schema.get('nodes', [])):
+            label = node_schema.get('label')
+            if not label:
+                logging.warning("Node schema missing 'label' field. Skipping.")
+                continue
+            node_schemas.setdefault(label, []).append((position, node_schema))
+
+        logging.info(f"Writing node files for {len(node_schemas)} labels...")
+        node_tasks = [(label, [node_schema for _, node_schema in entries], output_dir, shard_rows)
+                      for label, entries in node_schemas.items()]
+        node_ids = {}
+        for label, ids, _ in _run_tasks(_write_nodes, node_tasks, workers, source, source_path):
+            node_ids[label] = ids
+
+        # --- Write Relationship Files ---
+        first_position = {label: entries[0][0] for label, entries in node_schemas.items()}
+        row_targets = {}
+        for label, entries in node_schemas.items():
+            for position, _ in entries:
+                for rel_type, target_label, rel_col in row_relationship_targets(schema, label, source.columns):
+                    # Targets of other labels only exist if their nodes were created first
+                    if target_label != label and first_position.get(target_label, position) >= position:
+                        continue
+                    row_targets.setdefault(rel_type, []).append((label, position, target_label, rel_col))
+
+        rel_schemas = {}
+        for rel_schema in schema.get('relationships', []):
+            rel_type = rel_schema['type']
+            from_label = rel_schema.get('startNode', rel_schema.get('source'))
+            to_label = rel_schema.get('endNode', rel_schema.get('target'))
+            if from_label not in node_schemas or to_label not in node_schemas:
+                logging.warning(f"Skipping relationship type {rel_type} due to missing node data for {from_label} or {to_label}")
+                continue
+            rel_schemas.setdefault(rel_type, []).append(
+                (rel_schema, node_schemas[from_label][0][1], node_schemas[to_label][0][1]))
+
+        rel_types = list(dict.fromkeys(list(row_targets) + list(rel_schemas)))
+        logging.info(f"Writing relationship files for {len(rel_types)} relationship types...")
+        rel_tasks = []
+        for rel_type in rel_types:
+            # Only the node IDs of the labels this type connects go to its worker
+            labels = {target_label for label, _, target_label, _ in row_targets.get(rel_type, []) if target_label != label}
+            for rel_schema, _, _ in rel_schemas.get(rel_type, []):
+                labels.add(rel_schema.get('startNode', rel_schema.get('source')))
+                labels.add(rel_schema.get('endNode', rel_schema.get('target')))
+            rel_tasks.append((rel_type, row_targets.get(rel_type, []), rel_schemas.get(rel_type, []), node_schemas,
+                              {label: node_ids[label] for label in labels if label in node_ids}, output_dir, shard_rows))
+        processed_relationship_types = {
+            rel_type for rel_type, count, _ in _run_tasks(_write_relationships, rel_tasks, workers, source, source_path)
+            if count
+        }
+        # Close the temporary Parquet file before its directory is removed
+        source = None
+
+    schema_relationship_types = {rel.get('type') for rel in schema.get('relationships', [])}
+    missing_relationship_types = schema_relationship_types - processed_relationship_types
+    if missing_relationship_types:
+        logging.warning(f"WARNING: The following relationship types were defined in the schema but not generated: {missing_relationship_types}")
+    else:
+        logging.info("SUCCESS: All relationship types defined in the schema were successfully generated.")
+
+    logging.info("Processing complete.")
+
+
+def import_file_groups(directory):
+    """
+    The node and relationship files in an import directory, in either layout.
+
+    Returns (node groups, relationship groups); a group is the list of files
+    neo4j-admin import reads as one input, either a single file with its
+    header or a header file followed by its shards. Node groups are
+    (label, files) tuples.
+    """
+    directory = Path(directory)
+    node_groups = [(path.name[:-len("_nodes.csv")], [str(path)]) for path in sorted(directory.glob("*_nodes.csv"))]
+    relationship_groups = [[str(directory / "relationships.csv")]] if (directory / "relationships.csv").exists() else []
+    for suffix, groups in ((NODE_FILE_SUFFIX, node_groups), (RELATIONSHIP_FILE_SUFFIX, relationship_groups)):
+        for header in sorted(directory.glob(f"*{suffix}_header.csv")):
+            name = header.name[:-len("_header.csv")]
+            files = [str(header)] + [str(path) for path in sorted(directory.glob(f"{name}_part*.csv"))]
+            groups.append((name[:-len(suffix)], files) if suffix == NODE_FILE_SUFFIX else files)
+    return node_groups, relationship_groups
+
+
+# --- Command Line Interface ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate sharded Neo4j import CSV files from a schema and data file.")
+    parser.add_argument("schema_file", help="Path to the JSON schema definition file.")
+    parser.add_argument("data_file", help="Path to the input data file.")
+    parser.add_argument("output_dir", help="Directory to save the generated node and relationship CSV files.")
+    parser.add_argument("--shard-rows", type=int, default=SHARD_ROWS, help="Maximum number of rows per shard file.")
+    parser.add_argument("--workers", type=int, default=IMPORT_WORKERS, help="Maximum number of worker processes.")
+
+    args = parser.parse_args()
+
+    write_sharded_import_files(args.schema_file, args.data_file, args.output_dir, args.shard_rows, args.workers)
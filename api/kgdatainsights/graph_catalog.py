@@ -0,0 +1,124 @@
+"""
+In-memory catalog of the node labels, relationship types and property keys of each graph.
+
+Autocomplete asks for labels and relationship types on every keystroke. The
+catalog answers from memory: it is filled by refresh() after a load job
+succeeds and dropped by invalidate() when a job changes the graph otherwise.
+A graph that is not in the catalog, e.g. after a restart, is read from Neo4j
+once on first use. Graphs are keyed by their URI and database, so graph name
+aliases that resolve to the same database share one entry.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Fix import paths for both direct and module imports
+try:
+    # When imported as a module
+    from api.kgdatainsights.neo4j_config import get_neo4j_config
+    from api.kgdatainsights.neo4j_schema_helper import (
+        get_neo4j_node_labels,
+        get_neo4j_relationship_types,
+        get_neo4j_property_keys
+    )
+except ImportError:
+    # When run directly
+    from .neo4j_config import get_neo4j_config
+    from .neo4j_schema_helper import (
+        get_neo4j_node_labels,
+        get_neo4j_relationship_types,
+        get_neo4j_property_keys
+    )
+
+logger = logging.getLogger(__name__)
+
+# Seconds an empty catalog read is kept; the helpers also return nothing when Neo4j is down
+EMPTY_CATALOG_TTL = float(os.getenv("GRAPH_CATALOG_EMPTY_TTL", "60"))
+
+
+class GraphCatalog:
+    """Labels, relationship types and property keys by graph, read once per load"""
+
+    def __init__(self):
+        self._entries: Dict[Tuple[Any, Any], Dict[str, Any]] = {}
+        self._locks: Dict[Tuple[Any, Any], asyncio.Lock] = {}
+        self._keys: Dict[str, Tuple[Any, Any]] = {}
+
+    def catalog_key(self, graph_name: str) -> Tuple[Any, Any]:
+        """The database a graph name resolves to"""
+        if graph_name not in self._keys:
+            config = get_neo4j_config(graph_name)
+            self._keys[graph_name] = (config.get("uri"), config.get("database"))
+        return self._keys[graph_name]
+
+    async def _read(self, graph_name: str) -> Dict[str, Any]:
+        labels = await get_neo4j_node_labels(graph_name)
+        relationship_types = await get_neo4j_relationship_types(graph_name)
+        property_keys = {label: await get_neo4j_property_keys(label, graph_name) for label in labels}
+        entry = {
+            "node_labels": labels,
+            "relationship_types": relationship_types,
+            "property_keys": property_keys,
+            "loaded_at": time.time()
+        }
+        if not labels:
+            # Possibly a failed read, so read it again later instead of keeping it until the next load
+            entry["expires_at"] = entry["loaded_at"] + EMPTY_CATALOG_TTL
+        return entry
+
+    async def refresh(self, graph_name: str = "default_graph") -> Dict[str, Any]:
+        """Read the catalog of a graph from Neo4j, replacing the cached one"""
+        key = self.catalog_key(graph_name)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = await self._read(graph_name)
+            self._entries[key] = entry
+        logger.info(f"Cached catalog of graph '{graph_name}': {len(entry['node_labels'])} labels, "
+                    f"{len(entry['relationship_types'])} relationship types")
+        return entry
+
+    def _cached(self, key: Tuple[Any, Any]) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.get("expires_at") and entry["expires_at"] < time.time():
+            return None
+        return entry
+
+    async def get(self, graph_name: str = "default_graph") -> Dict[str, Any]:
+        """The cached catalog of a graph, read from Neo4j only if it is not cached"""
+        key = self.catalog_key(graph_name)
+        entry = self._cached(key)
+        if entry is not None:
+            return entry
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another request may have read it while this one waited
+            entry = self._cached(key)
+            if entry is None:
+                entry = await self._read(graph_name)
+                self._entries[key] = entry
+        return entry
+
+    def invalidate(self, graph_name: Optional[str] = None) -> None:
+        """Drop the cached catalog of a graph, or of all graphs"""
+        if graph_name is None:
+            self._entries.clear()
+            # Also re-resolve graph names, in case neo4j.databases.json changed
+            self._keys.clear()
+        else:
+            self._entries.pop(self.catalog_key(graph_name), None)
+
+    async def node_labels(self, graph_name: str = "default_graph") -> List[str]:
+        return (await self.get(graph_name))["node_labels"]
+
+    async def relationship_types(self, graph_name: str = "default_graph") -> List[str]:
+        return (await self.get(graph_name))["relationship_types"]
+
+    async def property_keys(self, node_label: str, graph_name: str = "default_graph") -> List[str]:
+        return (await self.get(graph_name))["property_keys"].get(node_label, [])
+
+
+# Shared by the websocket and the graph job handlers
+graph_catalog = GraphCatalog()
@@ -12,44 +12,36 @@ import os
 try:
     # When imported as a module
     from api.kgdatainsights.neo4j_config import get_neo4j_config
-    from api.kgdatainsights.neo4j_connection_manager import Neo4jConnectionManager
+    from api.kginsights.neo4j_async_pool import neo4j_async_pool
 except ImportError:
     # When run directly
     from .neo4j_config import get_neo4j_config
-    from .neo4j_connection_manager import Neo4jConnectionManager
+    from ..kginsights.neo4j_async_pool import neo4j_async_pool
 
-def get_neo4j_driver(graph_name: str = "default_graph"):
-    """Get a Neo4j driver instance using the connection manager"""
-    config = get_neo4j_config(graph_name)
-    uri = config.get("uri", "neo4j://localhost:7687")
-    username = config.get("username", "neo4j")
-    password = config.get("password", "neo4j123")
-    
-    # Get driver from connection manager
-    connection_manager = Neo4jConnectionManager()
-    return connection_manager.get_driver(uri, username, password)
+def neo4j_session(graph_name: str = "default_graph"):
+    """Lease an async Neo4j session on a graph from the shared pool"""
+    return neo4j_async_pool.session(graph_name, get_neo4j_config(graph_name))
 
 logger = logging.getLogger(__name__)
 
-async def get_neo4j_node_labels() -> List[str]:
+async def get_neo4j_node_labels(graph_name: str = "default_graph") -> List[str]:
     """
     Query Neo4j database for all available node labels
     """
     try:
-        driver = get_neo4j_driver()
         logger.info("Attempting to retrieve node labels from Neo4j")
-        with driver.session() as session:
+        async with neo4j_session(graph_name) as session:
             try:
                 # First try the db.labels() procedure
-                result = session.run("CALL db.labels()")
-                labels = [record["label"] for record in result]
+                result = await session.run("CALL db.labels()")
+                labels = [record["label"] async for record in result]
                 logger.info(f"Retrieved {len(labels)} node labels from Neo4j using db.labels(): {labels}")
                 return labels
             except Exception as proc_error:
                 # If that fails, try a more direct query
                 logger.warning(f"Error using db.labels() procedure: {str(proc_error)}. Trying alternative query.")
-                result = session.run("MATCH (n) RETURN DISTINCT labels(n) as labels")
-                label_sets = [record["labels"] for record in result]
+                result = await session.run("MATCH (n) RETURN DISTINCT labels(n) as labels")
+                label_sets = [record["labels"] async for record in result]
                 # Flatten the list of label sets
                 labels = list(set([label for label_set in label_sets for label in label_set]))
                 logger.info(f"Retrieved {len(labels)} node labels from Neo4j using direct query: {labels}")
@@ -57,8 +49,8 @@ async def get_neo4j_node_labels() -> List[str]:
             # If we still have no labels, try one more approach
             if not labels:
                 logger.warning("No labels found, trying one more approach")
-                result = session.run("MATCH (n) RETURN DISTINCT [x IN labels(n) | x][0] as label LIMIT 100")
-                labels = [record["label"] for record in result if record["label"] is not None]
+                result = await session.run("MATCH (n) RETURN DISTINCT [x IN labels(n) | x][0] as label LIMIT 100")
+                labels = [record["label"] async for record in result if record["label"] is not None]
                 logger.info(f"Retrieved {len(labels)} node labels from Neo4j using third approach: {labels}")
             
             return labels
@@ -69,31 +61,30 @@ async def get_neo4j_node_labels() -> List[str]:
         logger.error(traceback.format_exc())
         return []
 
-async def get_neo4j_relationship_types() -> List[str]:
+async def get_neo4j_relationship_types(graph_name: str = "default_graph") -> List[str]:
     """
     Query Neo4j database for all available relationship types
     """
     try:
-        driver = get_neo4j_driver()
         logger.info("Attempting to retrieve relationship types from Neo4j")
-        with driver.session() as session:
+        async with neo4j_session(graph_name) as session:
             try:
                 # First try the db.relationshipTypes() procedure
-                result = session.run("CALL db.relationshipTypes()")
-                types = [record["relationshipType"] for record in result]
+                result = await session.run("CALL db.relationshipTypes()")
+                types = [record["relationshipType"] async for record in result]
                 logger.info(f"Retrieved {len(types)} relationship types from Neo4j using db.relationshipTypes(): {types}")
             except Exception as proc_error:
                 # If that fails, try a more direct query
                 logger.warning(f"Error using db.relationshipTypes() procedure: {str(proc_error)}. Trying alternative query.")
-                result = session.run("MATCH ()-[r]->() RETURN DISTINCT type(r) as relType")
-                types = [record["relType"] for record in result]
+                result = await session.run("MATCH ()-[r]->() RETURN DISTINCT type(r) as relType")
+                types = [record["relType"] async for record in result]
                 logger.info(f"Retrieved {len(types)} relationship types from Neo4j using direct query: {types}")
             
             # If we still have no relationship types, try one more approach
             if not types:
                 logger.warning("No relationship types found, trying one more approach")
-                result = session.run("MATCH p=()-->() RETURN DISTINCT relationships(p)[0] as rel LIMIT 100")
-                types = list(set([type(record["rel"]) for record in result if record["rel"] is not None]))
+                result = await session.run("MATCH p=()-->() RETURN DISTINCT relationships(p)[0] as rel LIMIT 100")
+                types = list(set([record["rel"].type async for record in result if record["rel"] is not None]))
                 logger.info(f"Retrieved {len(types)} relationship types from Neo4j using third approach: {types}")
             
             return types
@@ -104,13 +95,12 @@ async def get_neo4j_relationship_types() -> List[str]:
         logger.error(traceback.format_exc())
         return []
 
-async def get_neo4j_property_keys(node_label: str) -> List[str]:
+async def get_neo4j_property_keys(node_label: str, graph_name: str = "default_graph") -> List[str]:
     """
     Query Neo4j database for all property keys for a specific node label
     """
     try:
-        driver = get_neo4j_driver()
-        with driver.session() as session:
+        async with neo4j_session(graph_name) as session:
             # Use a parameterized query to avoid injection
             query = """
             MATCH (n:`{label}`)
@@ -118,8 +108,8 @@ async def get_neo4j_property_keys(node_label: str) -> List[str]:
             RETURN keys(n) as property_keys
             """.format(label=node_label)
             
-            result = session.run(query)
-            record = result.single()
+            result = await session.run(query)
+            record = await result.single()
             if record:
                 property_keys = record["property_keys"]
                 logger.info(f"Retrieved {len(property_keys)} property keys for {node_label}: {property_keys}")
@@ -129,20 +119,20 @@ async def get_neo4j_property_keys(node_label: str) -> List[str]:
         logger.error(f"Error retrieving property keys for {node_label} from Neo4j: {str(e)}")
         return []
 
-async def get_complete_neo4j_schema() -> Dict[str, Any]:
+async def get_complete_neo4j_schema(graph_name: str = "default_graph") -> Dict[str, Any]:
     """
     Build a complete schema by querying Neo4j database directly
     """
     # Get all node labels
-    node_labels = await get_neo4j_node_labels()
+    node_labels = await get_neo4j_node_labels(graph_name)
     
     # Get all relationship types
-    relationship_types = await get_neo4j_relationship_types()
+    relationship_types = await get_neo4j_relationship_types(graph_name)
     
     # Build nodes with properties
     nodes = []
     for label in node_labels:
-        property_keys = await get_neo4j_property_keys(label)
+        property_keys = await get_neo4j_property_keys(label, graph_name)
         node = {
             "label": label,
             "properties": [{"name": prop, "type": "string"} for prop in property_keys]
@@ -21,6 +21,7 @@ from neo4j import GraphDatabase
 from .neo4j_config import get_neo4j_connection_params
 from .loaders.data_loader import DataLoader
 from .loaders.neo4j_loader import Neo4jLoader
+from ..kgdatainsights.graph_catalog import graph_catalog
 import traceback
 import re
 from langchain_google_genai import ChatGoogleGenerativeAI
@@ -217,6 +218,7 @@ class LoadDataInput(BaseModel):
     graph_name: str = "default"  # Default graph name to load data into
     batch_size: int = 1000  # Number of records to process in each batch
     drop_existing: bool = False  # Whether to drop existing data before loading
+    incremental: bool = False  # Apply only the changes since the last load while the database stays online
 
 # Router
 router = APIRouter(prefix="/graphschema", tags=["graphschema"])
@@ -1727,6 +1729,7 @@ async def clean_neo4j_database(
         
         # Update schema record to mark database as cleaned
         reset_schemas_for_db_id(graph_name)
+        graph_catalog.invalidate(graph_name)
         
         # Close the connection
         neo4j_loader.close()
@@ -1857,7 +1860,8 @@ async def load_data_to_neo4j(
             data_path=str(data_path),  # Convert Path to string
             graph_name=load_input.graph_name,
             batch_size=load_input.batch_size,
-            drop_existing=load_input.drop_existing
+            drop_existing=load_input.drop_existing,
+            incremental=load_input.incremental
         )
         
         # Load data
@@ -1891,6 +1895,9 @@ async def load_data_to_neo4j(
         db.query(Schema).filter(Schema.id != load_input.schema_id).update({"db_loaded": "no"})
         db.commit()
         print(f"DEBUG: Set db_loaded='no' for all schemas except schema_id={load_input.schema_id}")
+        
+        # Cache the labels, relationship types and property keys of the loaded graph
+        await graph_catalog.refresh(load_input.graph_name)
             
         return {
             "message": "Data loaded successfully",
@@ -1996,7 +2003,9 @@ async def load_data_from_schema(
     dataset_type: str = None,  # Add dataset_type parameter with default None
     current_user: User = Depends(has_any_permission(["kginsights:write"])),
     db: SessionLocal = Depends(get_db),
-    job_id: str = None
+    job_id: str = None,
+    incremental: bool = False,
+    batch_size: int = 1000
 ):
     """
     Load data directly from a schema's associated file path.
@@ -2007,6 +2016,8 @@ async def load_data_from_schema(
         drop_existing: Whether to drop existing data in the graph
         current_user: Current authenticated user
         db: Database session
+        incremental: Apply only the changes since the last load instead of rebuilding the database
+        batch_size: Number of rows written per transaction by incremental loads
         
     Returns:
         Dict with loading results
@@ -2053,9 +2064,10 @@ async def load_data_from_schema(
             schema_id=schema_id,
             data_path=data_path,
             graph_name=graph_name,
-            batch_size=1000,  # Default batch size
+            batch_size=batch_size,
             drop_existing=drop_existing,
-            job_id=job_id  # Pass the job_id for direct job updates
+            job_id=job_id,  # Pass the job_id for direct job updates
+            incremental=incremental
         )
         
         # Load data
@@ -2089,6 +2101,9 @@ async def load_data_from_schema(
         db.query(Schema).filter(Schema.id != schema_id).update({"db_loaded": "no"})
         db.commit()
         print(f"DEBUG: Set db_loaded='no' for all schemas except schema_id={schema_id}")
+        
+        # Cache the labels, relationship types and property keys of the loaded graph
+        await graph_catalog.refresh(graph_name)
             
         return {
             "message": "Data loaded successfully",
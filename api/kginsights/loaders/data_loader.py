@@ -21,6 +21,12 @@ from api.kginsights.neo4j_connection_manager import neo4j_connection_manager
 from api.kginsights.neo4j_config import get_neo4j_connection_params
 from api.db_config import SessionLocal
 from api.models import Schema, GraphIngestionJob
+from api.kginsights.loaders.neo4j_loader import Neo4jLoader
+from api.kginsights.loaders.incremental_loader import (
+    DeltaPlan, apply_delta, diff_rows, file_fingerprint, read_snapshot, row_hashes, snapshot_path
+)
+from api.kgdata_loader.generate_neo4j_files import FrameSource
+from api.kgdata_loader.sharded_import_files import import_file_groups, write_sharded_import_files
 
 class DataLoader:
     """
@@ -36,7 +42,8 @@ class DataLoader:
         graph_name: str = "default",
         batch_size: int = 1000,
         drop_existing: bool = False,
-        job_id: str = None
+        job_id: str = None,
+        incremental: bool = False
     ):
         """
         Initialize the data loader.
@@ -46,9 +53,10 @@ class DataLoader:
             schema_data: Schema data (alternative to schema_id)
             data_path: Path to the CSV file
             graph_name: Name of the Neo4j graph to load data into
-            batch_size: Number of records to process in each batch (not used with neo4j-admin)
+            batch_size: Number of rows written per transaction by incremental loads (not used with neo4j-admin)
             drop_existing: Whether to drop existing data before loading
             job_id: ID of the job associated with this data loading operation
+            incremental: Apply only the changes since the last load instead of rebuilding the database
         """
         self.schema_id = schema_id
         self.schema_data = schema_data
@@ -57,6 +65,7 @@ class DataLoader:
         self.batch_size = batch_size
         self.drop_existing = drop_existing
         self.job_id = job_id
+        self.incremental = incremental
         self.logger = logging.getLogger(__name__)
         
         # Neo4j configuration (will be set during initialization)
@@ -71,6 +80,7 @@ class DataLoader:
         
         # Will be initialized during loading
         self.schema = None
+        self.snapshot_fingerprint = None
         
         # Status tracking
         self.status = {
@@ -82,6 +92,9 @@ class DataLoader:
             "constraints_created": 0,
             "indexes_created": 0,
             "records_processed": 0,
+            "load_mode": "full",
+            "delta": None,
+            "watermark": None,
             "errors": [],
             "warnings": []
         }
@@ -217,17 +230,12 @@ class DataLoader:
             
     async def _generate_neo4j_files(self) -> bool:
         """
-        Generate CSV files for Neo4j import using generate_neo4j_files.py.
+        Generate CSV files for Neo4j import using sharded_import_files.py.
         
         Returns:
             True if files generated successfully, False otherwise
         """
         try:
-            # Import the generate_neo4j_files module
-            import sys
-            sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-            from api.kgdata_loader.generate_neo4j_files import create_neo4j_import_files
-            
             # Create output directory for CSV files
             os.makedirs(self.temp_dir, exist_ok=True)
             
@@ -237,26 +245,26 @@ class DataLoader:
                 json.dump(self.schema, f)
             
             print(f"Generating Neo4j import files from {self.data_path} using schema {schema_path}")
-            # Generate CSV files
+            # Generate CSV files, sharded per label and relationship type
             start = time.time()
-            create_neo4j_import_files(schema_path, self.data_path, self.temp_dir)
+            write_sharded_import_files(schema_path, self.data_path, self.temp_dir)
             end = time.time()
             print(f"Generated CSV files in {end - start:.2f} seconds")
             
             # Verify files were created
-            node_files = [f for f in os.listdir(self.temp_dir) if f.endswith('_nodes.csv')]
-            rel_file = os.path.join(self.temp_dir, "relationships.csv")
+            node_groups, relationship_groups = import_file_groups(self.temp_dir)
             
-            if not node_files:
+            if not node_groups:
                 print("No node CSV files were generated")
                 self.status["errors"].append("No node CSV files were generated")
                 return False
                 
-            if not os.path.exists(rel_file):
+            if not relationship_groups:
                 print("Warning: No relationship CSV file was generated")
                 self.status["warnings"].append("No relationship CSV file was generated")
             
-            print(f"Generated {len(node_files)} node CSV files and relationship file")
+            print(f"Generated node CSV files for {len(node_groups)} labels and "
+                  f"{len(relationship_groups)} relationship CSV file groups")
             return True
         except Exception as e:
             print(f"Error generating Neo4j import files: {str(e)}")
@@ -393,16 +401,14 @@ class DataLoader:
                             "--multiline-fields", "true"
                         ]
                         
-                        # Add node files
-                        for file in os.listdir(self.neo4j_import_dir):
-                            if file.endswith('_nodes.csv'):
-                                node_label = file.replace('_nodes.csv', '')
-                                cmd.extend(["--nodes", f"{node_label}={os.path.join(self.neo4j_import_dir, file)}"])
+                        # Add node files, a header file and its shards as one comma-separated group
+                        node_groups, relationship_groups = import_file_groups(self.neo4j_import_dir)
+                        for node_label, files in node_groups:
+                            cmd.extend(["--nodes", f"{node_label}={','.join(files)}"])
                         
-                        # Add relationship file if it exists
-                        rel_file = os.path.join(self.neo4j_import_dir, "relationships.csv")
-                        if os.path.exists(rel_file):
-                            cmd.extend(["--relationships", rel_file])
+                        # Add relationship files if they exist
+                        for files in relationship_groups:
+                            cmd.extend(["--relationships", ','.join(files)])
                         
                         if self.drop_existing:
                             cmd.append("--force")
@@ -612,6 +618,160 @@ class DataLoader:
             return False
 
         
+    async def _load_full(self) -> bool:
+        """
+        Rebuild the database from the data file with neo4j-admin import.
+        
+        Returns:
+            True if the import succeeded, False otherwise
+        """
+        self.status["load_mode"] = "full"
+        
+        # Generate Neo4j import files
+        files_generated = await self._generate_neo4j_files()
+        if not files_generated:
+            return False
+        
+        # Run Neo4j import
+        import_successful = await self._run_neo4j_import()
+        if not import_successful:
+            return False
+            
+        # Start Neo4j to ensure the database is available
+        print("Starting Neo4j service to make the imported database available...")
+        neo4j_started = await self._start_neo4j()  # We continue even if start fails
+        
+        if not neo4j_started:
+            print("WARNING: Neo4j may not have started properly. You might need to start it manually.")
+            self.status["warnings"].append("Neo4j may not have started properly. Consider restarting it manually.")
+        return True
+        
+    def _find_baseline(self, db: SessionLocal) -> Optional[str]:
+        """
+        Find the snapshot of the data the graph currently holds.
+        
+        That is the snapshot of the latest completed job of this schema with a
+        watermark, provided the graph has not been cleaned since and the kept
+        copy still matches the recorded fingerprint.
+        
+        Args:
+            db: Database session
+            
+        Returns:
+            Path of the kept snapshot, or None if there is no usable baseline
+        """
+        if not self.schema_id:
+            return None
+        schema_record = db.query(Schema).filter(Schema.id == self.schema_id).first()
+        if not schema_record or schema_record.db_loaded != 'yes':
+            return None
+        
+        latest_job = db.query(GraphIngestionJob).filter(
+            GraphIngestionJob.schema_id == self.schema_id,
+            GraphIngestionJob.status == "completed"
+        ).order_by(GraphIngestionJob.completed_at.desc()).first()
+        if not latest_job or latest_job.job_type != "load_data" or not latest_job.snapshot_fingerprint:
+            return None
+        
+        path = snapshot_path(self.schema_id, self.graph_name, self.data_path)
+        if not path.exists() or file_fingerprint(str(path)) != latest_job.snapshot_fingerprint:
+            return None
+        print(f"Using snapshot loaded by job {latest_job.id} (watermark {latest_job.load_watermark}) as baseline")
+        return str(path)
+        
+    async def _load_incremental(self, db: SessionLocal) -> bool:
+        """
+        Apply the changes between the last loaded snapshot and the data file
+        to the running database, falling back to a full load when there is no
+        baseline or the schema cannot be loaded incrementally.
+        
+        Args:
+            db: Database session
+            
+        Returns:
+            True if the load succeeded, False otherwise
+        """
+        baseline = self._find_baseline(db)
+        if not baseline:
+            print("No baseline snapshot for an incremental load, running a full load")
+            self.status["warnings"].append("No baseline snapshot for an incremental load, ran a full load")
+            return await self._load_full()
+        
+        new_df = read_snapshot(self.data_path)
+        old_df = read_snapshot(baseline)
+        if list(new_df.columns) != list(old_df.columns):
+            print("Columns changed since the last load, running a full load")
+            self.status["warnings"].append("Columns changed since the last load, ran a full load")
+            return await self._load_full()
+        
+        new_source = FrameSource(new_df)
+        plan = DeltaPlan(self.schema, new_source)
+        if plan.unsupported:
+            print(f"Schema cannot be loaded incrementally ({'; '.join(plan.unsupported)}), running a full load")
+            self.status["warnings"].append(f"Schema cannot be loaded incrementally: {'; '.join(plan.unsupported)}")
+            return await self._load_full()
+        
+        start = time.time()
+        inserted_rows, deleted_rows = diff_rows(row_hashes(old_df), row_hashes(new_df))
+        print(f"Snapshot diff: {len(inserted_rows)} rows inserted, {len(deleted_rows)} rows deleted "
+              f"({len(new_df)} rows, {time.time() - start:.2f} seconds)")
+        self.status["load_mode"] = "incremental"
+        self.status["delta"] = {
+            "rows_inserted": int(len(inserted_rows)),
+            "rows_deleted": int(len(deleted_rows))
+        }
+        if not len(inserted_rows) and not len(deleted_rows):
+            return True
+        
+        loader = Neo4jLoader(graph_name=self.graph_name, batch_size=self.batch_size)
+        if not await loader.connect():
+            self.status["errors"].append(f"Failed to connect to Neo4j graph {self.graph_name}")
+            return False
+        try:
+            result = await apply_delta(
+                loader, plan, new_source,
+                FrameSource(new_df.iloc[inserted_rows]),
+                FrameSource(old_df.iloc[deleted_rows])
+            )
+        finally:
+            loader.close()
+        
+        self.status["delta"].update({key: value for key, value in result.items() if key != "errors"})
+        print(f"Applied delta in {time.time() - start:.2f} seconds: {self.status['delta']}")
+        if result["errors"]:
+            # The baseline is kept, so the next incremental load applies the whole delta again
+            self.status["errors"].extend(result["errors"])
+            return False
+        return True
+        
+    def _save_snapshot(self):
+        """Keep a copy of the loaded data file as the baseline of the next incremental load."""
+        if not self.schema_id:
+            return
+        try:
+            path = snapshot_path(self.schema_id, self.graph_name, self.data_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(self.data_path, path)
+            if file_fingerprint(str(path)) != self.snapshot_fingerprint:
+                # The data file changed while it was being loaded
+                path.unlink()
+                self.status["warnings"].append("Data file changed during the load, no incremental baseline was kept")
+                return
+            self.status["watermark"] = {
+                "load_watermark": datetime.fromtimestamp(os.path.getmtime(self.data_path)).isoformat(),
+                "snapshot_fingerprint": self.snapshot_fingerprint
+            }
+        except Exception as e:
+            print(f"Error keeping the loaded snapshot: {str(e)}")
+            self.status["warnings"].append(f"Error keeping the loaded snapshot: {str(e)}")
+            
+    def _record_watermark(self, job: GraphIngestionJob):
+        """Record the snapshot the graph was loaded up to on a completed job."""
+        watermark = self.status["watermark"]
+        if watermark:
+            job.load_watermark = datetime.fromisoformat(watermark["load_watermark"])
+            job.snapshot_fingerprint = watermark["snapshot_fingerprint"]
+        
     # The _initialize_loaders method has been removed as it's no longer needed with the neo4j-admin approach
             
     async def load_data(self, db: SessionLocal) -> Dict[str, Any]:
@@ -670,28 +830,21 @@ class DataLoader:
                 target = rel.get("target") or rel.get("endNode") or rel.get("to_node")
                 print(f"Relationship {idx+1}: {source}-[{rel_type}]->{target}")
             
-            # Generate Neo4j import files
+            # Fingerprint the data before loading it, to record which snapshot was loaded
             print(f"Starting data loading from {self.data_path}")
-            files_generated = await self._generate_neo4j_files()
-            if not files_generated:
-                self.status["status"] = "failed"
-                self.status["end_time"] = datetime.now().isoformat()
-                return self.status
+            self.snapshot_fingerprint = file_fingerprint(self.data_path)
             
-            # Run Neo4j import
-            import_successful = await self._run_neo4j_import()
-            if not import_successful:
+            if self.incremental and not self.drop_existing:
+                loaded = await self._load_incremental(db)
+            else:
+                loaded = await self._load_full()
+            if not loaded:
                 self.status["status"] = "failed"
                 self.status["end_time"] = datetime.now().isoformat()
                 return self.status
-                
-            # Start Neo4j to ensure the database is available
-            print("Starting Neo4j service to make the imported database available...")
-            neo4j_started = await self._start_neo4j()  # We continue even if start fails
             
-            if not neo4j_started:
-                print("WARNING: Neo4j may not have started properly. You might need to start it manually.")
-                self.status["warnings"].append("Neo4j may not have started properly. Consider restarting it manually.")
+            # Keep the loaded data as the baseline of the next incremental load
+            self._save_snapshot()
             
             # Get database statistics
             print("Inspecting database after data loading...")
@@ -702,6 +855,8 @@ class DataLoader:
             self.status["relationships_created"] = stats.get("relationship_count", 0)
             self.status["node_counts"] = stats.get("node_counts", {})
             self.status["relationship_counts"] = stats.get("relationship_counts", {})
+            if self.status["delta"]:
+                self.status["records_processed"] = self.status["delta"]["rows_inserted"] + self.status["delta"]["rows_deleted"]
             
             # Update the schema record in the database if data was loaded successfully
             if stats.get("has_data", False) and self.schema_id:
@@ -743,9 +898,12 @@ class DataLoader:
                                         job_result["node_counts"] = self.status["node_counts"]
                                     if "relationship_counts" in self.status:
                                         job_result["relationship_counts"] = self.status["relationship_counts"]
+                                    if self.status["delta"]:
+                                        job_result["delta"] = self.status["delta"]
                                         
                                     if job_result:
                                         job.result = json.dumps(job_result)
+                                    self._record_watermark(job)
                                     
                                     # Commit the job update immediately
                                     db.commit()
@@ -786,9 +944,12 @@ class DataLoader:
                                             job_result["node_counts"] = self.status["node_counts"]
                                         if "relationship_counts" in self.status:
                                             job_result["relationship_counts"] = self.status["relationship_counts"]
+                                        if self.status["delta"]:
+                                            job_result["delta"] = self.status["delta"]
                                             
                                         if job_result:
                                             job.result = json.dumps(job_result)
+                                        self._record_watermark(job)
                                     
                                     # Commit all job updates
                                     db.commit()
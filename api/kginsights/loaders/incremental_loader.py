@@ -0,0 +1,310 @@
+"""
+Incremental (delta) graph loading.
+
+A full load regenerates every import file and rebuilds the database with
+neo4j-admin import, which needs Neo4j to be stopped and restarted. An
+incremental load compares the new data snapshot with the snapshot of the
+previous load instead: every row is reduced to a 64-bit hash, rows whose
+hash only occurs in the new snapshot are inserted (or are the new version of
+an updated row) and rows whose hash only occurs in the old one are deleted
+(or are the old version). Nodes and relationships are extracted from just
+those rows with the rules used for the import files, and written with
+batched MERGE and DELETE transactions while the database stays online. A
+node or relationship of a deleted row is only deleted when no row of the new
+snapshot still produces it.
+
+The import does not store the generated node IDs, so nodes are matched on
+the property their IDs are taken from. Labels with composite or hashed IDs
+and JSON array columns cannot be matched that way; such schemas always get a
+full load.
+"""
+import copy
+import hashlib
+import os
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from api.kgdata_loader.generate_neo4j_files import (
+    FrameSource,
+    generate_node_ids,
+    property_columns,
+    resolve_property_types,
+)
+from .neo4j_loader import Neo4jLoader
+
+# Copies of the last loaded data file of each schema and graph
+SNAPSHOT_DIR = Path(os.getenv("GRAPH_SNAPSHOT_DIR", "runtime-data/output/graph-snapshots"))
+
+# Bytes hashed per step when fingerprinting a snapshot file
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Column suffixes that create_neo4j_import_files treats as JSON arrays of related nodes
+JSON_ARRAY_SUFFIXES = ('_Members', '_Array', '_List')
+
+# Format cast_value gives 'datetime' properties, which the import files declare as :datetime
+DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+
+def snapshot_path(schema_id: int, graph_name: str, data_path: str) -> Path:
+    """Where the last loaded data file of a schema and graph is kept."""
+    extension = os.path.splitext(data_path.lower())[1]
+    return SNAPSHOT_DIR / f"schema_{schema_id}_{graph_name}{extension}"
+
+
+def file_fingerprint(path: str) -> str:
+    """Hash of the contents of a file."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_snapshot(path: str) -> pd.DataFrame:
+    """Read a data file the way create_neo4j_import_files does."""
+    file_ext = os.path.splitext(path.lower())[1]
+    if file_ext == '.csv':
+        return pd.read_csv(path, low_memory=False, parse_dates=False)
+    if file_ext == '.parquet':
+        return pd.read_parquet(path).reset_index(drop=True)
+    if file_ext == '.json':
+        try:
+            return pd.read_json(path, lines=True)
+        except ValueError:
+            return pd.read_json(path)
+    raise ValueError(f"Unsupported file format: {file_ext}. Supported formats are .csv, .json, and .parquet")
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """64-bit hash of every row of a DataFrame."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def diff_rows(old_hashes: np.ndarray, new_hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions of the new rows missing from the old snapshot and of the old rows missing from the new one."""
+    inserted = np.flatnonzero(~np.isin(new_hashes, old_hashes))
+    deleted = np.flatnonzero(~np.isin(old_hashes, new_hashes))
+    return inserted, deleted
+
+
+def graph_value(value: Any, target_type: Optional[str] = None) -> Any:
+    """
+    Property value as the driver can store it, with the type the import files give it.
+
+    Maps and nested values become strings; 'date' and 'datetime' values,
+    which cast_value formats as strings, become Neo4j dates and datetimes.
+    """
+    if isinstance(value, dict) or (isinstance(value, list) and any(isinstance(item, (dict, list)) for item in value)):
+        return str(value)
+    if isinstance(value, str) and target_type in ('date', 'datetime'):
+        try:
+            if target_type == 'date':
+                return date.fromisoformat(value)
+            return datetime.strptime(value, DATETIME_FORMAT).replace(tzinfo=timezone.utc)
+        except ValueError:
+            return value
+    return value
+
+
+def node_key_column(node_schema: Dict[str, Any], columns: List[str]) -> Optional[str]:
+    """
+    Column generate_node_ids takes the IDs of a label from.
+
+    Returns None for composite IDs and for labels whose IDs are row hashes.
+    """
+    id_rule = node_schema.get('id_rule')
+    if id_rule:
+        if id_rule.get('type') == 'property':
+            prop_name = id_rule.get('property')
+            if prop_name and prop_name in columns:
+                return prop_name
+        elif id_rule.get('type') == 'composite':
+            return None
+
+    id_config = node_schema.get('id', {})
+    if id_config and 'property' in id_config and id_config['property'] in columns:
+        return id_config['property']
+
+    primary_prop = node_schema.get('primary_property')
+    if primary_prop and primary_prop in columns:
+        return primary_prop
+
+    for prop_name in node_schema.get('properties', {}).keys():
+        if prop_name in columns:
+            return prop_name
+
+    for id_name in ['id', 'ID', 'Id', 'name', 'Name', 'identifier', 'Identifier', 'key', 'Key']:
+        if id_name in columns:
+            return id_name
+
+    return next((col for col in columns if 'id' in col.lower()), None)
+
+
+class DeltaPlan:
+    """
+    How the nodes and relationships of a schema are extracted from rows and
+    matched in the graph.
+
+    Property types are resolved against the whole new snapshot, as the
+    import files resolve them against the whole data file.
+    """
+
+    def __init__(self, schema: Dict[str, Any], source: FrameSource):
+        self.schema = copy.deepcopy(schema)
+        self.columns = source.columns
+        self.unsupported = []
+        # label -> (node schema, property specs, index of the key property)
+        self.nodes = {}
+        # (relationship schema, start label, end label, property specs)
+        self.relationships = []
+
+        if self.schema.get('json_mappings'):
+            self.unsupported.append("schema maps JSON columns to nodes")
+        json_columns = [col for col in self.columns if col.endswith(JSON_ARRAY_SUFFIXES)]
+        if json_columns:
+            self.unsupported.append(f"columns {json_columns} may hold JSON arrays of nodes")
+
+        for node_schema in self.schema.get('nodes', []):
+            label = node_schema.get('label')
+            if not label:
+                continue
+            key_column = node_key_column(node_schema, self.columns)
+            specs = resolve_property_types(node_schema.get('properties', {}), source, f"{label}.")
+            key_index = next((i for i, spec in enumerate(specs) if spec[1] == key_column and not spec[3]), None)
+            if key_index is None:
+                self.unsupported.append(f"{label} nodes have no ID property to match them on")
+                continue
+            self.nodes[label] = (node_schema, specs, key_index)
+
+        for rel_schema in self.schema.get('relationships', []):
+            start_label = rel_schema.get('startNode', rel_schema.get('source'))
+            end_label = rel_schema.get('endNode', rel_schema.get('target'))
+            if start_label not in self.nodes or end_label not in self.nodes:
+                continue
+            specs = resolve_property_types(rel_schema.get('properties', {}), source, "relationship property ",
+                                           node_properties=False)
+            self.relationships.append((rel_schema, start_label, end_label, specs))
+
+    def key_property(self, label: str) -> str:
+        """Property the nodes of a label are matched on."""
+        _, specs, key_index = self.nodes[label]
+        return specs[key_index][0]
+
+    def node_rows(self, source: FrameSource, label: str, key_only: bool = False) -> Dict[Any, Dict[str, Any]]:
+        """Properties of each node of a label produced by the rows of source, by key; the first row of a key wins."""
+        node_schema, specs, key_index = self.nodes[label]
+        key_name = specs[key_index][0]
+        used = [specs[key_index]] if key_only else specs
+        names = [spec[0] for spec in used]
+        nodes = {}
+        for batch in source.batches():
+            rows = np.arange(batch.length)
+            node_ids = generate_node_ids(node_schema, batch, source.columns) if any(spec[3] for spec in used) else None
+            values = property_columns(used, batch, rows, source.columns, node_ids)
+            for i, key in enumerate(values[names.index(key_name)]):
+                key = graph_value(key, specs[key_index][2])
+                if key is None or key in nodes:
+                    continue
+                nodes[key] = {} if key_only else {
+                    spec[0]: graph_value(column[i], spec[2]) for spec, column in zip(used, values) if spec[0] != key_name
+                }
+        return nodes
+
+    def relationship_rows(self, source: FrameSource, index: int,
+                          key_only: bool = False) -> Dict[Tuple[Any, Any], Dict[str, Any]]:
+        """Properties of each relationship produced by the rows of source, by (start key, end key)."""
+        _, start_label, end_label, specs = self.relationships[index]
+        start_spec = self.nodes[start_label][1][self.nodes[start_label][2]]
+        end_spec = self.nodes[end_label][1][self.nodes[end_label][2]]
+        used = [start_spec, end_spec] + ([] if key_only else specs)
+        relationships = {}
+        for batch in source.batches():
+            values = property_columns(used, batch, np.arange(batch.length), source.columns)
+            for i, (start_key, end_key) in enumerate(zip(values[0], values[1])):
+                pair = (graph_value(start_key, start_spec[2]), graph_value(end_key, end_spec[2]))
+                if pair[0] is None or pair[1] is None or pair in relationships:
+                    continue
+                relationships[pair] = {} if key_only else {
+                    spec[0]: graph_value(column[i], spec[2]) for spec, column in zip(specs, values[2:])
+                }
+        return relationships
+
+
+async def apply_delta(loader: Neo4jLoader, plan: DeltaPlan, new_source: FrameSource,
+                      inserted: FrameSource, deleted: FrameSource) -> Dict[str, Any]:
+    """
+    Write the nodes and relationships of the inserted rows and remove those
+    only the deleted rows produced.
+
+    Stale relationships are deleted first, then stale nodes, then nodes and
+    relationships are merged, each in batched transactions.
+
+    Args:
+        loader: Connected Neo4jLoader
+        plan: DeltaPlan of the schema
+        new_source: The whole new snapshot
+        inserted: Rows only in the new snapshot
+        deleted: Rows only in the old snapshot
+
+    Returns:
+        Dict with the numbers of nodes and relationships merged (created or
+        updated) and deleted, and errors
+    """
+    result = {
+        "nodes_merged": 0,
+        "nodes_deleted": 0,
+        "relationships_merged": 0,
+        "relationships_deleted": 0,
+        "errors": []
+    }
+    key_properties = {label: plan.key_property(label) for label in plan.nodes}
+    constraints = await loader.create_constraints_and_indexes(plan.schema, key_properties)
+    result["errors"].extend(constraints["errors"])
+
+    def endpoints(index):
+        rel_schema, start_label, end_label, _ = plan.relationships[index]
+        return rel_schema['type'], start_label, key_properties[start_label], end_label, key_properties[end_label]
+
+    if deleted.num_rows:
+        for index in range(len(plan.relationships)):
+            stale = (plan.relationship_rows(deleted, index, key_only=True).keys()
+                     - plan.relationship_rows(new_source, index, key_only=True).keys())
+            if stale:
+                counts = await loader.delete_relationships(*endpoints(index), list(stale))
+                result["relationships_deleted"] += counts["relationships_deleted"]
+                result["errors"].extend(counts["errors"])
+
+        for label in plan.nodes:
+            stale = plan.node_rows(deleted, label, key_only=True).keys() - plan.node_rows(new_source, label, key_only=True).keys()
+            if stale:
+                counts = await loader.delete_nodes(label, key_properties[label], list(stale))
+                result["nodes_deleted"] += counts["nodes_deleted"]
+                result["relationships_deleted"] += counts["relationships_deleted"]
+                result["errors"].extend(counts["errors"])
+
+    if inserted.num_rows:
+        for label in plan.nodes:
+            nodes = plan.node_rows(inserted, label)
+            if nodes:
+                counts = await loader.merge_nodes(label, key_properties[label],
+                                                  [{"key": key, "props": props} for key, props in nodes.items()])
+                result["nodes_merged"] += len(nodes)
+                result["errors"].extend(counts["errors"])
+
+        for index in range(len(plan.relationships)):
+            relationships = plan.relationship_rows(inserted, index)
+            if relationships:
+                rel_type, start_label, start_key, end_label, end_key = endpoints(index)
+                counts = await loader.merge_relationships(
+                    rel_type, start_label, start_key, end_label, end_key,
+                    [{"source_id": source_id, "target_id": target_id, "props": props}
+                     for (source_id, target_id), props in relationships.items()]
+                )
+                result["relationships_merged"] += len(relationships)
+                result["errors"].extend(counts["errors"])
+
+    return result
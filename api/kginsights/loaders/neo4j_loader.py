@@ -4,13 +4,27 @@ This is a minimal implementation that maintains compatibility with existing code
 The actual loading is now handled by neo4j-admin import utility.
 """
 import os
+import re
 import json
+import asyncio
 import logging
 import traceback
 from typing import Dict, List, Any, Optional, Tuple
 from neo4j import GraphDatabase
 from ..neo4j_config import get_neo4j_connection_params
 
+# Rows sent per UNWIND statement in batch mode
+LOAD_BATCH_SIZE = int(os.getenv("NEO4J_LOAD_BATCH_SIZE", "10000"))
+
+# Sessions writing batches at the same time in batch mode
+LOAD_CONCURRENCY = int(os.getenv("NEO4J_LOAD_CONCURRENCY", "4"))
+
+
+def escape_name(name: str) -> str:
+    """Quote a label, relationship type or property name for use in Cypher."""
+    return "`" + str(name).replace("`", "``") + "`"
+
+
 class Neo4jLoader:
     """
     Minimal implementation of Neo4jLoader that maintains compatibility with existing code.
@@ -18,14 +32,19 @@ class Neo4jLoader:
     This class provides only the necessary methods for compatibility.
     """
     
-    def __init__(self, graph_name: str = "default"):
+    def __init__(self, graph_name: str = "default", batch_size: int = LOAD_BATCH_SIZE,
+                 concurrency: int = LOAD_CONCURRENCY):
         """
         Initialize the Neo4j loader.
         
         Args:
             graph_name: Name of the Neo4j graph to connect to
+            batch_size: Rows sent per statement when loading in batch mode
+            concurrency: Sessions writing batches at the same time in batch mode
         """
         self.graph_name = graph_name
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
         self.logger = logging.getLogger(__name__)
         self.driver = None
         self.connection_params = None
@@ -308,15 +327,48 @@ class Neo4jLoader:
         
         return cypher, params
         
-    async def create_constraints_and_indexes(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+    def _schema_id_properties(self, schema: Dict[str, Any]) -> Dict[str, str]:
         """
-        Skip creating constraints and indexes based on schema.
+        Get the ID property of each node label declared in the schema.
         
         Args:
             schema: The schema definition
             
         Returns:
-            Dict with results of constraint and index creation (always empty)
+            Dict mapping node labels to their ID property
+        """
+        id_properties = {}
+        for node in schema.get("nodes", []):
+            label = node.get("label")
+            id_def = node.get("id") if isinstance(node.get("id"), dict) else {}
+            id_rule = node.get("id_rule") if isinstance(node.get("id_rule"), dict) else {}
+            id_property = id_def.get("property") or id_rule.get("property") or node.get("primary_property")
+            if label and isinstance(id_property, str):
+                id_properties[label] = id_property
+        return id_properties
+        
+    async def create_constraints_and_indexes(
+        self, 
+        schema: Dict[str, Any],
+        id_properties: Optional[Dict[str, str]] = None,
+        unique: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Create a uniqueness constraint on the ID property of each node label.
+        
+        MERGE and MATCH on the ID property then use the constraint's index
+        instead of scanning the label. Where existing data already holds
+        duplicate IDs the constraint cannot be created, and a plain index is
+        created instead.
+        
+        Args:
+            schema: The schema definition
+            id_properties: Optional mapping of node labels to ID properties, taken from the schema if omitted
+            unique: Whether to try a uniqueness constraint first; False creates plain indexes only,
+                for properties that are matched on but not known to identify nodes
+            
+        Returns:
+            Dict with results of constraint and index creation
         """
         if not self.driver:
             raise ValueError("Neo4j driver not initialized. Call connect() first.")
@@ -327,37 +379,216 @@ class Neo4jLoader:
             "errors": []
         }
         
-        # Skip creating constraints and indexes as requested
-        print("Skipping creation of constraints and indexes as requested")
+        if id_properties is None:
+            id_properties = self._schema_id_properties(schema)
         
+        try:
+            with self.driver.session() as session:
+                for label, id_property in id_properties.items():
+                    name = re.sub(r"\W", "_", f"{label}_{id_property}")
+                    if unique:
+                        constraint_cypher = (
+                            f"CREATE CONSTRAINT {escape_name(name + '_unique')} IF NOT EXISTS "
+                            f"FOR (n:{escape_name(label)}) REQUIRE n.{escape_name(id_property)} IS UNIQUE"
+                        )
+                        try:
+                            summary = session.run(constraint_cypher).consume()
+                            result["constraints_created"] += summary.counters.constraints_added
+                            continue
+                        except Exception as e:
+                            print(f"Could not create unique constraint on {label}.{id_property}, creating an index instead: {str(e)}")
+                    
+                    index_cypher = (
+                        f"CREATE INDEX {escape_name(name + '_idx')} IF NOT EXISTS "
+                        f"FOR (n:{escape_name(label)}) ON (n.{escape_name(id_property)})"
+                    )
+                    try:
+                        summary = session.run(index_cypher).consume()
+                        result["indexes_created"] += summary.counters.indexes_added
+                    except Exception as e:
+                        error_msg = f"Error creating index on {label}.{id_property}: {str(e)}"
+                        print(error_msg)
+                        result["errors"].append(error_msg)
+        except Exception as e:
+            error_msg = f"Error creating constraints and indexes: {str(e)}"
+            print(error_msg)
+            print(traceback.format_exc())
+            result["errors"].append(error_msg)
+        
+        print(f"Created {result['constraints_created']} constraints and {result['indexes_created']} indexes")
         return result
         
-    async def load_nodes(
+    async def _write_batches(self, cypher: str, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run a parameterized UNWIND statement over rows in batches.
+        
+        The rows are split into batches of batch_size, each written in its
+        own transaction as the $rows parameter, by up to concurrency sessions
+        at once. Transient errors such as lock conflicts between sessions are
+        retried by the driver.
+        
+        Args:
+            cypher: Cypher statement starting with UNWIND $rows AS row
+            rows: Parameter maps, one per row
+            
+        Returns:
+            Dict with summed node and relationship counters and errors of failed batches
+        """
+        batches = [rows[i:i + self.batch_size] for i in range(0, len(rows), self.batch_size)]
+        workers = min(self.concurrency, len(batches))
+        
+        def write_batch(tx, batch):
+            return tx.run(cypher, rows=batch).consume().counters
+        
+        counter_names = ["nodes_created", "nodes_deleted", "relationships_created", "relationships_deleted"]
+        
+        def write(worker_batches):
+            counts = {name: 0 for name in counter_names}
+            counts["errors"] = []
+            with self.driver.session() as session:
+                for batch in worker_batches:
+                    try:
+                        counters = session.execute_write(write_batch, batch)
+                        for name in counter_names:
+                            counts[name] += getattr(counters, name)
+                    except Exception as e:
+                        counts["errors"].append(f"Error writing batch of {len(batch)} rows: {str(e)}")
+            return counts
+        
+        result = {name: 0 for name in counter_names}
+        result["errors"] = []
+        if not batches:
+            return result
+        worker_results = await asyncio.gather(
+            *(asyncio.to_thread(write, batches[i::workers]) for i in range(workers))
+        )
+        for counts in worker_results:
+            for name in counter_names:
+                result[name] += counts[name]
+            result["errors"].extend(counts["errors"])
+        return result
+        
+    async def merge_nodes(self, label: str, key_property: str, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Create or update nodes of a label in batches.
+        
+        Args:
+            label: Node label
+            key_property: Property the nodes are merged on
+            rows: One {"key": ..., "props": {...}} map per node; props replace the stored values
+            
+        Returns:
+            Dict with batch counters and errors
+        """
+        cypher = (
+            f"UNWIND $rows AS row "
+            f"MERGE (n:{escape_name(label)} {{{escape_name(key_property)}: row.key}}) "
+            f"SET n += row.props"
+        )
+        print(f"Merging {len(rows)} {label} nodes in batches of {self.batch_size}")
+        return await self._write_batches(cypher, rows)
+        
+    async def delete_nodes(self, label: str, key_property: str, keys: List[Any]) -> Dict[str, Any]:
+        """
+        Delete nodes of a label, with their relationships, in batches.
+        
+        Args:
+            label: Node label
+            key_property: Property the nodes are matched on
+            keys: Values of key_property of the nodes to delete
+            
+        Returns:
+            Dict with batch counters and errors
+        """
+        cypher = (
+            f"UNWIND $rows AS row "
+            f"MATCH (n:{escape_name(label)} {{{escape_name(key_property)}: row.key}}) "
+            f"DETACH DELETE n"
+        )
+        print(f"Deleting {len(keys)} {label} nodes in batches of {self.batch_size}")
+        return await self._write_batches(cypher, [{"key": key} for key in keys])
+        
+    async def merge_relationships(
         self, 
-        records: List[Dict[str, Any]], 
-        schema: Dict[str, Any],
-        column_mapping: Dict[str, Dict[str, Any]]
+        rel_type: str,
+        source_label: str,
+        source_key: str,
+        target_label: str,
+        target_key: str,
+        rows: List[Dict[str, Any]]
     ) -> Dict[str, Any]:
         """
-        Load nodes into Neo4j from CSV records.
+        Create or update relationships of a type between existing nodes in batches.
+        
+        Rows whose source or target node does not exist are skipped.
         
         Args:
-            records: List of records from CSV
-            schema: The schema definition
-            column_mapping: Mapping of CSV columns to node properties with metadata
+            rel_type: Type of relationship
+            source_label: Label of source node
+            source_key: Property source nodes are matched on
+            target_label: Label of target node
+            target_key: Property target nodes are matched on
+            rows: One {"source_id": ..., "target_id": ..., "props": {...}} map per relationship
             
         Returns:
-            Dict with results of node loading
+            Dict with batch counters and errors
         """
-        if not self.driver:
-            raise ValueError("Neo4j driver not initialized. Call connect() first.")
+        cypher = (
+            f"UNWIND $rows AS row "
+            f"MATCH (source:{escape_name(source_label)} {{{escape_name(source_key)}: row.source_id}}) "
+            f"MATCH (target:{escape_name(target_label)} {{{escape_name(target_key)}: row.target_id}}) "
+            f"MERGE (source)-[r:{escape_name(rel_type)}]->(target) "
+            f"SET r += row.props"
+        )
+        print(f"Merging {len(rows)} {source_label}-[{rel_type}]->{target_label} relationships in batches of {self.batch_size}")
+        return await self._write_batches(cypher, rows)
+        
+    async def delete_relationships(
+        self, 
+        rel_type: str,
+        source_label: str,
+        source_key: str,
+        target_label: str,
+        target_key: str,
+        pairs: List[Tuple[Any, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Delete every relationship of a type between the given node pairs in batches.
+        
+        Args:
+            rel_type: Type of relationship
+            source_label: Label of source node
+            source_key: Property source nodes are matched on
+            target_label: Label of target node
+            target_key: Property target nodes are matched on
+            pairs: (source key, target key) of each node pair
             
-        result = {
-            "nodes_created": 0,
-            "errors": []
-        }
+        Returns:
+            Dict with batch counters and errors
+        """
+        cypher = (
+            f"UNWIND $rows AS row "
+            f"MATCH (source:{escape_name(source_label)} {{{escape_name(source_key)}: row.source_id}})"
+            f"-[r:{escape_name(rel_type)}]->"
+            f"(target:{escape_name(target_label)} {{{escape_name(target_key)}: row.target_id}}) "
+            f"DELETE r"
+        )
+        print(f"Deleting {source_label}-[{rel_type}]->{target_label} relationships between {len(pairs)} node pairs")
+        return await self._write_batches(cypher, [{"source_id": source_id, "target_id": target_id} for source_id, target_id in pairs])
         
-        # Group columns by node label
+    def _group_node_columns(
+        self, 
+        column_mapping: Dict[str, Dict[str, Any]]
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, List[Dict[str, Any]]]]:
+        """
+        Group mapped CSV columns by node label.
+        
+        Args:
+            column_mapping: Mapping of CSV columns to node properties with metadata
+            
+        Returns:
+            Tuple of (properties by node label, likely ID properties by node label)
+        """
         node_properties = {}
         node_id_properties = {}
         
@@ -387,6 +618,41 @@ class Neo4jLoader:
                     "property": mapping.get("property", column)
                 })
         
+        return node_properties, node_id_properties
+        
+    async def load_nodes(
+        self, 
+        records: List[Dict[str, Any]], 
+        schema: Dict[str, Any],
+        column_mapping: Dict[str, Dict[str, Any]],
+        batch_mode: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Load nodes into Neo4j from CSV records.
+        
+        Args:
+            records: List of records from CSV
+            schema: The schema definition
+            column_mapping: Mapping of CSV columns to node properties with metadata
+            batch_mode: Write the nodes of each label with batched UNWIND statements
+            
+        Returns:
+            Dict with results of node loading
+        """
+        if not self.driver:
+            raise ValueError("Neo4j driver not initialized. Call connect() first.")
+            
+        if batch_mode:
+            return await self._load_nodes_batched(records, schema, column_mapping)
+            
+        result = {
+            "nodes_created": 0,
+            "errors": []
+        }
+        
+        # Group columns by node label
+        node_properties, node_id_properties = self._group_node_columns(column_mapping)
+        
         print(f"Node ID properties: {node_id_properties}")
         
         # Track unique nodes to avoid duplicates
@@ -659,11 +925,190 @@ class Neo4jLoader:
             
         return result
         
+    async def _load_nodes_batched(
+        self, 
+        records: List[Dict[str, Any]], 
+        schema: Dict[str, Any],
+        column_mapping: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Load nodes with one parameterized UNWIND ... MERGE statement per batch.
+        
+        Nodes are chosen as in load_nodes: one per distinct ID value for labels
+        with an ID column, otherwise one per distinct value of the label's
+        columns. A constraint or index on each label's merge key is created
+        first so MERGE does not scan the label.
+        
+        Args:
+            records: List of records from CSV
+            schema: The schema definition
+            column_mapping: Mapping of CSV columns to node properties with metadata
+            
+        Returns:
+            Dict with results of node loading
+        """
+        result = {
+            "nodes_created": 0,
+            "errors": []
+        }
+        
+        node_properties, node_id_properties = self._group_node_columns(column_mapping)
+        
+        # Property each label's nodes are merged on, with the rows to merge
+        merge_keys = {}
+        label_rows = {}
+        for node_label, properties in node_properties.items():
+            if node_id_properties.get(node_label):
+                id_property = node_id_properties[node_label][0]["property"]
+                id_column = node_id_properties[node_label][0]["csv_column"]
+                rows = {}
+                for record in records:
+                    value = record.get(id_column)
+                    if not value or str(value) in rows:
+                        continue
+                    node_props = {
+                        prop["property"]: record[prop["csv_column"]]
+                        for prop in properties
+                        if prop["csv_column"] in record and prop["property"] != id_property
+                    }
+                    rows[str(value)] = {"key": str(value), "props": node_props}
+            else:
+                id_property = properties[0]["property"]
+                rows = {}
+                for record in records:
+                    for prop in properties:
+                        value = record.get(prop["csv_column"])
+                        if value and value not in rows:
+                            rows[value] = {"key": value, "props": {}}
+            merge_keys[node_label] = id_property
+            label_rows[node_label] = list(rows.values())
+        
+        constraints = await self.create_constraints_and_indexes(schema, merge_keys)
+        result["errors"].extend(constraints["errors"])
+        
+        for node_label, rows in label_rows.items():
+            counts = await self.merge_nodes(node_label, merge_keys[node_label], rows)
+            result["nodes_created"] += counts["nodes_created"]
+            result["errors"].extend(f"Error creating nodes {node_label}: {error}" for error in counts["errors"])
+        
+        return result
+        
+    def _find_relationship_columns(
+        self, 
+        records: List[Dict[str, Any]], 
+        source_label: str,
+        rel_type: str,
+        target_label: str,
+        relationship_columns: Dict[str, Dict[str, str]]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Find the columns holding the source and target IDs of a relationship.
+        
+        Args:
+            records: List of records from CSV
+            source_label: Label of source node
+            rel_type: Type of relationship
+            target_label: Label of target node
+            relationship_columns: Columns found by _analyze_relationship_columns
+            
+        Returns:
+            Tuple of (source_column, target_column), either of which may be None
+        """
+        rel_key = f"{source_label}_{rel_type}_{target_label}"
+        source_col = None
+        target_col = None
+        
+        # Check if we have identified columns for this relationship
+        if rel_key in relationship_columns:
+            source_col = relationship_columns[rel_key].get("source_column")
+            target_col = relationship_columns[rel_key].get("target_column")
+        
+        # If not found, try to find columns by name patterns
+        if not source_col or not target_col:
+            # Try common naming patterns
+            for column in records[0].keys() if records else []:
+                col_lower = column.lower()
+                if source_label.lower() in col_lower and "id" in col_lower:
+                    source_col = column
+                elif target_label.lower() in col_lower and "id" in col_lower:
+                    target_col = column
+        
+        # If still not found, use any column that has the label name
+        if not source_col:
+            for column in records[0].keys() if records else []:
+                if source_label.lower() in column.lower():
+                    source_col = column
+                    break
+        
+        if not target_col:
+            for column in records[0].keys() if records else []:
+                if target_label.lower() in column.lower():
+                    target_col = column
+                    break
+        
+        return source_col, target_col
+        
+    def _find_match_property(self, session, label: str, column: str) -> Optional[str]:
+        """
+        Find the property to match existing nodes of a label on.
+        
+        Args:
+            session: Neo4j session
+            label: Node label
+            column: CSV column holding the node IDs
+            
+        Returns:
+            An ID-like property of a stored node, its first property, or None if there are no nodes
+        """
+        try:
+            props_result = session.run(f"MATCH (n:{label}) RETURN keys(n) as props LIMIT 1").single()
+            if props_result:
+                props = props_result["props"]
+                print(f"Available properties for {label}: {props}")
+                
+                # Try to find a suitable ID property
+                for prop in props:
+                    if prop.lower() in ['id', 'key', 'identifier', 'uuid', column.lower()]:
+                        return prop
+                
+                # If no ID-like property found, use the first property
+                if props:
+                    return props[0]
+        except Exception as e:
+            print(f"Error getting properties for {label}: {str(e)}")
+        return None
+        
+    def _relationship_properties(self, rel_def: Dict[str, Any], record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extract relationship properties from a record if defined in schema.
+        
+        Args:
+            rel_def: Relationship definition from schema
+            record: Record from CSV
+            
+        Returns:
+            Dict of relationship properties
+        """
+        rel_props = {}
+        if 'properties' in rel_def and rel_def['properties']:
+            for prop in rel_def['properties']:
+                # Check if property is defined as a dict with csv_column mapping
+                if isinstance(prop, dict) and 'csv_column' in prop and 'property' in prop:
+                    csv_col = prop['csv_column']
+                    prop_name = prop['property']
+                    if csv_col in record and record[csv_col] is not None:
+                        rel_props[prop_name] = record[csv_col]
+                # Or if it's a direct string property name that matches a column
+                elif isinstance(prop, str) and prop in record and record[prop] is not None:
+                    rel_props[prop] = record[prop]
+        return rel_props
+        
     async def load_relationships(
         self, 
         records: List[Dict[str, Any]], 
         schema: Dict[str, Any],
-        column_mapping: Optional[Dict[str, Dict[str, Any]]] = None
+        column_mapping: Optional[Dict[str, Dict[str, Any]]] = None,
+        batch_mode: bool = False
     ) -> Dict[str, Any]:
         """
         Load relationships into Neo4j from CSV records.
@@ -672,6 +1117,7 @@ class Neo4jLoader:
             records: List of records from CSV
             schema: The schema definition
             column_mapping: Optional mapping of CSV columns to node properties
+            batch_mode: Write the relationships of each type with batched UNWIND statements
             
         Returns:
             Dict with results of relationship loading
@@ -679,6 +1125,9 @@ class Neo4jLoader:
         if not self.driver:
             raise ValueError("Neo4j driver not initialized. Call connect() first.")
             
+        if batch_mode:
+            return await self._load_relationships_batched(records, schema)
+            
         result = {
             "relationships_created": 0,
             "errors": []
@@ -708,37 +1157,9 @@ class Neo4jLoader:
                     print(f"Processing relationship: {source_label}-[{rel_type}]->{target_label}")
                     
                     # Find columns that might represent this relationship
-                    rel_key = f"{source_label}_{rel_type}_{target_label}"
-                    source_col = None
-                    target_col = None
-                    
-                    # Check if we have identified columns for this relationship
-                    if rel_key in relationship_columns:
-                        source_col = relationship_columns[rel_key].get("source_column")
-                        target_col = relationship_columns[rel_key].get("target_column")
-                    
-                    # If not found, try to find columns by name patterns
-                    if not source_col or not target_col:
-                        # Try common naming patterns
-                        for column in records[0].keys() if records else []:
-                            col_lower = column.lower()
-                            if source_label.lower() in col_lower and "id" in col_lower:
-                                source_col = column
-                            elif target_label.lower() in col_lower and "id" in col_lower:
-                                target_col = column
-                    
-                    # If still not found, use any column that has the label name
-                    if not source_col:
-                        for column in records[0].keys() if records else []:
-                            if source_label.lower() in column.lower():
-                                source_col = column
-                                break
-                    
-                    if not target_col:
-                        for column in records[0].keys() if records else []:
-                            if target_label.lower() in column.lower():
-                                target_col = column
-                                break
+                    source_col, target_col = self._find_relationship_columns(
+                        records, source_label, rel_type, target_label, relationship_columns
+                    )
                     
                     print(f"Using columns: {source_col} -> {target_col} for relationship {rel_type}")
                     
@@ -750,56 +1171,10 @@ class Neo4jLoader:
                     # Process each record to create relationships
                     created_relationships = set()  # Track to avoid duplicates
                     
-                    # Determine the property names to use for matching nodes
-                    # First, try to find the most likely ID property for each node label
-                    source_prop_name = None
-                    target_prop_name = None
-                    
-                    # Get all properties for source and target node labels
-                    source_props_query = f"MATCH (n:{source_label}) RETURN keys(n) as props LIMIT 1"
-                    target_props_query = f"MATCH (n:{target_label}) RETURN keys(n) as props LIMIT 1"
-                    
-                    try:
-                        source_props_result = session.run(source_props_query).single()
-                        if source_props_result:
-                            source_props = source_props_result["props"]
-                            print(f"Available properties for {source_label}: {source_props}")
-                            
-                            # Try to find a suitable ID property
-                            for prop in source_props:
-                                if prop.lower() in ['id', 'key', 'identifier', 'uuid', source_col.lower()]:
-                                    source_prop_name = prop
-                                    break
-                            
-                            # If no ID-like property found, use the first property
-                            if not source_prop_name and source_props:
-                                source_prop_name = source_props[0]
-                    except Exception as e:
-                        print(f"Error getting properties for {source_label}: {str(e)}")
-                    
-                    try:
-                        target_props_result = session.run(target_props_query).single()
-                        if target_props_result:
-                            target_props = target_props_result["props"]
-                            print(f"Available properties for {target_label}: {target_props}")
-                            
-                            # Try to find a suitable ID property
-                            for prop in target_props:
-                                if prop.lower() in ['id', 'key', 'identifier', 'uuid', target_col.lower()]:
-                                    target_prop_name = prop
-                                    break
-                            
-                            # If no ID-like property found, use the first property
-                            if not target_prop_name and target_props:
-                                target_prop_name = target_props[0]
-                    except Exception as e:
-                        print(f"Error getting properties for {target_label}: {str(e)}")
-                    
-                    # If we couldn't determine property names from the database, use the column names
-                    if not source_prop_name:
-                        source_prop_name = source_col
-                    if not target_prop_name:
-                        target_prop_name = target_col
+                    # Determine the property names to use for matching nodes,
+                    # using the column names if the database has no nodes to look at
+                    source_prop_name = self._find_match_property(session, source_label, source_col) or source_col
+                    target_prop_name = self._find_match_property(session, target_label, target_col) or target_col
                     
                     print(f"Using property '{source_prop_name}' for {source_label} nodes")
                     print(f"Using property '{target_prop_name}' for {target_label} nodes")
@@ -873,18 +1248,7 @@ class Neo4jLoader:
                                 escaped_target_prop = f"`{target_prop_name}`" if " " in target_prop_name or "(" in target_prop_name or ")" in target_prop_name or "$" in target_prop_name or "%" in target_prop_name else target_prop_name
                                 
                                 # Extract relationship properties from the record if defined in schema
-                                rel_props = {}
-                                if 'properties' in rel_def and rel_def['properties']:
-                                    for prop in rel_def['properties']:
-                                        # Check if property is defined as a dict with csv_column mapping
-                                        if isinstance(prop, dict) and 'csv_column' in prop and 'property' in prop:
-                                            csv_col = prop['csv_column']
-                                            prop_name = prop['property']
-                                            if csv_col in record and record[csv_col] is not None:
-                                                rel_props[prop_name] = record[csv_col]
-                                        # Or if it's a direct string property name that matches a column
-                                        elif isinstance(prop, str) and prop in record and record[prop] is not None:
-                                            rel_props[prop] = record[prop]
+                                rel_props = self._relationship_properties(rel_def, record)
                                 
                                 # Build the Cypher query
                                 cypher = (
@@ -1020,6 +1384,106 @@ class Neo4jLoader:
             
         return result
         
+    async def _load_relationships_batched(
+        self, 
+        records: List[Dict[str, Any]], 
+        schema: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Load relationships with one parameterized UNWIND ... MERGE statement per batch.
+        
+        Columns and match properties are chosen as in load_relationships, and
+        each distinct (source ID, target ID) pair keeps the properties of its
+        first record. Rows whose nodes do not exist are skipped by the MATCH.
+        
+        Args:
+            records: List of records from CSV
+            schema: The schema definition
+            
+        Returns:
+            Dict with results of relationship loading
+        """
+        result = {
+            "relationships_created": 0,
+            "errors": []
+        }
+        
+        relationships = schema.get("relationships", [])
+        if not relationships:
+            return result
+            
+        relationship_columns = self._analyze_relationship_columns(records, relationships)
+        
+        # (relationship definition, source property, target property, rows) per relationship type
+        rel_batches = []
+        match_properties = {}
+        try:
+            with self.driver.session() as session:
+                for rel_def in relationships:
+                    rel_type = rel_def.get("type")
+                    source_label = rel_def.get("startNode") or rel_def.get("source")
+                    target_label = rel_def.get("endNode") or rel_def.get("target")
+                    
+                    if not all([rel_type, source_label, target_label]):
+                        print(f"Incomplete relationship definition: {rel_def}")
+                        continue
+                    
+                    source_col, target_col = self._find_relationship_columns(
+                        records, source_label, rel_type, target_label, relationship_columns
+                    )
+                    if not source_col or not target_col:
+                        print(f"Could not find suitable columns for relationship {rel_type}")
+                        continue
+                    
+                    source_prop_name = self._find_match_property(session, source_label, source_col) or source_col
+                    target_prop_name = self._find_match_property(session, target_label, target_col) or target_col
+                    match_properties.setdefault(source_label, source_prop_name)
+                    match_properties.setdefault(target_label, target_prop_name)
+                    
+                    rows = {}
+                    for record in records:
+                        source_id_value = record.get(source_col)
+                        target_id_value = record.get(target_col)
+                        if not source_id_value or not target_id_value:
+                            continue
+                        pair = (str(source_id_value), str(target_id_value))
+                        if pair not in rows:
+                            rows[pair] = {
+                                "source_id": pair[0],
+                                "target_id": pair[1],
+                                "props": self._relationship_properties(rel_def, record)
+                            }
+                    rel_batches.append((rel_def, source_prop_name, target_prop_name, list(rows.values())))
+        except Exception as e:
+            error_msg = f"Error in relationship loading: {str(e)}"
+            print(error_msg)
+            self.logger.exception(e)
+            result["errors"].append(error_msg)
+            return result
+        
+        # Match properties are guessed from existing nodes, so only the schema's ID properties get constraints
+        id_properties = self._schema_id_properties(schema)
+        for unique in (True, False):
+            properties = {
+                label: prop for label, prop in match_properties.items()
+                if (id_properties.get(label) == prop) == unique
+            }
+            if properties:
+                constraints = await self.create_constraints_and_indexes(schema, properties, unique=unique)
+                result["errors"].extend(constraints["errors"])
+        
+        for rel_def, source_prop_name, target_prop_name, rows in rel_batches:
+            rel_type = rel_def.get("type")
+            source_label = rel_def.get("startNode") or rel_def.get("source")
+            target_label = rel_def.get("endNode") or rel_def.get("target")
+            counts = await self.merge_relationships(
+                rel_type, source_label, source_prop_name, target_label, target_prop_name, rows
+            )
+            result["relationships_created"] += counts["relationships_created"]
+            result["errors"].extend(f"Error creating relationship {rel_type}: {error}" for error in counts["errors"])
+        
+        return result
+        
     def _analyze_relationship_columns(self, records: List[Dict[str, Any]], relationships: List[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
         """
         Analyze records to find columns that might represent relationships.
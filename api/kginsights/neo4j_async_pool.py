@@ -0,0 +1,252 @@
+"""
+Async Neo4j access for request handlers.
+
+Every database gets one AsyncDriver whose connection pool is sized from the
+graph's entry in neo4j.databases.json. Handlers lease a session from it with
+
+    async with neo4j_async_pool.session(graph_name) as session:
+        result = await session.run(query)
+
+which never blocks the event loop. Leases are bounded by the pool size, so a
+burst of requests waits for a free lease instead of failing on connection
+acquisition. Instead of pinging the database before each lease, a background
+task verifies the connectivity of every driver at a fixed interval and
+replaces a driver that fails; the driver itself re-checks connections that
+sat idle longer than the liveness timeout before reusing them.
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, Tuple
+
+from neo4j import AsyncGraphDatabase
+
+from .neo4j_config import get_neo4j_connection_params
+
+logger = logging.getLogger(__name__)
+
+# Default pool size per graph; neo4j.databases.json can set max_connection_pool_size per graph
+POOL_SIZE = int(os.getenv("NEO4J_POOL_SIZE", "50"))
+# Seconds a lease waits for a free session; the config key is connection_acquisition_timeout
+ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "30"))
+# Seconds between the background connectivity checks of the drivers
+LIVENESS_INTERVAL = float(os.getenv("NEO4J_LIVENESS_INTERVAL", "30"))
+# Connections idle for longer than this are checked by the driver before reuse
+LIVENESS_CHECK_TIMEOUT = float(os.getenv("NEO4J_LIVENESS_CHECK_TIMEOUT", "60"))
+
+
+class GraphPool:
+    """The driver of one database, the leases on it and their metrics."""
+
+    def __init__(self, graph_name: str, config: Dict[str, Any]):
+        self.graph_names = {graph_name}
+        self.uri = config.get("uri")
+        self.username = config.get("username")
+        self.password = config.get("password")
+        self.database = config.get("database")
+        self.size = int(config.get("max_connection_pool_size", POOL_SIZE))
+        self.acquisition_timeout = float(config.get("connection_acquisition_timeout", ACQUISITION_TIMEOUT))
+        self.driver = self._create_driver()
+        # Active leases of each driver; replaced drivers are closed once theirs end
+        self.driver_leases = {self.driver: 0}
+        self.leases = asyncio.Semaphore(self.size)
+        self.healthy = True
+        self.last_check = None
+        self.last_error = None
+        self.reconnects = 0
+        self.active = 0
+        self.total = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _create_driver(self):
+        return AsyncGraphDatabase.driver(
+            self.uri,
+            auth=(self.username, self.password),
+            max_connection_pool_size=self.size,
+            connection_acquisition_timeout=self.acquisition_timeout,
+            liveness_check_timeout=LIVENESS_CHECK_TIMEOUT
+        )
+
+    @property
+    def name(self) -> str:
+        return ", ".join(sorted(self.graph_names))
+
+    def lease_driver(self):
+        """The current driver, counted as leased until release_driver."""
+        self.driver_leases[self.driver] += 1
+        return self.driver
+
+    async def release_driver(self, driver) -> None:
+        self.driver_leases[driver] -= 1
+        if driver is not self.driver and not self.driver_leases[driver]:
+            await self._close_driver(driver)
+
+    async def _close_driver(self, driver) -> None:
+        del self.driver_leases[driver]
+        try:
+            await driver.close()
+        except Exception as e:
+            logger.debug(f"Error closing Neo4j driver of graph '{self.name}': {str(e)}")
+
+    async def check(self) -> bool:
+        """Verify connectivity, replacing the driver when the graph stops responding."""
+        self.last_check = time.time()
+        try:
+            await self.driver.verify_connectivity()
+            self.healthy = True
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            if self.healthy:
+                logger.warning(f"Neo4j graph '{self.name}' at {self.uri} failed its liveness check: {str(e)}")
+                self.healthy = False
+                await self.reconnect()
+        return self.healthy
+
+    async def reconnect(self, password: Optional[str] = None) -> None:
+        """
+        Replace the driver. New leases get the new driver; the old one is
+        closed when the leases holding sessions on it have ended.
+        """
+        if password is not None:
+            self.password = password
+        old_driver = self.driver
+        self.driver = self._create_driver()
+        self.driver_leases[self.driver] = 0
+        self.reconnects += 1
+        if not self.driver_leases[old_driver]:
+            await self._close_driver(old_driver)
+
+    async def close(self) -> None:
+        for driver in list(self.driver_leases):
+            await self._close_driver(driver)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "graph_names": sorted(self.graph_names),
+            "uri": self.uri,
+            "database": self.database,
+            "pool_size": self.size,
+            "healthy": self.healthy,
+            "last_check": self.last_check,
+            "last_error": self.last_error,
+            "reconnects": self.reconnects,
+            "draining_drivers": len(self.driver_leases) - 1,
+            "active_leases": self.active,
+            "total_leases": self.total,
+            "lease_errors": self.errors,
+            "lease_timeouts": self.timeouts,
+            "avg_wait_ms": round(1000 * self.wait_seconds / self.total, 3) if self.total else 0.0,
+            "max_wait_ms": round(1000 * self.max_wait_seconds, 3)
+        }
+
+
+class Neo4jAsyncPool:
+    """
+    Async drivers by database, with background liveness checks.
+
+    Pools are keyed by URI, username and database rather than graph name,
+    as graph names are resolved from more than one configuration file.
+    """
+
+    def __init__(self):
+        self._pools: Dict[Tuple[Any, Any, Any], GraphPool] = {}
+        self._lock = None
+        self._liveness_task = None
+
+    async def _get_pool(self, graph_name: str, config: Optional[Dict[str, Any]]) -> GraphPool:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if config is None:
+                config = get_neo4j_connection_params(graph_name)
+            key = (config.get("uri"), config.get("username"), config.get("database"))
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = GraphPool(graph_name, config)
+                self._pools[key] = pool
+                logger.info(f"Created async Neo4j pool of {pool.size} connections for graph '{graph_name}' at {pool.uri}")
+            elif pool.password != config.get("password"):
+                # The password of the database changed
+                await pool.reconnect(config.get("password"))
+            pool.graph_names.add(graph_name)
+            if self._liveness_task is None or self._liveness_task.done():
+                self._liveness_task = asyncio.create_task(self._check_liveness())
+            return pool
+
+    @asynccontextmanager
+    async def session(self, graph_name: str = "default_graph", config: Optional[Dict[str, Any]] = None, **session_args):
+        """
+        Lease an AsyncSession on a graph.
+
+        Args:
+            graph_name: Graph in neo4j.databases.json
+            config: Connection parameters to use instead of the graph's configuration
+            session_args: Further arguments of AsyncDriver.session
+
+        Raises:
+            TimeoutError: If no lease becomes free within the acquisition timeout
+        """
+        pool = await self._get_pool(graph_name, config)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(pool.leases.acquire(), timeout=pool.acquisition_timeout)
+        except asyncio.TimeoutError:
+            pool.timeouts += 1
+            raise TimeoutError(f"No Neo4j session free for graph '{graph_name}' after {pool.acquisition_timeout}s")
+        waited = time.perf_counter() - start
+        pool.total += 1
+        pool.wait_seconds += waited
+        pool.max_wait_seconds = max(pool.max_wait_seconds, waited)
+        pool.active += 1
+        driver = pool.lease_driver()
+        try:
+            if pool.database and "database" not in session_args:
+                session_args["database"] = pool.database
+            async with driver.session(**session_args) as session:
+                yield session
+        except Exception:
+            pool.errors += 1
+            raise
+        finally:
+            pool.active -= 1
+            pool.leases.release()
+            await pool.release_driver(driver)
+
+    async def _check_liveness(self) -> None:
+        while True:
+            await asyncio.sleep(LIVENESS_INTERVAL)
+            for pool in list(self._pools.values()):
+                try:
+                    await pool.check()
+                except Exception as e:
+                    logger.error(f"Error checking Neo4j graph '{pool.name}': {str(e)}")
+
+    async def check(self, graph_name: str = "default_graph") -> bool:
+        """Check a graph's connectivity now, e.g. after Neo4j was restarted."""
+        return await (await self._get_pool(graph_name, None)).check()
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Pool metrics by URI and database."""
+        return {f"{pool.uri}/{pool.database}": pool.metrics() for pool in self._pools.values()}
+
+    async def close(self) -> None:
+        """Stop the liveness checks and close all drivers."""
+        if self._liveness_task is not None:
+            self._liveness_task.cancel()
+            self._liveness_task = None
+        for pool in list(self._pools.values()):
+            try:
+                await pool.close()
+            except Exception as e:
+                logger.error(f"Error closing Neo4j drivers of graph '{pool.name}': {str(e)}")
+        self._pools = {}
+
+
+# Shared by all request handlers
+neo4j_async_pool = Neo4jAsyncPool()
@@ -8,6 +8,10 @@ import subprocess
 from typing import Dict, Any, Optional
 from neo4j import GraphDatabase
 import threading
+import traceback
+
+# Connections idle for longer than this many seconds are checked by the driver before reuse
+LIVENESS_CHECK_TIMEOUT = float(os.getenv("NEO4J_LIVENESS_CHECK_TIMEOUT", "60"))
 
 class Neo4jConnectionManager:
     """
@@ -34,7 +38,10 @@ class Neo4jConnectionManager:
     def get_driver(self, uri: str, username: str, password: str) -> Any:
         """
         Get a Neo4j driver for the given connection parameters.
-        Will create a new driver if one doesn't exist or if connections need refreshing.
+        Will create a new driver if one doesn't exist or if connections were refreshed.
+        
+        The driver is not pinged here: it checks connections that were idle
+        for longer than the liveness check timeout before reusing them.
         
         Args:
             uri: Neo4j URI
@@ -46,22 +53,11 @@ class Neo4jConnectionManager:
         """
         connection_key = f"{uri}:{username}"
         
-        # If we have a driver and it's still valid, return it
         if connection_key in self._drivers:
-            driver = self._drivers[connection_key]
-            try:
-                # Test the connection with a simple query
-                with driver.session() as session:
-                    result = session.run("RETURN 1 as test")
-                    test_value = result.single()["test"]
-                    if test_value == 1:
-                        return driver
-            except Exception:
-                # Connection failed, we'll create a new one
-                self._close_driver(connection_key)
+            return self._drivers[connection_key]
         
         # Create a new driver
-        driver = GraphDatabase.driver(uri, auth=(username, password))
+        driver = GraphDatabase.driver(uri, auth=(username, password), liveness_check_timeout=LIVENESS_CHECK_TIMEOUT)
         self._drivers[connection_key] = driver
         return driver
     
@@ -16,6 +16,7 @@ from .graphschemaapi import load_data_from_schema as graphschema_load_data
 from .neo4j_config import get_neo4j_connection_params
 from ..db_config import SessionLocal
 from ..kgdatainsights.agent.schema_aware_agent import remove_schema_aware_assistant
+from ..kgdatainsights.graph_catalog import graph_catalog
 
 
 async def generate_prompts_async(schema_id: int):
@@ -77,6 +78,7 @@ class LoadDataRequest(BaseModel):
     drop_existing: bool = False
     batch_size: int = 1000
     dataset_type: Optional[str] = None  # Optional parameter to specify the dataset type (source/transformed)
+    incremental: bool = False  # Apply only the changes since the last load while the database stays online
 
 class CleanDataRequest(BaseModel):
     schema_id: int
@@ -156,7 +158,8 @@ def format_job_response(job: GraphIngestionJob) -> JobStatus:
     )
 
 # Background task for processing Neo4j data loading
-async def process_load_data_job(job_id: str, schema_id: int, graph_name: str, drop_existing: bool, dataset_type: str = None, db: Session = None):
+async def process_load_data_job(job_id: str, schema_id: int, graph_name: str, drop_existing: bool, dataset_type: str = None, db: Session = None,
+                                incremental: bool = False, batch_size: int = 1000):
     """
     Background task to load data into Neo4j
     """
@@ -191,7 +194,9 @@ async def process_load_data_job(job_id: str, schema_id: int, graph_name: str, dr
                 dataset_type=dataset_type,  # Pass the dataset_type parameter
                 db=task_db,  # Pass the new session
                 current_user=None,  # We're in a background task, no user context
-                job_id=job_id  # Pass the job_id to track the specific job
+                job_id=job_id,  # Pass the job_id to track the specific job
+                incremental=incremental,
+                batch_size=batch_size
             )
             
             print(f"Data loading result: {result}")
@@ -383,6 +388,9 @@ async def process_clean_data_job(job_id: str, schema_id: int, graph_name: str, d
                 task_db.commit()
                 print(f"DEBUG: Job status updated to completed in task_db connection")
                 
+                # The cached catalog of the graph no longer matches it
+                graph_catalog.invalidate(graph_name)
+                
                 # Update schema record to indicate data has been cleaned
                 schema_db = db.query(Schema).filter(Schema.id == schema_id).first()
                 if schema_db:
@@ -474,7 +482,8 @@ async def load_data_to_neo4j(
         {
             "graph_name": request.graph_name,
             "drop_existing": request.drop_existing,
-            "batch_size": request.batch_size
+            "batch_size": request.batch_size,
+            "incremental": request.incremental
         }
     )
     
@@ -489,7 +498,9 @@ async def load_data_to_neo4j(
         graph_name=request.graph_name,
         drop_existing=request.drop_existing,
         dataset_type=request.dataset_type,
-        db=db
+        db=db,
+        incremental=request.incremental,
+        batch_size=request.batch_size
     )
     
     return format_job_response(job)
@@ -4,11 +4,10 @@ from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 from datetime import datetime
 import json
-from neo4j import GraphDatabase
 
 from ..models import get_db, Schema, GraphIngestionJob, User
 from ..auth import has_any_permission
-from .neo4j_connection_manager import neo4j_connection_manager
+from .neo4j_async_pool import neo4j_async_pool
 from .neo4j_config import get_neo4j_connection_params
 
 # Models
@@ -29,7 +28,7 @@ class SchemaStatus(BaseModel):
 router = APIRouter(prefix="/kginsights/schema-status", tags=["schema_status"])
 
 # Helper functions
-def get_neo4j_stats(schema_id: int, db: Session):
+async def get_neo4j_stats(schema_id: int, db: Session):
     """
     Get statistics about the schema's data in Neo4j
     """
@@ -86,17 +85,8 @@ def get_neo4j_stats(schema_id: int, db: Session):
         total_nodes = 0
         total_relationships = 0
         
-        # Force refresh connections before getting stats to ensure we have the latest data
-        neo4j_connection_manager.refresh_connections()
-        
-        # Get a fresh connection from the connection manager
-        driver = neo4j_connection_manager.get_driver(uri, username, password)
         try:
-            # Verify connection is working with a simple query
-            with driver.session() as session:
-                session.run("RETURN 1 as test").single()
-                
-            with driver.session() as session:
+            async with neo4j_async_pool.session(graph_name, connection_params) as session:
                 # Count nodes for each node type
                 for node_type in schema_data.get("nodes", []):
                     label = node_type.get("label", "")
@@ -105,8 +95,8 @@ def get_neo4j_stats(schema_id: int, db: Session):
                     
                     query = f"MATCH (n:{label}) RETURN count(n) as count"
                     try:
-                        result = session.run(query)
-                        count = result.single()["count"]
+                        result = await session.run(query)
+                        count = (await result.single())["count"]
                         node_counts[label] = count
                         total_nodes += count
                     except Exception as query_error:
@@ -124,8 +114,8 @@ def get_neo4j_stats(schema_id: int, db: Session):
                     
                     query = f"MATCH (:{start_node})-[r:{rel_label}]->(:{end_node}) RETURN count(r) as count"
                     try:
-                        result = session.run(query)
-                        count = result.single()["count"]
+                        result = await session.run(query)
+                        count = (await result.single())["count"]
                         relationship_counts[f"{start_node}-{rel_label}->{end_node}"] = count
                         total_relationships += count
                     except Exception as query_error:
@@ -139,8 +129,6 @@ def get_neo4j_stats(schema_id: int, db: Session):
                 "relationship_count": 0,
                 "error": f"Neo4j connection error: {str(conn_error)}"
             }
-        finally:
-            driver.close()
             
         # Debug output removed to reduce log verbosity
         # print(f"Total nodes: {total_nodes}")
@@ -208,6 +196,15 @@ def get_last_successful_job(schema_id: int, db: Session):
     return job.updated_at if job else None
 
 # API Routes
+@router.get("/neo4j/pool-metrics")
+async def get_neo4j_pool_metrics(
+    current_user: User = Depends(has_any_permission(["kginsights:read"]))
+):
+    """
+    Get the health and lease metrics of the async Neo4j pool of each database
+    """
+    return neo4j_async_pool.metrics()
+
 @router.get("/{schema_id}", response_model=SchemaStatus)
 async def get_schema_status(
     schema_id: int,
@@ -222,7 +219,7 @@ async def get_schema_status(
         raise HTTPException(status_code=404, detail=f"Schema with ID {schema_id} not found")
     
     # Get Neo4j stats directly from the database
-    neo4j_stats = get_neo4j_stats(schema_id, db)
+    neo4j_stats = await get_neo4j_stats(schema_id, db)
     
     # Get active jobs
     active_jobs = get_schema_jobs(schema_id, db)
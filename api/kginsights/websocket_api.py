@@ -22,25 +22,23 @@ except ImportError:
     LINGUISTIC_CHECKS_AVAILABLE = False
     logging.warning("Language checking libraries not available. Install with: pip install language-tool-python pyspellchecker")
 
-# Import Neo4j schema helper functions
+# Neo4j schema metadata is served from the cached graph catalog, so autocomplete does not query Neo4j
 try:
     # First try relative import (most reliable)
-    from ..kgdatainsights.neo4j_schema_helper import (
-        get_neo4j_node_labels,
-        get_neo4j_relationship_types,
-        get_neo4j_property_keys
-    )
+    from ..kgdatainsights.graph_catalog import graph_catalog
+    get_neo4j_node_labels = graph_catalog.node_labels
+    get_neo4j_relationship_types = graph_catalog.relationship_types
+    get_neo4j_property_keys = graph_catalog.property_keys
 except ImportError as e:
-    logger.error(f"Failed to import neo4j_schema_helper with relative import: {e}")
+    logger.error(f"Failed to import graph_catalog with relative import: {e}")
     try:
         # Try absolute import as fallback
-        from api.kgdatainsights.neo4j_schema_helper import (
-            get_neo4j_node_labels,
-            get_neo4j_relationship_types,
-            get_neo4j_property_keys
-        )
+        from api.kgdatainsights.graph_catalog import graph_catalog
+        get_neo4j_node_labels = graph_catalog.node_labels
+        get_neo4j_relationship_types = graph_catalog.relationship_types
+        get_neo4j_property_keys = graph_catalog.property_keys
     except ImportError as e:
-        logger.error(f"Failed to import neo4j_schema_helper with absolute import: {e}")
+        logger.error(f"Failed to import graph_catalog with absolute import: {e}")
         # Define stub functions for graceful degradation
         async def get_neo4j_node_labels():
             logger.warning("Using stub node labels due to import failure")
@@ -435,7 +433,7 @@ async def websocket_endpoint(
                     # Initialize suggestions list
                     suggestions = []
                     
-                    # Get node labels from Neo4j schema
+                    # Get node labels and relationship types from the graph catalog
                     try:
                         node_labels = await get_neo4j_node_labels()
                         relationship_types = await get_neo4j_relationship_types()
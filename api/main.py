@@ -39,7 +39,7 @@ from api.kginsights import router as kginsights_router
 from api.kgdatainsights.data_insights_api import router as kgdatainsights_router, get_query_history, get_predefined_queries
 from api.kginsights.graphschemaapi import router as graphschema_router, build_schema_from_source, SourceIdInput, SchemaResult
 from api.kginsights.websocket_api import router as websocket_router
-from api.profiler import router as profiler_router
+from api.profiler.router import router as profiler_router
 from api.datapuur_ai import router as datapuur_ai_router
 from api.admin import router as admin_router
 from api.gen_ai_layer.router import router as gen_ai_router
@@ -191,6 +191,30 @@ async def startup_event():
     # Initialize the database
     init_db()
     
+    # Add indexed file_id/uploaded_by columns to ingestion jobs created by older versions
+    try:
+        from api.migrations.add_ingestion_job_columns import run_migration as migrate_ingestion_jobs
+        from api.db_config import engine as db_engine
+        migrate_ingestion_jobs(db_engine)
+    except Exception as e:
+        print(f"Error migrating ingestion_jobs table: {str(e)}")
+    
+    # Add the profile cache fingerprint columns to profiles stored by older versions
+    try:
+        from api.migrations.add_profile_fingerprint_columns import run_migration as migrate_profile_results
+        from api.db_config import engine as db_engine
+        migrate_profile_results(db_engine)
+    except Exception as e:
+        print(f"Error migrating profile_results table: {str(e)}")
+    
+    # Add the incremental load watermark columns to graph jobs created by older versions
+    try:
+        from api.migrations.add_graph_job_watermark_columns import run_migration as migrate_graph_jobs
+        from api.db_config import engine as db_engine
+        migrate_graph_jobs(db_engine)
+    except Exception as e:
+        print(f"Error migrating graph_ingestion_jobs table: {str(e)}")
+    
     db = next(get_db())
     
     # Create default users if they don't exist
@@ -215,6 +239,14 @@ async def startup_event():
     except Exception as e:
         print(f"Error updating role permissions: {str(e)}")
     
+    # Re-queue DataPuur ingestion jobs interrupted by a restart
+    try:
+        from api.datapuur import resume_queued_ingestion_jobs
+        resumed = resume_queued_ingestion_jobs()
+        print(f"Re-queued {resumed} interrupted ingestion jobs")
+    except Exception as e:
+        print(f"Error resuming ingestion jobs: {str(e)}")
+    
     # Initialize query suggestion cache
     try:
         import asyncio
@@ -273,6 +305,18 @@ async def startup_event():
         print(f"Error initializing schema-aware agents: {str(e)}")
         # Non-fatal error - continue application startup
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Stop the DataPuur ingestion worker pool; unfinished jobs are re-queued on the next startup
+    from api.datapuur_engine import get_ingestion_scheduler
+    get_ingestion_scheduler().shutdown(wait=False)
+    # Stop the profiling process pool
+    from api.profiler.services.parallel import shutdown_executor
+    shutdown_executor(wait=False)
+    # Close the async Neo4j drivers and stop their liveness checks
+    from api.kginsights.neo4j_async_pool import neo4j_async_pool
+    await neo4j_async_pool.close()
+
 # Mount static files after all API routes are registered
 # Mount static files directory if it exists
 static_dir = Path(__file__).parent / "static"
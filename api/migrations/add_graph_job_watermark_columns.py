@@ -0,0 +1,45 @@
+"""
+Migration script to add load_watermark and snapshot_fingerprint columns to the graph_ingestion_jobs table.
+
+Incremental graph loads diff the new data snapshot against the snapshot of
+the last completed load, which is found through these columns. Jobs stored
+before the columns existed have neither, so the next incremental load of
+their schema falls back to a full load. The migration is idempotent and runs
+at application startup; it can also be run manually.
+"""
+import os
+import sys
+import logging
+from sqlalchemy import create_engine, text, inspect
+
+# Add parent directory to path to import from api modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(os.path.dirname(current_dir)))
+
+from api.db_config import SQLALCHEMY_DATABASE_URL, connect_args
+
+logger = logging.getLogger(__name__)
+
+
+def run_migration(engine=None):
+    """
+    Add load_watermark and snapshot_fingerprint columns to graph_ingestion_jobs
+    """
+    engine = engine or create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args)
+    inspector = inspect(engine)
+    if not inspector.has_table("graph_ingestion_jobs"):
+        logger.info("graph_ingestion_jobs table does not exist yet, nothing to migrate")
+        return
+
+    columns = [col['name'] for col in inspector.get_columns('graph_ingestion_jobs')]
+
+    with engine.begin() as conn:
+        for column, column_type in (("load_watermark", "TIMESTAMP"), ("snapshot_fingerprint", "VARCHAR")):
+            if column not in columns:
+                logger.info(f"Adding {column} column to graph_ingestion_jobs table")
+                conn.execute(text(f"ALTER TABLE graph_ingestion_jobs ADD COLUMN {column} {column_type}"))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    run_migration()
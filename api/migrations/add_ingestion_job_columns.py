@@ -0,0 +1,91 @@
+"""
+Migration script to add file_id and uploaded_by columns to the ingestion_jobs table.
+
+Both values used to live only inside the JSON config (or in uploaded_files),
+which forced the sources listing to parse every job and look files up one by
+one. The migration adds the indexed columns and backfills them from existing
+rows. It is idempotent and runs at application startup; it can also be run
+manually.
+"""
+import os
+import sys
+import json
+import logging
+from sqlalchemy import create_engine, text, inspect
+
+# Add parent directory to path to import from api modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(os.path.dirname(current_dir)))
+
+from api.db_config import SQLALCHEMY_DATABASE_URL, connect_args
+
+logger = logging.getLogger(__name__)
+
+# Rows updated per transaction while backfilling
+BACKFILL_BATCH_SIZE = 1000
+
+
+def run_migration(engine=None):
+    """
+    Add file_id and uploaded_by columns plus their indexes to ingestion_jobs and backfill them
+    """
+    engine = engine or create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args)
+    inspector = inspect(engine)
+    if not inspector.has_table("ingestion_jobs"):
+        logger.info("ingestion_jobs table does not exist yet, nothing to migrate")
+        return
+
+    columns = [col['name'] for col in inspector.get_columns('ingestion_jobs')]
+    indexes = [index['name'] for index in inspector.get_indexes('ingestion_jobs')]
+
+    with engine.begin() as conn:
+        for column in ("file_id", "uploaded_by"):
+            if column not in columns:
+                logger.info(f"Adding {column} column to ingestion_jobs table")
+                conn.execute(text(f"ALTER TABLE ingestion_jobs ADD COLUMN {column} VARCHAR"))
+        for name, ddl in (
+            ("ix_ingestion_jobs_file_id", "CREATE INDEX ix_ingestion_jobs_file_id ON ingestion_jobs (file_id)"),
+            ("ix_ingestion_jobs_uploaded_by", "CREATE INDEX ix_ingestion_jobs_uploaded_by ON ingestion_jobs (uploaded_by)"),
+            ("idx_ingestion_jobs_status_start_time",
+             "CREATE INDEX idx_ingestion_jobs_status_start_time ON ingestion_jobs (status, start_time)"),
+        ):
+            if name not in indexes:
+                logger.info(f"Creating index {name}")
+                conn.execute(text(ddl))
+
+    backfill(engine)
+
+
+def backfill(engine):
+    """Fill file_id and uploaded_by for jobs created before the columns existed"""
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT id, config FROM ingestion_jobs "
+            "WHERE file_id IS NULL AND uploaded_by IS NULL AND config IS NOT NULL"
+        )).fetchall()
+        file_owners = dict(conn.execute(text("SELECT id, uploaded_by FROM uploaded_files")).fetchall())
+
+    updates = []
+    for job_id, config in rows:
+        try:
+            config_data = json.loads(config) if config else {}
+        except json.JSONDecodeError:
+            config_data = {}
+        file_id = config_data.get("file_id")
+        uploaded_by = file_owners.get(file_id) or config_data.get("username")
+        if file_id or uploaded_by:
+            updates.append({"id": job_id, "file_id": file_id, "uploaded_by": uploaded_by})
+
+    for start in range(0, len(updates), BACKFILL_BATCH_SIZE):
+        with engine.begin() as conn:
+            conn.execute(text(
+                "UPDATE ingestion_jobs SET file_id = :file_id, uploaded_by = :uploaded_by WHERE id = :id"
+            ), updates[start:start + BACKFILL_BATCH_SIZE])
+
+    if updates:
+        logger.info(f"Backfilled file_id/uploaded_by for {len(updates)} ingestion jobs")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    run_migration()
@@ -0,0 +1,49 @@
+"""
+Migration script to add fingerprint and column_fingerprints columns to the profile_results table.
+
+The profile cache looks stored profiles up by the fingerprint of the profiled
+Parquet file and reuses column profiles by column fingerprint. Profiles
+stored before the columns existed have neither and are simply not reused.
+The migration is idempotent and runs at application startup; it can also be
+run manually.
+"""
+import os
+import sys
+import logging
+from sqlalchemy import create_engine, text, inspect
+
+# Add parent directory to path to import from api modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(os.path.dirname(current_dir)))
+
+from api.db_config import SQLALCHEMY_DATABASE_URL, connect_args
+
+logger = logging.getLogger(__name__)
+
+
+def run_migration(engine=None):
+    """
+    Add fingerprint (indexed) and column_fingerprints columns to profile_results
+    """
+    engine = engine or create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args)
+    inspector = inspect(engine)
+    if not inspector.has_table("profile_results"):
+        logger.info("profile_results table does not exist yet, nothing to migrate")
+        return
+
+    columns = [col['name'] for col in inspector.get_columns('profile_results')]
+    indexes = [index['name'] for index in inspector.get_indexes('profile_results')]
+
+    with engine.begin() as conn:
+        for column, column_type in (("fingerprint", "VARCHAR"), ("column_fingerprints", "JSON")):
+            if column not in columns:
+                logger.info(f"Adding {column} column to profile_results table")
+                conn.execute(text(f"ALTER TABLE profile_results ADD COLUMN {column} {column_type}"))
+        if "ix_profile_results_fingerprint" not in indexes:
+            logger.info("Creating index ix_profile_results_fingerprint")
+            conn.execute(text("CREATE INDEX ix_profile_results_fingerprint ON profile_results (fingerprint)"))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    run_migration()
@@ -124,6 +124,13 @@ class IngestionJob(Base):
     error = Column(Text, nullable=True)
     duration = Column(String, nullable=True)
     config = Column(Text, nullable=True)  # Store config as JSON string
+    file_id = Column(String, nullable=True, index=True)  # UploadedFile.id of the source/output file
+    uploaded_by = Column(String, nullable=True, index=True)  # User who started the ingestion
+
+    # Sources listing filters on status and pages by start_time
+    __table_args__ = (
+        Index('idx_ingestion_jobs_status_start_time', 'status', 'start_time'),
+    )
 
 class Schema(Base):
     __tablename__ = "schemas"
@@ -165,6 +172,8 @@ class GraphIngestionJob(Base):
     node_count = Column(Integer, default=0)  # Count of nodes created during job execution
     relationship_count = Column(Integer, default=0)  # Count of relationships created during job execution
     result = Column(Text, nullable=True)  # Store detailed job results as JSON string
+    load_watermark = Column(DateTime, nullable=True)  # Modification time of the data snapshot the graph was loaded up to
+    snapshot_fingerprint = Column(String, nullable=True)  # Content hash of that snapshot, the baseline of incremental loads
 
     # Relationship to Schema
     schema = relationship("Schema", backref="graph_jobs")
@@ -1,12 +1,9 @@
 """
 Data Profiler API package.
 This package contains all profiling-related API endpoints.
-"""
-
-from fastapi import APIRouter
 
-# Import the router directly from router.py
-from .router import router
-
-# No need to include it in another router - this is the main router
-# that will be used in main.py
+The router is imported from api.profiler.router rather than re-exported
+here: profiling worker processes import api.profiler.services, and
+importing the router would pull in auth and its database setup in every
+worker.
+"""
@@ -26,6 +26,8 @@ class ProfileResult(Base):
     exact_duplicates_count = Column(Integer, default=0)  # Number of exact duplicate rows
     fuzzy_duplicates_count = Column(Integer, default=0)  # Number of fuzzy/similar rows
     duplicate_groups = Column(JSON, nullable=True)  # Store groups of duplicates as JSON
+    fingerprint = Column(String, nullable=True, index=True)  # Dataset fingerprint of the profiled file and options
+    column_fingerprints = Column(JSON, nullable=True)  # Content fingerprint by column name
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
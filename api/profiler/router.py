@@ -8,6 +8,7 @@ from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 import pandas as pd
 import numpy as np
+import pyarrow.parquet as pq
 from typing import Dict, Any, List, Optional, Union
 import os
 import uuid
@@ -26,11 +27,19 @@ import gc
 from concurrent.futures import ThreadPoolExecutor
 from starlette.concurrency import run_in_threadpool
 
-from ..models import User, get_db
+from ..models import User, get_db, SessionLocal
 from ..auth import has_permission, log_activity, has_any_permission
 from .models import ProfileResult, ColumnProfile
 from .schemas.profile import ProfileRequest, ProfileResponse, ProfileListResponse, ProfileSummaryResponse
-from .services.engine import DataProfiler
+from .services.cache import (
+    column_fingerprints,
+    dataset_fingerprint,
+    find_cached_profile,
+    profile_parquet_incremental,
+    reusable_column_profiles,
+)
+from .services.duplicates import find_exact_duplicates
+from .services.near_duplicates import find_near_duplicates
 from pathlib import Path  # Import Path for directory handling
 
 # Set up logging
@@ -86,6 +95,28 @@ def convert_numpy_types(obj: Any) -> Any:
     else:
         return obj
 
+def cached_profile_response(profile_result: ProfileResult) -> Dict[str, Any]:
+    """Response of /profile-data for a stored profile"""
+    column_profiles = profile_result.column_profiles or {}
+    if isinstance(column_profiles, list):
+        column_profiles = {col["column_name"]: col for col in column_profiles
+                           if isinstance(col, dict) and "column_name" in col}
+    return convert_numpy_types({
+        "id": profile_result.id,
+        "file_id": profile_result.file_id,
+        "file_name": profile_result.file_name,
+        "total_rows": profile_result.total_rows,
+        "total_columns": profile_result.total_columns,
+        "data_quality_score": profile_result.data_quality_score,
+        "column_names": list(column_profiles),
+        "original_headers": list(column_profiles),
+        "columns": column_profiles,
+        "created_at": profile_result.created_at,
+        "exact_duplicates_count": profile_result.exact_duplicates_count,
+        "fuzzy_duplicates_count": profile_result.fuzzy_duplicates_count,
+        "duplicate_groups": profile_result.duplicate_groups
+    })
+
 @router.post("/profile-data", response_model=ProfileResponse)
 async def profile_data(
     request: ProfileRequest,
@@ -160,6 +191,48 @@ async def profile_data(
         
         logger.info(f"[{request_id}] Parquet file found, size: {os.path.getsize(parquet_path)} bytes")
         
+        # Return the stored profile if this file was already profiled with the same options
+        cache_file_id = request.file_id
+        if not cache_file_id or cache_file_id.strip() == "":
+            cache_file_id = str(request.file_path)
+            if cache_file_id.endswith(".parquet"):
+                cache_file_id = os.path.splitext(cache_file_id)[0]
+        try:
+            fingerprint = await run_in_threadpool(dataset_fingerprint, parquet_path)
+        except Exception as fingerprint_error:
+            logger.warning(f"[{request_id}] Could not fingerprint {parquet_path}: {str(fingerprint_error)}")
+            fingerprint = None
+        cached_profile = find_cached_profile(db, fingerprint, cache_file_id) if fingerprint else None
+        if cached_profile:
+            if cached_profile.file_id != cache_file_id or cached_profile.file_name != request.file_name:
+                # Same data under another file: store a copy so it is listed for this file too
+                cached_profile = ProfileResult(
+                    id=str(uuid.uuid4()),
+                    file_id=cache_file_id,
+                    file_name=request.file_name,
+                    parquet_file_path=str(request.file_path),
+                    total_rows=cached_profile.total_rows,
+                    total_columns=cached_profile.total_columns,
+                    data_quality_score=cached_profile.data_quality_score,
+                    column_profiles=cached_profile.column_profiles,
+                    exact_duplicates_count=cached_profile.exact_duplicates_count,
+                    fuzzy_duplicates_count=cached_profile.fuzzy_duplicates_count,
+                    duplicate_groups=cached_profile.duplicate_groups,
+                    fingerprint=cached_profile.fingerprint,
+                    column_fingerprints=cached_profile.column_fingerprints
+                )
+                db.add(cached_profile)
+                db.commit()
+            log_activity(
+                db=db,
+                username=current_user.username,
+                action="Data Profile",
+                details=f"Returned stored profile for {request.file_name} (file_id: {cached_profile.file_id})"
+            )
+            logger.info(f"[{request_id}] Returning stored profile {cached_profile.id} for fingerprint {fingerprint} "
+                        f"in {time.time() - start_time:.2f} seconds")
+            return cached_profile_response(cached_profile)
+        
         try:
             logger.debug(f"[{request_id}] Attempting to read parquet file")
             # Check file size to determine if we need to use chunked processing
@@ -194,8 +267,7 @@ async def profile_data(
                     column_profiles={},  # Will be updated when processing completes
                     exact_duplicates_count=0,
                     fuzzy_duplicates_count=0,
-                    duplicate_groups={"exact": [], "fuzzy": []},
-                    status="processing"
+                    duplicate_groups={"exact": [], "fuzzy": []}
                 )
                 db.add(profile_result)
                 db.commit()
@@ -208,7 +280,8 @@ async def profile_data(
                     file_id=request.file_id,
                     file_name=request.file_name,
                     file_path=request.file_path,
-                    username=current_user.username
+                    username=current_user.username,
+                    fingerprint=fingerprint
                 )
                 
                 # Return initial response with processing status
@@ -223,11 +296,10 @@ async def profile_data(
                     "columns": []
                 }
             
-            # For smaller files, process synchronously
-            df = pd.read_parquet(parquet_path)
-            logger.info(f"[{request_id}] Successfully read parquet file with shape: {df.shape}")
-            logger.debug(f"[{request_id}] DataFrame columns: {df.columns.tolist()}")
-            logger.debug(f"[{request_id}] DataFrame sample: {df.head(2).to_dict()}")
+            # For smaller files, process synchronously; only the footer is needed up front
+            metadata = pq.ParquetFile(parquet_path).metadata
+            logger.info(f"[{request_id}] Successfully read parquet footer: {metadata.num_rows} rows, "
+                        f"{metadata.num_columns} columns")
         except Exception as read_error:
             logger.error(f"[{request_id}] Error reading parquet file: {str(read_error)}")
             raise HTTPException(
@@ -240,10 +312,13 @@ async def profile_data(
             logger.info(f"[{request_id}] Starting profile generation")
             profile_start = time.time()
             
-            # Determine memory limit based on file size (use 2x file size or 1GB, whichever is larger)
-            memory_limit_mb = max(1000, int(file_size_mb * 2))
-            profiler = DataProfiler(df, max_memory_mb=memory_limit_mb)
-            profile_summary, column_profiles = profiler.generate_profile()
+            # Profile every column in a single pass over the Parquet record batches, sharded by
+            # row group across the profiling process pool for large files. Columns whose content
+            # matches a column of a stored profile reuse that column profile.
+            fingerprints = await run_in_threadpool(column_fingerprints, parquet_path)
+            reused_columns = reusable_column_profiles(db, fingerprints)
+            profile_summary, column_profiles = await run_in_threadpool(
+                profile_parquet_incremental, parquet_path, reused_columns)
             
             # Detect exact and fuzzy duplicates
             logger.info(f"[{request_id}] Starting duplicate detection")
@@ -251,12 +326,12 @@ async def profile_data(
                 # Track time for duplicate detection
                 dup_start = time.time()
                 
-                # Detect exact duplicates (much faster operation)
-                exact_duplicates = profiler.detect_exact_duplicates()
+                # Count exact duplicates over every row by hashing the Parquet record batches
+                exact_duplicates = await run_in_threadpool(find_exact_duplicates, parquet_path)
                 profile_summary["exact_duplicates_count"] = exact_duplicates["count"]
                 
-                # Detect fuzzy duplicates (more intensive operation)
-                fuzzy_duplicates = profiler.detect_fuzzy_duplicates(threshold=0.9)
+                # Find near duplicates over every row with MinHash/LSH
+                fuzzy_duplicates = await run_in_threadpool(find_near_duplicates, parquet_path)
                 profile_summary["fuzzy_duplicates_count"] = fuzzy_duplicates["count"]
                 
                 # Create duplicate groups dictionary for storage
@@ -347,7 +422,9 @@ async def profile_data(
                 column_profiles=column_profiles_json,  # Store column profiles as JSON
                 exact_duplicates_count=profile_summary["exact_duplicates_count"],
                 fuzzy_duplicates_count=profile_summary["fuzzy_duplicates_count"],
-                duplicate_groups=duplicate_groups
+                duplicate_groups=duplicate_groups,
+                fingerprint=fingerprint,
+                column_fingerprints=fingerprints
             )
             
             # Verify file_id is populated
@@ -1000,7 +1077,8 @@ async def process_large_file_profile(
     file_id: str,
     file_name: str,
     file_path: str,
-    username: str
+    username: str,
+    fingerprint: Optional[str] = None
 ):
     """
     Process a large file profile in the background.
@@ -1008,15 +1086,7 @@ async def process_large_file_profile(
     """
     logger.info(f"Starting background processing for profile {profile_id}, file {file_name}")
     
-    # Create a new database session for this background task
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import sessionmaker
-    from ..models import Base
-    
-    # Get database URL from environment or use default
-    database_url = os.environ.get("DATABASE_URL", "sqlite:///./api/data.db")
-    engine = create_engine(database_url)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # Use a session of the application's connection pool for this background task
     db = SessionLocal()
     
     # If file_id is not provided or empty, use the parquet_file_path as file_id
@@ -1028,11 +1098,11 @@ async def process_large_file_profile(
         logger.info(f"Empty file_id detected, using parquet_file_path without extension as file_id: {file_id}")
     
     try:
-        # Read the parquet file
+        # Read the parquet footer
         start_time = time.time()
-        logger.info(f"Reading parquet file for background processing: {parquet_path}")
-        df = pd.read_parquet(parquet_path)
-        logger.info(f"Successfully read parquet file with shape: {df.shape}")
+        logger.info(f"Reading parquet footer for background processing: {parquet_path}")
+        metadata = pq.ParquetFile(parquet_path).metadata
+        logger.info(f"Successfully read parquet footer: {metadata.num_rows} rows, {metadata.num_columns} columns")
         
         # Get the profile result from the database
         profile_result = db.query(ProfileResult).filter(ProfileResult.id == profile_id).first()
@@ -1041,33 +1111,26 @@ async def process_large_file_profile(
             return
         
         # Update initial metadata
-        profile_result.total_rows = len(df)
-        profile_result.total_columns = len(df.columns)
+        profile_result.total_rows = metadata.num_rows
+        profile_result.total_columns = metadata.num_columns
         db.commit()
         
-        # Process the profile with optimized memory usage
-        file_size_mb = os.path.getsize(parquet_path) / (1024 * 1024)
-        memory_limit_mb = max(1000, int(file_size_mb * 2))
-        
-        logger.info(f"Starting profile generation with memory limit {memory_limit_mb} MB")
-        profiler = DataProfiler(df, max_memory_mb=memory_limit_mb)
+        # Generate profile in a single pass over the Parquet record batches, sharded by row
+        # group across the profiling process pool, reusing the profiles of unchanged columns
+        logger.info("Starting profile generation")
+        fingerprints = await run_in_threadpool(column_fingerprints, parquet_path)
+        reused_columns = reusable_column_profiles(db, fingerprints)
+        profile_summary, column_profiles = await run_in_threadpool(
+            profile_parquet_incremental, parquet_path, reused_columns)
+        column_profiles = convert_numpy_types(column_profiles)
         
-        # Generate profile
-        profile_summary, column_profiles = profiler.generate_profile()
-        
-        # Process duplicates with sampling to avoid memory issues
+        # Count exact and near duplicates over every row
         try:
             logger.info(f"Starting duplicate detection for profile {profile_id}")
-            exact_duplicates = profiler.detect_exact_duplicates(sample_size=min(50000, len(df)))
+            exact_duplicates = await run_in_threadpool(find_exact_duplicates, parquet_path)
             profile_summary["exact_duplicates_count"] = exact_duplicates["count"]
             
-            # For very large files, skip fuzzy duplicate detection or use aggressive sampling
-            if len(df) > 1000000:  # 1M+ rows
-                logger.info(f"Skipping fuzzy duplicate detection for very large file")
-                fuzzy_duplicates = {"count": 0, "values": []}
-            else:
-                fuzzy_duplicates = profiler.detect_fuzzy_duplicates(threshold=0.9, sample_size=min(1000, len(df)))
-            
+            fuzzy_duplicates = await run_in_threadpool(find_near_duplicates, parquet_path)
             profile_summary["fuzzy_duplicates_count"] = fuzzy_duplicates["count"]
             
             duplicate_groups = {
@@ -1088,6 +1151,9 @@ async def process_large_file_profile(
         profile_result.exact_duplicates_count = profile_summary["exact_duplicates_count"]
         profile_result.fuzzy_duplicates_count = profile_summary["fuzzy_duplicates_count"]
         profile_result.duplicate_groups = duplicate_groups
+        profile_result.column_fingerprints = fingerprints
+        # Set last: a profile with a fingerprint is complete and can be returned from the cache
+        profile_result.fingerprint = fingerprint
         
         # Ensure file_id is populated - if not, use parquet_file_path without extension
         if not profile_result.file_id or profile_result.file_id.strip() == "":
@@ -1121,8 +1187,6 @@ async def process_large_file_profile(
         logger.info(f"Background profile generation completed in {duration:.2f} seconds")
         
         # Clean up memory
-        del df
-        del profiler
         gc.collect()
         
     except Exception as e:
@@ -0,0 +1,205 @@
+"""
+Profile cache keyed by Parquet file fingerprints.
+
+A dataset fingerprint hashes the file size, modification time and Parquet
+footer together with the profiler options, so a repeat request for an
+unchanged file can return the stored ProfileResult without reading any data.
+
+When a file has no stored profile, column fingerprints decide what has to
+be profiled: each hashes the compressed bytes of one column's chunks (plus
+its type and the row group sizes). Columns whose fingerprint matches a
+column of a recently stored profile, such as the untouched columns of a
+transformed dataset, reuse that column profile; only the others are read.
+Row-level results (duplicates) are always computed over the whole file.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pyarrow.parquet as pq
+from sqlalchemy.orm import Session
+
+from ..models import ProfileResult
+from .duplicates import DUPLICATE_SAMPLE_GROUPS
+from .near_duplicates import MINHASH_PERMUTATIONS, NEAR_DUPLICATE_SAMPLE_GROUPS, NEAR_DUPLICATE_THRESHOLD
+from .parallel import profile_parquet_parallel
+from .streaming import read_column_types, summarize_profiles, visible_columns
+
+logger = logging.getLogger("profiler.cache")
+
+# Bump when the shape or meaning of stored profiles changes
+PROFILE_CACHE_VERSION = 1
+
+# Recent profiles searched for column profiles to reuse
+PROFILE_CACHE_SCAN = int(os.getenv("PROFILER_CACHE_SCAN", "50"))
+
+# Bytes hashed per step when fingerprinting column chunks
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+PARQUET_MAGIC = b"PAR1"
+
+
+def profile_options() -> Dict[str, Any]:
+    """Profiler settings that change the stored profile of a dataset"""
+    return {
+        "version": PROFILE_CACHE_VERSION,
+        "exact_sample_groups": DUPLICATE_SAMPLE_GROUPS,
+        "fuzzy_threshold": NEAR_DUPLICATE_THRESHOLD,
+        "fuzzy_permutations": MINHASH_PERMUTATIONS,
+        "fuzzy_sample_groups": NEAR_DUPLICATE_SAMPLE_GROUPS,
+    }
+
+
+def _read_footer(path: Union[str, Path]) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(-8, os.SEEK_END)
+        tail = f.read(8)
+        if tail[4:] != PARQUET_MAGIC:
+            raise ValueError(f"{path} is not a Parquet file")
+        footer_length = int.from_bytes(tail[:4], "little")
+        f.seek(-8 - footer_length, os.SEEK_END)
+        return f.read(footer_length)
+
+
+def dataset_fingerprint(path: Union[str, Path], options: Optional[Dict[str, Any]] = None) -> str:
+    """Fingerprint of a Parquet file and the profiler options, read from the file footer only"""
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps({
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "options": options if options is not None else profile_options(),
+    }, sort_keys=True).encode())
+    digest.update(_read_footer(path))
+    return digest.hexdigest()
+
+
+def column_fingerprints(path: Union[str, Path]) -> Dict[str, str]:
+    """
+    Fingerprint of every visible column of a Parquet file.
+
+    Hashes the compressed bytes of the column's chunks, which are read once
+    through a memory map. Equal fingerprints mean the column holds the same
+    values in the same row groups, whatever else the files contain.
+    """
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    metadata = parquet_file.metadata
+    schema = parquet_file.schema_arrow
+    digests = {}
+    for name in visible_columns(schema):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{PROFILE_CACHE_VERSION}:{schema.field(name).type}".encode())
+        digests[name] = digest
+    # Nested columns are stored as several leaf columns
+    leaf_names = [metadata.schema.column(i).path.split(".")[0] for i in range(metadata.num_columns)]
+
+    if metadata.num_rows:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            view = memoryview(data)
+            try:
+                for row_group_index in range(metadata.num_row_groups):
+                    row_group = metadata.row_group(row_group_index)
+                    for leaf, name in enumerate(leaf_names):
+                        if name not in digests:
+                            continue
+                        chunk = row_group.column(leaf)
+                        start = (chunk.dictionary_page_offset
+                                 if chunk.has_dictionary_page and chunk.dictionary_page_offset
+                                 else chunk.data_page_offset)
+                        end = start + chunk.total_compressed_size
+                        digest = digests[name]
+                        digest.update(row_group.num_rows.to_bytes(8, "little"))
+                        for offset in range(start, end, HASH_BLOCK_SIZE):
+                            digest.update(view[offset:min(offset + HASH_BLOCK_SIZE, end)])
+            finally:
+                view.release()
+    return {name: digest.hexdigest() for name, digest in digests.items()}
+
+
+def find_cached_profile(db: Session, fingerprint: str, file_id: Optional[str] = None) -> Optional[ProfileResult]:
+    """Latest completed profile of a dataset fingerprint, preferring one stored for file_id"""
+    profiles = (
+        db.query(ProfileResult)
+        .filter(ProfileResult.fingerprint == fingerprint)
+        .order_by(ProfileResult.created_at.desc())
+        .all()
+    )
+    for profile in profiles:
+        if profile.file_id == file_id:
+            return profile
+    return profiles[0] if profiles else None
+
+
+def reusable_column_profiles(db: Session, fingerprints: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Column profiles of recently stored profiles whose column fingerprints match.
+
+    Args:
+        db: Database session
+        fingerprints: Column fingerprint by column name of the dataset being profiled
+
+    Returns:
+        dict: Column profile by column name, for the columns that can be reused
+    """
+    wanted: Dict[str, List[str]] = {}
+    for name, fingerprint in fingerprints.items():
+        wanted.setdefault(fingerprint, []).append(name)
+
+    # (profile id, stored column name) each of our columns can be copied from
+    sources: Dict[str, Tuple[str, str]] = {}
+    recent = (
+        db.query(ProfileResult.id, ProfileResult.column_fingerprints)
+        .filter(ProfileResult.column_fingerprints.isnot(None))
+        .order_by(ProfileResult.created_at.desc())
+        .limit(PROFILE_CACHE_SCAN)
+        .all()
+    )
+    for profile_id, stored in recent:
+        for stored_name, fingerprint in (stored or {}).items():
+            for name in wanted.get(fingerprint, []):
+                sources.setdefault(name, (profile_id, stored_name))
+    if not sources:
+        return {}
+
+    profile_ids = {profile_id for profile_id, _ in sources.values()}
+    stored_profiles = dict(
+        db.query(ProfileResult.id, ProfileResult.column_profiles)
+        .filter(ProfileResult.id.in_(profile_ids))
+        .all()
+    )
+    reused = {}
+    for name, (profile_id, stored_name) in sources.items():
+        column_profile = (stored_profiles.get(profile_id) or {}).get(stored_name)
+        if isinstance(column_profile, dict):
+            reused[name] = {**column_profile, "column_name": name}
+    return reused
+
+
+def profile_parquet_incremental(path: Union[str, Path],
+                                reused: Optional[Dict[str, Dict[str, Any]]] = None) -> Tuple[Dict, Dict]:
+    """
+    Profile a Parquet file, taking the given column profiles as they are.
+
+    Args:
+        path: Parquet file
+        reused: Column profiles by column name that do not need to be recomputed
+
+    Returns:
+        tuple: (profile_summary, column_profiles) as returned by DataProfiler.generate_profile
+    """
+    reused = reused or {}
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    columns = visible_columns(parquet_file.schema_arrow)
+    missing = [name for name in columns if name not in reused]
+    profiled = {}
+    if missing:
+        _, profiled = profile_parquet_parallel(path, read_column_types(path, missing))
+    if reused:
+        logger.info(f"Reused {len(columns) - len(missing)} of {len(columns)} column profiles for {path}")
+    column_profiles = {name: reused[name] if name in reused else profiled[name] for name in columns}
+    return summarize_profiles(parquet_file.metadata.num_rows, column_profiles), column_profiles
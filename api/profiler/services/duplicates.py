@@ -0,0 +1,290 @@
+"""
+Exact duplicate-row detection for Parquet datasets.
+
+DataProfiler.detect_exact_duplicates looks at a sample of at most 1000 rows
+and extrapolates, which says little about tables with millions of rows.
+Here every row of the file is reduced to a 64-bit hash, computed per record
+batch with vectorized kernels: numeric columns are hashed directly and text
+columns are dictionary-encoded so each distinct value is hashed once per
+batch. The (hash, row number) pairs go into a hash table partitioned by the
+top bits of the hash; past a memory budget the partitions are spilled to
+temporary files. Each partition is then counted on its own, which gives the
+exact number of duplicate rows (up to 64-bit hash collisions, around one in
+10^5 for 50 million rows) and the largest duplicate groups, whose rows are
+read back as samples.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from ...datapuur_engine.preview import ORIENT_RECORDS, table_to_json_rows
+from .streaming import PROFILE_BATCH_SIZE, visible_columns
+
+logger = logging.getLogger("profiler.duplicates")
+
+# (hash, row number) pairs kept in memory before partitions are spilled to disk
+DUPLICATE_MEMORY_ROWS = int(os.getenv("PROFILER_DUPLICATE_MEMORY_ROWS", "16000000"))
+
+# Partitions of the hash table, selected by the top bits of the row hash
+HASH_PARTITION_BITS = 8
+
+# Duplicate groups returned with a sample row
+DUPLICATE_SAMPLE_GROUPS = 10
+
+# Hash of a null (or NaN) cell
+NULL_HASH = np.uint64(0x9E3779B97F4A7C15)
+
+# Multiplier used to combine column hashes (64-bit FNV prime)
+COMBINE_MULTIPLIER = np.uint64(0x100000001B3)
+
+ROW_HASH_DTYPE = np.dtype([("hash", "<u8"), ("row", "<i8")])
+
+
+def _hash_strings(array: pa.Array) -> np.ndarray:
+    encoded = pc.dictionary_encode(array)
+    if len(encoded.dictionary) == 0:
+        return np.full(len(array), NULL_HASH, dtype=np.uint64)
+    dictionary_hashes = pd.util.hash_array(encoded.dictionary.to_numpy(zero_copy_only=False), categorize=False)
+    return dictionary_hashes[encoded.indices.fill_null(0).to_numpy(zero_copy_only=False)]
+
+
+def hash_column(array: Union[pa.Array, pa.ChunkedArray]) -> np.ndarray:
+    """64-bit hash of every cell of an Arrow column; nulls and NaN hash to NULL_HASH"""
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    if pa.types.is_dictionary(array.type):
+        array = array.dictionary_decode()
+    data_type = array.type
+
+    if pa.types.is_floating(data_type):
+        array = pc.if_else(pc.is_nan(array), pa.scalar(None, type=data_type), array)
+    if pa.types.is_decimal(data_type):
+        array = array.cast(pa.string())
+        data_type = array.type
+
+    if (pa.types.is_integer(data_type) or pa.types.is_floating(data_type) or pa.types.is_boolean(data_type)):
+        hashes = pd.util.hash_array(array.fill_null(0).to_numpy(zero_copy_only=False))
+    elif pa.types.is_temporal(data_type):
+        values = array.to_numpy(zero_copy_only=False)
+        hashes = pd.util.hash_array(values.view(np.int64) if values.dtype.kind in "mM" else values.astype(str))
+    elif (pa.types.is_string(data_type) or pa.types.is_large_string(data_type)
+          or pa.types.is_binary(data_type) or pa.types.is_large_binary(data_type)):
+        hashes = _hash_strings(array)
+    else:
+        # Nested and other types: hash their string form
+        hashes = pd.util.hash_array(array.to_pandas().astype(str).to_numpy(dtype=object), categorize=False)
+
+    if array.null_count:
+        hashes = hashes.copy()
+        hashes[pc.is_null(array).to_numpy(zero_copy_only=False)] = NULL_HASH
+    return hashes
+
+
+def hash_rows(batch: Union[pa.RecordBatch, pa.Table]) -> np.ndarray:
+    """64-bit hash of every row, combining the column hashes in column order"""
+    hashes = np.zeros(batch.num_rows, dtype=np.uint64)
+    for column in batch.columns:
+        hashes *= COMBINE_MULTIPLIER
+        hashes ^= hash_column(column)
+    return hashes
+
+
+class SpillableHashTable:
+    """
+    (hash, row number) pairs split into partitions by the top bits of the hash.
+
+    Partitions are kept in memory until ``memory_rows`` pairs are buffered,
+    then appended to one temporary file per partition. Partitions are read
+    back one at a time, so counting needs memory for a single partition.
+    """
+
+    def __init__(self, memory_rows: int = DUPLICATE_MEMORY_ROWS,
+                 partition_bits: int = HASH_PARTITION_BITS,
+                 spill_dir: Optional[Union[str, Path]] = None):
+        self.memory_rows = memory_rows
+        self.partition_bits = partition_bits
+        self.spill_dir = spill_dir
+        self._buffers: List[List[np.ndarray]] = [[] for _ in range(1 << partition_bits)]
+        self._buffered = 0
+        self._directory: Optional[str] = None
+
+    @property
+    def spilled(self) -> bool:
+        return self._directory is not None
+
+    def _partition_path(self, partition: int) -> str:
+        return os.path.join(self._directory, f"partition-{partition}.bin")
+
+    def add(self, hashes: np.ndarray, rows: np.ndarray):
+        partitions = (hashes >> np.uint64(64 - self.partition_bits)).astype(np.uint16)
+        order = np.argsort(partitions, kind="stable")
+        records = np.empty(len(hashes), dtype=ROW_HASH_DTYPE)
+        records["hash"] = hashes[order]
+        records["row"] = rows[order]
+        bounds = np.searchsorted(partitions[order], np.arange(len(self._buffers) + 1))
+        for partition in np.flatnonzero(np.diff(bounds)):
+            self._buffers[partition].append(records[bounds[partition]:bounds[partition + 1]])
+        self._buffered += len(hashes)
+        if self._buffered > self.memory_rows:
+            self._spill()
+
+    def _spill(self):
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix="profiler-duplicates-", dir=self.spill_dir)
+            logger.info(f"Row hashes exceed {self.memory_rows} in memory, spilling to {self._directory}")
+        for partition, buffer in enumerate(self._buffers):
+            if buffer:
+                with open(self._partition_path(partition), "ab") as f:
+                    for records in buffer:
+                        records.tofile(f)
+                self._buffers[partition] = []
+        self._buffered = 0
+
+    def partitions(self) -> Iterator[np.ndarray]:
+        """Records of each non-empty partition, in insertion order"""
+        for partition, buffer in enumerate(self._buffers):
+            pieces = list(buffer)
+            if self._directory is not None and os.path.exists(self._partition_path(partition)):
+                pieces.insert(0, np.fromfile(self._partition_path(partition), dtype=ROW_HASH_DTYPE))
+            if pieces:
+                yield np.concatenate(pieces)
+
+    def close(self):
+        self._buffers = [[] for _ in self._buffers]
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+
+
+def read_rows(parquet_file: pq.ParquetFile, columns: List[str], rows: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+    """JSON-ready records of the given row numbers, reading only the row groups that hold them"""
+    starts = np.cumsum([0] + [parquet_file.metadata.row_group(i).num_rows
+                              for i in range(parquet_file.metadata.num_row_groups)])
+    records = {}
+    by_row_group: Dict[int, List[int]] = {}
+    for row in rows:
+        by_row_group.setdefault(int(np.searchsorted(starts, row, side="right") - 1), []).append(row)
+    for row_group, group_rows in by_row_group.items():
+        table = parquet_file.read_row_group(row_group, columns=columns)
+        offsets = [row - int(starts[row_group]) for row in group_rows]
+        for row, record in zip(group_rows, table_to_json_rows(table.take(offsets), ORIENT_RECORDS)):
+            records[row] = record
+    return records
+
+
+def _count_duplicates(batches: Iterator[Union[pa.RecordBatch, pa.Table]], sample_groups: int,
+                      memory_rows: int, spill_dir: Optional[Union[str, Path]]) -> Tuple[int, int, List[Tuple[int, int]], bool]:
+    """
+    Hash every row of the batches and count them per partition.
+
+    Returns:
+        tuple: total rows, duplicate rows, (count, first row) of the largest
+        groups and whether the hash table spilled to disk
+    """
+    table = SpillableHashTable(memory_rows=memory_rows, spill_dir=spill_dir)
+    try:
+        total_rows = 0
+        for batch in batches:
+            table.add(hash_rows(batch), np.arange(total_rows, total_rows + batch.num_rows, dtype=np.int64))
+            total_rows += batch.num_rows
+
+        duplicate_count = 0
+        candidates: List[Tuple[int, int]] = []  # (count, first row) of the largest groups
+        for records in table.partitions():
+            _, first, counts = np.unique(records["hash"], return_index=True, return_counts=True)
+            duplicate_count += len(records) - len(counts)
+            repeated = np.flatnonzero(counts > 1)
+            if len(repeated):
+                largest = repeated[np.argsort(-counts[repeated], kind="stable")[:sample_groups]]
+                candidates.extend((int(counts[i]), int(records["row"][first[i]])) for i in largest)
+        spilled = table.spilled
+    finally:
+        table.close()
+
+    candidates = sorted(candidates, key=lambda candidate: (-candidate[0], candidate[1]))[:sample_groups]
+    return total_rows, duplicate_count, candidates, spilled
+
+
+def _duplicate_result(duplicate_count: int, candidates: List[Tuple[int, int]],
+                      samples: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    groups = [
+        {"group_id": group_id, "count": count, "sample": samples[row]}
+        for group_id, (count, row) in enumerate(candidates)
+    ]
+    return {
+        "count": int(duplicate_count),
+        "values": [group["sample"] for group in groups],
+        "groups": groups
+    }
+
+
+def find_exact_duplicates(path: Union[str, Path],
+                          columns: Optional[Sequence[str]] = None,
+                          sample_groups: int = DUPLICATE_SAMPLE_GROUPS,
+                          memory_rows: int = DUPLICATE_MEMORY_ROWS,
+                          batch_size: int = PROFILE_BATCH_SIZE,
+                          spill_dir: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+    """
+    Count the exact duplicate rows of a Parquet file.
+
+    Args:
+        path: Parquet file
+        columns: Columns that make up a row, all visible columns by default
+        sample_groups: Number of largest duplicate groups to return with a sample row
+        memory_rows: Row hashes kept in memory before spilling to disk
+        batch_size: Rows per record batch
+        spill_dir: Directory for spilled partitions, the system temp directory by default
+
+    Returns:
+        dict: count (rows that repeat an earlier row, like DataFrame.duplicated),
+        values (a sample row of each of the largest groups) and groups
+        (group_id, count and sample row of those groups)
+    """
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    columns = list(columns) if columns is not None else visible_columns(parquet_file.schema_arrow)
+    batches = (parquet_file.iter_batches(batch_size=batch_size, columns=columns)
+               if columns and parquet_file.metadata.num_rows else iter(()))
+    total_rows, duplicate_count, candidates, spilled = _count_duplicates(
+        batches, sample_groups, memory_rows, spill_dir)
+    samples = read_rows(parquet_file, columns, [row for _, row in candidates]) if candidates else {}
+
+    logger.info(f"Found {duplicate_count} exact duplicate rows in {total_rows} rows of {path}"
+                f"{' (spilled to disk)' if spilled else ''}")
+    return _duplicate_result(duplicate_count, candidates, samples)
+
+
+def find_exact_duplicates_in_frame(df: pd.DataFrame,
+                                   sample_groups: int = DUPLICATE_SAMPLE_GROUPS,
+                                   memory_rows: int = DUPLICATE_MEMORY_ROWS,
+                                   batch_size: int = PROFILE_BATCH_SIZE,
+                                   spill_dir: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+    """
+    Count the exact duplicate rows of a DataFrame, converting it to Arrow a batch at a time.
+
+    Takes the same options and returns the same dict as find_exact_duplicates.
+    """
+    def batches() -> Iterator[pa.Table]:
+        for start in range(0, len(df), batch_size):
+            yield pa.Table.from_pandas(df.iloc[start:start + batch_size], preserve_index=False)
+
+    total_rows, duplicate_count, candidates, spilled = _count_duplicates(
+        batches() if len(df.columns) else iter(()), sample_groups, memory_rows, spill_dir)
+    rows = [row for _, row in candidates]
+    samples = {}
+    if rows:
+        records = table_to_json_rows(pa.Table.from_pandas(df.iloc[rows], preserve_index=False), ORIENT_RECORDS)
+        samples = dict(zip(rows, records))
+
+    logger.info(f"Found {duplicate_count} exact duplicate rows in {total_rows} rows"
+                f"{' (spilled to disk)' if spilled else ''}")
+    return _duplicate_result(duplicate_count, candidates, samples)
@@ -4,6 +4,7 @@ from typing import Dict, List, Tuple, Optional, Any, Generator
 import re
 from datetime import datetime, date
 import jellyfish  # For fuzzy string matching
+import pyarrow as pa
 from collections import defaultdict
 import uuid
 from scipy import stats  # Import scipy.stats properly
@@ -19,6 +20,25 @@ from functools import partial
 # Configure logger
 logger = logging.getLogger("profiler.engine")
 
+# Value patterns of the special data types
+EMAIL_PATTERN = r'^[\w\.-]+@[\w\.-]+\.\w+$'
+PHONE_PATTERN = r'^\+?[\d\s-]{10,}$'
+UUID_PATTERN = r'^[0-9a-f]{8}-[0-9a-f]{4}-[1-5][0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$'
+# Enhanced to ignore simple 2-3 digit numbers and common words like "No", "Yes"
+POSTAL_CODE_PATTERN = r'^(?!(?:[0-9]{1,3}|No|Yes|NA|N\/A)$)[A-Z0-9]{2,10}(-[A-Z0-9]{2,10})?$'
+
+# Values that mean "no data" in otherwise filled-in cells
+PLACEHOLDER_VALUES = ['n/a', 'na', 'null', 'none', 'missing', '?', '-']
+
+# Date formats tried for date validity, DD-MM-YYYY first
+DATE_FORMATS = [
+    '%d-%m-%Y',  # DD-MM-YYYY
+    '%d/%m/%Y',  # DD/MM/YYYY
+    '%Y-%m-%d',  # ISO format
+    '%m-%d-%Y',  # US format
+    '%m/%d/%Y',  # US format with slashes
+]
+
 # Helper function for JSON serialization
 def json_serializable(obj):
     """Convert objects to JSON serializable types."""
@@ -34,6 +54,77 @@ def json_serializable(obj):
         return bool(obj)
     return obj
 
+def calculate_column_quality_score(completeness: float, uniqueness: float, validity: float) -> float:
+    """
+    Calculate overall quality score for a column, weighted by importance of different metrics.
+    Returns a float between 0.0 and 1.0.
+    """
+    # Weights for different components (add up to 1.0)
+    completeness_weight = 0.5  # Completeness is most important
+    validity_weight = 0.48     # Validity is equally important
+    uniqueness_weight = 0.02   # Uniqueness is less important (some columns should have low uniqueness)
+    
+    # Calculate weighted score
+    score = (completeness * completeness_weight + 
+             validity * validity_weight + 
+             uniqueness * uniqueness_weight)
+             
+    return float(score)
+
+def detect_data_type(series: pd.Series) -> str:
+    """Detect the profiler data type of a column (date, email, phone, uuid, postal_code, integer, float, string or the dtype)."""
+    if series.dtype == 'object':
+        # Check for date
+        try:
+            pd.to_datetime(series.dropna().iloc[0])
+            return 'date'
+        except:
+            pass
+        
+        # Check for email
+        valid_emails = series.dropna().str.match(EMAIL_PATTERN)
+        if valid_emails.mean() > 0.5:  # If more than 50% match email pattern
+            return 'email'
+        
+        # Check for phone
+        valid_phones = series.dropna().str.match(PHONE_PATTERN)
+        if valid_phones.mean() > 0.5:  # If more than 50% match phone pattern
+            return 'phone'
+            
+        # Check for UUID
+        valid_uuids = series.dropna().str.match(UUID_PATTERN, case=False)
+        if valid_uuids.mean() > 0.5:  # If more than 50% match UUID pattern
+            return 'uuid'
+            
+        # Check for postal code (supporting various formats from different countries)
+        # This regex covers common postal code formats from US, UK, Canada, and many other countries
+        valid_postal = series.dropna().str.match(POSTAL_CODE_PATTERN, case=False)
+        if valid_postal.mean() > 0.5 and len(series.dropna().unique()) > 3:  # Require more than 3 unique values for a postal code column
+            return 'postal_code'
+        
+        # Check for numeric strings
+        try:
+            numeric_series = pd.to_numeric(series.dropna(), errors='coerce')
+            # If at least 80% of non-null values can be converted to numeric, consider it numeric
+            if numeric_series.notna().mean() >= 0.8:
+                # Check if all values are integers
+                if all(float(x).is_integer() for x in numeric_series.dropna()):
+                    return 'integer'
+                else:
+                    return 'float'
+        except:
+            pass
+        
+        return 'string'
+    
+    elif pd.api.types.is_integer_dtype(series):
+        return 'integer'
+    elif pd.api.types.is_float_dtype(series):
+        return 'float'
+    else:
+        return str(series.dtype)
+
+
 class DataProfiler:
     def __init__(self, df: pd.DataFrame, max_memory_mb: int = 1000, chunk_size: int = 100000):
         """Initialize the DataProfiler with a DataFrame.
@@ -90,7 +181,9 @@ class DataProfiler:
         # Profile columns
         if self.use_chunked_processing:
             logger.info(f"Using chunked processing for {self.total_columns} columns")
-            column_profiles = self._profile_columns_chunked()
+            column_profiles = self._profile_columns_single_pass()
+            if column_profiles is None:
+                column_profiles = self._profile_columns_chunked()
         else:
             logger.info(f"Using standard processing for {self.total_columns} columns")
             column_profiles = {}
@@ -116,6 +209,28 @@ class DataProfiler:
         
         return profile_summary, column_profiles
     
+    def _profile_columns_single_pass(self) -> Optional[Dict]:
+        """Profile all columns in one pass over Arrow record batches of chunk_size rows.
+
+        Returns:
+            Dictionary of column profiles, or None when the DataFrame cannot be
+            converted to Arrow (the per-column chunked path is used instead)
+        """
+        from .streaming import detect_column_types, profile_table
+
+        columns = self.df.columns
+        if not columns.is_unique or not all(isinstance(col, str) for col in columns):
+            return None
+        try:
+            table = pa.Table.from_pandas(self.df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+            logger.warning(f"DataFrame cannot be converted to Arrow, profiling column by column: {str(e)}")
+            return None
+
+        column_types = detect_column_types(self.df.head(10000), self.column_data_types)
+        _, column_profiles = profile_table(table, column_types, batch_size=self.chunk_size)
+        return column_profiles
+
     def _profile_columns_chunked(self) -> Dict:
         """Profile columns using chunked processing to reduce memory usage.
         
@@ -639,74 +754,10 @@ class DataProfiler:
         return 0.9  # Default for other types
         
     def _calculate_column_quality_score(self, completeness: float, uniqueness: float, validity: float) -> float:
-        """
-        Calculate overall quality score for a column, weighted by importance of different metrics.
-        Returns a float between 0.0 and 1.0.
-        """
-        # Weights for different components (add up to 1.0)
-        completeness_weight = 0.5  # Completeness is most important
-        validity_weight = 0.48     # Validity is equally important
-        uniqueness_weight = 0.02   # Uniqueness is less important (some columns should have low uniqueness)
-        
-        # Calculate weighted score
-        score = (completeness * completeness_weight + 
-                 validity * validity_weight + 
-                 uniqueness * uniqueness_weight)
-                 
-        return float(score)
+        return calculate_column_quality_score(completeness, uniqueness, validity)
 
     def _detect_data_type(self, series: pd.Series) -> str:
-        if series.dtype == 'object':
-            # Check for date
-            try:
-                pd.to_datetime(series.dropna().iloc[0])
-                return 'date'
-            except:
-                pass
-            
-            # Check for email
-            valid_emails = series.dropna().str.match(r'^[\w\.-]+@[\w\.-]+\.\w+$')
-            if valid_emails.mean() > 0.5:  # If more than 50% match email pattern
-                return 'email'
-            
-            # Check for phone
-            valid_phones = series.dropna().str.match(r'^\+?[\d\s-]{10,}$')
-            if valid_phones.mean() > 0.5:  # If more than 50% match phone pattern
-                return 'phone'
-                
-            # Check for UUID
-            valid_uuids = series.dropna().str.match(r'^[0-9a-f]{8}-[0-9a-f]{4}-[1-5][0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$', case=False)
-            if valid_uuids.mean() > 0.5:  # If more than 50% match UUID pattern
-                return 'uuid'
-                
-            # Check for postal code (supporting various formats from different countries)
-            # This regex covers common postal code formats from US, UK, Canada, and many other countries
-            # Enhanced to ignore simple 2-3 digit numbers and common words like "No", "Yes"
-            valid_postal = series.dropna().str.match(r'^(?!(?:[0-9]{1,3}|No|Yes|NA|N\/A)$)[A-Z0-9]{2,10}(-[A-Z0-9]{2,10})?$', case=False)
-            if valid_postal.mean() > 0.5 and len(series.dropna().unique()) > 3:  # Require more than 3 unique values for a postal code column
-                return 'postal_code'
-            
-            # Check for numeric strings
-            try:
-                numeric_series = pd.to_numeric(series.dropna(), errors='coerce')
-                # If at least 80% of non-null values can be converted to numeric, consider it numeric
-                if numeric_series.notna().mean() >= 0.8:
-                    # Check if all values are integers
-                    if all(float(x).is_integer() for x in numeric_series.dropna()):
-                        return 'integer'
-                    else:
-                        return 'float'
-            except:
-                pass
-            
-            return 'string'
-        
-        elif pd.api.types.is_integer_dtype(series):
-            return 'integer'
-        elif pd.api.types.is_float_dtype(series):
-            return 'float'
-        else:
-            return str(series.dtype)
+        return detect_data_type(series)
 
     def _get_frequent_values(self, series: pd.Series) -> Dict:
         value_counts = series.value_counts().head(10).to_dict()
@@ -825,19 +876,27 @@ class DataProfiler:
             return 0.0
 
 
-    def detect_exact_duplicates(self, sample_size: int = 100000) -> Dict:
+    def detect_exact_duplicates(self, sample_size: int = 100000, exact: bool = False) -> Dict:
         """Detect exact duplicate rows in the DataFrame.
         
-        For large DataFrames, this uses sampling to avoid memory issues.
+        For large DataFrames, this uses sampling to avoid memory issues
+        unless exact is set.
         
         Args:
             sample_size: Maximum number of rows to sample for duplicate detection
+            exact: Hash every row instead of sampling, giving the true duplicate
+                count and the largest duplicate groups
             
         Returns:
             Dictionary with count of duplicates and sample values
         """
         start_time = time.time()
         logger.info(f"Starting exact duplicate detection on {self.total_rows} rows")
+        if exact:
+            from .duplicates import find_exact_duplicates_in_frame
+            result = find_exact_duplicates_in_frame(self.df)
+            logger.info(f"Exact duplicate detection completed in {time.time() - start_time:.2f} seconds")
+            return result
         """
         Detect exact duplicates across all columns in the DataFrame.
         Returns a dictionary with duplicate counts and their values.
@@ -872,20 +931,29 @@ class DataProfiler:
             "values": duplicate_values
         }
 
-    def detect_fuzzy_duplicates(self, threshold: float = 0.95, max_rows: int = 1000) -> Dict:
+    def detect_fuzzy_duplicates(self, threshold: float = 0.95, max_rows: int = 1000,
+                                full_scan: bool = False) -> Dict:
         """Detect fuzzy duplicate rows in the DataFrame.
         
-        For large DataFrames, this uses aggressive sampling to avoid memory issues.
+        For large DataFrames, this uses aggressive sampling to avoid memory issues
+        unless full_scan is set.
         
         Args:
             threshold: Similarity threshold (0.0-1.0), higher means more similar
             max_rows: Maximum number of rows to process for performance
+            full_scan: Compare every row with MinHash/LSH instead of sampling; the
+                threshold is then the mean per-column Jaccard similarity of two rows
             
         Returns:
             Dictionary with count of fuzzy duplicates and sample values
         """
         start_time = time.time()
         logger.info(f"Starting fuzzy duplicate detection with threshold {threshold}")
+        if full_scan:
+            from .near_duplicates import find_near_duplicates_in_frame
+            result = find_near_duplicates_in_frame(self.df, threshold=threshold)
+            logger.info(f"Fuzzy duplicate detection completed in {time.time() - start_time:.2f} seconds")
+            return result
         
         # This is a performance optimization to make the feature usable
         # Only examine a sample of rows for fuzzy duplicates
@@ -0,0 +1,396 @@
+"""
+Near-duplicate row detection with MinHash and locality-sensitive hashing.
+
+DataProfiler.detect_fuzzy_duplicates compares candidate pairs from a 1000-row
+sample in Python, which misses most near duplicates and is skipped for large
+files. Here every row is reduced to a MinHash signature with a block of
+slots per column: text cells are hashed as their lower-cased character
+trigrams and other cells as their value, so the share of equal slots of two
+rows estimates their mean per-column Jaccard similarity. Trigrams are cut
+straight from the Arrow string buffers, once per distinct value of a batch.
+
+Signatures are split into bands, each over the slots of a few random
+columns. The (band hash, row number) pairs go into
+the spillable hash table used for exact duplicates, so rows sharing a band
+meet in one bucket, and every row of a bucket is paired with the bucket's
+first row. Pairs whose signatures agree on at least the threshold are joined
+into groups. Exact copies are left to the exact duplicate count.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from ...datapuur_engine.preview import ORIENT_RECORDS, table_to_json_rows
+from .duplicates import DUPLICATE_MEMORY_ROWS, NULL_HASH, SpillableHashTable, hash_column, hash_rows, read_rows
+from .streaming import PROFILE_BATCH_SIZE, visible_columns
+
+logger = logging.getLogger("profiler.near_duplicates")
+
+# Estimated mean per-column Jaccard similarity above which two rows are near duplicates.
+# Lower than the sampler's 0.9, which scored string columns only: here one typo in an
+# email and a changed amount already bring a 10-column row down to about 0.86.
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("PROFILER_FUZZY_THRESHOLD", "0.8"))
+
+# Slots of a MinHash signature; more slots give a closer similarity estimate
+MINHASH_PERMUTATIONS = int(os.getenv("PROFILER_MINHASH_PERMUTATIONS", "64"))
+
+# Columns an LSH band draws its slots from, beyond the fewest that hold enough slots
+BAND_EXTRA_COLUMNS = 2
+
+# Groups returned with sample rows, and sample rows per group
+NEAR_DUPLICATE_SAMPLE_GROUPS = 5
+NEAR_DUPLICATE_SAMPLE_ROWS = 5
+
+# Trigrams hashed per step when signing the distinct values of a text column
+SHINGLE_STEP = 262144
+
+# Candidate pairs compared per step
+VERIFY_STEP = 1000000
+
+# Signature slot of a row without any token
+EMPTY_SLOT = np.uint32(0xFFFFFFFF)
+
+SEED = 20240611
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finaliser, spreading 64-bit keys over all bits"""
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def lsh_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Bands and rows per band for a signature of num_perm slots.
+
+    Picks the split whose candidate probability 1 - (1 - s^rows)^bands best
+    separates similarities s below the threshold from those above it, weighing
+    false positives and false negatives equally.
+    """
+    similarity = np.linspace(0.0, 1.0, 1001)
+    below = similarity < threshold
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            probability = 1.0 - (1.0 - similarity ** rows) ** bands
+            error = probability[below].sum() + (1.0 - probability[~below]).sum()
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+class MinHasher:
+    """
+    MinHash signatures of record batches.
+
+    Every column gets its own block of slots_per_column slots, so the share
+    of equal slots of two rows estimates the mean of their per-column
+    Jaccard similarities: long text values do not outweigh short ones, and
+    a column missing in both rows counts as equal. LSH bands mix the slots of
+    several columns, see band_slots.
+    """
+
+    def __init__(self, num_columns: int, num_perm: int = MINHASH_PERMUTATIONS, seed: int = SEED):
+        rng = np.random.default_rng(seed)
+        self.num_columns = num_columns
+        self.slots_per_column = max(1, -(-num_perm // max(num_columns, 1)))
+        self.width = self.slots_per_column * num_columns
+        # Slot i maps a 32-bit token hash x to (a_i * x + b_i) mod 2^32, a permutation as a_i is odd
+        self.multipliers = rng.integers(0, 1 << 32, self.width, dtype=np.uint64).astype(np.uint32) | np.uint32(1)
+        self.increments = rng.integers(0, 1 << 32, self.width, dtype=np.uint64).astype(np.uint32)
+        self.seed = seed
+
+    def band_slots(self, bands: int, rows: int) -> List[np.ndarray]:
+        """
+        Slots hashed by each LSH band.
+
+        Every band takes its slots from a random few columns: enough that a
+        band does not hinge on one low-cardinality column, whose buckets would
+        be huge, and few enough that a column that differs entirely between
+        two rows leaves most bands able to match them.
+        """
+        rng = np.random.default_rng(self.seed + 1)
+        band_columns = min(self.num_columns, -(-rows // self.slots_per_column) + BAND_EXTRA_COLUMNS)
+        slots = []
+        for _ in range(bands):
+            columns = rng.choice(self.num_columns, band_columns, replace=False)
+            candidates = (columns[:, None] * self.slots_per_column + np.arange(self.slots_per_column)).ravel()
+            slots.append(rng.choice(candidates, rows, replace=False))
+        return slots
+
+    def _slots(self, tokens: np.ndarray, column: int) -> np.ndarray:
+        """(len(tokens), slots_per_column) slot values of 64-bit token hashes of a column"""
+        block = slice(column * self.slots_per_column, (column + 1) * self.slots_per_column)
+        keys = (tokens >> np.uint64(32)).astype(np.uint32)
+        return keys[:, None] * self.multipliers[None, block] + self.increments[None, block]
+
+    def _sign_text(self, values: pa.Array, column: int) -> np.ndarray:
+        """Signature of the trigram set of each (non-null) text value"""
+        if pa.types.is_string(values.type) or pa.types.is_large_string(values.type):
+            values = pc.utf8_lower(values).cast(pa.large_string())
+        else:
+            values = values.cast(pa.large_binary())
+        offsets = np.frombuffer(values.buffers()[1], dtype=np.int64)[values.offset:values.offset + len(values) + 1]
+        data_buffer = values.buffers()[2]
+        data = np.frombuffer(data_buffer, dtype=np.uint8) if data_buffer is not None else np.empty(0, dtype=np.uint8)
+        data = np.concatenate([data[:offsets[-1]], np.zeros(3, dtype=np.uint8)]).astype(np.uint64)
+
+        # Values shorter than three bytes are a single token of their own
+        lengths = np.diff(offsets)
+        counts = np.maximum(lengths - 2, 1)
+        ends = np.cumsum(counts)
+        signatures = np.empty((len(values), self.slots_per_column), dtype=np.uint32)
+        first_value = 0
+        while first_value < len(values):
+            done = ends[first_value - 1] if first_value else 0
+            last_value = max(int(np.searchsorted(ends, done + SHINGLE_STEP, side="right")), first_value + 1)
+            value_counts = counts[first_value:last_value]
+            value_ids = np.repeat(np.arange(first_value, last_value), value_counts)
+            starts = np.cumsum(value_counts) - value_counts
+            positions = offsets[value_ids] + np.arange(len(value_ids)) - np.repeat(starts, value_counts)
+            value_lengths = lengths[value_ids].astype(np.uint64)
+            codes = (data[positions] * (value_lengths >= 1)) << np.uint64(16)
+            codes |= (data[positions + 1] * (value_lengths >= 2)) << np.uint64(8)
+            codes |= data[positions + 2] * (value_lengths >= 3)
+            codes |= np.minimum(value_lengths, np.uint64(3)) << np.uint64(24)
+            signatures[first_value:last_value] = np.minimum.reduceat(self._slots(_mix(codes), column), starts, axis=0)
+            first_value = last_value
+        return signatures
+
+    def sign(self, batch: Union[pa.RecordBatch, pa.Table]) -> np.ndarray:
+        """(num_rows, width) signatures; null cells leave their column's slots at EMPTY_SLOT"""
+        signatures = np.full((batch.num_rows, self.width), EMPTY_SLOT, dtype=np.uint32)
+        for index, column in enumerate(batch.columns):
+            if isinstance(column, pa.ChunkedArray):
+                column = column.combine_chunks()
+            if pa.types.is_dictionary(column.type):
+                column = column.dictionary_decode()
+            block = slice(index * self.slots_per_column, (index + 1) * self.slots_per_column)
+            data_type = column.type
+            if (pa.types.is_string(data_type) or pa.types.is_large_string(data_type)
+                    or pa.types.is_binary(data_type) or pa.types.is_large_binary(data_type)):
+                encoded = pc.dictionary_encode(column)
+                if len(encoded.dictionary) == 0:
+                    continue
+                valid = pc.is_valid(encoded.indices).to_numpy(zero_copy_only=False)
+                indices = encoded.indices.fill_null(0).to_numpy(zero_copy_only=False)[valid]
+                signatures[valid, block] = self._sign_text(encoded.dictionary, index)[indices]
+            else:
+                hashes = hash_column(column)
+                valid = hashes != NULL_HASH
+                signatures[valid, block] = self._slots(_mix(hashes[valid]), index)
+        return signatures
+
+
+def _band_keys(signatures: np.ndarray, band_slots: List[np.ndarray]) -> List[np.ndarray]:
+    keys = []
+    for band, slots in enumerate(band_slots):
+        key = np.full(len(signatures), band + 1, dtype=np.uint64)
+        for slot in slots:
+            key = _mix(key ^ signatures[:, slot].astype(np.uint64))
+        keys.append(key)
+    return keys
+
+
+def near_duplicate_groups(batches: Iterator[Union[pa.RecordBatch, pa.Table]],
+                          threshold: float = NEAR_DUPLICATE_THRESHOLD,
+                          num_perm: int = MINHASH_PERMUTATIONS,
+                          memory_rows: int = DUPLICATE_MEMORY_ROWS,
+                          spill_dir: Optional[Union[str, Path]] = None
+                          ) -> Tuple[int, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Group the near-duplicate rows of a stream of batches.
+
+    Args:
+        batches: Record batches of the dataset, in row order
+        threshold: Estimated mean per-column Jaccard similarity at which two rows are near duplicates
+        num_perm: Signature slots per row, rounded up to a multiple of the column count
+        memory_rows: Band hashes kept in memory before spilling to disk
+        spill_dir: Directory for signatures and spilled partitions, the system temp directory by default
+
+    Returns:
+        tuple: total rows, the sorted row numbers that belong to a group, the
+        group label of each of those rows and the mean similarity of each group
+    """
+    hasher, bands, band_rows, band_slots = None, 0, 0, []
+    table = SpillableHashTable(memory_rows=memory_rows, spill_dir=spill_dir)
+    directory = tempfile.mkdtemp(prefix="profiler-near-duplicates-", dir=spill_dir)
+    try:
+        total_rows = 0
+        signature_path = os.path.join(directory, "signatures.bin")
+        row_hash_path = os.path.join(directory, "row-hashes.bin")
+        with open(signature_path, "wb") as signature_file, open(row_hash_path, "wb") as row_hash_file:
+            for batch in batches:
+                if hasher is None:
+                    hasher = MinHasher(batch.num_columns, num_perm)
+                    bands, band_rows = lsh_bands(threshold, hasher.width)
+                    band_slots = hasher.band_slots(bands, band_rows)
+                signatures = hasher.sign(batch)
+                rows = np.arange(total_rows, total_rows + batch.num_rows, dtype=np.int64)
+                signed = (signatures != EMPTY_SLOT).any(axis=1)
+                for key in _band_keys(signatures[signed], band_slots):
+                    table.add(key, rows[signed])
+                signatures.tofile(signature_file)
+                hash_rows(batch).tofile(row_hash_file)
+                total_rows += batch.num_rows
+
+        # Pair every row of a bucket with the bucket's first row
+        firsts, seconds = [], []
+        for records in table.partitions():
+            order = np.argsort(records["hash"], kind="stable")
+            keys, rows = records["hash"][order], records["row"][order]
+            new_bucket = np.ones(len(keys), dtype=bool)
+            new_bucket[1:] = keys[1:] != keys[:-1]
+            bucket_first = np.flatnonzero(new_bucket)[np.cumsum(new_bucket) - 1]
+            firsts.append(rows[bucket_first[~new_bucket]])
+            seconds.append(rows[~new_bucket])
+        table.close()
+        empty = np.empty(0, dtype=np.int64)
+        pairs = np.unique(np.concatenate(firsts) * total_rows + np.concatenate(seconds)) if firsts else empty
+
+        signatures = (np.memmap(signature_path, dtype=np.uint32, mode="r", shape=(total_rows, hasher.width))
+                      if total_rows else np.empty((0, 0), dtype=np.uint32))
+        row_hashes = np.fromfile(row_hash_path, dtype=np.uint64)
+        kept_firsts, kept_seconds, kept_similarities = [empty], [empty], [np.empty(0)]
+        for start in range(0, len(pairs), VERIFY_STEP):
+            first, second = np.divmod(pairs[start:start + VERIFY_STEP], total_rows)
+            similarity = (signatures[first] == signatures[second]).mean(axis=1)
+            keep = (similarity >= threshold) & (row_hashes[first] != row_hashes[second])
+            kept_firsts.append(first[keep])
+            kept_seconds.append(second[keep])
+            kept_similarities.append(similarity[keep])
+        del signatures
+    finally:
+        table.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    first, second, similarity = (np.concatenate(kept_firsts), np.concatenate(kept_seconds),
+                                 np.concatenate(kept_similarities))
+    members, inverse = np.unique(np.concatenate([first, second]), return_inverse=True)
+    if not len(members):
+        return total_rows, members, np.empty(0, dtype=np.int64), np.empty(0)
+    graph = coo_matrix((np.ones(len(first)), (inverse[:len(first)], inverse[len(first):])),
+                       shape=(len(members), len(members)))
+    group_count, labels = connected_components(graph, directed=False)
+    pair_labels = labels[inverse[:len(first)]]
+    similarities = (np.bincount(pair_labels, weights=similarity, minlength=group_count)
+                    / np.bincount(pair_labels, minlength=group_count))
+    logger.info(f"Checked {len(pairs)} candidate pairs from {bands} bands of {band_rows} slots, "
+                f"{len(members)} of {total_rows} rows in {group_count} near-duplicate groups")
+    return total_rows, members, labels, similarities
+
+
+def _largest_groups(members: np.ndarray, labels: np.ndarray, sample_groups: int) -> List[Tuple[int, np.ndarray]]:
+    """Label and first sample rows of the largest groups"""
+    if not len(members):
+        return []
+    sizes = np.bincount(labels)
+    order = np.argsort(labels, kind="stable")
+    starts = np.cumsum(sizes) - sizes
+    return [
+        (int(label), members[order[starts[label]:starts[label] + min(sizes[label], NEAR_DUPLICATE_SAMPLE_ROWS)]])
+        for label in np.argsort(-sizes, kind="stable")[:sample_groups]
+    ]
+
+
+def _near_duplicate_result(members: np.ndarray, labels: np.ndarray, similarities: np.ndarray,
+                           groups: List[Tuple[int, np.ndarray]], samples: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    sizes = np.bincount(labels) if len(labels) else np.empty(0, dtype=np.int64)
+    values = [
+        {
+            "group_id": group_id,
+            "count": int(sizes[label]),
+            "similarity": int(round(similarities[label] * 100)),
+            "sample": [samples[int(row)] for row in rows]
+        }
+        for group_id, (label, rows) in enumerate(groups)
+    ]
+    return {
+        # Rows that nearly repeat another row of their group, like the exact count
+        "count": int(len(members) - len(sizes)),
+        "values": values
+    }
+
+
+def find_near_duplicates(path: Union[str, Path],
+                         columns: Optional[Sequence[str]] = None,
+                         threshold: float = NEAR_DUPLICATE_THRESHOLD,
+                         num_perm: int = MINHASH_PERMUTATIONS,
+                         sample_groups: int = NEAR_DUPLICATE_SAMPLE_GROUPS,
+                         memory_rows: int = DUPLICATE_MEMORY_ROWS,
+                         batch_size: int = PROFILE_BATCH_SIZE,
+                         spill_dir: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+    """
+    Find the near-duplicate rows of a Parquet file.
+
+    Args:
+        path: Parquet file
+        columns: Columns that make up a row, all visible columns by default
+        threshold: Estimated mean per-column Jaccard similarity at which two rows are near duplicates
+        num_perm: Signature slots per row, rounded up to a multiple of the column count
+        sample_groups: Number of largest groups to return with sample rows
+        memory_rows: Band hashes kept in memory before spilling to disk
+        batch_size: Rows per record batch
+        spill_dir: Directory for temporary files, the system temp directory by default
+
+    Returns:
+        dict: count (rows that nearly repeat another row) and values (group_id,
+        count, similarity in percent and sample rows of the largest groups)
+    """
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    columns = list(columns) if columns is not None else visible_columns(parquet_file.schema_arrow)
+    batches = (parquet_file.iter_batches(batch_size=batch_size, columns=columns)
+               if columns and parquet_file.metadata.num_rows else iter(()))
+    total_rows, members, labels, similarities = near_duplicate_groups(
+        batches, threshold, num_perm, memory_rows, spill_dir)
+    groups = _largest_groups(members, labels, sample_groups)
+    rows = [int(row) for _, group_rows in groups for row in group_rows]
+    samples = read_rows(parquet_file, columns, rows) if rows else {}
+
+    result = _near_duplicate_result(members, labels, similarities, groups, samples)
+    logger.info(f"Found {result['count']} near-duplicate rows in {total_rows} rows of {path}")
+    return result
+
+
+def find_near_duplicates_in_frame(df: pd.DataFrame,
+                                  threshold: float = NEAR_DUPLICATE_THRESHOLD,
+                                  num_perm: int = MINHASH_PERMUTATIONS,
+                                  sample_groups: int = NEAR_DUPLICATE_SAMPLE_GROUPS,
+                                  memory_rows: int = DUPLICATE_MEMORY_ROWS,
+                                  batch_size: int = PROFILE_BATCH_SIZE,
+                                  spill_dir: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+    """
+    Find the near-duplicate rows of a DataFrame, converting it to Arrow a batch at a time.
+
+    Takes the same options and returns the same dict as find_near_duplicates.
+    """
+    def batches() -> Iterator[pa.Table]:
+        for start in range(0, len(df), batch_size):
+            yield pa.Table.from_pandas(df.iloc[start:start + batch_size], preserve_index=False)
+
+    total_rows, members, labels, similarities = near_duplicate_groups(
+        batches() if len(df.columns) else iter(()), threshold, num_perm, memory_rows, spill_dir)
+    groups = _largest_groups(members, labels, sample_groups)
+    rows = [int(row) for _, group_rows in groups for row in group_rows]
+    samples = {}
+    if rows:
+        records = table_to_json_rows(pa.Table.from_pandas(df.iloc[rows], preserve_index=False), ORIENT_RECORDS)
+        samples = dict(zip(rows, records))
+
+    result = _near_duplicate_result(members, labels, similarities, groups, samples)
+    logger.info(f"Found {result['count']} near-duplicate rows in {total_rows} rows")
+    return result
@@ -0,0 +1,159 @@
+"""
+Process-parallel profiling of Parquet datasets.
+
+Profiling with a thread pool tops out at about one and a half cores because
+the pandas/Python parts of the work hold the GIL. Here a Parquet file is split
+into shards of contiguous row groups (and, when there are fewer row groups
+than workers, of column subsets) that are sketched in a spawned process pool.
+Workers open and read the file themselves, so only the shard description goes
+to a worker and only the bounded-size sketches come back; the parent merges
+them into the profile of the whole file.
+"""
+
+import logging
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .streaming import PROFILE_BATCH_SIZE, ColumnTypes, DatasetSketch, read_column_types, sketch_parquet
+
+logger = logging.getLogger("profiler.parallel")
+
+# Worker processes used for profiling
+PROFILE_MAX_WORKERS = int(os.getenv("PROFILER_MAX_WORKERS", str(os.cpu_count() or 1)))
+
+# Files with fewer rows are profiled in the calling process
+PARALLEL_MIN_ROWS = int(os.getenv("PROFILER_PARALLEL_MIN_ROWS", "500000"))
+
+# Shards per worker, so workers that finish early pick up more work
+SHARDS_PER_WORKER = 2
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _init_worker():
+    # Parallelism comes from the processes; one Arrow thread each avoids oversubscription
+    pa.set_cpu_count(1)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawn rather than fork: the API process runs threads and holds
+            # open database connections that must not be shared with children
+            _executor = ProcessPoolExecutor(max_workers=PROFILE_MAX_WORKERS,
+                                            mp_context=multiprocessing.get_context("spawn"),
+                                            initializer=_init_worker)
+            logger.info(f"Started profiling process pool with {PROFILE_MAX_WORKERS} workers")
+        return _executor
+
+
+def shutdown_executor(wait: bool = False):
+    """Stop the profiling pool; the next parallel profile starts a new one"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait, cancel_futures=True)
+            _executor = None
+
+
+def plan_shards(row_group_rows: Sequence[int], columns: Sequence[str],
+                shards: int) -> List[Tuple[List[int], List[str]]]:
+    """
+    Split a file into about ``shards`` (row groups, columns) pieces.
+
+    Row groups are cut into contiguous runs of similar row counts. When there
+    are fewer row groups than shards, columns are dealt round-robin into groups
+    and every run of row groups is sketched once per column group.
+
+    Returns:
+        list: (row group indexes, column names) per shard
+    """
+    if not row_group_rows or not columns:
+        return []
+    row_shards = max(1, min(len(row_group_rows), shards))
+    cumulative = np.cumsum(row_group_rows)
+    targets = cumulative[-1] * np.arange(1, row_shards) / row_shards
+    boundaries = sorted(set(np.searchsorted(cumulative, targets, side="left") + 1) - {0, len(row_group_rows)})
+    runs = [list(run) for run in np.split(np.arange(len(row_group_rows)), boundaries) if len(run)]
+
+    column_groups = max(1, min(len(columns), math.ceil(shards / len(runs))))
+    groups = [list(columns[i::column_groups]) for i in range(column_groups)]
+    return [([int(rg) for rg in run], group) for run in runs for group in groups]
+
+
+def profile_parquet_parallel(path: Union[str, Path],
+                             column_types: Optional[ColumnTypes] = None,
+                             workers: int = PROFILE_MAX_WORKERS,
+                             min_rows: int = PARALLEL_MIN_ROWS,
+                             batch_size: int = PROFILE_BATCH_SIZE) -> Tuple[Dict, Dict]:
+    """
+    Profile a Parquet file using the profiling process pool.
+
+    Small files, and single-worker setups, are profiled in the calling
+    process. If the pool breaks (e.g. a worker is killed) it is recreated for
+    the next call and this file is profiled in the calling process.
+
+    Args:
+        path: Parquet file
+        column_types: Data types per column; detected from the leading rows when omitted
+        workers: Number of workers to split the file for
+        min_rows: Files with fewer rows are not split
+        batch_size: Rows per record batch
+
+    Returns:
+        tuple: (profile_summary, column_profiles) as returned by DataProfiler.generate_profile
+    """
+    if column_types is None:
+        column_types = read_column_types(path)
+    metadata = pq.ParquetFile(path, memory_map=True).metadata
+    if workers <= 1 or metadata.num_rows < min_rows:
+        return sketch_parquet(path, column_types, batch_size=batch_size).to_profile()
+
+    row_group_rows = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+    shards = plan_shards(row_group_rows, list(column_types), workers * SHARDS_PER_WORKER)
+    if not shards:
+        return sketch_parquet(path, column_types, batch_size=batch_size).to_profile()
+    logger.info(f"Profiling {path} in {len(shards)} shards ({metadata.num_row_groups} row groups, "
+                f"{len(column_types)} columns)")
+
+    try:
+        executor = _get_executor()
+        futures = [
+            executor.submit(sketch_parquet, str(path), {name: column_types[name] for name in columns},
+                            row_groups, batch_size)
+            for row_groups, columns in shards
+        ]
+        # Combine the column groups of each run of row groups, then merge the runs
+        runs: Dict[Tuple[int, ...], DatasetSketch] = {}
+        for (row_groups, _), future in zip(shards, futures):
+            sketch = future.result()
+            key = tuple(row_groups)
+            if key in runs:
+                runs[key].add_columns(sketch)
+            else:
+                runs[key] = sketch
+    except BrokenProcessPool as e:
+        logger.error(f"Profiling pool is broken, profiling {path} in process: {str(e)}")
+        shutdown_executor()
+        return sketch_parquet(path, column_types, batch_size=batch_size).to_profile()
+
+    merged = None
+    for sketch in runs.values():
+        if merged is None:
+            merged = sketch
+        else:
+            merged.merge(sketch)
+    merged.columns = {name: merged.columns[name] for name in column_types}
+    return merged.to_profile()
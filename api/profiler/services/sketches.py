@@ -0,0 +1,327 @@
+"""
+Mergeable streaming sketches used by the single-pass profiler.
+
+Every sketch can be updated with one batch of values at a time and merged
+with another sketch of the same kind, so partial results computed over
+different batches (or different processes) combine into the result for the
+whole dataset. Memory is bounded by the sketch parameters, not the data size.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# HyperLogLog precision: 2^16 one-byte registers, ~0.4% standard error
+HLL_PRECISION = 16
+
+# Distinct hashes tracked exactly before a HyperLogLog estimate is used
+HLL_EXACT_LIMIT = 65536
+
+# Items per level of the quantile sketch; rank error is roughly 1/k
+QUANTILE_SKETCH_K = 2048
+
+# Counters kept by the frequent-items summary
+FREQUENT_ITEMS_CAPACITY = 1024
+
+# Smallest and largest values kept for outlier reporting
+EXTREMES_SIZE = 1000
+
+
+def hash_values(values: np.ndarray) -> np.ndarray:
+    """64-bit hashes of an array of values (numbers, strings or objects)"""
+    return pd.util.hash_array(np.asarray(values), categorize=False)
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Vectorized int.bit_length for uint64 values"""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # Both halves are below 2^32, so float64 log2 is exact enough to floor
+    high_bits = np.floor(np.log2(np.maximum(high, 1))) + 33
+    low_bits = np.floor(np.log2(np.maximum(low, 1))) + 1
+    return np.where(high > 0, high_bits, np.where(low > 0, low_bits, 0)).astype(np.int64)
+
+
+class HyperLogLog:
+    """
+    Distinct counter: exact up to HLL_EXACT_LIMIT distinct values, HyperLogLog beyond.
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION, exact_limit: int = HLL_EXACT_LIMIT):
+        self.precision = precision
+        self.exact_limit = exact_limit
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+        self.exact: Optional[np.ndarray] = np.empty(0, dtype=np.uint64)
+
+    def update_hashes(self, hashes: np.ndarray):
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        value_bits = 64 - self.precision
+        index = (hashes >> np.uint64(value_bits)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << value_bits) - 1)
+        rank = (value_bits - _bit_length(remainder) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+        if self.exact is not None:
+            self.exact = np.union1d(self.exact, hashes)
+            if len(self.exact) > self.exact_limit:
+                self.exact = None
+
+    def update(self, values: np.ndarray):
+        self.update_hashes(hash_values(values))
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        if self.exact is not None and other.exact is not None:
+            self.exact = np.union1d(self.exact, other.exact)
+            if len(self.exact) > self.exact_limit:
+                self.exact = None
+        else:
+            self.exact = None
+
+    def count(self) -> int:
+        if self.exact is not None:
+            return int(len(self.exact))
+        # Ertl's improved estimator ("New cardinality estimation algorithms for
+        # HyperLogLog sketches", 2017): no bias in the small and mid range
+        m = len(self.registers)
+        q = 64 - self.precision
+        histogram = np.bincount(self.registers, minlength=q + 2).astype(np.float64)
+        z = m * _tau(1 - histogram[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + histogram[k])
+        z += m * _sigma(histogram[0] / m)
+        if math.isinf(z):
+            return 0
+        return int(round(m * m / (2 * math.log(2)) / z))
+
+
+def _sigma(x: float) -> float:
+    if x == 1:
+        return math.inf
+    y, z = 1.0, x
+    while True:
+        x *= x
+        previous = z
+        z += x * y
+        y += y
+        if z == previous:
+            return z
+
+
+def _tau(x: float) -> float:
+    if x == 0 or x == 1:
+        return 0.0
+    y, z = 1.0, 1 - x
+    while True:
+        x = math.sqrt(x)
+        previous = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == previous:
+            return z / 3
+
+
+class QuantileSketch:
+    """
+    KLL-style compactor hierarchy for approximate quantiles and ranks.
+
+    Level h holds items of weight 2^h. When a level exceeds k items it is
+    sorted and every other item (from a random offset) is promoted to the
+    next level. Each compaction moves any rank by at most the item weight,
+    regardless of how many items were compacted, so large batches are cheap.
+    """
+
+    def __init__(self, k: int = QUANTILE_SKETCH_K, seed: Optional[int] = None):
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray):
+        if len(values) == 0:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], np.asarray(values, dtype=np.float64)])
+        self.n += len(values)
+        self._compact()
+
+    def merge(self, other: "QuantileSketch"):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compact()
+
+    def _compact(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.k:
+                items = np.sort(items)
+                # An odd item out stays at this level
+                leftover = items[len(items) - (len(items) % 2):]
+                items = items[:len(items) - (len(items) % 2)]
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level] = leftover
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def _weighted_items(self) -> Tuple[np.ndarray, np.ndarray]:
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 1 << level, dtype=np.int64)
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs: List[float]) -> List[Optional[float]]:
+        if self.n == 0:
+            return [None for _ in qs]
+        values, cumulative = self._weighted_items()
+        total = cumulative[-1]
+        positions = np.searchsorted(cumulative, [q * total for q in qs], side="left")
+        return [float(values[min(p, len(values) - 1)]) for p in positions]
+
+    def rank(self, value: float, inclusive: bool = False) -> float:
+        """Approximate fraction of values below (or at most) value"""
+        if self.n == 0:
+            return 0.0
+        values, cumulative = self._weighted_items()
+        position = np.searchsorted(values, value, side="right" if inclusive else "left")
+        return float(cumulative[position - 1] / cumulative[-1]) if position > 0 else 0.0
+
+
+def _object_array(items) -> np.ndarray:
+    """1-D object array of the given values (tuples stay single elements)"""
+    array = np.empty(len(items), dtype=object)
+    array[:] = list(items)
+    return array
+
+
+class FrequentItems:
+    """
+    Mergeable top-k summary of value counts.
+
+    At most ``capacity`` counters are kept; when more values are seen, the
+    ones with the smallest counts are dropped. Counts are exact while fewer
+    than ``capacity`` distinct values have been seen. Beyond that they never
+    overestimate, and a value loses at most ``error`` occurrences, so the
+    counts of frequent values stay exact in practice.
+    """
+
+    def __init__(self, capacity: int = FREQUENT_ITEMS_CAPACITY):
+        self.capacity = capacity
+        self.counts: Dict[Any, int] = {}
+        self.error = 0
+
+    def _reduce(self, values: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Keep the capacity largest counters; also return the largest count dropped"""
+        order = np.argpartition(counts, len(counts) - self.capacity)
+        keep, drop = order[len(counts) - self.capacity:], order[:len(counts) - self.capacity]
+        return values[keep], counts[keep], int(counts[drop].max())
+
+    def update_counts(self, values: np.ndarray, counts: np.ndarray):
+        """Add pre-aggregated (value, count) pairs, e.g. from a batch value_counts"""
+        counts = np.asarray(counts, dtype=np.int64)
+        if len(counts) > self.capacity:
+            # Summarize the batch first so at most capacity counters are merged
+            values, counts, dropped = self._reduce(np.asarray(values), counts)
+            self.error += dropped
+        for value, count in zip(values.tolist(), counts.tolist()):
+            self.counts[value] = self.counts.get(value, 0) + count
+        if len(self.counts) > self.capacity:
+            values, counts, dropped = self._reduce(_object_array(self.counts),
+                                                   np.fromiter(self.counts.values(), dtype=np.int64))
+            self.counts = dict(zip(values.tolist(), counts.tolist()))
+            self.error += dropped
+
+    def merge(self, other: "FrequentItems"):
+        self.error += other.error
+        if other.counts:
+            self.update_counts(_object_array(other.counts),
+                               np.fromiter(other.counts.values(), dtype=np.int64, count=len(other.counts)))
+
+    def top(self, n: int) -> List[Tuple[Any, int]]:
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+class StreamingMoments:
+    """Count, mean, variance, min and max with Chan et al. parallel merging"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _combine(self, n: int, mean: float, m2: float, minimum: float, maximum: float):
+        if n == 0:
+            return
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    def update(self, values: np.ndarray):
+        if len(values) == 0:
+            return
+        values = np.asarray(values, dtype=np.float64)
+        mean = float(values.mean())
+        self._combine(len(values), mean, float(np.sum((values - mean) ** 2)), float(values.min()), float(values.max()))
+
+    def merge(self, other: "StreamingMoments"):
+        self._combine(other.n, other.mean, other.m2, other.min, other.max)
+
+    def variance(self, ddof: int = 1) -> Optional[float]:
+        if self.n - ddof <= 0:
+            return None
+        return self.m2 / (self.n - ddof)
+
+    def std(self, ddof: int = 1) -> Optional[float]:
+        variance = self.variance(ddof)
+        return math.sqrt(variance) if variance is not None else None
+
+
+class Extremes:
+    """The ``size`` smallest and largest values seen (with repetitions)"""
+
+    def __init__(self, size: int = EXTREMES_SIZE):
+        self.size = size
+        self.smallest = np.empty(0, dtype=np.float64)
+        self.largest = np.empty(0, dtype=np.float64)
+
+    def _combine(self, smallest: np.ndarray, largest: np.ndarray):
+        smallest = np.concatenate([self.smallest, smallest])
+        largest = np.concatenate([self.largest, largest])
+        if len(smallest) > self.size:
+            smallest = np.partition(smallest, self.size - 1)[:self.size]
+        if len(largest) > self.size:
+            largest = np.partition(largest, len(largest) - self.size)[-self.size:]
+        self.smallest, self.largest = smallest, largest
+
+    def update(self, values: np.ndarray):
+        if len(values) == 0:
+            return
+        values = np.asarray(values, dtype=np.float64)
+        self._combine(values, values)
+
+    def merge(self, other: "Extremes"):
+        self._combine(other.smallest, other.largest)
+
+    def beyond(self, lower: float, upper: float) -> np.ndarray:
+        """
+        Values below lower or above upper among the kept extremes.
+
+        The two ends may hold the same values when few were seen, but a value
+        is only taken from the end matching its side, so none is counted twice.
+        """
+        return np.concatenate([self.smallest[self.smallest < lower], self.largest[self.largest > upper]])
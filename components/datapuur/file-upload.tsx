@@ -210,6 +210,8 @@ export function FileUpload({
         
         // For large files, use a streaming approach with chunked upload
         const CHUNK_SIZE = 5 * 1024 * 1024; // 5MB chunks for better performance
+        const PARALLEL_CHUNK_UPLOADS = 4; // Concurrent chunk requests per file
+        const MAX_CHUNK_ATTEMPTS = 3; // Attempts per chunk before the upload fails
         
         if (file.size > 50 * 1024 * 1024) { // Only use chunked upload for files > 50MB
           // Use chunked upload for large files
@@ -220,67 +222,113 @@ export function FileUpload({
           const uploadId = `upload-${Date.now()}-${Math.random().toString(36).substring(2, 15)}`;
           uploadIdRef.current = uploadId;
           
-          for (let start = 0; start < file.size; start += CHUNK_SIZE) {
-            // Check for cancellation before each chunk
-            if (isCancelling || localStorage.getItem(`cancelled_upload_${uploadId}`) === "true") {
-              console.log("Upload cancelled during chunking, stopping chunk upload")
-              throw new Error("Upload cancelled by user")
+          const apiBaseUrl = getApiBaseUrl();
+          const authHeaders = { Authorization: `Bearer ${localStorage.getItem("token")}` };
+
+          // Preallocate the upload on the server; chunks are written at their final offset,
+          // so they can be sent in parallel and the response lists any chunks still missing
+          const initResponse = await fetch(`${apiBaseUrl}/api/datapuur/init-chunked-upload`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', ...authHeaders },
+            body: JSON.stringify({
+              uploadId,
+              fileName: file.name,
+              totalSize: file.size,
+              chunkBytes: CHUNK_SIZE,
+              totalChunks
+            }),
+          });
+          if (!initResponse.ok) {
+            if (initResponse.status === 403) {
+              throw new Error("Permission denied: You don't have sufficient permissions to upload files");
             }
-            
-            const chunk = file.slice(start, start + CHUNK_SIZE);
+            throw new Error(`Failed to start chunked upload for ${file.name}`);
+          }
+          const pendingChunks: number[] = (await initResponse.json()).missing_chunks;
+
+          const sha256Hex = async (blob: Blob): Promise<string | null> => {
+            if (typeof crypto === "undefined" || !crypto.subtle) return null;
+            const digest = await crypto.subtle.digest("SHA-256", await blob.arrayBuffer());
+            return Array.from(new Uint8Array(digest)).map((b) => b.toString(16).padStart(2, "0")).join("");
+          };
+
+          const uploadChunk = async (chunkIndex: number) => {
+            const chunk = file.slice(chunkIndex * CHUNK_SIZE, (chunkIndex + 1) * CHUNK_SIZE);
+            const checksum = await sha256Hex(chunk);
             const chunkFormData = new FormData();
             chunkFormData.append('file', chunk, file.name);
             chunkFormData.append('chunkSize', chunkSize.toString());
-            chunkFormData.append('chunkIndex', String(uploadedChunks));
+            chunkFormData.append('chunkIndex', String(chunkIndex));
             chunkFormData.append('totalChunks', String(totalChunks));
             chunkFormData.append('uploadId', uploadId);
-            
-            try {
-              // Send the chunk
-              const apiBaseUrl = getApiBaseUrl();
+            chunkFormData.append('chunkBytes', String(CHUNK_SIZE));
+            chunkFormData.append('totalSize', String(file.size));
+            if (checksum) {
+              chunkFormData.append('checksum', checksum);
+            }
+
+            // Retry transient failures and checksum mismatches a few times
+            for (let attempt = 1; ; attempt++) {
               const response = await fetch(`${apiBaseUrl}/api/datapuur/upload-chunk`, {
                 method: 'POST',
-                headers: {
-                  Authorization: `Bearer ${localStorage.getItem("token")}`,
-                },
+                headers: authHeaders,
                 body: chunkFormData,
               });
-              
-              if (!response.ok) {
-                // Handle permission denied errors
-                if (response.status === 403) {
-                  throw new Error("Permission denied: You don't have sufficient permissions to upload files");
-                }
-                throw new Error(`Failed to upload chunk ${uploadedChunks + 1} of ${totalChunks}`);
+              if (response.ok) return;
+              // Handle permission denied errors
+              if (response.status === 403) {
+                throw new Error("Permission denied: You don't have sufficient permissions to upload files");
+              }
+              if (attempt >= MAX_CHUNK_ATTEMPTS || response.status === 400) {
+                throw new Error(`Failed to upload chunk ${chunkIndex + 1} of ${totalChunks}`);
+              }
+            }
+          };
+
+          // Send chunks with a small number of parallel requests
+          uploadedChunks = totalChunks - pendingChunks.length;
+          const uploadWorker = async () => {
+            while (pendingChunks.length > 0) {
+              // Check for cancellation before each chunk
+              if (isCancelling || localStorage.getItem(`cancelled_upload_${uploadId}`) === "true") {
+                console.log("Upload cancelled during chunking, stopping chunk upload")
+                throw new Error("Upload cancelled by user")
+              }
+
+              const chunkIndex = pendingChunks.shift() as number;
+              try {
+                await uploadChunk(chunkIndex);
+              } catch (error) {
+                console.error("Error uploading chunk:", error);
+                throw error;
               }
-              
               uploadedChunks++;
-              
+
               // Update progress based on chunks
               const percentComplete = Math.round((uploadedChunks / totalChunks) * 100);
-              
+
               // Update the job progress
               const progressJob: Job = {
                 ...initialJob,
                 progress: percentComplete,
                 details: `Uploading: ${percentComplete}% of ${(file.size / 1024 / 1024).toFixed(2)} MB`,
               };
-              
+
               // Update the job in the UI
               if (onJobUpdated) {
                 onJobUpdated(progressJob)
               }
               // Also update in global context
               updateJob(progressJob)
-              
+
               // Update status
               onStatusChange(`Uploading file ${i + 1} of ${filesToProcess.length}: ${file.name} (${percentComplete}%)...`)
               setProcessingStatus(`Uploading file ${i + 1} of ${filesToProcess.length}: ${file.name} (${percentComplete}%)...`)
-            } catch (error) {
-              console.error("Error uploading chunk:", error);
-              throw error;
             }
-          }
+          };
+          await Promise.all(
+            Array.from({ length: Math.min(PARALLEL_CHUNK_UPLOADS, pendingChunks.length) }, () => uploadWorker())
+          );
           
           // Check for cancellation before completing the upload
           if (isCancelling || localStorage.getItem(`cancelled_upload_${uploadId}`) === "true") {
@@ -289,7 +337,6 @@ export function FileUpload({
           }
           
           // Complete the chunked upload
-          const apiBaseUrl = getApiBaseUrl();
           const completeResponse = await fetch(`${apiBaseUrl}/api/datapuur/complete-chunked-upload`, {
             method: 'POST',
             headers: {
@@ -260,6 +260,8 @@ function clean_database {
 }
 
 # Find all node CSV files in the import directory
+# A label is either one <label>_nodes.csv file or a <label>_nodes_header.csv
+# file with its <label>_nodes_part*.csv shards, passed as one comma-separated group
 function find_node_files {
     echo "Finding node CSV files..."
     NODE_FILES=()
@@ -271,24 +273,53 @@ function find_node_files {
             echo "  Found node file: $(basename "$file")"
         fi
     done
+    for header in "$IMPORT_DIR"/*_nodes_header.csv; do
+        if [ -f "$header" ]; then
+            group="$header"
+            for part in "${header%_header.csv}"_part*.csv; do
+                if [ -f "$part" ]; then
+                    group="$group,$part"
+                fi
+            done
+            NODE_FILES+=("$group")
+            NODE_FILES_BASENAME+=($(basename "$header"))
+            echo "  Found node files: $(basename "$header") and its shards"
+        fi
+    done
     
     if [ ${#NODE_FILES[@]} -eq 0 ]; then
         echo "Error: No node files found in $IMPORT_DIR"
-        echo "Node files should be named <label>_nodes.csv"
+        echo "Node files should be named <label>_nodes.csv or <label>_nodes_header.csv and <label>_nodes_part*.csv"
         exit 1
     fi
 }
 
-# Find relationship CSV file in the import directory
+# Find relationship CSV files in the import directory
+# Either one relationships.csv file or, per relationship type, a
+# <type>_relationships_header.csv file with its <type>_relationships_part*.csv shards
 function find_relationship_file {
-    echo "Finding relationship CSV file..."
-    REL_FILE="$IMPORT_DIR/relationships.csv"
-    REL_FILE_BASENAME="relationships.csv"
-    if [ ! -f "$REL_FILE" ]; then
-        echo "Error: Relationship file not found at $REL_FILE"
+    echo "Finding relationship CSV files..."
+    REL_FILES=()
+    if [ -f "$IMPORT_DIR/relationships.csv" ]; then
+        REL_FILES+=("$IMPORT_DIR/relationships.csv")
+        echo "  Found relationship file: relationships.csv"
+    fi
+    for header in "$IMPORT_DIR"/*_relationships_header.csv; do
+        if [ -f "$header" ]; then
+            group="$header"
+            for part in "${header%_header.csv}"_part*.csv; do
+                if [ -f "$part" ]; then
+                    group="$group,$part"
+                fi
+            done
+            REL_FILES+=("$group")
+            echo "  Found relationship files: $(basename "$header") and its shards"
+        fi
+    done
+    if [ ${#REL_FILES[@]} -eq 0 ]; then
+        echo "Error: No relationship files found in $IMPORT_DIR"
         exit 1
     fi
-    echo "  Found relationship file: $REL_FILE_BASENAME"
 }
 
 # Import the database using neo4j-admin import
@@ -303,8 +334,10 @@ function import_database {
         IMPORT_CMD="$IMPORT_CMD --nodes=$file"
     done
     
-    # Add relationship file with full path
-    IMPORT_CMD="$IMPORT_CMD --relationships=$REL_FILE"
+    # Add relationship files with full paths
+    for file in "${REL_FILES[@]}"; do
+        IMPORT_CMD="$IMPORT_CMD --relationships=$file"
+    done
     
     # Add delimiter options
     IMPORT_CMD="$IMPORT_CMD --multiline-fields=true --delimiter=\",\" --array-delimiter=\";\""